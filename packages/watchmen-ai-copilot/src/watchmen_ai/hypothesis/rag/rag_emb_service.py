@@ -17,10 +17,42 @@ from watchmen_ai.hypothesis.model.common import SimulationResult, ChallengeAnaly
 from watchmen_ai.hypothesis.model.analysis import BusinessChallengeWithProblems
 from watchmen_ai.hypothesis.report.markdown_report import build_analysis_report_md
 from watchmen_ai.hypothesis.rag.azure_openai_register import AzureOpenAIEmbeddings
+from watchmen_search import CachedEmbeddingProvider, EmbeddingProvider, SqliteEmbeddingCache
 
 logger = getLogger(__name__)
 
 
+class EmbeddingFunctionProvider(EmbeddingProvider):
+    """Adapt a lancedb embedding function to the watchmen-search embedding provider"""
+
+    def __init__(self, embedding_func: AzureOpenAIEmbeddings, dimension: int):
+        self.embedding_func = embedding_func
+        self._dimension = dimension
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        embeddings = self.embedding_func.generate_embeddings(texts)
+        return [e.tolist() if isinstance(e, np.ndarray) else e for e in embeddings]
+
+
+class SentenceTransformerProvider(EmbeddingProvider):
+    """Adapt a sentence-transformers model to the watchmen-search embedding provider"""
+
+    def __init__(self, model: Any):
+        self.model = model
+        self._dimension = model.get_sentence_embedding_dimension()
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        return self.model.encode(texts, convert_to_numpy=True).tolist()
+
+
 class ChallengeDocument(BaseModel):
     """Challenge document model for vector storage"""
     id: str
@@ -60,7 +92,9 @@ class RAGEmbeddingService:
                  azure_api_key: Optional[str] = None,
                  azure_endpoint: Optional[str] = None,
                  azure_deployment: Optional[str] = None,
-                 azure_api_version: str = "2023-05-15"):
+                 azure_api_version: str = "2023-05-15",
+                 embedding_batch_size: int = 64,
+                 embedding_concurrency: int = 4):
         """
         Initialize RAG Embedding Service
 
@@ -74,6 +108,8 @@ class RAGEmbeddingService:
             azure_endpoint: Azure OpenAI endpoint (if None, uses AZURE_OPENAI_ENDPOINT env var)
             azure_deployment: Azure OpenAI deployment name (if None, uses AZURE_OPENAI_DEPLOYMENT env var)
             azure_api_version: Azure OpenAI API version
+            embedding_batch_size: Max texts sent to embedding model in one call
+            embedding_concurrency: Max embedding calls in flight
         """
         self.db_path = db_path
         self.table_name = table_name
@@ -105,6 +141,24 @@ class RAGEmbeddingService:
                     "AZURE_OPENAI_DEPLOYMENT"
                 )
 
+            provider = EmbeddingFunctionProvider(self.azure_embedding_func, self.embedding_dim)
+        else:
+            # Use sentence-transformers (fallback)
+            from sentence_transformers import SentenceTransformer
+
+            self.embedding_model = SentenceTransformer(embedding_model)
+            provider = SentenceTransformerProvider(self.embedding_model)
+            self.embedding_dim = provider.dimension
+
+        # Batched embedding, vectors are cached by model and text, unchanged chunks are never embedded again
+        self.embedding_provider = CachedEmbeddingProvider(
+            provider,
+            model_id=embedding_model,
+            cache=SqliteEmbeddingCache(os.path.join(db_path, "embedding_cache.sqlite")),
+            batch_size=embedding_batch_size,
+            max_concurrency=embedding_concurrency
+        )
+
         # Initialize database
         self.db = None
         self.table = None
@@ -495,15 +549,13 @@ class RAGEmbeddingService:
 
     def _generate_embedding(self, text: str) -> List[float]:
         """Generate embedding for text"""
+        return self._generate_embeddings([text])[0]
+
+    def _generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings for texts in batches, same order as given texts"""
         try:
-            if self.embedding_model_name == "text-embedding-ada-002":
-                # Use Azure OpenAI API
-                embeddings = self.azure_embedding_func.generate_embeddings([text])
-                return embeddings[0].tolist() if isinstance(embeddings[0], np.ndarray) else embeddings[0]
-            else:
-                # Use sentence-transformers (fallback)
-                embedding = self.embedding_model.encode(text, convert_to_numpy=True)
-                return embedding.tolist()
+            # Azure OpenAI API or sentence-transformers, cached
+            return self.embedding_provider.embed_batch(texts)
         except Exception as e:
             logger.error(f"Failed to generate embedding: {str(e)}")
             raise
@@ -691,9 +743,10 @@ class RAGEmbeddingService:
             "vector": []
         }
 
-        for doc in documents:
-            # Generate embedding
-            embedding = self._generate_embedding(doc.markdown_content)
+        # Generate embeddings of all documents in batches
+        embeddings = self._generate_embeddings([doc.markdown_content for doc in documents])
+
+        for doc, embedding in zip(documents, embeddings):
 
             # Add to data
             data["id"].append(doc.id)
@@ -1 +1,3 @@
 from .collector_cache_service import CollectorCacheService
+from .cache_heart_beat import heart_beat_on_collector_configs, heart_beat_on_collector_configs_if_due, \
+	heart_beat_on_model_configs, heart_beat_on_module_configs, heart_beat_on_table_configs
@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta
+from logging import getLogger
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+
+from watchmen_collector_kernel.model import CollectorModelConfig, CollectorModuleConfig, CollectorTableConfig
+from watchmen_collector_kernel.storage import get_collector_model_config_service, \
+	get_collector_module_config_service, get_collector_table_config_service
+from watchmen_meta.common import ask_meta_storage, ask_snowflake_generator, ask_super_admin, TupleService, \
+	TupleVersion
+from watchmen_utilities import ArrayHelper
+from .collector_cache_service import CollectorCacheService
+
+logger = getLogger(__name__)
+
+# max count of ids in one "in" criteria
+IDS_CHUNK_SIZE = 500
+
+CachedConfig = TypeVar('CachedConfig', CollectorModuleConfig, CollectorModelConfig, CollectorTableConfig)
+
+
+def is_changed(cached: CachedConfig, loaded: TupleVersion) -> bool:
+	return loaded.lastModifiedAt > cached.lastModifiedAt or loaded.version > cached.version
+
+
+def find_changes(
+		service: TupleService, cached_configs: List[CachedConfig], get_id: Callable[[CachedConfig], str]
+) -> Tuple[List[CachedConfig], List[Tuple[CachedConfig, CachedConfig]]]:
+	"""
+	check versions of all cached configs in bulk, then load changed ones in bulk.
+	returns removed configs, and pairs of cached and reloaded config.
+	"""
+	cached_by_id: Dict[str, CachedConfig] = {get_id(config): config for config in cached_configs}
+	removed: List[CachedConfig] = []
+	changed_ids: List[str] = []
+	for ids in ArrayHelper(list(cached_by_id.keys())).chunk(IDS_CHUNK_SIZE).to_list():
+		versions: Dict[str, TupleVersion] = {str(x.tupleId): x for x in service.find_versions_by_ids(ids)}
+		for config_id in ids:
+			loaded = versions.get(config_id)
+			if loaded is None:
+				removed.append(cached_by_id[config_id])
+			elif is_changed(cached_by_id[config_id], loaded):
+				changed_ids.append(config_id)
+	changed: List[Tuple[CachedConfig, CachedConfig]] = []
+	for ids in ArrayHelper(changed_ids).chunk(IDS_CHUNK_SIZE).to_list():
+		for loaded in service.find_by_ids(ids):
+			changed.append((cached_by_id[get_id(loaded)], loaded))
+	return removed, changed
+
+
+def heart_beat_on_module_configs() -> None:
+	module_configs = CollectorCacheService.module_config().all()
+	if len(module_configs) == 0:
+		return
+	service = get_collector_module_config_service(ask_meta_storage(), ask_snowflake_generator(), ask_super_admin())
+	service.begin_transaction()
+	try:
+		removed, changed = find_changes(service, module_configs, lambda x: x.moduleId)
+	finally:
+		service.close_transaction()
+	for module_config in removed:
+		CollectorCacheService.module_config().remove(module_config.moduleId)
+	for _, loaded in changed:
+		CollectorCacheService.module_config().put(loaded)
+
+
+def heart_beat_on_model_configs() -> None:
+	model_configs = CollectorCacheService.model_config().all()
+	if len(model_configs) == 0:
+		return
+	service = get_collector_model_config_service(ask_meta_storage(), ask_snowflake_generator(), ask_super_admin())
+	service.begin_transaction()
+	try:
+		removed, changed = find_changes(service, model_configs, lambda x: x.modelId)
+	finally:
+		service.close_transaction()
+	for model_config in removed:
+		CollectorCacheService.model_config().remove(model_config.modelName, model_config.tenantId)
+	for _, loaded in changed:
+		CollectorCacheService.model_config().put(loaded)
+
+
+def heart_beat_on_table_configs() -> None:
+	table_configs = CollectorCacheService.table_config().all()
+	if len(table_configs) == 0:
+		return
+	service = get_collector_table_config_service(ask_meta_storage(), ask_snowflake_generator(), ask_super_admin())
+	service.begin_transaction()
+	try:
+		removed, changed = find_changes(service, table_configs, lambda x: x.configId)
+	finally:
+		service.close_transaction()
+	table_config_cache = CollectorCacheService.table_config()
+	for table_config in removed:
+		table_config_cache.remove_config_by_name(table_config.name, table_config.tenantId)
+		table_config_cache.remove_configs_by_parent_name(table_config.parentName, table_config.tenantId)
+	for table_config, loaded in changed:
+		table_config_cache.remove_configs_by_parent_name(table_config.parentName, table_config.tenantId)
+		table_config_cache.put_config_by_name(loaded)
+
+
+def heart_beat_on_collector_configs() -> None:
+	heart_beat_on_module_configs()
+	heart_beat_on_model_configs()
+	heart_beat_on_table_configs()
+
+
+class CollectorConfigsHeartBeat:
+	"""
+	for process which has no scheduler, heart beat is checked on demand.
+	"""
+
+	def __init__(self):
+		self.lock = Lock()
+		self.lastBeatAt: Optional[datetime] = None
+
+	def is_due(self, interval: int) -> bool:
+		return self.lastBeatAt is None or datetime.now() - self.lastBeatAt >= timedelta(seconds=interval)
+
+	def beat_if_due(self, interval: int) -> None:
+		if not self.is_due(interval):
+			return
+		with self.lock:
+			if not self.is_due(interval):
+				return
+			self.lastBeatAt = datetime.now()
+		try:
+			heart_beat_on_collector_configs()
+		except Exception as e:
+			logger.error('Collector configs heart beat failed.', exc_info=e)
+
+
+collector_configs_heart_beat = CollectorConfigsHeartBeat()
+
+
+def heart_beat_on_collector_configs_if_due(interval: int) -> None:
+	collector_configs_heart_beat.beat_if_due(interval)
@@ -1,18 +1,136 @@
 from logging import getLogger
-from typing import Optional, Dict, Any, Tuple, List
+from typing import Optional, Dict, Any, Tuple, List, Union
 
 from watchmen_auth import PrincipalService
-from watchmen_collector_kernel.model import CollectorTableConfig, Condition
+from watchmen_collector_kernel.common import LEFT_BRACE, RIGHT_BRACE
+from watchmen_collector_kernel.model import CollectorTableConfig, Condition, ConditionExpression, ConditionJoint
 from .criteria_builder import CriteriaBuilder
+from .extract_spi import ExtractorSPI
 from .table_config_service import get_table_config_service
-from .extract_source import ask_source_extractor
+from .extract_source import ask_source_extractor, SourceS3Extractor
 from watchmen_collector_kernel.storage import get_collector_table_config_service
-from watchmen_storage import TransactionalStorageSPI, SnowflakeGenerator, EntityCriteria
+from watchmen_storage import TransactionalStorageSPI, SnowflakeGenerator, EntityCriteria, EntityCriteriaOperator, \
+	EntityCriteriaExpression, ColumnNameLiteral
 from watchmen_utilities import ArrayHelper
-from .extract_utils import build_criteria_by_join_key
+from .extract_utils import build_criteria_by_join_key, build_criteria_by_primary_key, normalize_join_value
 
 logger = getLogger(__name__)
 
+# max count of distinct keys in one "in" criteria
+KEYS_CHUNK_SIZE = 500
+
+
+def is_variable(value: Any) -> bool:
+	return isinstance(value, str) and value.startswith(LEFT_BRACE) and value.endswith(RIGHT_BRACE)
+
+
+def has_variable(condition: Condition) -> bool:
+	if isinstance(condition, ConditionExpression):
+		value = condition.columnValue
+		if isinstance(value, list):
+			return ArrayHelper(value).some(is_variable)
+		return is_variable(value)
+	elif isinstance(condition, ConditionJoint):
+		return ArrayHelper(condition.children).some(has_variable)
+	else:
+		return True
+
+
+class JoinPlan:
+	"""
+	join conditions which can be queried for many rows by "in" criteria.
+	each equation is a column of target table equals to a variable of source row,
+	static conditions have no variable, they are same for all source rows.
+	"""
+
+	def __init__(self, equations: List[Tuple[str, str]], static_conditions: List[Condition]):
+		self.equations = equations
+		self.staticConditions = static_conditions
+
+
+def plan_join(conditions: List[Condition]) -> Optional[JoinPlan]:
+	equations: List[Tuple[str, str]] = []
+	static_conditions: List[Condition] = []
+	for condition in conditions:
+		if isinstance(condition, ConditionExpression) \
+				and condition.operator == EntityCriteriaOperator.EQUALS and is_variable(condition.columnValue):
+			equations.append((condition.columnName, condition.columnValue))
+		elif not has_variable(condition):
+			static_conditions.append(condition)
+		else:
+			return None
+	if len(equations) == 0:
+		return None
+	return JoinPlan(equations, static_conditions)
+
+
+def get_column_value(row: Dict[str, Any], column_name: str) -> Any:
+	if column_name in row:
+		return row.get(column_name)
+	return row.get(column_name.lower())
+
+
+def find_rows_by_keys(
+		extractor: ExtractorSPI, static_criteria: EntityCriteria, column_names: List[str],
+		keys: List[List[Any]]) -> List[List[Dict[str, Any]]]:
+	"""
+	find rows which match the given values of columns, for each key.
+	distinct keys are queried by one "in" criteria on each column per chunk, and matched in memory.
+	"in" criteria of composite key matches any combination of column values, which might be a key of another chunk,
+	therefore only rows of keys in current chunk are taken.
+	"""
+	normalized_keys = ArrayHelper(keys).map(lambda key: tuple(normalize_join_value(value) for value in key)).to_list()
+	distinct_keys: Dict[tuple, List[Any]] = {}
+	for normalized_key, key in zip(normalized_keys, keys):
+		distinct_keys.setdefault(normalized_key, key)
+	found: Dict[tuple, List[Dict[str, Any]]] = {}
+	for chunk in ArrayHelper(list(distinct_keys.items())).chunk(KEYS_CHUNK_SIZE).to_list():
+		chunk_keys = set(ArrayHelper(chunk).map(lambda item: item[0]).to_list())
+		criteria = [*static_criteria]
+		for index, column_name in enumerate(column_names):
+			values: Dict[Optional[str], Any] = {}
+			for normalized_key, key in chunk:
+				values.setdefault(normalized_key[index], key[index])
+			criteria.append(EntityCriteriaExpression(
+				left=ColumnNameLiteral(columnName=column_name),
+				operator=EntityCriteriaOperator.IN, right=list(values.values())))
+		for row in extractor.find_records_by_criteria(criteria):
+			found_key = tuple(normalize_join_value(get_column_value(row, column_name)) for column_name in column_names)
+			if found_key in chunk_keys:
+				found.setdefault(found_key, []).append(row)
+	return ArrayHelper(normalized_keys).map(lambda normalized_key: found.get(normalized_key, [])).to_list()
+
+
+def find_joined_rows(
+		extractor: ExtractorSPI, conditions: List[Condition], rows: List[Dict[str, Any]]
+) -> List[List[Dict[str, Any]]]:
+	"""
+	find rows of target table joined with each source row, returns in same order of source rows.
+	source rows which has null join value, or join conditions cannot be batched, are queried one by one.
+	"""
+
+	def find_one_by_one(row: Dict[str, Any]) -> List[Dict[str, Any]]:
+		return extractor.find_records_by_criteria(
+			ArrayHelper(conditions).map(lambda condition: build_criteria_by_join_key(condition, row)).to_list())
+
+	plan = plan_join(conditions)
+	if plan is None:
+		return ArrayHelper(rows).map(find_one_by_one).to_list()
+	keys = ArrayHelper(rows).map(
+		lambda row: ArrayHelper(plan.equations).map(
+			lambda equation: CriteriaBuilder(row).parse_condition_value(equation[1])).to_list()
+	).to_list()
+	batched = ArrayHelper(list(range(len(rows)))) \
+		.filter(lambda index: ArrayHelper(keys[index]).every(lambda value: value is not None)).to_list()
+	found = find_rows_by_keys(
+		extractor, CriteriaBuilder({}).build_criteria(plan.staticConditions),
+		ArrayHelper(plan.equations).map(lambda equation: equation[0]).to_list(),
+		ArrayHelper(batched).map(lambda index: keys[index]).to_list())
+	found_by_index = dict(zip(batched, found))
+	return ArrayHelper(list(range(len(rows)))).map(
+		lambda index: found_by_index[index] if index in found_by_index else find_one_by_one(rows[index])
+	).to_list()
+
 
 class DataCaptureService:
 
@@ -45,6 +163,83 @@ class DataCaptureService:
 		else:
 			return config, data_
 
+	# noinspection PyMethodMayBeStatic
+	def find_data_by_data_ids(self, config: CollectorTableConfig, data_ids: List[Dict]) -> List[List[Dict[str, Any]]]:
+		"""
+		same as find_data_by_data_id, but data are queried in batch, returns found rows of each data id.
+		"""
+		extractor = ask_source_extractor(config)
+		if isinstance(extractor, SourceS3Extractor):
+			def find_one(data_id: Dict) -> List[Dict[str, Any]]:
+				data_ = extractor.find_one_by_primary_keys(data_id)
+				return [] if data_ is None else [data_]
+
+			return ArrayHelper(data_ids).map(find_one).to_list()
+		column_names = list(config.primaryKey)
+		keys = ArrayHelper(data_ids).map(
+			lambda data_id: ArrayHelper(column_names).map(lambda column_name: data_id.get(column_name)).to_list()
+		).to_list()
+		batched = ArrayHelper(list(range(len(data_ids)))) \
+			.filter(lambda index: ArrayHelper(keys[index]).every(lambda value: value is not None)).to_list()
+		found = find_rows_by_keys(
+			extractor, [], column_names, ArrayHelper(batched).map(lambda index: keys[index]).to_list())
+		found_by_index = dict(zip(batched, found))
+		return ArrayHelper(list(range(len(data_ids)))).map(
+			lambda index: found_by_index[index] if index in found_by_index
+			else extractor.find_records_by_criteria(build_criteria_by_primary_key(data_ids[index]))
+		).to_list()
+
+	def find_root_nodes(
+			self, config: CollectorTableConfig, data_list: List[Dict]
+	) -> Tuple[CollectorTableConfig, List[Union[Dict[str, Any], Exception]]]:
+		"""
+		same as find_parent_node, but parents of all given data are queried level by level.
+		exception is returned for data whose parent cannot be identified.
+		"""
+		nodes: List[Union[Dict[str, Any], Exception]] = list(data_list)
+		while config.parentName:
+			parent_config = self.table_config_service.find_by_name(config.parentName, config.tenantId)
+			indexes = ArrayHelper(list(range(len(nodes)))) \
+				.filter(lambda index: not isinstance(nodes[index], Exception)).to_list()
+			parents_list = find_joined_rows(
+				ask_source_extractor(parent_config),
+				ArrayHelper(config.joinKeys).map(lambda join_key: join_key.parentKey).to_list(),
+				ArrayHelper(indexes).map(lambda index: nodes[index]).to_list())
+			for index, parent_data in zip(indexes, parents_list):
+				if len(parent_data) != 1:
+					nodes[index] = RuntimeError(
+						f'The data : {nodes[index]}, config_name: {config.name}, '
+						f'parent_config_name: {parent_config.name}, size: {len(parent_data)}')
+				else:
+					nodes[index] = parent_data[0]
+			config = parent_config
+		return config, nodes
+
+	def build_json_batch(self, config: CollectorTableConfig, nodes: List[Dict]) -> None:
+		"""
+		same as build_json, but children of all given nodes are queried together, level by level.
+		"""
+		if len(nodes) == 0:
+			return
+		child_configs = self.table_config_service.find_by_parent_name(config.name, config.tenantId)
+		for child_config in (child_configs or []):
+			children_list = find_joined_rows(
+				ask_source_extractor(child_config),
+				ArrayHelper(child_config.joinKeys).map(lambda join_key: join_key.childKey).to_list(),
+				nodes)
+			next_nodes: Dict[int, Dict] = {}
+			for node, child_data in zip(nodes, children_list):
+				if not child_data:
+					continue
+				if child_config.isList:
+					node[child_config.label] = child_data
+					for child in child_data:
+						next_nodes[id(child)] = child
+				else:
+					node[child_config.label] = child_data[0]
+					next_nodes[id(child_data[0])] = child_data[0]
+			self.build_json_batch(child_config, list(next_nodes.values()))
+
 	def build_json(self,
 	               config: CollectorTableConfig,
 	               data: Dict):
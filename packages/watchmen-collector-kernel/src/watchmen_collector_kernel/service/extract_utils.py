@@ -1,6 +1,7 @@
-from datetime import datetime
+from datetime import date, datetime, time
+from decimal import Decimal
 from logging import getLogger
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 import numpy as np
 from .criteria_builder import CriteriaBuilder
@@ -131,6 +132,31 @@ def build_criteria_by_join_key(join_key: Condition, data: Dict) -> EntityCriteri
     return CriteriaBuilder(data).build_statement(join_key)
 
 
+def normalize_join_value(value: Any) -> Optional[str]:
+    """
+    rows queried in batch are matched in memory by join values,
+    variable value might be a string or a date while column value is a number or a datetime.
+    """
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return str(value)
+    if isinstance(value, (int, float, Decimal)):
+        try:
+            if value == int(value):
+                return str(int(value))
+        except (ValueError, OverflowError):
+            pass
+        return str(value)
+    if isinstance(value, datetime):
+        if value.time() == time.min and value.tzinfo is None:
+            return value.date().isoformat()
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
 def cal_array2d_diff(array_0: np.ndarray, array_1: np.ndarray) -> np.ndarray:
     array_0_rows = array_0.view([('', array_0.dtype)] * array_0.shape[1])
     array_1_rows = array_1.view([('', array_1.dtype)] * array_1.shape[1])
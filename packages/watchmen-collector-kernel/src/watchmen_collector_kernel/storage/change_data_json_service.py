@@ -12,6 +12,7 @@ from watchmen_storage import EntityName, EntityRow, EntityShaper, TransactionalS
 	ColumnNameLiteral, EntityCriteriaExpression, EntityStraightValuesFinder, EntityStraightColumn, EntitySortColumn, \
 	EntitySortMethod, EntityLimitedFinder, EntityCriteriaOperator, EntityUpdater, EntityDistinctValuesFinder, \
 	EntityLimitedStraightValuesFinder
+from watchmen_utilities import ArrayHelper
 
 
 class ChangeDataJsonShaper(EntityShaper):
@@ -235,6 +236,25 @@ class ChangeDataJsonService(TupleService):
 		finally:
 			self.storage.close()
 
+	def find_existed_resource_ids(self, resource_ids: List[str]) -> List[str]:
+		if len(resource_ids) == 0:
+			return []
+		try:
+			self.storage.connect()
+			rows = self.storage.find_straight_values(EntityStraightValuesFinder(
+				name=self.get_entity_name(),
+				shaper=self.get_entity_shaper(),
+				criteria=[
+					EntityCriteriaExpression(left=ColumnNameLiteral(columnName='resource_id'),
+					                         operator=EntityCriteriaOperator.IN,
+					                         right=resource_ids)
+				],
+				straightColumns=[EntityStraightColumn(columnName='resource_id')]
+			))
+			return ArrayHelper(rows).map(lambda row: row.get('resource_id')).to_list()
+		finally:
+			self.storage.close()
+
 	def find_by_object_id(self, model_name: str, object_id: str, model_trigger_id: int) -> List:
 		try:
 			self.storage.connect()
@@ -223,6 +223,33 @@ class ChangeDataRecordService(TupleService):
 		finally:
 			self.close_transaction()
 
+	def find_existed_records_after(
+			self, table_trigger_id: int, change_record_id: Optional[int], limit: int) -> List[ChangeDataRecord]:
+		"""
+		page existed records of table trigger in change record id order, starts after the given change record id
+		"""
+		criteria = [
+			EntityCriteriaExpression(left=ColumnNameLiteral(columnName='table_trigger_id'), right=table_trigger_id)
+		]
+		if change_record_id is not None:
+			criteria.append(EntityCriteriaExpression(
+				left=ColumnNameLiteral(columnName=CHANGE_RECORD_ID),
+				operator=EntityCriteriaOperator.GREATER_THAN, right=change_record_id))
+		self.begin_transaction()
+		try:
+			# noinspection PyTypeChecker
+			return self.storage.find_limited(
+				EntityLimitedFinder(
+					name=self.get_entity_name(),
+					shaper=self.get_entity_shaper(),
+					criteria=criteria,
+					sort=[EntitySortColumn(name=CHANGE_RECORD_ID, method=EntitySortMethod.ASC)],
+					limit=limit
+				)
+			)
+		finally:
+			self.close_transaction()
+
 	def is_event_finished(self, event_trigger_id: int) -> bool:
 		try:
 			self.begin_transaction()
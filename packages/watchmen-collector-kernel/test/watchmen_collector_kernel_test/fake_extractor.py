@@ -0,0 +1,43 @@
+from typing import Any, Dict, List, Optional
+
+from watchmen_collector_kernel.service.extract_utils import normalize_join_value
+from watchmen_storage import EntityCriteria, EntityCriteriaExpression, EntityCriteriaOperator
+
+
+def get_column_value(row: Dict[str, Any], column_name: str) -> Any:
+	return normalize_join_value(row.get(column_name))
+
+
+def matches(row: Dict[str, Any], expression: EntityCriteriaExpression) -> bool:
+	value = get_column_value(row, expression.left.columnName)
+	if expression.operator == EntityCriteriaOperator.IN:
+		return value in [normalize_join_value(x) for x in expression.right]
+	elif expression.operator == EntityCriteriaOperator.EQUALS:
+		return value == normalize_join_value(expression.right)
+	raise NotImplementedError(f'{expression.operator}')
+
+
+class FakeExtractor:
+	"""
+	source table in memory, supports equals and in criteria only
+	"""
+
+	def __init__(self, rows: List[Dict[str, Any]]):
+		self.rows = rows
+		self.queries: List[EntityCriteria] = []
+
+	def find_records_by_criteria(self, criteria: EntityCriteria) -> Optional[List[Dict[str, Any]]]:
+		self.queries.append(criteria)
+		return [dict(row) for row in self.rows if all(matches(row, expression) for expression in criteria)]
+
+	def find_one_by_primary_keys(self, data_id: Dict) -> Optional[Dict[str, Any]]:
+		rows = [row for row in self.rows if all(row.get(key) == value for key, value in data_id.items())]
+		return dict(rows[0]) if len(rows) == 1 else None
+
+	def delete_one_by_primary_keys(self, data_id: Dict) -> None:
+		pass
+
+	def count_of_in_queries(self) -> int:
+		return len([
+			criteria for criteria in self.queries
+			if any(expression.operator == EntityCriteriaOperator.IN for expression in criteria)])
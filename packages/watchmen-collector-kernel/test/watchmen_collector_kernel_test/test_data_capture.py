@@ -0,0 +1,82 @@
+from typing import Dict, List, Optional
+from unittest import TestCase
+from unittest.mock import patch
+
+from watchmen_collector_kernel.model import CollectorTableConfig
+from watchmen_collector_kernel.service import data_capture
+from watchmen_collector_kernel.service.data_capture import DataCaptureService, find_rows_by_keys
+from .fake_extractor import FakeExtractor
+
+PARENT_ROWS = [{'a': a, 'b': b, 'id': f'{a}{b}'} for a in [1, 2, 3] for b in ['x', 'y']]
+
+
+class FakeTableConfigService:
+	def __init__(self, configs: List[CollectorTableConfig]):
+		self.configs = dict((config.name, config) for config in configs)
+
+	def find_by_name(self, name: str, tenant_id: str) -> Optional[CollectorTableConfig]:
+		return self.configs.get(name)
+
+
+def create_configs() -> List[CollectorTableConfig]:
+	return [
+		CollectorTableConfig(
+			configId='1', name='parent', tableName='parent', primaryKey=['a', 'b'], tenantId='1'),
+		CollectorTableConfig(
+			configId='2', name='child', tableName='child', primaryKey=['id'], parentName='parent', tenantId='1',
+			joinKeys=[
+				{'parentKey': {'columnName': 'a', 'columnValue': '{parent_a}'}},
+				{'parentKey': {'columnName': 'b', 'columnValue': '{parent_b}'}}
+			])
+	]
+
+
+def create_data_capture_service(configs: List[CollectorTableConfig]) -> DataCaptureService:
+	service = DataCaptureService.__new__(DataCaptureService)
+	service.table_config_service = FakeTableConfigService(configs)
+	return service
+
+
+class DataCaptureTest(TestCase):
+	def setUp(self):
+		patcher = patch.object(data_capture, 'KEYS_CHUNK_SIZE', 2)
+		patcher.start()
+		self.addCleanup(patcher.stop)
+
+	def test_composite_key_across_chunks(self):
+		extractor = FakeExtractor(PARENT_ROWS)
+		# 5 distinct keys, in 3 chunks. columns of first chunk are (1, 2) and (x, y), which covers keys of second chunk
+		keys = [[1, 'x'], [2, 'y'], [1, 'y'], [2, 'x'], ['3', 'x'], [1, 'x']]
+		found = find_rows_by_keys(extractor, [], ['a', 'b'], keys)
+		self.assertEqual(['1x', '2y', '1y', '2x', '3x', '1x'], [[row['id'] for row in rows][0] for rows in found])
+		self.assertEqual([1] * len(keys), [len(rows) for rows in found])
+		self.assertEqual(3, len(extractor.queries))
+
+	def test_find_data_by_data_ids(self):
+		extractor = FakeExtractor(PARENT_ROWS + [{'a': None, 'b': 'z', 'id': 'nz'}])
+		service = create_data_capture_service(create_configs())
+		data_ids: List[Dict] = [
+			{'a': 1, 'b': 'x'}, {'a': 2, 'b': 'y'}, {'a': 1, 'b': 'y'}, {'a': None, 'b': 'z'}, {'a': 4, 'b': 'x'}]
+		with patch.object(data_capture, 'ask_source_extractor', lambda config: extractor):
+			found = service.find_data_by_data_ids(service.table_config_service.find_by_name('parent', '1'), data_ids)
+		self.assertEqual(
+			[['1x'], ['2y'], ['1y'], ['nz'], []], [[row['id'] for row in rows] for rows in found])
+		# 4 batched keys in 2 chunks, key with null value is queried one by one
+		self.assertEqual(2, extractor.count_of_in_queries())
+		self.assertEqual(3, len(extractor.queries))
+
+	def test_find_root_nodes(self):
+		parent_extractor = FakeExtractor(PARENT_ROWS)
+		configs = create_configs()
+		service = create_data_capture_service(configs)
+		children = [
+			{'id': 'c1', 'parent_a': 1, 'parent_b': 'x'}, {'id': 'c2', 'parent_a': 2, 'parent_b': 'y'},
+			{'id': 'c3', 'parent_a': 1, 'parent_b': 'y'}, {'id': 'c4', 'parent_a': 2, 'parent_b': 'x'},
+			{'id': 'c5', 'parent_a': 5, 'parent_b': 'x'}
+		]
+		with patch.object(data_capture, 'ask_source_extractor', lambda config: parent_extractor):
+			root_config, nodes = service.find_root_nodes(configs[1], children)
+		self.assertEqual('parent', root_config.name)
+		self.assertEqual(['1x', '2y', '1y', '2x'], [node['id'] for node in nodes[:4]])
+		self.assertIsInstance(nodes[4], RuntimeError)
+		self.assertIn('size: 0', str(nodes[4]))
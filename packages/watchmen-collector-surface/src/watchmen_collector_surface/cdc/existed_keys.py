@@ -0,0 +1,58 @@
+import os
+import sqlite3
+from json import dumps, loads
+from tempfile import mkstemp
+from typing import List, Set, Tuple
+
+from watchmen_utilities import ArrayHelper
+
+# max count of keys in one "in" clause of sqlite, which allows 999 variables at least
+KEYS_CHUNK_SIZE = 900
+
+
+class ExistedKeys:
+    """
+    normalized primary keys of existed change records, spilled to a temporary sqlite file,
+    so memory of diffing is bounded by page size instead of count of existed records.
+    data ids of change records are stored as json, cannot be ordered or looked up by source database.
+    """
+
+    def __init__(self):
+        handle, self.path = mkstemp(prefix='watchmen-existed-keys-', suffix='.sqlite')
+        os.close(handle)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute('CREATE TABLE existed_keys (data_key TEXT PRIMARY KEY)')
+        self.count = 0
+
+    # noinspection PyMethodMayBeStatic
+    def to_data_key(self, key: Tuple) -> str:
+        return dumps(list(key))
+
+    def add_all(self, keys: List[Tuple]) -> None:
+        cursor = self.connection.executemany(
+            'INSERT OR IGNORE INTO existed_keys (data_key) VALUES (?)',
+            ArrayHelper(keys).map(lambda key: (self.to_data_key(key),)).to_list())
+        self.count = self.count + cursor.rowcount
+        self.connection.commit()
+
+    def pop_all(self, keys: List[Tuple]) -> Set[Tuple]:
+        """
+        returns the given keys which are existed, and remove them
+        """
+        found: Set[Tuple] = set()
+        for chunk in ArrayHelper(list(set(keys))).chunk(KEYS_CHUNK_SIZE).to_list():
+            data_keys = ArrayHelper(chunk).map(self.to_data_key).to_list()
+            placeholders = ','.join(['?'] * len(data_keys))
+            rows = self.connection.execute(
+                f'SELECT data_key FROM existed_keys WHERE data_key IN ({placeholders})', data_keys).fetchall()
+            if len(rows) == 0:
+                continue
+            self.connection.execute(f'DELETE FROM existed_keys WHERE data_key IN ({placeholders})', data_keys)
+            found.update(ArrayHelper(rows).map(lambda row: tuple(loads(row[0]))).to_list())
+        self.connection.commit()
+        self.count = self.count - len(found)
+        return found
+
+    def close(self) -> None:
+        self.connection.close()
+        os.remove(self.path)
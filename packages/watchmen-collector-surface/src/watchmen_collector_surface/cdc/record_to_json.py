@@ -17,12 +17,15 @@ from watchmen_collector_kernel.storage import get_competitive_lock_service, get_
 	get_change_data_json_history_service
 from watchmen_collector_surface.settings import ask_record_to_json_wait
 from watchmen_meta.common import ask_meta_storage, ask_super_admin, ask_snowflake_generator
-from watchmen_utilities import ArrayHelper
+from watchmen_utilities import ArrayHelper, get_current_time_in_seconds
 
 
 logger = logging.getLogger('apscheduler')
 logger.setLevel(logging.ERROR)
 
+# max count of resource ids in one "in" criteria
+RESOURCE_IDS_CHUNK_SIZE = 500
+
 
 def init_record_listener():
 	RecordToJsonService().create_thread()
@@ -77,12 +80,20 @@ class RecordToJsonService:
 		try:
 			self.change_record_service.begin_transaction()
 			records = self.change_record_service.find_records_and_locked()
-			# TODO bulk update. No need
-			results = ArrayHelper(records).map(
-				lambda record: self.change_status(record, Status.EXECUTING.value)
-			).map(
-				lambda record: self.change_record_service.update(record)
-			).to_list()
+			now = get_current_time_in_seconds()
+			user_id = self.principal_service.get_user_id()
+
+			def mark_executing(record: ChangeDataRecord) -> ChangeDataRecord:
+				record.status = Status.EXECUTING.value
+				record.lastModifiedAt = now
+				record.lastModifiedBy = user_id
+				return record
+
+			results = ArrayHelper(records).map(mark_executing).to_list()
+			if len(results) != 0:
+				self.change_record_service.update_by_ids(
+					ArrayHelper(results).map(lambda record: record.changeRecordId).to_list(),
+					{'status': Status.EXECUTING.value, 'last_modified_at': now, 'last_modified_by': user_id})
 			self.change_record_service.commit_transaction()
 			return results
 		finally:
@@ -90,22 +101,106 @@ class RecordToJsonService:
 
 	def change_data_record_listener(self):
 		unmerged_records = self.find_records_and_locked()
-		for unmerged_record in unmerged_records:
-			self.performance_result(unmerged_record, True)
-			change_data_record = unmerged_record
+		# records of same table and tenant share the same table config chain
+		batches = ArrayHelper(unmerged_records).group_by(lambda record: (record.tableName, record.tenantId))
+		for records in batches.values():
+			ArrayHelper(records).each(lambda record: self.performance_result(record, True))
 			try:
-				self.process_record(change_data_record)
-			except IntegrityError:
-				change_data_record.isMerged = True
-				change_data_record.status = Status.SUCCESS.value
-				self.handle_result(change_data_record, {"result": "duplicated"})
-				self.finish_and_backup_record(change_data_record, None, False)
+				change_jsons = self.assemble_records(records)
 			except Exception as e:
+				# nothing is written yet, process one by one
 				logger.error(e, exc_info=True, stack_info=True)
-				self.update_result(change_data_record, format_exc())
-			finally:
-				self.finalize(change_data_record)
-				self.performance_result(change_data_record, False)
+				ArrayHelper(records).each(self.process_one_record)
+				continue
+			self.finish_and_backup_records(records, change_jsons)
+			self.finalize_records(records)
+			ArrayHelper(records).each(lambda record: self.performance_result(record, False))
+
+	def process_one_record(self, change_data_record: ChangeDataRecord) -> None:
+		try:
+			self.process_record(change_data_record)
+		except IntegrityError:
+			self.handle_duplicated(change_data_record)
+		except Exception as e:
+			logger.error(e, exc_info=True, stack_info=True)
+			self.update_result(change_data_record, format_exc())
+		finally:
+			self.finalize(change_data_record)
+			self.performance_result(change_data_record, False)
+
+	def handle_duplicated(self, change_data_record: ChangeDataRecord) -> None:
+		change_data_record.isMerged = True
+		change_data_record.status = Status.SUCCESS.value
+		self.handle_result(change_data_record, {"result": "duplicated"})
+		self.finish_and_backup_record(change_data_record, None, False)
+
+	def assemble_records(self, records: List[ChangeDataRecord]) -> Dict[int, ChangeDataJson]:
+		"""
+		assemble json of records of same table in batch, returns change data jsons keyed by index of record.
+		data, parents and children are queried by one "in" criteria per table config level,
+		duplication is checked by one lookup for all records.
+		"""
+		config = self.table_config_service.find_by_name(records[0].tableName, records[0].tenantId)
+		found_list = self.data_capture_service.find_data_by_data_ids(
+			config, ArrayHelper(records).map(lambda record: record.dataId).to_list())
+		errors: Dict[int, str] = {}
+		data_list: List[Dict[str, Any]] = []
+		data_indexes: List[int] = []
+		for index, found in enumerate(found_list):
+			if len(found) == 1:
+				data_list.append(found[0])
+				data_indexes.append(index)
+			elif len(found) == 0:
+				errors[index] = f'Data not found by {records[index].dataId}, config_name: {config.name}.'
+			else:
+				errors[index] = f'Too many data found by {records[index].dataId}, config_name: {config.name}.'
+		root_config, root_nodes = self.data_capture_service.find_root_nodes(config, data_list)
+
+		roots: Dict[int, Dict[str, Any]] = {}
+		for index, root_node in zip(data_indexes, root_nodes):
+			if isinstance(root_node, Exception):
+				errors[index] = str(root_node)
+			else:
+				record = records[index]
+				record.rootTableName = root_config.tableName
+				record.rootDataId = get_data_id(root_config.primaryKey, root_node)
+				roots[index] = root_node
+
+		resource_ids = ArrayHelper(list(roots.keys())).to_map(
+			lambda index: index, lambda index: self.generate_resource_id(records[index]))
+		existed_resource_ids = self.find_existed_resource_ids(list(set(resource_ids.values())))
+		contents: Dict[int, Dict[str, Any]] = {}
+		for index, resource_id in resource_ids.items():
+			# duplicated record is merged without json, including the later ones of same root in this batch
+			if resource_id not in existed_resource_ids:
+				existed_resource_ids.add(resource_id)
+				contents[index] = roots[index].copy()
+		self.data_capture_service.build_json_batch(root_config, list(contents.values()))
+
+		change_jsons: Dict[int, ChangeDataJson] = ArrayHelper(list(contents.keys())).to_map(
+			lambda index: index,
+			lambda index: self.get_change_data_json(records[index], root_config, roots[index], contents[index]))
+		for index, record in enumerate(records):
+			record.isMerged = True
+			if index in errors:
+				record.status = Status.FAIL.value
+				self.handle_result(record, {"error": errors[index]})
+			else:
+				record.status = Status.SUCCESS.value
+		return change_jsons
+
+	def find_existed_resource_ids(self, resource_ids: List[str]) -> set:
+		existed = set()
+		for chunk in ArrayHelper(resource_ids).chunk(RESOURCE_IDS_CHUNK_SIZE).to_list():
+			existed.update(self.change_json_history_service.find_existed_resource_ids(chunk))
+			existed.update(self.change_json_service.find_existed_resource_ids(chunk))
+		return existed
+
+	def finalize_records(self, change_data_records: List[ChangeDataRecord]):
+		config = self.table_config_service.find_by_name(change_data_records[0].tableName,
+		                                                change_data_records[0].tenantId)
+		extractor = ask_source_extractor(config)
+		ArrayHelper(change_data_records).each(lambda record: extractor.delete_one_by_primary_keys(record.dataId))
 
 	def finalize(self, change_data_record: ChangeDataRecord):
 		config = self.table_config_service.find_by_name(change_data_record.tableName, change_data_record.tenantId)
@@ -141,6 +236,42 @@ class RecordToJsonService:
 		finally:
 			self.change_record_service.close_transaction()
 
+	def finish_and_backup_records(
+			self, change_data_records: List[ChangeDataRecord], change_data_jsons: Dict[int, ChangeDataJson]) -> None:
+		"""
+		write jsons, histories and deletions of records in one transaction,
+		write one by one when failed, to find out the duplicated or failed ones.
+		change data jsons are keyed by index of record.
+		"""
+		self.change_record_service.begin_transaction()
+		try:
+			self.change_json_service.create_all(list(change_data_jsons.values()))
+			self.change_record_history_service.create_all(change_data_records)
+			self.change_record_service.delete_by_ids(
+				ArrayHelper(change_data_records).map(lambda record: record.changeRecordId).to_list())
+			self.change_record_service.commit_transaction()
+			return
+		except Exception as e:
+			self.change_record_service.rollback_transaction()
+			logger.warning('Failed to write change data records in batch, fallback to write one by one.', exc_info=e)
+		finally:
+			self.change_record_service.close_transaction()
+		for index, record in enumerate(change_data_records):
+			self.finish_and_backup_one(record, change_data_jsons.get(index))
+
+	def finish_and_backup_one(self, change_data_record: ChangeDataRecord,
+	                          change_data_json: Optional[ChangeDataJson]) -> None:
+		try:
+			self.finish_and_backup_record(change_data_record, change_data_json, change_data_json is not None)
+		except IntegrityError:
+			self.handle_duplicated(change_data_record)
+		except Exception as e:
+			logger.error(e, exc_info=True, stack_info=True)
+			try:
+				self.update_result(change_data_record, format_exc())
+			except Exception as error:
+				logger.error(error, exc_info=True, stack_info=True)
+
 	def process_record(self, change_data_record: ChangeDataRecord) -> None:
 		config = self.table_config_service.find_by_name(change_data_record.tableName, change_data_record.tenantId)
 		root_config, root_data, record = self.find_root(config, change_data_record)
@@ -1,16 +1,14 @@
 import logging
 from datetime import datetime
 from traceback import format_exc
-from typing import Tuple, Dict, List, Any, Optional
-
-import numpy as np
+from typing import Tuple, Dict, List, Any, Optional, Iterator
 
 from watchmen_collector_kernel.model import TriggerEvent, ChangeDataRecord, TriggerTable, \
     Condition, Status, CollectorTableConfig
 from watchmen_collector_kernel.service import try_lock_nowait, unlock, CriteriaBuilder, \
     build_audit_column_criteria, get_table_config_service, ask_source_extractor
-from watchmen_collector_kernel.service.extract_utils import cal_array2d_diff, build_data_id, get_data_id, \
-    build_audit_columns_criteria
+from watchmen_collector_kernel.service.extract_utils import get_data_id, build_audit_columns_criteria, \
+    normalize_join_value
 from watchmen_collector_kernel.service.lock_helper import get_resource_lock
 from watchmen_collector_kernel.storage import get_trigger_table_service, get_competitive_lock_service, \
     get_collector_table_config_service, get_trigger_event_service, get_change_data_record_service
@@ -20,6 +18,7 @@ from watchmen_meta.common import ask_super_admin, ask_snowflake_generator, ask_m
 from watchmen_storage import EntityCriteria, EntityCriteriaJoint, EntityCriteriaExpression, ColumnNameLiteral, \
     EntityCriteriaOperator, EntityCriteriaJointConjunction
 from watchmen_utilities import ArrayHelper
+from .existed_keys import ExistedKeys
 
 logger = logging.getLogger('apscheduler')
 logger.setLevel(logging.ERROR)
@@ -92,31 +91,48 @@ class TableExtractor:
                         config = self.table_config_service.find_by_name(trigger.tableName, trigger.tenantId)
                         trigger_event = self.trigger_event_service.find_event_by_id(trigger.eventTriggerId)
                         criteria = self.get_criteria(trigger_event, config)
-                        source_records = ask_source_extractor(config).find_primary_keys_by_criteria(
-                            criteria
-                        )
-                        existed_records = self.change_data_record_service.find_existed_records(
-                            trigger.tableTriggerId)
-                        if existed_records:
-                            diff_records: List[List] = self.get_diff(source_records, existed_records)
-                            logger.info(
-                                f'table_name: {config.tableName}, source_records: {len(source_records)}, existed_records: {len(existed_records)}, diffs: {len(diff_records)}'
-                            )
-                            for diff_record in diff_records:
-                                self.save_change_data_record(trigger, build_data_id(config.primaryKey, diff_record))
-                        else:
+                        existed_keys = self.find_existed_keys(trigger.tableTriggerId, config)
+                        try:
+                            existed_count = existed_keys.count
+                            data_count = 0
+                            diff_count = 0
+                            for source_records in self.find_primary_key_pages(criteria, config):
+                                data_count += len(source_records)
+                                data_ids = self.get_diff(source_records, existed_keys, config)
+                                diff_count += len(data_ids)
+                                self.save_change_data_records(trigger, data_ids)
+                            # keys left are not in source anymore, nothing to do with them
                             logger.info(
-                                f'table_name: {config.tableName}, source_records: {len(source_records)}, existed_records: {len(existed_records)}'
+                                f'table_name: {config.tableName}, source_records: {data_count}, existed_records: {existed_count}, diffs: {diff_count}, missed: {existed_keys.count}'
                             )
-                            ArrayHelper(source_records).map(
-                                lambda record: self.save_change_data_record(trigger,
-                                                                            get_data_id(config.primaryKey, record)))
-                        data_count = ArrayHelper(source_records).size()
+                        finally:
+                            existed_keys.close()
                         self.trigger_table_service.update_table_trigger(self.set_extracted(trigger, data_count))
                         break
             finally:
                 unlock(self.competitive_lock_service, lock)
-    
+
+    def find_primary_key_pages(self,
+                               base_criteria: EntityCriteria,
+                               config: CollectorTableConfig) -> Iterator[List[Dict[str, Any]]]:
+        """
+        page primary keys of source in primary key order, each page starts after the last key of previous page.
+        """
+        extractor = ask_source_extractor(config)
+        limit = ask_extract_table_limit_size()
+        last_max_pk = None
+        while True:
+            criteria = list(base_criteria)
+            if last_max_pk:
+                criteria.append(self.build_page_criteria_by_primary_key(last_max_pk, config))
+            source_records = extractor.find_limited_primary_keys_by_criteria(criteria, limit)
+            if not source_records:
+                return
+            yield source_records
+            if len(source_records) < limit:
+                return
+            last_max_pk = source_records[len(source_records) - 1]
+
     # noinspection PyMethodMayBeStatic
     def set_data_count(self, trigger_table: TriggerTable, count: int) -> TriggerTable:
         trigger_table.dataCount = count
@@ -273,6 +289,13 @@ class TableExtractor:
         change_data_record = self.source_to_change(trigger_table, data_id)
         self.change_data_record_service.create_change_record(change_data_record)
 
+    def save_change_data_records(self, trigger_table: TriggerTable, data_ids: List[Dict]) -> None:
+        shard_size = ask_extract_table_record_shard_size()
+        for i in range(0, len(data_ids), shard_size):
+            change_records = ArrayHelper(data_ids[i:i + shard_size]).map(
+                lambda data_id: self.source_to_change(trigger_table, data_id)).to_list()
+            self.change_data_record_service.create_change_records(change_records)
+
     def source_to_change(self, trigger_table: TriggerTable, data_id: Dict) -> ChangeDataRecord:
         return self.get_change_data_record(
             trigger_table.modelName,
@@ -309,14 +332,41 @@ class TableExtractor:
         )
 
     # noinspection PyMethodMayBeStatic
-    def get_diff(self, source_records, existed_records) -> Any:
-        source_array = np.asarray(
-            ArrayHelper(source_records).map(lambda source_record: list(source_record.values())[:]).to_list()
-        )
-        existed_array = np.asarray(
-            ArrayHelper(existed_records).map(lambda existed_record: list(existed_record.values())[:]).to_list()
-        )
-        return cal_array2d_diff(source_array, existed_array).tolist()
+    def get_data_id_key(self, data_id: Dict, config: CollectorTableConfig) -> Tuple:
+        # value types of data id loaded from json are not same as source, compare by normalized values
+        return tuple(ArrayHelper(config.primaryKey).map(lambda key: normalize_join_value(data_id.get(key))).to_list())
+
+    def find_existed_keys(self, table_trigger_id: int, config: CollectorTableConfig) -> ExistedKeys:
+        """
+        existed records are paged in change record id order, and their keys are spilled page by page.
+        """
+        existed_keys = ExistedKeys()
+        limit = ask_extract_table_limit_size()
+        last_change_record_id = None
+        try:
+            while True:
+                existed_records = self.change_data_record_service.find_existed_records_after(
+                    table_trigger_id, last_change_record_id, limit)
+                existed_keys.add_all(ArrayHelper(existed_records).map(
+                    lambda record: self.get_data_id_key(record.dataId, config)).to_list())
+                if len(existed_records) < limit:
+                    return existed_keys
+                last_change_record_id = existed_records[len(existed_records) - 1].changeRecordId
+        except Exception as e:
+            existed_keys.close()
+            raise e
+
+    def get_diff(self,
+                 source_records: List[Dict[str, Any]],
+                 existed_keys: ExistedKeys,
+                 config: CollectorTableConfig) -> List[Dict]:
+        """
+        returns data ids of source records which has no change record yet, matched keys are removed from existed keys.
+        """
+        data_ids = ArrayHelper(source_records).map(lambda record: get_data_id(config.primaryKey, record)).to_list()
+        keys = ArrayHelper(data_ids).map(lambda data_id: self.get_data_id_key(data_id, config)).to_list()
+        found = existed_keys.pop_all(keys)
+        return [data_id for data_id, key in zip(data_ids, keys) if key not in found]
 
     def get_criteria(self, trigger_event: TriggerEvent, table_config: CollectorTableConfig) -> List:
         criteria = []
@@ -0,0 +1,201 @@
+from typing import Any, Dict, List, Optional, Set
+from unittest import TestCase
+from unittest.mock import patch
+
+from sqlalchemy.exc import IntegrityError
+
+from watchmen_collector_kernel.model import ChangeDataJson, ChangeDataRecord, CollectorTableConfig, Status
+from watchmen_collector_kernel.service import data_capture, DataCaptureService
+from watchmen_collector_kernel.service.extract_utils import normalize_join_value
+from watchmen_collector_surface.cdc import record_to_json
+from watchmen_collector_surface.cdc.record_to_json import RecordToJsonService
+from watchmen_storage import EntityCriteria, EntityCriteriaOperator
+
+PARENT_ROWS = [{'a': a, 'b': b, 'id': f'{a}{b}'} for a in [1, 2, 3] for b in ['x', 'y']]
+CHILD_ROWS = [
+	{'id': 'c1', 'parent_a': 1, 'parent_b': 'x'}, {'id': 'c2', 'parent_a': 2, 'parent_b': 'y'},
+	{'id': 'c3', 'parent_a': 1, 'parent_b': 'y'}, {'id': 'c4', 'parent_a': 2, 'parent_b': 'x'},
+	# parent not found
+	{'id': 'c5', 'parent_a': 5, 'parent_b': 'x'},
+	# same parent as c1
+	{'id': 'c6', 'parent_a': 1, 'parent_b': 'x'}
+]
+
+
+class FakeExtractor:
+	def __init__(self, rows: List[Dict[str, Any]]):
+		self.rows = rows
+
+	def find_records_by_criteria(self, criteria: EntityCriteria) -> Optional[List[Dict[str, Any]]]:
+		def matches(row: Dict[str, Any]) -> bool:
+			for expression in criteria:
+				value = normalize_join_value(row.get(expression.left.columnName))
+				if expression.operator == EntityCriteriaOperator.IN:
+					if value not in [normalize_join_value(x) for x in expression.right]:
+						return False
+				elif value != normalize_join_value(expression.right):
+					return False
+			return True
+
+		return [dict(row) for row in self.rows if matches(row)]
+
+	def delete_one_by_primary_keys(self, data_id: Dict) -> None:
+		pass
+
+
+class FakeTableConfigService:
+	def __init__(self):
+		self.configs = {
+			'parent': CollectorTableConfig(
+				configId='1', name='parent', tableName='parent', primaryKey=['a', 'b'], objectKey='id', tenantId='1'),
+			'child': CollectorTableConfig(
+				configId='2', name='child', tableName='child', primaryKey=['id'], parentName='parent', tenantId='1',
+				joinKeys=[
+					{'parentKey': {'columnName': 'a', 'columnValue': '{parent_a}'}},
+					{'parentKey': {'columnName': 'b', 'columnValue': '{parent_b}'}}
+				])
+		}
+
+	def find_by_name(self, name: str, tenant_id: str) -> Optional[CollectorTableConfig]:
+		return self.configs.get(name)
+
+	# noinspection PyMethodMayBeStatic
+	def find_by_parent_name(self, parent_name: str, tenant_id: str) -> Optional[List[CollectorTableConfig]]:
+		return None
+
+
+class FakeSnowflakeGenerator:
+	def __init__(self):
+		self.id = 0
+
+	def next_id(self) -> int:
+		self.id = self.id + 1
+		return self.id
+
+
+class FakeStorageService:
+	"""
+	records writes of change data records, jsons and histories, which share one transaction
+	"""
+
+	def __init__(self, written: List[Any], existed_resource_ids: Optional[Set[str]] = None):
+		self.written = written
+		self.existedResourceIds = existed_resource_ids if existed_resource_ids is not None else set()
+		self.failOnCreateAll = False
+		self.duplicatedResourceIds: Set[str] = set()
+		self.pending: List[Any] = []
+
+	def find_existed_resource_ids(self, resource_ids: List[str]) -> List[str]:
+		return [x for x in resource_ids if x in self.existedResourceIds]
+
+	def begin_transaction(self) -> None:
+		self.pending.clear()
+
+	def commit_transaction(self) -> None:
+		self.written.extend(self.pending)
+		self.pending.clear()
+
+	def rollback_transaction(self) -> None:
+		self.pending.clear()
+
+	def close_transaction(self) -> None:
+		pass
+
+	def create_all(self, entities: List[Any]) -> None:
+		if self.failOnCreateAll:
+			raise IntegrityError('insert', {}, Exception('Duplicated.'))
+		self.pending.extend(entities)
+
+	def create(self, entity: Any) -> None:
+		if isinstance(entity, ChangeDataJson) and entity.resourceId in self.duplicatedResourceIds:
+			raise IntegrityError('insert', {}, Exception('Duplicated.'))
+		self.pending.append(entity)
+
+	def delete_by_ids(self, ids: List[int]) -> None:
+		self.pending.extend(('delete', x) for x in ids)
+
+	def delete(self, an_id: int) -> None:
+		self.pending.append(('delete', an_id))
+
+
+def create_record(change_record_id: int, data_id: Dict) -> ChangeDataRecord:
+	return ChangeDataRecord(
+		changeRecordId=change_record_id, modelName='model', tableName='child', dataId=data_id,
+		rootTableName='', rootDataId={}, isMerged=False, status=Status.EXECUTING.value, result={},
+		tableTriggerId=1, modelTriggerId=1, moduleTriggerId=1, eventTriggerId=1, tenantId='1')
+
+
+class RecordToJsonTest(TestCase):
+	def setUp(self):
+		extractors = {'parent': FakeExtractor(PARENT_ROWS), 'child': FakeExtractor(CHILD_ROWS)}
+		for patcher in [
+			patch.object(data_capture, 'KEYS_CHUNK_SIZE', 2),
+			patch.object(data_capture, 'ask_source_extractor', lambda config: extractors[config.name]),
+			patch.object(record_to_json, 'ask_source_extractor', lambda config: extractors[config.name])
+		]:
+			patcher.start()
+			self.addCleanup(patcher.stop)
+
+		self.written: List[Any] = []
+		service = RecordToJsonService.__new__(RecordToJsonService)
+		service.snowflake_generator = FakeSnowflakeGenerator()
+		service.table_config_service = FakeTableConfigService()
+		service.data_capture_service = DataCaptureService.__new__(DataCaptureService)
+		service.data_capture_service.table_config_service = service.table_config_service
+		service.change_record_service = FakeStorageService(self.written)
+		service.change_record_history_service = service.change_record_service
+		service.change_json_service = service.change_record_service
+		service.change_json_history_service = FakeStorageService(self.written)
+		self.service = service
+
+	def create_records(self) -> List[ChangeDataRecord]:
+		return [create_record(index + 1, {'id': row['id']}) for index, row in enumerate(CHILD_ROWS)]
+
+	def test_assemble_records(self):
+		records = self.create_records()
+		change_jsons = self.service.assemble_records(records)
+		# c6 has same root as c1, merged without json
+		self.assertEqual([0, 1, 2, 3], sorted(change_jsons.keys()))
+		self.assertEqual(
+			['1x', '2y', '1y', '2x'], [change_jsons[index].content['id'] for index in sorted(change_jsons.keys())])
+		self.assertEqual(
+			[{'a': 1, 'b': 'x'}, {'a': 2, 'b': 'y'}, {'a': 1, 'b': 'y'}, {'a': 2, 'b': 'x'}],
+			[records[index].rootDataId for index in range(4)])
+		self.assertEqual(
+			[Status.SUCCESS.value] * 4 + [Status.FAIL.value, Status.SUCCESS.value], [x.status for x in records])
+		self.assertIn('size: 0', records[4].result['error'])
+		self.assertTrue(all(x.isMerged for x in records))
+
+	def test_skip_existed(self):
+		records = self.create_records()
+		# json of root 1x is created before
+		existed = create_record(0, {'id': 'c1'})
+		existed.rootTableName = 'parent'
+		existed.rootDataId = {'a': 1, 'b': 'x'}
+		self.service.change_json_history_service.existedResourceIds.add(self.service.generate_resource_id(existed))
+		change_jsons = self.service.assemble_records(records)
+		self.assertEqual([1, 2, 3], sorted(change_jsons.keys()))
+		self.assertEqual(Status.SUCCESS.value, records[0].status)
+
+	def test_finish_and_backup_records(self):
+		records = self.create_records()
+		change_jsons = self.service.assemble_records(records)
+		self.service.finish_and_backup_records(records, change_jsons)
+		self.assertEqual(4, len([x for x in self.written if isinstance(x, ChangeDataJson)]))
+		self.assertEqual(6, len([x for x in self.written if isinstance(x, ChangeDataRecord)]))
+		self.assertEqual([('delete', x) for x in range(1, 7)], [x for x in self.written if isinstance(x, tuple)])
+
+	def test_finish_and_backup_one_by_one(self):
+		records = self.create_records()
+		change_jsons = self.service.assemble_records(records)
+		storage = self.service.change_record_service
+		storage.failOnCreateAll = True
+		# json of c2 is created by another node
+		storage.duplicatedResourceIds.add(change_jsons[1].resourceId)
+		self.service.finish_and_backup_records(records, change_jsons)
+		self.assertEqual(
+			['1x', '1y', '2x'], [x.content['id'] for x in self.written if isinstance(x, ChangeDataJson)])
+		self.assertEqual(6, len([x for x in self.written if isinstance(x, ChangeDataRecord)]))
+		self.assertEqual([('delete', x) for x in range(1, 7)], [x for x in self.written if isinstance(x, tuple)])
+		self.assertEqual({'result': 'duplicated'}, records[1].result)
+		self.assertEqual(Status.SUCCESS.value, records[1].status)
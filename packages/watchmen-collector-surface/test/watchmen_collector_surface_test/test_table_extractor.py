@@ -0,0 +1,114 @@
+import os
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+from unittest import TestCase
+from unittest.mock import patch
+
+from watchmen_collector_kernel.model import CollectorTableConfig
+from watchmen_collector_surface.cdc import table_extractor
+from watchmen_collector_surface.cdc.table_extractor import TableExtractor
+from watchmen_storage import EntityCriteria, EntityCriteriaJoint, EntityCriteriaJointConjunction, \
+    EntityCriteriaOperator, EntityCriteriaStatement
+
+CONFIG = CollectorTableConfig(configId='1', name='table', tableName='table', primaryKey=['a', 'b'], tenantId='1')
+
+
+def matches(row: Dict[str, Any], statement: EntityCriteriaStatement) -> bool:
+    if isinstance(statement, EntityCriteriaJoint):
+        results = [matches(row, child) for child in statement.children]
+        return any(results) if statement.conjunction == EntityCriteriaJointConjunction.OR else all(results)
+    value = row.get(statement.left.columnName)
+    if statement.operator == EntityCriteriaOperator.EQUALS:
+        return value == statement.right
+    elif statement.operator == EntityCriteriaOperator.GREATER_THAN:
+        return value > statement.right
+    raise NotImplementedError(f'{statement.operator}')
+
+
+class FakeSourceExtractor:
+    """
+    source table in memory, primary keys are ordered as database does
+    """
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self.rows = rows
+        self.queries = 0
+
+    def find_limited_primary_keys_by_criteria(self, criteria: EntityCriteria, limit: int) -> List[Dict[str, Any]]:
+        self.queries = self.queries + 1
+        rows = [row for row in self.rows if all(matches(row, statement) for statement in criteria)]
+        rows.sort(key=lambda row: (row['a'], row['b']))
+        return [{'a': row['a'], 'b': row['b']} for row in rows[:limit]]
+
+
+class FakeChangeDataRecordService:
+    def __init__(self, data_ids: List[Dict]):
+        self.records = [SimpleNamespace(changeRecordId=index + 1, dataId=data_id) for index, data_id in enumerate(data_ids)]
+        self.queries = 0
+
+    def find_existed_records_after(
+            self, table_trigger_id: int, change_record_id: Optional[int], limit: int) -> List[SimpleNamespace]:
+        self.queries = self.queries + 1
+        start = 0 if change_record_id is None else change_record_id
+        return [record for record in self.records if record.changeRecordId > start][:limit]
+
+
+def create_rows() -> List[Dict[str, Any]]:
+    # rows are not in primary key order
+    return [{'a': a, 'b': b, 'value': a * b} for b in [3, 1, 2] for a in [4, 2, 1, 3]]
+
+
+class TableExtractorTest(TestCase):
+    def page(self, extractor: FakeSourceExtractor, limit: int) -> List[List[Dict[str, Any]]]:
+        with patch.object(table_extractor, 'ask_source_extractor', lambda config: extractor), \
+                patch.object(table_extractor, 'ask_extract_table_limit_size', lambda: limit):
+            return list(TableExtractor.__new__(TableExtractor).find_primary_key_pages([], CONFIG))
+
+    def test_build_page_criteria_by_primary_key(self):
+        joint = TableExtractor.__new__(TableExtractor).build_page_criteria_by_primary_key({'a': 2, 'b': 3}, CONFIG)
+        self.assertEqual(EntityCriteriaJointConjunction.OR, joint.conjunction)
+        self.assertEqual(
+            [[('a', EntityCriteriaOperator.GREATER_THAN, 2)],
+             [('a', EntityCriteriaOperator.EQUALS, 2), ('b', EntityCriteriaOperator.GREATER_THAN, 3)]],
+            [[(x.left.columnName, x.operator, x.right) for x in child.children] for child in joint.children])
+        with self.assertRaises(KeyError):
+            TableExtractor.__new__(TableExtractor).build_page_criteria_by_primary_key({'a': 2}, CONFIG)
+
+    def test_composite_key_pages(self):
+        expected = [{'a': a, 'b': b} for a in [1, 2, 3, 4] for b in [1, 2, 3]]
+        # page boundary in middle of first column
+        extractor = FakeSourceExtractor(create_rows())
+        pages = self.page(extractor, 5)
+        self.assertEqual([5, 5, 2], [len(page) for page in pages])
+        self.assertEqual(expected, [key for page in pages for key in page])
+        self.assertEqual({'a': 2, 'b': 2}, pages[0][-1])
+        self.assertEqual(3, extractor.queries)
+        # last page is full, one more query to find nothing left
+        extractor = FakeSourceExtractor(create_rows())
+        pages = self.page(extractor, 4)
+        self.assertEqual(expected, [key for page in pages for key in page])
+        self.assertEqual(4, extractor.queries)
+
+    def test_diff_with_existed_keys(self):
+        service = TableExtractor.__new__(TableExtractor)
+        # data ids loaded from json, value types are not same as source, last one is not in source anymore
+        service.change_data_record_service = FakeChangeDataRecordService([
+            {'a': '1', 'b': '2'}, {'a': 2, 'b': 3}, {'a': '3', 'b': 1}, {'a': 9, 'b': 9}, {'a': 1, 'b': '2'}])
+        with patch.object(table_extractor, 'ask_extract_table_limit_size', lambda: 2):
+            existed_keys = service.find_existed_keys(1, CONFIG)
+        try:
+            # paged, and duplicated key is counted once
+            self.assertEqual(3, service.change_data_record_service.queries)
+            self.assertEqual(4, existed_keys.count)
+            self.assertTrue(os.path.exists(existed_keys.path))
+            diffs = []
+            for page in self.page(FakeSourceExtractor(create_rows()), 5):
+                diffs.extend(service.get_diff(page, existed_keys, CONFIG))
+            self.assertEqual(
+                [{'a': a, 'b': b} for a in [1, 2, 3, 4] for b in [1, 2, 3] if (a, b) not in [(1, 2), (2, 3), (3, 1)]],
+                diffs)
+            # missed
+            self.assertEqual(1, existed_keys.count)
+        finally:
+            existed_keys.close()
+        self.assertFalse(os.path.exists(existed_keys.path))
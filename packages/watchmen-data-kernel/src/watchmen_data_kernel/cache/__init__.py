@@ -1,4 +1,6 @@
 from .cache_manager import configure_cache, find_cache
 from .cache_service import CacheService
 from .internal_cache import InternalCache
+from .invalidation_bus import apply_cache_invalidation, ask_cache_invalidation_bus, CacheInvalidationBus, \
+	publish_cache_invalidation
 from .pipeline_cache import PipelineCacheListener
@@ -0,0 +1,323 @@
+from abc import abstractmethod
+from datetime import datetime, timedelta
+from json import dumps, loads
+from logging import getLogger
+from threading import Lock, Thread, Timer
+from time import sleep
+from typing import Any, Dict, Optional
+from uuid import uuid4
+
+from watchmen_data_kernel.common import ask_cache_invalidation_bus_type, ask_cache_invalidation_channel, \
+	ask_cache_invalidation_kafka_bootstrap_servers, ask_cache_invalidation_poll_interval, \
+	ask_cache_invalidation_poll_lookback, ask_cache_invalidation_redis_url, ask_cache_invalidation_retention, \
+	DataKernelException
+from watchmen_meta.common import ask_meta_storage, ask_snowflake_generator, StorageService
+from watchmen_meta.system import CacheInvalidationService
+from watchmen_model.system import CacheInvalidation, CacheInvalidationKind
+from watchmen_utilities import get_current_time_in_seconds, is_blank
+from .cache_service import CacheService
+
+logger = getLogger(__name__)
+
+
+def apply_cache_invalidation(invalidation: CacheInvalidation) -> None:
+	"""
+	remove cached resource, it will be reloaded from meta storage on next visit.
+	listeners of pipeline cache are notified, so compiled pipeline is removed as well.
+	"""
+	kind = invalidation.kind
+	resource_id = invalidation.resourceId
+	if kind == CacheInvalidationKind.ALL:
+		CacheService.clear_all()
+	elif is_blank(resource_id):
+		return
+	elif kind == CacheInvalidationKind.TOPIC:
+		CacheService.topic().remove(resource_id)
+	elif kind == CacheInvalidationKind.PIPELINE:
+		CacheService.pipeline().remove(resource_id)
+	elif kind == CacheInvalidationKind.DATA_SOURCE:
+		CacheService.data_source().remove(resource_id)
+	elif kind == CacheInvalidationKind.EXTERNAL_WRITER:
+		CacheService.external_writer().remove(resource_id)
+	elif kind == CacheInvalidationKind.TENANT:
+		CacheService.tenant().remove(resource_id)
+	else:
+		logger.warning(f'Cache invalidation kind[{kind}] is not supported, ignored.')
+
+
+class CacheInvalidationBus:
+	"""
+	broadcast cache invalidations to all nodes.
+	node which changes meta applies change to its own caches directly, invalidations published by itself are ignored.
+	"""
+
+	def __init__(self):
+		self.origin = uuid4().hex
+		self.lock = Lock()
+		self.subscriber: Optional[Thread] = None
+
+	def publish(self, kind: CacheInvalidationKind, resource_id: Optional[str], storage_service: StorageService) -> None:
+		"""
+		storage service is the one which changes meta, and its transaction is not committed yet.
+		"""
+		principal_service = storage_service.principalService
+		self.send(CacheInvalidation(
+			kind=kind, resourceId=resource_id, origin=self.origin,
+			tenantId=None if principal_service is None else principal_service.get_tenant_id()
+		), storage_service)
+
+	@abstractmethod
+	def send(self, invalidation: CacheInvalidation, storage_service: StorageService) -> None:
+		pass
+
+	def receive(self, invalidation: CacheInvalidation) -> None:
+		if invalidation.origin == self.origin:
+			return
+		try:
+			apply_cache_invalidation(invalidation)
+		except Exception as e:
+			logger.error(
+				f'Failed to apply cache invalidation[kind={invalidation.kind}, resourceId={invalidation.resourceId}].',
+				exc_info=e)
+
+	@abstractmethod
+	def listen(self) -> None:
+		"""
+		receive invalidations until failed
+		"""
+		pass
+
+	def run(self) -> None:
+		logger.info(f'Cache invalidation subscriber[{self.__class__.__name__}] started.')
+		while True:
+			try:
+				self.listen()
+			except Exception as e:
+				logger.error(e, exc_info=True, stack_info=True)
+			# try to restart
+			sleep(ask_cache_invalidation_poll_interval())
+			logger.info('Try to restart cache invalidation subscriber.')
+
+	def start(self) -> None:
+		if self.subscriber is not None:
+			return
+		with self.lock:
+			if self.subscriber is None:
+				self.subscriber = Thread(target=self.run, args=(), daemon=True)
+				self.subscriber.start()
+
+
+class MetaCacheInvalidationBus(CacheInvalidationBus):
+	"""
+	invalidations are written into meta storage in the transaction which changes meta,
+	so they are visible to other nodes exactly when the change is committed.
+	all nodes poll invalidations created in lookback window, applied ones are remembered until out of window.
+	"""
+
+	def __init__(self, poll_interval: int, lookback: int, retention: int):
+		super().__init__()
+		self.pollInterval = max(poll_interval, 1)
+		# lookback window must cover poll interval and clock skew of nodes
+		self.lookback = timedelta(seconds=max(lookback, self.pollInterval * 2))
+		self.retention = timedelta(seconds=max(retention, self.lookback.total_seconds()))
+		self.applied: Dict[str, datetime] = {}
+		self.nextPurgeAt: Optional[datetime] = None
+
+	def send(self, invalidation: CacheInvalidation, storage_service: StorageService) -> None:
+		snowflake_generator = storage_service.snowflakeGenerator
+		service = CacheInvalidationService(storage_service.storage).with_snowflake_generator(
+			ask_snowflake_generator() if snowflake_generator is None else snowflake_generator)
+		# noinspection PyUnresolvedReferences
+		service.publish(invalidation)
+
+	# noinspection PyMethodMayBeStatic
+	def ask_service(self) -> CacheInvalidationService:
+		# noinspection PyTypeChecker
+		return CacheInvalidationService(ask_meta_storage()).with_snowflake_generator(ask_snowflake_generator())
+
+	def poll(self) -> None:
+		now = get_current_time_in_seconds()
+		since = now - self.lookback
+		service = self.ask_service()
+		service.begin_transaction()
+		try:
+			invalidations = service.find_since(since)
+		finally:
+			service.close_transaction()
+		for invalidation in invalidations:
+			if invalidation.invalidationId in self.applied:
+				continue
+			self.applied[invalidation.invalidationId] = invalidation.createdAt
+			self.receive(invalidation)
+		self.applied = {key: value for key, value in self.applied.items() if value is None or value >= since}
+		if self.nextPurgeAt is None or self.nextPurgeAt <= now:
+			self.purge(now)
+
+	def purge(self, now: datetime) -> None:
+		self.nextPurgeAt = now + self.lookback
+		service = self.ask_service()
+		service.begin_transaction()
+		try:
+			service.delete_before(now - self.retention)
+			service.commit_transaction()
+		except Exception as e:
+			service.rollback_transaction()
+			logger.warning('Failed to purge expired cache invalidations.', exc_info=e)
+
+	def listen(self) -> None:
+		while True:
+			self.poll()
+			sleep(self.pollInterval)
+
+
+class PubSubCacheInvalidationBus(CacheInvalidationBus):
+	"""
+	invalidation is published before the meta change is committed,
+	therefore it is applied twice, on arrival and after re-apply delay.
+	failure of publishing is logged only, cache heart beat is the fallback.
+	"""
+
+	def __init__(self, channel: str, reapply_delay: int):
+		super().__init__()
+		self.channel = channel
+		self.reapplyDelay = max(reapply_delay, 1)
+
+	# noinspection PyMethodMayBeStatic
+	def to_message(self, invalidation: CacheInvalidation) -> bytes:
+		return dumps({
+			'kind': invalidation.kind,
+			'resourceId': invalidation.resourceId,
+			'origin': invalidation.origin,
+			'tenantId': invalidation.tenantId
+		}).encode('utf-8')
+
+	# noinspection PyMethodMayBeStatic
+	def from_message(self, message: Any) -> CacheInvalidation:
+		if isinstance(message, bytes):
+			message = message.decode('utf-8')
+		data = loads(message)
+		return CacheInvalidation(
+			kind=data.get('kind'), resourceId=data.get('resourceId'),
+			origin=data.get('origin'), tenantId=data.get('tenantId'))
+
+	# noinspection PyUnusedLocal
+	def send(self, invalidation: CacheInvalidation, storage_service: StorageService) -> None:
+		try:
+			self.send_message(self.to_message(invalidation))
+		except Exception as e:
+			logger.error(
+				f'Failed to publish cache invalidation[kind={invalidation.kind}, '
+				f'resourceId={invalidation.resourceId}].', exc_info=e)
+
+	@abstractmethod
+	def send_message(self, message: bytes) -> None:
+		pass
+
+	def receive_message(self, message: Any) -> None:
+		try:
+			invalidation = self.from_message(message)
+		except Exception as e:
+			logger.error(f'Failed to parse cache invalidation[{message}].', exc_info=e)
+			return
+		if invalidation.origin == self.origin:
+			return
+		self.receive(invalidation)
+		timer = Timer(self.reapplyDelay, self.receive, args=(invalidation,))
+		timer.daemon = True
+		timer.start()
+
+
+class RedisCacheInvalidationBus(PubSubCacheInvalidationBus):
+	def __init__(self, url: str, channel: str, reapply_delay: int):
+		super().__init__(channel, reapply_delay)
+		self.url = url
+		self.client = None
+
+	def ask_client(self):
+		if self.client is None:
+			# noinspection PyPackageRequirements
+			from redis import Redis
+			self.client = Redis.from_url(self.url)
+		return self.client
+
+	def send_message(self, message: bytes) -> None:
+		self.ask_client().publish(self.channel, message)
+
+	def listen(self) -> None:
+		pubsub = self.ask_client().pubsub(ignore_subscribe_messages=True)
+		pubsub.subscribe(self.channel)
+		try:
+			for message in pubsub.listen():
+				self.receive_message(message.get('data'))
+		finally:
+			pubsub.close()
+
+
+class KafkaCacheInvalidationBus(PubSubCacheInvalidationBus):
+	def __init__(self, bootstrap_servers: str, topic: str, reapply_delay: int):
+		super().__init__(topic, reapply_delay)
+		self.bootstrapServers = bootstrap_servers.split(',')
+		self.producer = None
+
+	def ask_producer(self):
+		if self.producer is None:
+			# noinspection PyPackageRequirements
+			from kafka import KafkaProducer
+			self.producer = KafkaProducer(bootstrap_servers=self.bootstrapServers)
+		return self.producer
+
+	def send_message(self, message: bytes) -> None:
+		self.ask_producer().send(self.channel, message)
+
+	def listen(self) -> None:
+		# noinspection PyPackageRequirements
+		from kafka import KafkaConsumer
+		# no consumer group, every node receives all invalidations since it started
+		consumer = KafkaConsumer(
+			self.channel, bootstrap_servers=self.bootstrapServers, group_id=None, auto_offset_reset='latest')
+		try:
+			for record in consumer:
+				self.receive_message(record.value)
+		finally:
+			consumer.close()
+
+
+def build_cache_invalidation_bus() -> Optional[CacheInvalidationBus]:
+	bus_type = ask_cache_invalidation_bus_type()
+	if is_blank(bus_type) or bus_type == 'none':
+		return None
+	elif bus_type == 'meta':
+		return MetaCacheInvalidationBus(
+			ask_cache_invalidation_poll_interval(), ask_cache_invalidation_poll_lookback(),
+			ask_cache_invalidation_retention())
+	elif bus_type == 'redis':
+		return RedisCacheInvalidationBus(
+			ask_cache_invalidation_redis_url(), ask_cache_invalidation_channel(),
+			ask_cache_invalidation_poll_interval())
+	elif bus_type == 'kafka':
+		return KafkaCacheInvalidationBus(
+			ask_cache_invalidation_kafka_bootstrap_servers(), ask_cache_invalidation_channel(),
+			ask_cache_invalidation_poll_interval())
+	else:
+		raise DataKernelException(f'Cache invalidation bus[{bus_type}] is not supported.')
+
+
+cache_invalidation_bus = build_cache_invalidation_bus()
+
+
+def ask_cache_invalidation_bus() -> Optional[CacheInvalidationBus]:
+	return cache_invalidation_bus
+
+
+def publish_cache_invalidation(
+		kind: CacheInvalidationKind, resource_id: Optional[str], storage_service: StorageService) -> None:
+	"""
+	publish to other nodes, do nothing when cache invalidation bus is not enabled.
+	call it in the transaction which changes meta.
+	"""
+	if cache_invalidation_bus is not None:
+		cache_invalidation_bus.publish(kind, resource_id, storage_service)
+
+
+if cache_invalidation_bus is not None:
+	cache_invalidation_bus.start()
@@ -1,5 +1,8 @@
 from .exception import DataKernelException
 from .settings import ask_all_date_formats, ask_cache_enabled, ask_cache_heart_beat_enabled, \
-	ask_cache_heart_beat_interval, ask_date_formats, ask_datetime_formats, ask_encrypt_aes_params, \
+	ask_cache_heart_beat_interval, ask_cache_invalidation_bus_type, ask_cache_invalidation_channel, \
+	ask_cache_invalidation_kafka_bootstrap_servers, ask_cache_invalidation_poll_interval, \
+	ask_cache_invalidation_poll_lookback, ask_cache_invalidation_redis_url, ask_cache_invalidation_retention, \
+	ask_compile_in_memory_expression, ask_date_formats, ask_datetime_formats, ask_encrypt_aes_params, \
 	ask_full_datetime_formats, ask_ignore_default_on_raw, ask_replace_topic_to_storage, ask_storage_echo_enabled, \
 	ask_sync_topic_to_storage, ask_time_formats, ask_topic_snapshot_scheduler_heart_beat_interval, ask_trino_enabled
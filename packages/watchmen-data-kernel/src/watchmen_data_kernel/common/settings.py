@@ -35,12 +35,22 @@ class KernelSettings(ExtendedBaseSettings):
 	KERNEL_CACHE: bool = True  # enable kernel cache, keep it enabled in production
 	KERNEL_CACHE_HEART_BEAT: bool = True  # enable kernel cache heart beat
 	KERNEL_CACHE_HEART_BEAT_INTERVAL: int = 60  # kernel cache heart beat interval, in seconds
+	# cache invalidation bus, broadcast meta changes to all nodes. none, meta, redis or kafka
+	KERNEL_CACHE_INVALIDATION_BUS: str = 'none'
+	KERNEL_CACHE_INVALIDATION_POLL_INTERVAL: int = 5  # meta bus poll interval, pub-sub bus re-apply delay, in seconds
+	KERNEL_CACHE_INVALIDATION_POLL_LOOKBACK: int = 60  # meta bus poll lookback, tolerates clock skew, in seconds
+	KERNEL_CACHE_INVALIDATION_RETENTION: int = 86400  # meta bus keeps invalidations for, in seconds
+	KERNEL_CACHE_INVALIDATION_CHANNEL: str = 'watchmen-cache-invalidation'  # redis channel or kafka topic
+	KERNEL_CACHE_INVALIDATION_REDIS_URL: str = 'redis://localhost:6379/0'
+	KERNEL_CACHE_INVALIDATION_KAFKA_BOOTSTRAP_SERVERS: str = 'localhost:9092'
 
 	TOPIC_SNAPSHOT_SCHEDULER_HEART_BEAT_INTERVAL: int = 30  # topic snapshot scheduler heart beat interval, in seconds
 
 	SYNC_TOPIC_TO_STORAGE: bool = False  # sync topic change to storage entity
 	REPLACE_TOPIC_TO_STORAGE: bool = False  # force replace existing topic entity (drop and recreate)
 	TRINO: bool = True  # trino
+	# compile in-memory prerequisites and mapping parameters to python functions
+	COMPILE_IN_MEMORY_EXPRESSION: bool = False
 
 
 settings = KernelSettings()
@@ -114,6 +124,34 @@ def ask_cache_heart_beat_interval() -> int:
 	return settings.KERNEL_CACHE_HEART_BEAT_INTERVAL
 
 
+def ask_cache_invalidation_bus_type() -> str:
+	return settings.KERNEL_CACHE_INVALIDATION_BUS
+
+
+def ask_cache_invalidation_poll_interval() -> int:
+	return settings.KERNEL_CACHE_INVALIDATION_POLL_INTERVAL
+
+
+def ask_cache_invalidation_poll_lookback() -> int:
+	return settings.KERNEL_CACHE_INVALIDATION_POLL_LOOKBACK
+
+
+def ask_cache_invalidation_retention() -> int:
+	return settings.KERNEL_CACHE_INVALIDATION_RETENTION
+
+
+def ask_cache_invalidation_channel() -> str:
+	return settings.KERNEL_CACHE_INVALIDATION_CHANNEL
+
+
+def ask_cache_invalidation_redis_url() -> str:
+	return settings.KERNEL_CACHE_INVALIDATION_REDIS_URL
+
+
+def ask_cache_invalidation_kafka_bootstrap_servers() -> str:
+	return settings.KERNEL_CACHE_INVALIDATION_KAFKA_BOOTSTRAP_SERVERS
+
+
 def ask_topic_snapshot_scheduler_heart_beat_interval() -> int:
 	return settings.TOPIC_SNAPSHOT_SCHEDULER_HEART_BEAT_INTERVAL
 
@@ -128,3 +166,7 @@ def ask_replace_topic_to_storage() -> bool:
 
 def ask_trino_enabled() -> bool:
 	return settings.TRINO
+
+
+def ask_compile_in_memory_expression() -> bool:
+	return settings.COMPILE_IN_MEMORY_EXPRESSION
@@ -3,4 +3,4 @@ from .external_writer_service import ExternalWriterService
 from .key_store_service import KeyStoreService
 from .pipeline_service import PipelineService
 from .tenant_service import TenantService
-from .topic_service import TopicService
+from .topic_service import ask_factor_index, TopicService
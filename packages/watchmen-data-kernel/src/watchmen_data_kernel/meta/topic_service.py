@@ -3,7 +3,7 @@ from typing import List, Optional
 from watchmen_auth import PrincipalService
 from watchmen_data_kernel.cache import CacheService
 from watchmen_data_kernel.common import DataKernelException
-from watchmen_data_kernel.topic_schema import TopicSchema
+from watchmen_data_kernel.topic_schema import FactorIndex, TopicSchema
 from watchmen_meta.admin import TopicService as TopicStorageService
 from watchmen_meta.common import ask_meta_storage, ask_snowflake_generator
 from watchmen_model.admin import Topic, TopicKind
@@ -99,3 +99,15 @@ class TopicService:
 			return ArrayHelper(topics).filter(lambda x: x.kind == TopicKind.BUSINESS).to_list()
 		finally:
 			storage_service.close_transaction()
+
+
+def ask_factor_index(topic: Topic) -> FactorIndex:
+	"""
+	reuse factor index of cached topic schema when given topic is exactly the cached one,
+	otherwise build a new one for given topic.
+	index is replaced with schema when topic cache changed.
+	"""
+	schema = CacheService.topic().get_schema(topic.topicId)
+	if schema is not None and schema.get_topic() is topic:
+		return schema.get_factor_index()
+	return FactorIndex(topic)
@@ -1,5 +1,6 @@
 from abc import abstractmethod
 from datetime import datetime
+from decimal import Decimal
 from typing import Any, Dict, List, Optional, Tuple
 
 from watchmen_auth import PrincipalService
@@ -8,9 +9,10 @@ from watchmen_model.admin import Topic
 from watchmen_model.common import Pageable, TenantId
 from watchmen_model.pipeline_kernel import TopicDataColumnNames
 from watchmen_storage import ColumnNameLiteral, EntityColumnName, EntityCriteria, EntityCriteriaExpression, \
-	EntityDeleter, EntityDistinctValuesFinder, EntityFinder, EntityHelper, EntityIdHelper, EntityPager, EntitySort, \
-	EntityStraightColumn, EntityStraightValuesFinder, EntityUpdate, EntityUpdater, SnowflakeGenerator, \
+	EntityDeleter, EntityDistinctValuesFinder, EntityFinder, EntityHelper, EntityIdHelper, EntityIncrementer, \
+	EntityPager, EntitySort, EntityStraightColumn, EntityStraightValuesFinder, EntityUpdate, EntityUpdater, SnowflakeGenerator, \
 	EntityLimitedFinder, EntityLimitedStraightValuesFinder
+from watchmen_utilities import ArrayHelper
 from .shaper import TopicShaper
 
 
@@ -145,6 +147,18 @@ class TopicDataEntityHelper:
 			update=update
 		)
 
+	def get_entity_incrementer(
+			self, criteria: EntityCriteria, increments: Dict[EntityColumnName, Decimal],
+			update: EntityUpdate) -> EntityIncrementer:
+		entity_helper = self.get_entity_helper()
+		return EntityIncrementer(
+			name=entity_helper.name,
+			shaper=entity_helper.shaper,
+			criteria=criteria,
+			increments=increments,
+			update=update
+		)
+
 	def get_entity_deleter(self, criteria: EntityCriteria) -> EntityDeleter:
 		entity_helper = self.get_entity_helper()
 		return EntityDeleter(
@@ -220,14 +234,26 @@ class TopicDataEntityHelper:
 	def assign_fix_columns_on_create(
 			self, data: Dict[str, Any],
 			snowflake_generator: SnowflakeGenerator, principal_service: PrincipalService,
-			now: datetime
+			now: datetime, id_: Optional[int] = None
 	) -> None:
-		self.assign_id_column(data, snowflake_generator.next_id())
+		self.assign_id_column(data, snowflake_generator.next_id() if id_ is None else id_)
 		self.assign_tenant_id(data, principal_service.get_tenant_id())
 		self.assign_insert_time(data, now)
 		self.assign_update_time(data, now)
 		self.assign_version(data, 1)
 
+	def assign_fix_columns_on_create_all(
+			self, data_list: List[Dict[str, Any]],
+			snowflake_generator: SnowflakeGenerator, principal_service: PrincipalService,
+			now: datetime
+	) -> None:
+		"""
+		ids are reserved in one block
+		"""
+		ids = snowflake_generator.next_ids(len(data_list))
+		ArrayHelper(data_list).each_with_index(lambda data, index: self.assign_fix_columns_on_create(
+			data, snowflake_generator, principal_service, now, ids[index]))
+
 	def assign_fix_columns_on_update(
 			self, data: Dict[str, Any],
 			principal_service: PrincipalService,
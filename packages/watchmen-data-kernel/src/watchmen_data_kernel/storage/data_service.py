@@ -1,5 +1,6 @@
 from abc import abstractmethod
 from datetime import datetime
+from decimal import Decimal
 from logging import getLogger
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -10,9 +11,10 @@ from watchmen_meta.common import ask_snowflake_generator
 from watchmen_model.admin import PipelineTriggerType, Topic
 from watchmen_model.common import DataModel, DataPage, Pageable
 from watchmen_model.pipeline_kernel import TopicDataColumnNames
-from watchmen_storage import EntityColumnName, EntityCriteria, EntityPager, EntityStraightColumn, SnowflakeGenerator, \
-	TopicDataStorageSPI, EntityId, EntitySort
-from watchmen_utilities import ArrayHelper, get_current_time_in_seconds
+from watchmen_storage import ColumnNameLiteral, EntityColumnName, EntityCriteria, EntityCriteriaExpression, \
+	EntityCriteriaJoint, EntityCriteriaJointConjunction, EntityCriteriaOperator, EntityCriteriaStatement, EntityPager, \
+	EntityStraightColumn, SnowflakeGenerator, TopicDataStorageSPI, EntityId, EntitySort
+from watchmen_utilities import ArrayHelper, get_current_time_in_seconds, is_decimal
 from .data_entity_helper import TopicDataEntityHelper
 
 logger = getLogger(__name__)
@@ -80,6 +82,38 @@ class TopicStructureService:
 			criteria.append(by_version)
 		return criteria
 
+	def build_ids_versions_criteria(self, data_list: List[Dict[str, Any]]) -> EntityCriteria:
+		"""
+		criteria matches exactly the given rows by their ids and versions.
+		rows are grouped by version, each group is "version = ? and id in (...)", groups are joint by or.
+		"""
+		data_entity_helper = self.get_data_entity_helper()
+		id_column = ColumnNameLiteral(columnName=TopicDataColumnNames.ID.value)
+
+		def ask_id(data: Dict[str, Any]) -> int:
+			has_id, id_ = data_entity_helper.find_data_id(data)
+			if not has_id:
+				raise DataKernelException(f'Id not found from given data[{data}].')
+			return id_
+
+		def by_ids(ids: List[int]) -> EntityCriteriaExpression:
+			return EntityCriteriaExpression(left=id_column, operator=EntityCriteriaOperator.IN, right=ids)
+
+		if not data_entity_helper.is_versioned():
+			return [by_ids(ArrayHelper(data_list).map(ask_id).to_list())]
+
+		groups: Dict[Any, Tuple[EntityCriteriaExpression, List[int]]] = {}
+		for data in data_list:
+			by_version = data_entity_helper.build_version_criteria(data)
+			if by_version is None:
+				raise DataKernelException(f'Version not found from given data[{data}].')
+			groups.setdefault(by_version.right, (by_version, []))[1].append(ask_id(data))
+		joints: List[EntityCriteriaStatement] = ArrayHelper(list(groups.values())) \
+			.map(lambda x: EntityCriteriaJoint(children=[x[0], by_ids(x[1])])).to_list()
+		if len(joints) == 1:
+			return joints
+		return [EntityCriteriaJoint(conjunction=EntityCriteriaJointConjunction.OR, children=joints)]
+
 
 class TopicDataService(TopicStructureService):
 	def __init__(
@@ -155,6 +189,34 @@ class TopicDataService(TopicStructureService):
 		finally:
 			storage.close()
 
+	def trigger_by_insert_all(self, data_list: List[Dict[str, Any]]) -> List[TopicTrigger]:
+		"""
+		data is pure data, all data are inserted by one statement
+		"""
+		data_entity_helper = self.get_data_entity_helper()
+		storage = self.get_storage()
+		try:
+			now = self.now()
+			topic_data_list = ArrayHelper(data_list).map(lambda x: self.try_to_wrap_to_topic_data(x)).to_list()
+			data_entity_helper.assign_fix_columns_on_create_all(
+				data_list=topic_data_list,
+				snowflake_generator=self.get_snowflake_generator(), principal_service=self.get_principal_service(),
+				now=now
+			)
+			storage.connect()
+			storage.insert_all(topic_data_list, data_entity_helper.get_entity_helper())
+			return ArrayHelper(data_list).map_with_index(lambda data, index: TopicTrigger(
+				previous=None,
+				current=data,
+				triggerType=PipelineTriggerType.INSERT,
+				internalDataId=data_entity_helper.find_data_id(topic_data_list[index])[1]
+			)).to_list()
+		except Exception as e:
+			logger.error(e, exc_info=True, stack_info=True)
+			self.raise_exception(f'Failed to create data[count={len(data_list)}] into {self.raise_on_topic()}.', e)
+		finally:
+			storage.close()
+
 	def find_data_by_id(self, id_: EntityId) -> Optional[Dict[str, Any]]:
 		"""
 		return topic data
@@ -345,18 +407,19 @@ class TopicDataService(TopicStructureService):
 		finally:
 			storage.close()
 			
-	def find_limited_values(self, criteria: EntityCriteria, limit: int) -> List[Dict[str, Any]]:
+	def find_limited_values(
+			self, criteria: EntityCriteria, limit: int, sort: Optional[EntitySort] = None) -> List[Dict[str, Any]]:
 		data_entity_helper = self.get_data_entity_helper()
 		storage = self.get_storage()
 		try:
 			storage.connect()
-			return storage.find_limited(data_entity_helper.get_limited_finder(criteria, limit))
+			return storage.find_limited(data_entity_helper.get_limited_finder(criteria, limit, sort))
 		finally:
 			storage.close()
 
-	def insert(self, data: Dict[str, Any]) -> Dict[str, Any]:
+	def prepare_insert(self, data: Dict[str, Any]) -> Dict[str, Any]:
 		"""
-		assign id and version, audit columns
+		assign id and version, audit columns. no storage operation.
 		"""
 		data_entity_helper = self.get_data_entity_helper()
 		data_entity_helper.assign_id_column(data, self.get_snowflake_generator().next_id())
@@ -365,6 +428,14 @@ class TopicDataService(TopicStructureService):
 		data_entity_helper.assign_tenant_id(data, self.get_principal_service().get_tenant_id())
 		data_entity_helper.assign_insert_time(data, now)
 		data_entity_helper.assign_update_time(data, now)
+		return data
+
+	def insert(self, data: Dict[str, Any]) -> Dict[str, Any]:
+		"""
+		assign id and version, audit columns
+		"""
+		data_entity_helper = self.get_data_entity_helper()
+		self.prepare_insert(data)
 		storage = self.get_storage()
 		try:
 			storage.connect()
@@ -373,6 +444,20 @@ class TopicDataService(TopicStructureService):
 		finally:
 			storage.close()
 
+	def insert_all(self, data_list: List[Dict[str, Any]]) -> None:
+		"""
+		given data must be prepared already, see prepare_insert.
+		"""
+		if len(data_list) == 0:
+			return
+		data_entity_helper = self.get_data_entity_helper()
+		storage = self.get_storage()
+		try:
+			storage.connect()
+			storage.insert_all(data_list, data_entity_helper.get_entity_helper())
+		finally:
+			storage.close()
+
 	def update_by_id_and_version(
 			self, data: Dict[str, Any], additional_criteria: Optional[EntityCriteria] = None
 	) -> Tuple[int, EntityCriteria]:
@@ -426,6 +511,52 @@ class TopicDataService(TopicStructureService):
 			data_entity_helper.assign_update_time(data, current_update_time)
 		return updated_count, criteria
 
+	def increment_and_pull(
+			self, criteria: EntityCriteria, increments: Dict[str, Decimal]
+	) -> Tuple[int, Optional[Dict[str, Any]]]:
+		"""
+		add increments to given factors in storage side, row is not read before updating.
+		version + 1 and update time are assigned as well.
+		returns updated count and the updated row, which is read in same transaction.
+		values of incremented factors in updated row are decimal,
+		raise exception and rollback when more than one row updated, or value cannot be parsed to decimal.
+		"""
+		data_entity_helper = self.get_data_entity_helper()
+		column_increments: Dict[EntityColumnName, Decimal] = {}
+		for factor_name, increment in increments.items():
+			column_increments[data_entity_helper.get_column_name(factor_name)] = increment
+		if data_entity_helper.is_versioned():
+			column_increments[TopicDataColumnNames.VERSION.value] = Decimal(1)
+		update: Dict[str, Any] = {}
+		data_entity_helper.assign_update_time(update, get_current_time_in_seconds())
+		storage = self.get_storage()
+		storage.begin()
+		try:
+			updated_count = storage.increment(
+				data_entity_helper.get_entity_incrementer(criteria, column_increments, update))
+			if updated_count == 0:
+				storage.commit_and_close()
+				return 0, None
+			elif updated_count != 1:
+				raise DataKernelException(f'Too many data[count={updated_count}] updated by increment, rollback.')
+			data = storage.find(data_entity_helper.get_entity_finder(criteria))
+			if len(data) != 1:
+				raise DataKernelException(f'{len(data)} data found after increment, rollback.')
+			updated_data = data[0]
+			for factor_name in increments.keys():
+				# value pulled might be float (e.g. float columns, or number of oracle)
+				parsed, value = is_decimal(updated_data.get(factor_name))
+				if not parsed:
+					raise DataKernelException(
+						f'Value[{updated_data.get(factor_name)}] of factor[{factor_name}] '
+						f'cannot be parsed to decimal after increment, rollback.')
+				updated_data[factor_name] = value
+			storage.commit_and_close()
+			return 1, updated_data
+		except Exception as e:
+			storage.rollback_and_close()
+			raise e
+
 	def delete_by_id_and_version(self, data: Dict[str, Any]) -> Tuple[int, EntityCriteria]:
 		"""
 		for raw, since there is no version column, will be ignored.
@@ -440,6 +571,33 @@ class TopicDataService(TopicStructureService):
 		finally:
 			storage.close()
 
+	def delete_all_by_id_and_version(self, data_list: List[Dict[str, Any]], chunk_size: int) -> int:
+		"""
+		delete given rows in one transaction, one statement for each chunk.
+		raise exception and rollback when any row is not deleted, since it is deleted or changed by others.
+		returns count of deleted rows.
+		"""
+		if len(data_list) == 0:
+			return 0
+		data_entity_helper = self.get_data_entity_helper()
+		storage = self.get_storage()
+		storage.begin()
+		try:
+			deleted_count = 0
+			for chunk in ArrayHelper(data_list).chunk(max(chunk_size, 1)).to_list():
+				criteria = self.build_ids_versions_criteria(chunk)
+				count = storage.delete(data_entity_helper.get_entity_deleter(criteria))
+				if count != len(chunk):
+					raise DataKernelException(
+						f'{len(chunk)} rows expected but {count} deleted, '
+						f'some of them are deleted or changed by others, bulk deletion rollback.')
+				deleted_count = deleted_count + count
+			storage.commit_and_close()
+			return deleted_count
+		except Exception as e:
+			storage.rollback_and_close()
+			raise e
+
 	def page(self, pager: EntityPager) -> DataPage:
 		storage = self.get_storage()
 		try:
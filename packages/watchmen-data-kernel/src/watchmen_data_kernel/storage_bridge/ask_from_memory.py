@@ -6,8 +6,9 @@ from decimal import Decimal
 from typing import Any, Callable, List, Optional, Tuple, Union
 
 from watchmen_auth import PrincipalService
-from watchmen_data_kernel.common import ask_all_date_formats, ask_time_formats, DataKernelException
-from watchmen_data_kernel.meta import TopicService
+from watchmen_data_kernel.common import ask_all_date_formats, ask_compile_in_memory_expression, ask_time_formats, \
+	DataKernelException
+from watchmen_data_kernel.meta import ask_factor_index, TopicService
 from watchmen_data_kernel.utils import MightAVariable, parse_function_in_variable, parse_move_date_pattern, \
 	parse_variable
 from watchmen_model.admin import Conditional, Factor, Topic
@@ -406,7 +407,7 @@ class ParsedMemoryTopicFactorParameter(ParsedMemoryParameter):
 
 		if is_blank(parameter.factorId):
 			raise DataKernelException(f'Factor not declared.')
-		factor: Optional[Factor] = ArrayHelper(topic.factors).find(lambda x: x.factorId == parameter.factorId)
+		factor: Optional[Factor] = ask_factor_index(topic).find_by_id(parameter.factorId)
 		if factor is None:
 			raise DataKernelException(
 				f'Factor[id={parameter.factorId}] in topic[id={topic.topicId}, name={topic.name}] not found.')
@@ -640,10 +641,13 @@ def create_ask_constant_value(variables: List[MightAVariable]) -> Callable[[Pipe
 
 class ParsedMemoryConstantParameter(ParsedMemoryParameter):
 	askValue: Callable[[PipelineVariables, PrincipalService], Any] = None
+	# value is static when no variable in constant, which is not related to variables
+	static: bool = False
 
 	# noinspection DuplicatedCode
 	def parse(self, parameter: ConstantParameter, principal_service: PrincipalService) -> None:
 		value = parameter.value
+		self.static = True
 		if value is None:
 			self.askValue = always_none
 		elif len(value) == 0:
@@ -653,6 +657,7 @@ class ParsedMemoryConstantParameter(ParsedMemoryParameter):
 		elif '{' not in value or '}' not in value:
 			self.askValue = create_static_str(value)
 		else:
+			self.static = False
 			_, variables = parse_variable(value)
 			self.askValue = create_ask_constant_value(variables)
 
@@ -685,31 +690,46 @@ def parse_to_decimal(value: Any, fallback_value: Callable[[], Optional[Decimal]]
 	return fallback_value() if decimal_value is None else decimal_value
 
 
+class NumericReducer:
+	"""
+	reduce values of parameters to one decimal, keeps the parsed parameters to be compiled
+	"""
+
+	def __init__(
+			self, parameters: List[ParsedMemoryParameter], reduce_func: Callable[[Decimal, Decimal], Decimal],
+			numeric_name: str,
+			fallback_first: Callable[[], Optional[Decimal]] = lambda x: None,
+			fallback_rest: Callable[[], Optional[Decimal]] = lambda x: None):
+		self.parameters = parameters
+		self.reduceFunc = reduce_func
+		self.numericName = numeric_name
+		self.fallbackFirst = fallback_first
+		self.fallbackRest = fallback_rest
+
+	def to_decimal(self, value: Any, fallback_value: Callable[[], Optional[Decimal]]) -> Decimal:
+		decimal_value = parse_to_decimal(value, fallback_value)
+		if decimal_value is None:
+			raise DataKernelException(f'{self.numericName} [value={value}, type={type(value)}] is not supported.')
+		return decimal_value
+
+	def __call__(self, variables: PipelineVariables, principal_service: PrincipalService) -> Decimal:
+		first_value = self.parameters[0].value(variables, principal_service)
+		result_decimal_value = self.to_decimal(first_value, self.fallbackFirst)
+
+		rest_parameters = self.parameters[1:]
+		for rest_parameter in rest_parameters:
+			rest_value = rest_parameter.value(variables, principal_service)
+			rest_decimal_value = self.to_decimal(rest_value, self.fallbackRest)
+			result_decimal_value = self.reduceFunc(result_decimal_value, rest_decimal_value)
+		return result_decimal_value
+
+
 def create_numeric_reducer(
 		parameters: List[ParsedMemoryParameter], reduce_func: Callable[[Decimal, Decimal], Decimal], numeric_name: str,
 		fallback_first: Callable[[], Optional[Decimal]] = lambda x: None,
 		fallback_rest: Callable[[], Optional[Decimal]] = lambda x: None
 ) -> Callable[[PipelineVariables, PrincipalService], Any]:
-	def reduce(variables: PipelineVariables, principal_service: PrincipalService) -> Decimal:
-		first_value = parameters[0].value(variables, principal_service)
-		first_decimal_value = parse_to_decimal(first_value, fallback_first)
-		if first_decimal_value is None:
-			raise DataKernelException(
-				f'{numeric_name} [value={first_value}, type={type(first_value)}] is not supported.')
-
-		result_decimal_value = first_decimal_value
-
-		rest_parameters = parameters[1:]
-		for rest_parameter in rest_parameters:
-			rest_value = rest_parameter.value(variables, principal_service)
-			rest_decimal_value = parse_to_decimal(rest_value, fallback_rest)
-			if rest_decimal_value is None:
-				raise DataKernelException(
-					f'{numeric_name} [value={rest_value}, type={type(rest_value)}] is not supported.')
-			result_decimal_value = reduce_func(result_decimal_value, rest_decimal_value)
-		return result_decimal_value
-
-	return reduce
+	return NumericReducer(parameters, reduce_func, numeric_name, fallback_first, fallback_rest)
 
 
 def create_datetime_func(
@@ -897,6 +917,10 @@ def parse_prerequisite_in_memory(
 		return always_true
 	condition = ParsedMemoryJoint(joint, principal_service)
 
+	if ask_compile_in_memory_expression():
+		# to avoid loop dependency
+		from .compile_in_memory import compile_condition_in_memory
+		return compile_condition_in_memory(condition)
 	return create_ask_prerequisite(condition)
 
 
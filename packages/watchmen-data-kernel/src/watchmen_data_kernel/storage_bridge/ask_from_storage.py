@@ -8,8 +8,9 @@ from inspect import isfunction
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 from watchmen_auth import PrincipalService
-from watchmen_data_kernel.common import ask_all_date_formats, ask_time_formats, DataKernelException
-from watchmen_data_kernel.meta import TopicService
+from watchmen_data_kernel.common import ask_all_date_formats, ask_compile_in_memory_expression, ask_time_formats, \
+	DataKernelException
+from watchmen_data_kernel.meta import ask_factor_index, TopicService
 from watchmen_data_kernel.topic_schema import cast_value_for_factor, TopicSchema
 from watchmen_data_kernel.utils import MightAVariable, parse_function_in_variable, parse_move_date_pattern, \
 	parse_variable
@@ -25,6 +26,7 @@ from watchmen_storage import ColumnNameLiteral, ComputedLiteral, ComputedLiteral
 from watchmen_utilities import ArrayHelper, date_might_with_prefix, get_current_time_in_seconds, is_blank, is_date, \
 	is_decimal, is_time, move_date, translate_date_format_to_memory
 from .ask_from_memory import assert_parameter_count, create_ask_factor_value, parse_parameter_in_memory
+from .compile_in_memory import compile_parameter_in_memory
 from .topic_utils import ask_topic_data_entity_helper
 from .utils import always_none, compute_date_diff, create_from_previous_trigger_data, \
 	create_get_from_variables_with_prefix, create_snowflake_generator, create_static_str, get_date_from_variables, \
@@ -89,7 +91,7 @@ class ParsedStorageParameter:
 	def find_factor(self, factor_id: Optional[FactorId], topic: Topic) -> Factor:
 		if is_blank(factor_id):
 			raise DataKernelException(f'Factor not declared.')
-		factor: Optional[Factor] = ArrayHelper(topic.factors).find(lambda x: x.factorId == factor_id)
+		factor: Optional[Factor] = ask_factor_index(topic).find_by_id(factor_id)
 		if factor is None:
 			raise DataKernelException(
 				f'Factor[id={factor_id}] in topic[id={topic.topicId}, name={topic.name}] not found.')
@@ -338,7 +340,7 @@ def parse_variable_to_value(
 		if topic is None:
 			raise DataKernelException(f'Topic[{topic_name}] not found in given available topics.')
 
-	factor: Optional[Factor] = ArrayHelper(topic.factors).find(lambda x: x.name == factor_name)
+	factor: Optional[Factor] = ask_factor_index(topic).find_by_name(factor_name)
 	if factor is None:
 		raise DataKernelException(
 			f'Factor[{factor_name}] in topic[id={topic.topicId}, name={topic.name}] not found.')
@@ -1059,7 +1061,7 @@ class ParsedStorageMappingFactor:
 		if is_blank(factor_id):
 			raise DataKernelException('Factor not declared on mapping.')
 		topic = schema.get_topic()
-		factor: Optional[Factor] = ArrayHelper(topic.factors).find(lambda x: x.factorId == factor_id)
+		factor: Optional[Factor] = schema.get_factor_index().find_by_id(factor_id)
 		if factor is None:
 			raise DataKernelException(
 				f'Factor[id={factor_id}] in topic[id={topic.topicId}, name={topic.name}] not found.')
@@ -1068,6 +1070,8 @@ class ParsedStorageMappingFactor:
 			raise DataKernelException('Source of mapping factor not declared.')
 		# parameter in mapping factor always retrieve value from variables
 		self.parsedParameter = parse_parameter_in_memory(mapping_factor.source, principal_service)
+		if ask_compile_in_memory_expression():
+			self.parsedParameter = compile_parameter_in_memory(self.parsedParameter)
 
 	# noinspection PyMethodMayBeStatic
 	def get_aggregate_assist_column(self, data: Dict[str, Any], return_default: bool):
@@ -1120,6 +1124,38 @@ class ParsedStorageMappingFactor:
 			self.compute_previous_value(variables, principal_service), \
 				self.compute_current_value(variables, principal_service)
 
+	def compute_increment(
+			self, variables: PipelineVariables, principal_service: PrincipalService) -> Optional[Decimal]:
+		"""
+		compute increment to original value, the result is same as run with existing original data.
+		returns none when it cannot be computed without original data.
+		"""
+		if self.arithmetic == AggregateArithmetic.SUM:
+			if self.accumulateMode == AccumulateMode.CUMULATE:
+				return Decimal(self.compute_current_value(variables, principal_service))
+			elif variables.has_previous_trigger_data():
+				if self.accumulateMode == AccumulateMode.REVERSE:
+					return -Decimal(self.compute_previous_value(variables, principal_service))
+				else:
+					previous_value, current_value = \
+						self.compute_previous_and_current_value(variables, principal_service)
+					return Decimal(current_value - previous_value)
+			elif self.accumulateMode == AccumulateMode.REVERSE:
+				# exception should be raised, leave it to regular way
+				return None
+			else:
+				return Decimal(self.compute_current_value(variables, principal_service))
+		elif self.arithmetic == AggregateArithmetic.COUNT:
+			if self.accumulateMode == AccumulateMode.CUMULATE:
+				return Decimal(1)
+			elif variables.has_previous_trigger_data() or self.accumulateMode == AccumulateMode.REVERSE:
+				# depends on original value, check or correct it
+				return None
+			else:
+				return Decimal(1)
+		else:
+			return None
+
 	def run(
 			self, data: Dict[str, Any], original_data: Optional[Dict[str, Any]], variables: PipelineVariables,
 			principal_service: PrincipalService
@@ -1275,6 +1311,19 @@ class ParsedStorageMapping:
 		return ArrayHelper(self.parsedMappingFactors).reduce(
 			lambda data, x: self.run_factor(data, x, original_data, variables, principal_service), {})
 
+	def compute_increments(
+			self, variables: PipelineVariables, principal_service: PrincipalService) -> Optional[Dict[str, Decimal]]:
+		"""
+		returns increments by factor name, or none when any of them cannot be computed without original data.
+		"""
+		increments: Dict[str, Decimal] = {}
+		for parsed_factor in self.parsedMappingFactors:
+			increment = parsed_factor.compute_increment(variables, principal_service)
+			if increment is None:
+				return None
+			increments[parsed_factor.factor.name] = increment
+		return increments
+
 	# noinspection PyMethodMayBeStatic
 	def run_factor(
 			self, data: Dict[str, Any], parsed_factor: ParsedStorageMappingFactor,
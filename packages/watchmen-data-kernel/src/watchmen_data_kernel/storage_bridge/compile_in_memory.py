@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional
+
+from watchmen_auth import PrincipalService
+from watchmen_model.common import ParameterExpressionOperator, ParameterJointType
+from watchmen_utilities import ArrayHelper, is_empty, is_not_empty
+from .ask_from_memory import NoopMemoryParameter, NumericReducer, ParsedMemoryComputedParameter, \
+	ParsedMemoryCondition, ParsedMemoryConstantParameter, ParsedMemoryExpression, ParsedMemoryJoint, \
+	ParsedMemoryParameter, ParsedMemoryTopicFactorParameter, PrerequisiteTest
+from .utils import split_variable_segments
+from .variables import PipelineVariables
+
+"""
+compile parsed in-memory conditions and parameters.
+parsed tree is a tree of closures, each evaluation walks all nodes, checks operator and converts constant values again.
+compiling does the following once:
+1. static constant is folded to value, and expression on static constants is folded to true or false,
+2. numeric computation on static constants is folded, static operands of numeric computation are converted to decimal,
+3. topic factor which is not nested is read from current data directly,
+4. operator of expression is resolved, joint and expressions are generated into one python function.
+node which cannot be compiled is called as is, so the semantics is always same as the parsed one.
+"""
+
+
+class CompiledMemoryParameter(ParsedMemoryParameter):
+	# noinspection PyMissingConstructor
+	def __init__(
+			self, parsed: ParsedMemoryParameter,
+			ask_value: Callable[[PipelineVariables, PrincipalService], Any],
+			static: bool = False, static_value: Any = None, current_data_name: Optional[str] = None):
+		"""
+		parsed already, no need to parse again
+		"""
+		self.parameter = parsed.parameter
+		self.parsed = parsed
+		self.askValue = ask_value
+		self.static = static
+		self.staticValue = static_value
+		# name of current data, when value is read from current data directly
+		self.currentDataName = current_data_name
+
+	def parse(self, parameter: Any, principal_service: PrincipalService) -> None:
+		pass
+
+	def value(self, variables: PipelineVariables, principal_service: PrincipalService) -> Any:
+		return self.askValue(variables, principal_service)
+
+
+def create_static_value(value: Any) -> Callable[[PipelineVariables, PrincipalService], Any]:
+	# noinspection PyUnusedLocal
+	def get_static_value(variables: PipelineVariables, principal_service: PrincipalService) -> Any:
+		return value
+
+	return get_static_value
+
+
+def compile_static(parsed: ParsedMemoryParameter, value: Any) -> CompiledMemoryParameter:
+	return CompiledMemoryParameter(parsed, create_static_value(value), True, value)
+
+
+def create_current_data_getter(name: str) -> Callable[[PipelineVariables, PrincipalService], Any]:
+	# noinspection PyUnusedLocal
+	def get_from_current_data(variables: PipelineVariables, principal_service: PrincipalService) -> Any:
+		return variables.find_from_current_data(name)
+
+	return get_from_current_data
+
+
+def create_decimal_getter(
+		compiled: CompiledMemoryParameter, reducer: NumericReducer,
+		fallback_value: Callable[[], Optional[Decimal]]) -> Callable[[PipelineVariables, PrincipalService], Decimal]:
+	if compiled.static:
+		try:
+			return create_static_value(reducer.to_decimal(compiled.staticValue, fallback_value))
+		except Exception:
+			# raise at runtime, as same as parsed
+			pass
+	ask_value = compiled.askValue
+
+	def get_decimal(variables: PipelineVariables, principal_service: PrincipalService) -> Decimal:
+		return reducer.to_decimal(ask_value(variables, principal_service), fallback_value)
+
+	return get_decimal
+
+
+def compile_numeric_reducer(
+		parsed: ParsedMemoryComputedParameter, reducer: NumericReducer) -> CompiledMemoryParameter:
+	parameters = ArrayHelper(reducer.parameters).map(compile_parameter_in_memory).to_list()
+	if ArrayHelper(parameters).every(lambda x: x.static):
+		try:
+			return compile_static(parsed, reducer(None, None))
+		except Exception:
+			# raise at runtime, as same as parsed
+			pass
+	ask_first = create_decimal_getter(parameters[0], reducer, reducer.fallbackFirst)
+	ask_rest = ArrayHelper(parameters[1:]) \
+		.map(lambda x: create_decimal_getter(x, reducer, reducer.fallbackRest)).to_list()
+	reduce_func = reducer.reduceFunc
+
+	def reduce(variables: PipelineVariables, principal_service: PrincipalService) -> Decimal:
+		result_decimal_value = ask_first(variables, principal_service)
+		for ask_decimal in ask_rest:
+			result_decimal_value = reduce_func(result_decimal_value, ask_decimal(variables, principal_service))
+		return result_decimal_value
+
+	return CompiledMemoryParameter(parsed, reduce)
+
+
+def compile_parameter_in_memory(parsed: ParsedMemoryParameter) -> CompiledMemoryParameter:
+	if isinstance(parsed, CompiledMemoryParameter):
+		return parsed
+	elif isinstance(parsed, NoopMemoryParameter):
+		return compile_static(parsed, None)
+	elif isinstance(parsed, ParsedMemoryConstantParameter) and parsed.static:
+		return compile_static(parsed, parsed.value(None, None))
+	elif isinstance(parsed, ParsedMemoryTopicFactorParameter):
+		names = split_variable_segments(parsed.factor.name)
+		if len(names) == 1:
+			return CompiledMemoryParameter(
+				parsed, create_current_data_getter(names[0]), current_data_name=names[0])
+	elif isinstance(parsed, ParsedMemoryComputedParameter) and isinstance(parsed.askValue, NumericReducer):
+		return compile_numeric_reducer(parsed, parsed.askValue)
+	return CompiledMemoryParameter(parsed, parsed.value)
+
+
+class ConditionCompiler:
+	"""
+	generate source of one python function for condition, all referenced objects are bound into namespace
+	"""
+
+	def __init__(self):
+		self.namespace: Dict[str, Any] = {'is_empty': is_empty, 'is_not_empty': is_not_empty}
+		self.count = 0
+
+	def bind(self, value: Any) -> str:
+		name = f'_v{self.count}'
+		self.count = self.count + 1
+		self.namespace[name] = value
+		return name
+
+	def value_source(self, compiled: CompiledMemoryParameter) -> str:
+		if compiled.static:
+			return self.bind(compiled.staticValue)
+		elif compiled.currentDataName is not None:
+			return f'variables.find_from_current_data({self.bind(compiled.currentDataName)})'
+		else:
+			return f'{self.bind(compiled.askValue)}(variables, principal_service)'
+
+	def fallback_source(self, condition: ParsedMemoryCondition) -> str:
+		return f'{self.bind(condition.run)}(variables, principal_service)'
+
+	def expression_source(self, expression: ParsedMemoryExpression) -> str:
+		operator = expression.operator
+		left = compile_parameter_in_memory(expression.left)
+		if operator == ParameterExpressionOperator.EMPTY or operator == ParameterExpressionOperator.NOT_EMPTY:
+			right = None
+			static = left.static
+		else:
+			right = compile_parameter_in_memory(expression.right)
+			static = left.static and right.static
+		if static:
+			try:
+				return 'True' if expression.run(None, None) else 'False'
+			except Exception:
+				# raise at runtime, as same as parsed
+				return self.fallback_source(expression)
+
+		if operator == ParameterExpressionOperator.EMPTY:
+			return f'is_empty({self.value_source(left)})'
+		elif operator == ParameterExpressionOperator.NOT_EMPTY:
+			return f'is_not_empty({self.value_source(left)})'
+		elif operator == ParameterExpressionOperator.EQUALS:
+			compare = expression.equals
+		elif operator == ParameterExpressionOperator.NOT_EQUALS:
+			compare = expression.not_equals
+		elif operator == ParameterExpressionOperator.LESS:
+			compare = expression.less_than
+		elif operator == ParameterExpressionOperator.LESS_EQUALS:
+			compare = expression.less_than_or_equals
+		elif operator == ParameterExpressionOperator.MORE:
+			compare = expression.greater_than
+		elif operator == ParameterExpressionOperator.MORE_EQUALS:
+			compare = expression.greater_than_or_equals
+		elif operator == ParameterExpressionOperator.IN:
+			compare = expression.exists
+		elif operator == ParameterExpressionOperator.NOT_IN:
+			compare = expression.not_exists
+		else:
+			# raise at runtime, as same as parsed
+			return self.fallback_source(expression)
+		return f'{self.bind(compare)}({self.value_source(left)}, {self.value_source(right)})'
+
+	def joint_source(self, joint: ParsedMemoryJoint) -> str:
+		if joint.jointType == ParameterJointType.OR:
+			neutral, absorbing, join_with = 'False', 'True', ' or '
+		else:
+			neutral, absorbing, join_with = 'True', 'False', ' and '
+		sources: List[str] = []
+		for a_filter in joint.filters:
+			source = self.condition_source(a_filter)
+			if source == neutral:
+				# no impact to result
+				continue
+			sources.append(source)
+			if source == absorbing:
+				# following filters never be evaluated
+				break
+		if len(sources) == 0:
+			return neutral
+		elif len(sources) == 1 and (sources[0] == neutral or sources[0] == absorbing):
+			return sources[0]
+		else:
+			return '(' + join_with.join(sources) + ')'
+
+	def condition_source(self, condition: ParsedMemoryCondition) -> str:
+		if isinstance(condition, ParsedMemoryJoint):
+			return self.joint_source(condition)
+		elif isinstance(condition, ParsedMemoryExpression):
+			return self.expression_source(condition)
+		else:
+			return self.fallback_source(condition)
+
+	def compile(self, condition: ParsedMemoryCondition) -> PrerequisiteTest:
+		source = \
+			'def compiled_condition(variables, principal_service):\n' \
+			f'\treturn True if {self.condition_source(condition)} else False\n'
+		exec(compile(source, '<compiled in-memory condition>', 'exec'), self.namespace)
+		return self.namespace['compiled_condition']
+
+
+def compile_condition_in_memory(condition: ParsedMemoryCondition) -> PrerequisiteTest:
+	return ConditionCompiler().compile(condition)
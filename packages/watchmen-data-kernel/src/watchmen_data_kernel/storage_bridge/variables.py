@@ -3,14 +3,15 @@ from __future__ import annotations
 from copy import deepcopy, copy
 from typing import Any, Dict, List, Optional, Tuple
 
-from watchmen_model.admin import Factor, FactorType, Topic
+from watchmen_data_kernel.topic_schema import FactorIndex
+from watchmen_model.admin import Topic
 from watchmen_utilities import ArrayHelper, is_blank
 
 
 class PipelineVariables:
 	def __init__(
 			self, previous_data: Optional[Dict[str, Any]], current_data: Optional[Dict[str, Any]],
-			topic: Optional[Topic]
+			topic: Optional[Topic], factor_index: Optional[FactorIndex] = None
 	):
 		self.previousData = previous_data
 		self.currentData = current_data
@@ -19,30 +20,30 @@ class PipelineVariables:
 		# key is variable key, value is factor name
 		self.variables_from: Dict[str, str] = {}
 		self.topic = topic
+		# build factor index of topic on first use when not given
+		self.factorIndex = factor_index
+
+	def ask_factor_index(self) -> Optional[FactorIndex]:
+		if self.factorIndex is None and self.topic is not None:
+			self.factorIndex = FactorIndex(self.topic)
+		return self.factorIndex
 
 	def is_list_on_trigger(self, names: List[str]) -> bool:
 		if self.topic is None:
 			# no topic declared, false
 			return False
 
-		name = ArrayHelper(names).join('.')
-		factor: Optional[Factor] = ArrayHelper(self.topic.factors).find(lambda x: x.name == name)
-		if factor is None:
-			return False
-		else:
-			return factor.type == FactorType.ARRAY
+		return self.ask_factor_index().is_list_path(names)
 
 	def is_list_on_variables(self, names: List[str]) -> bool:
 		factor_name = self.variables_from.get(names[0])
 		if is_blank(factor_name):
 			return False
+		elif self.topic is None:
+			return False
 		else:
 			factor_name = factor_name + '.' + ArrayHelper(names[1:]).join('.')
-			factor: Optional[Factor] = ArrayHelper(self.topic.factors).find(lambda x: x.name == factor_name)
-			if factor is None:
-				return False
-			else:
-				return factor.type == FactorType.ARRAY
+			return self.ask_factor_index().is_list(factor_name)
 
 	def trace_variable(self, name: str) -> Tuple[bool, Optional[str]]:
 		if name in self.variables_from:
@@ -75,13 +76,13 @@ class PipelineVariables:
 		return self.previousData
 
 	def clone(self) -> PipelineVariables:
-		cloned = PipelineVariables(self.previousData, self.currentData, self.topic)
+		cloned = PipelineVariables(self.previousData, self.currentData, self.topic, self.factorIndex)
 		cloned.variables_from = deepcopy(self.variables_from)
 		cloned.variables = deepcopy(self.variables)
 		return cloned
 
 	def clone_all(self) -> PipelineVariables:
-		cloned = PipelineVariables(deepcopy(self.previousData), deepcopy(self.currentData), self.topic)
+		cloned = PipelineVariables(deepcopy(self.previousData), deepcopy(self.currentData), self.topic, self.factorIndex)
 		cloned.variables_from = deepcopy(self.variables_from)
 		cloned.variables = deepcopy(self.variables)
 		return cloned
@@ -90,13 +91,13 @@ class PipelineVariables:
 		"""
 		not cloned, assume it will not be changed
 		"""
-		backed = PipelineVariables(self.previousData, self.previousData, self.topic)
+		backed = PipelineVariables(self.previousData, self.previousData, self.topic, self.factorIndex)
 		backed.variables_from = copy(self.variables_from)
 		backed.variables = self.variables
 		return backed
 
 	def shallow_clone(self) -> PipelineVariables:
-		cloned = PipelineVariables(self.previousData, self.currentData, self.topic)
+		cloned = PipelineVariables(self.previousData, self.currentData, self.topic, self.factorIndex)
 		cloned.variables_from = copy(self.variables_from)
 		cloned.variables = copy(self.variables)
 		return cloned
@@ -1,2 +1,3 @@
+from .factor_index import FactorIndex
 from .topic_schema import TopicSchema
 from .utils import cast_value_for_factor
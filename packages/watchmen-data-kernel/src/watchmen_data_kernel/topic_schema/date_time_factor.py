@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 from datetime import date, time
-from typing import Any, Dict, List, Optional, Union
+from re import sub
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from watchmen_data_kernel.common import ask_all_date_formats, ask_time_formats
 from watchmen_data_kernel.common.settings import ask_abandon_date_time_on_parse_fail
 from watchmen_model.admin import Factor, FactorType, Topic
-from watchmen_utilities import ArrayHelper, is_blank, is_not_blank, try_to_date, try_to_time
+from watchmen_utilities import ArrayHelper, is_blank, is_not_blank, is_suitable_format, try_to_date, \
+	try_to_format_date, try_to_format_time, try_to_time
 
 """
 design of date/time/datetime translator. same with encryption, see that for more. 
@@ -71,6 +73,94 @@ class DateOrTimeFactorGroup:
 		else:
 			data[self.name] = self.factors[0].translate(value)
 
+	def collect(self, data: Dict[str, Any], cells: List[Tuple[Dict[str, Any], str, DateOrTimeFactor]]) -> None:
+		"""
+		collect cells to translate instead of translating them, walks exactly same as translate
+		"""
+		value = data.get(self.name)
+		if value is None:
+			return
+		if isinstance(value, dict):
+			ArrayHelper(self.groups).each(lambda x: x.collect(value, cells))
+		elif isinstance(value, list):
+			def each(item):
+				ArrayHelper(self.groups).each(lambda x: x.collect(item, cells))
+
+			ArrayHelper(value).each(lambda x: each(x))
+		else:
+			cells.append((data, self.name, self.factors[0]))
+
+
+class DateOrTimeFactorColumn:
+	"""
+	translate values of one factor across rows, result is same as translating them one by one.
+	suitable formats are detected once per digits length, formats are still tried in declared order.
+	string values are parsed only once, translated value is reused by same string value.
+	"""
+
+	def __init__(self, factor: DateOrTimeFactor):
+		self.factor = factor
+		factor_type = factor.factor.type
+		self.isTime = factor_type == FactorType.TIME
+		if factor_type in [FactorType.FULL_DATETIME, FactorType.DATETIME, FactorType.DATE, FactorType.DATE_OF_BIRTH]:
+			self.formats = ask_all_date_formats()
+		elif self.isTime:
+			self.formats = ask_time_formats()
+		else:
+			self.formats = None
+		self.abandonOnParseFail = ask_abandon_date_time_on_parse_fail()
+		self.suitableFormats: Dict[int, List[str]] = {}
+		self.translated: Dict[str, Any] = {}
+
+	def ask_suitable_formats(self, count: int) -> List[str]:
+		formats = self.suitableFormats.get(count)
+		if formats is None:
+			if self.isTime:
+				formats = ArrayHelper(self.formats).filter(lambda x: len(x) == count).to_list()
+			else:
+				formats = ArrayHelper(self.formats).filter(lambda x: is_suitable_format(count, x)).to_list()
+			self.suitableFormats[count] = formats
+		return formats
+
+	def parse(self, value: str) -> Optional[Union[date, time]]:
+		tidy_value = sub(r'[^0-9+]', '', value)
+		for a_format in self.ask_suitable_formats(len(tidy_value)):
+			if self.isTime:
+				parsed, parsed_value = try_to_format_time(tidy_value, a_format)
+			else:
+				parsed, parsed_value = try_to_format_date(tidy_value, a_format)
+			if parsed:
+				return parsed_value
+		return None
+
+	def translate(self, value: Any) -> Optional[Union[date, time, Any]]:
+		if self.formats is None or not isinstance(value, str):
+			return self.factor.translate(value)
+		if value in self.translated:
+			return self.translated[value]
+		parsed_value = self.parse(value)
+		if parsed_value is not None:
+			translated = parsed_value
+		elif self.abandonOnParseFail:
+			translated = None
+		else:
+			translated = value
+		self.translated[value] = translated
+		return translated
+
+
+def translate_date_or_time_batch(groups: List[DateOrTimeFactorGroup], rows: List[Dict[str, Any]]) -> None:
+	cells: List[Tuple[Dict[str, Any], str, DateOrTimeFactor]] = []
+	for row in rows:
+		ArrayHelper(groups).each(lambda x: x.collect(row, cells))
+	columns: Dict[int, DateOrTimeFactorColumn] = {}
+	for data, name, factor in cells:
+		column = columns.get(id(factor))
+		if column is None:
+			column = DateOrTimeFactorColumn(factor)
+			columns[id(factor)] = column
+		data[name] = column.translate(data[name])
+
 
 def is_date_or_time(factor: Factor) -> bool:
 	factor_type = factor.type
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from watchmen_auth import PrincipalService
 from watchmen_data_kernel.encryption import Encryptor, find_encryptor, register_encryptor
@@ -116,6 +116,23 @@ class EncryptFactorGroup:
 		else:
 			data[self.name] = decrypt(value, self.factors[0].get_encrypt_method(), principal_service)
 
+	def collect(self, data: Dict[str, Any], cells: List[Tuple[Dict[str, Any], str, EncryptFactor]]) -> None:
+		"""
+		collect cells to encrypt instead of encrypting them, walks exactly same as encrypt
+		"""
+		value = data.get(self.name)
+		if value is None:
+			return
+		if isinstance(value, dict):
+			ArrayHelper(self.groups).each(lambda x: x.collect(value, cells))
+		elif isinstance(value, list):
+			def each(item):
+				ArrayHelper(self.groups).each(lambda x: x.collect(item, cells))
+
+			ArrayHelper(value).each(lambda x: each(x))
+		else:
+			cells.append((data, self.name, self.factors[0]))
+
 
 def parse_encrypt_factors(topic: Topic) -> List[EncryptFactorGroup]:
 	groups = ArrayHelper(topic.factors) \
@@ -128,6 +145,26 @@ def parse_encrypt_factors(topic: Topic) -> List[EncryptFactorGroup]:
 		.map(lambda x: EncryptFactorGroup(name=x[0], factors=x[1])).to_list()
 
 
+def encrypt_batch(
+		groups: List[EncryptFactorGroup], rows: List[Dict[str, Any]], principal_service: PrincipalService) -> None:
+	"""
+	encrypt values of rows factor by factor, encryptor is asked once for each encrypt method
+	"""
+	cells: List[Tuple[Dict[str, Any], str, EncryptFactor]] = []
+	for row in rows:
+		ArrayHelper(groups).each(lambda x: x.collect(row, cells))
+	encryptors: Dict[Union[FactorEncryptMethod, str], Encryptor] = {}
+	for data, name, factor in cells:
+		method = factor.get_encrypt_method()
+		if method == FactorEncryptMethod.NONE:
+			continue
+		encryptor = encryptors.get(method)
+		if encryptor is None:
+			encryptor = ask_encryptor(method, principal_service)
+			encryptors[method] = encryptor
+		data[name] = encryptor.encrypt(data[name])
+
+
 def encrypt(value: Any, method: FactorEncryptMethod, principal_service: PrincipalService) -> Any:
 	# do encryption
 	# check it is encrypted or not first
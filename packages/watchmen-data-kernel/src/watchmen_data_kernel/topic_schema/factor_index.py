@@ -0,0 +1,43 @@
+from typing import Dict, List, Optional, Set
+
+from watchmen_model.admin import Factor, FactorType, Topic
+from watchmen_model.common import FactorId
+
+
+class FactorIndex:
+	"""
+	index factors of topic by id and by name (dotted path), built once for topic.
+	first one wins when id or name is duplicated, as same as finding in factors one by one.
+	"""
+
+	def __init__(self, topic: Topic):
+		self.topic = topic
+		self.byId: Dict[FactorId, Factor] = {}
+		self.byName: Dict[str, Factor] = {}
+		# names of array factors
+		self.arrayNames: Set[str] = set()
+		for factor in topic.factors or []:
+			if factor.factorId not in self.byId:
+				self.byId[factor.factorId] = factor
+			if factor.name not in self.byName:
+				self.byName[factor.name] = factor
+				if factor.type == FactorType.ARRAY:
+					self.arrayNames.add(factor.name)
+
+	def get_topic(self) -> Topic:
+		return self.topic
+
+	def find_by_id(self, factor_id: Optional[FactorId]) -> Optional[Factor]:
+		return self.byId.get(factor_id)
+
+	def find_by_name(self, name: Optional[str]) -> Optional[Factor]:
+		return self.byName.get(name)
+
+	def find_by_path(self, names: List[str]) -> Optional[Factor]:
+		return self.byName.get('.'.join(names))
+
+	def is_list(self, name: str) -> bool:
+		return name in self.arrayNames
+
+	def is_list_path(self, names: List[str]) -> bool:
+		return '.'.join(names) in self.arrayNames
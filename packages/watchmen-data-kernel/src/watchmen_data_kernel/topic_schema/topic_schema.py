@@ -7,9 +7,10 @@ from watchmen_meta.common import ask_snowflake_generator
 from watchmen_model.admin import is_raw_topic, Topic, TopicKind
 from watchmen_utilities import ArrayHelper
 from .aid_hierarchy import aid
-from .date_time_factor import parse_date_or_time_factors
+from .date_time_factor import parse_date_or_time_factors, translate_date_or_time_batch
 from .default_value_factor import DefaultValueFactorGroup, parse_default_value_factors
-from .encrypt_factor import EncryptFactorGroup, parse_encrypt_factors
+from .encrypt_factor import encrypt_batch, EncryptFactorGroup, parse_encrypt_factors
+from .factor_index import FactorIndex
 from .flatten_factor import FlattenFactor, parse_flatten_factors
 
 
@@ -20,10 +21,14 @@ class TopicSchema:
 		self.dateOrTimeFactors = parse_date_or_time_factors(self.topic)
 		self.encryptFactorGroups = parse_encrypt_factors(self.topic)
 		self.defaultValueFactorGroups = parse_default_value_factors(self.topic)
+		self.factorIndex = FactorIndex(self.topic)
 
 	def get_topic(self) -> Topic:
 		return self.topic
 
+	def get_factor_index(self) -> FactorIndex:
+		return self.factorIndex
+
 	def get_flatten_factors(self) -> List[FlattenFactor]:
 		return self.flattenFactors
 
@@ -104,3 +109,17 @@ class TopicSchema:
 		data = self.aid_hierarchy(data)
 		data = self.flatten(data)
 		return data
+
+	def prepare_batch(self, rows: List[Dict[str, Any]], principal_service: PrincipalService) -> List[Dict[str, Any]]:
+		"""
+		same as prepare data on each row, but date/time parsing and encryption are done column by column.
+		given rows might be changed, and returns exactly the given ones.
+		rows might be prepared partially when exception raised, prepare them again is harmless.
+		"""
+		ArrayHelper(rows).each(lambda x: self.initialize_default_values(x))
+		translate_date_or_time_batch(self.dateOrTimeFactors, rows)
+		if self.should_encrypt():
+			encrypt_batch(self.encryptFactorGroups, rows, principal_service)
+		ArrayHelper(rows).each(lambda x: self.aid_hierarchy(x))
+		ArrayHelper(rows).each(lambda x: self.flatten(x))
+		return rows
@@ -0,0 +1,94 @@
+from copy import deepcopy
+from typing import Any, Dict, List
+from unittest import TestCase
+
+from watchmen_auth import PrincipalService
+from watchmen_data_kernel.storage import RegularTopicDataEntityHelper, RegularTopicDataService
+from watchmen_data_kernel.topic_schema import TopicSchema
+from watchmen_model.admin import Factor, FactorType, Topic, TopicKind, TopicType, User, UserRole
+from watchmen_storage import EntityCriteriaExpression, EntityCriteriaJoint, EntityCriteriaJointConjunction, \
+	EntityCriteriaOperator, EntityDeleter
+
+
+def matches(row: Dict[str, Any], statement) -> bool:
+	if isinstance(statement, EntityCriteriaJoint):
+		results = [matches(row, x) for x in statement.children]
+		return any(results) if statement.conjunction == EntityCriteriaJointConjunction.OR else all(results)
+	assert isinstance(statement, EntityCriteriaExpression)
+	value = row.get(statement.left.columnName)
+	if statement.operator == EntityCriteriaOperator.IN:
+		return value in statement.right
+	return value == statement.right
+
+
+class FakeStorage:
+	"""
+	rows in memory, transaction by snapshot
+	"""
+
+	def __init__(self, rows: List[Dict[str, Any]]):
+		self.rows = rows
+		self.snapshot = None
+		self.statements = 0
+
+	def connect(self) -> None:
+		pass
+
+	def close(self) -> None:
+		pass
+
+	def begin(self) -> None:
+		self.snapshot = deepcopy(self.rows)
+
+	def commit_and_close(self) -> None:
+		self.snapshot = None
+
+	def rollback_and_close(self) -> None:
+		self.rows[:] = self.snapshot
+		self.snapshot = None
+
+	def delete(self, deleter: EntityDeleter) -> int:
+		self.statements = self.statements + 1
+		remained = [row for row in self.rows if not all(matches(row, x) for x in deleter.criteria)]
+		count = len(self.rows) - len(remained)
+		self.rows[:] = remained
+		return count
+
+
+def create_service(rows: List[Dict[str, Any]]) -> RegularTopicDataService:
+	schema = TopicSchema(Topic(
+		topicId='1', name='order_summary', type=TopicType.AGGREGATE, kind=TopicKind.BUSINESS,
+		factors=[Factor(factorId='1', name='amount', type=FactorType.NUMBER)]))
+	principal_service = PrincipalService(User(userId='1', tenantId='1', name='imma-admin', role=UserRole.ADMIN))
+	# noinspection PyTypeChecker
+	return RegularTopicDataService(schema, RegularTopicDataEntityHelper(schema), FakeStorage(rows), principal_service)
+
+
+def create_rows() -> List[Dict[str, Any]]:
+	return [{'id_': index, 'version_': index % 3 + 1, 'amount': index} for index in range(1, 11)]
+
+
+class BulkDeleteTest(TestCase):
+	def test_same_as_one_by_one(self):
+		rows = create_rows()
+		to_delete = [x for x in rows if x['amount'] % 2 == 0]
+
+		one_by_one = create_service(deepcopy(rows))
+		for row in to_delete:
+			count, _ = one_by_one.delete_by_id_and_version(row)
+			self.assertEqual(1, count)
+
+		bulk = create_service(deepcopy(rows))
+		self.assertEqual(len(to_delete), bulk.delete_all_by_id_and_version(deepcopy(to_delete), 2))
+		self.assertEqual(one_by_one.get_storage().rows, bulk.get_storage().rows)
+		self.assertEqual(3, bulk.get_storage().statements)
+
+	def test_rollback_on_changed_row(self):
+		rows = create_rows()
+		service = create_service(deepcopy(rows))
+		to_delete = deepcopy(rows[:4])
+		# changed by others, version mismatched
+		to_delete[3]['version_'] = 99
+		with self.assertRaises(Exception):
+			service.delete_all_by_id_and_version(to_delete, 2)
+		self.assertEqual(rows, service.get_storage().rows)
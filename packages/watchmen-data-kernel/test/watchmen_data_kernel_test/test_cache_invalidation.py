@@ -0,0 +1,63 @@
+from typing import List
+from unittest import TestCase
+
+from watchmen_data_kernel.cache import apply_cache_invalidation, CacheService, PipelineCacheListener
+from watchmen_data_kernel.cache.invalidation_bus import PubSubCacheInvalidationBus
+from watchmen_model.admin import Pipeline, PipelineTriggerType
+from watchmen_model.system import CacheInvalidation, CacheInvalidationKind
+
+
+class RecordListener(PipelineCacheListener):
+	def __init__(self):
+		self.removed: List[str] = []
+
+	def on_pipeline_added(self, pipeline: Pipeline) -> None:
+		pass
+
+	def on_pipeline_removed(self, pipeline: Pipeline) -> None:
+		self.removed.append(pipeline.pipelineId)
+
+	def on_cache_cleared(self) -> None:
+		pass
+
+
+class FakeBus(PubSubCacheInvalidationBus):
+	def __init__(self):
+		super().__init__('fake', 60)
+		self.sent: List[bytes] = []
+
+	def send_message(self, message: bytes) -> None:
+		self.sent.append(message)
+
+	def listen(self) -> None:
+		pass
+
+
+def create_pipeline(pipeline_id: str) -> Pipeline:
+	return Pipeline(pipelineId=pipeline_id, topicId='1', type=PipelineTriggerType.INSERT, enabled=True)
+
+
+class CacheInvalidationTest(TestCase):
+	def setUp(self):
+		self.listener = RecordListener()
+		CacheService.pipeline().add_cache_listener(self.listener)
+
+	def tearDown(self):
+		CacheService.pipeline().remove_cache_listener(self.listener)
+		CacheService.pipeline().clear()
+
+	def test_apply(self):
+		CacheService.pipeline().put(create_pipeline('1'))
+		apply_cache_invalidation(CacheInvalidation(kind=CacheInvalidationKind.PIPELINE, resourceId='1'))
+		self.assertIsNone(CacheService.pipeline().get('1'))
+		self.assertEqual(['1'], self.listener.removed)
+
+	def test_ignore_own(self):
+		publisher, receiver = FakeBus(), FakeBus()
+		publisher.send(CacheInvalidation(
+			kind=CacheInvalidationKind.PIPELINE, resourceId='2', origin=publisher.origin), None)
+		CacheService.pipeline().put(create_pipeline('2'))
+		publisher.receive_message(publisher.sent[0])
+		self.assertIsNotNone(CacheService.pipeline().get('2'))
+		receiver.receive_message(publisher.sent[0])
+		self.assertIsNone(CacheService.pipeline().get('2'))
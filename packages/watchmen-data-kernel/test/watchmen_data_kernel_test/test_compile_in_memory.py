@@ -0,0 +1,91 @@
+from typing import Any, Dict, List
+from unittest import TestCase
+
+from watchmen_auth import PrincipalService
+from watchmen_data_kernel.storage_bridge import PipelineVariables
+from watchmen_data_kernel.storage_bridge.ask_from_memory import ParsedMemoryJoint, parse_parameter_in_memory
+from watchmen_data_kernel.storage_bridge.compile_in_memory import compile_condition_in_memory, \
+	compile_parameter_in_memory
+from watchmen_model.admin import User, UserRole
+from watchmen_model.common import ComputedParameter, ConstantParameter, ParameterComputeType, ParameterExpression, \
+	ParameterExpressionOperator, ParameterJoint, ParameterJointType
+
+
+def create_fake_principal_service() -> PrincipalService:
+	return PrincipalService(User(userId='1', tenantId='1', name='imma-admin', role=UserRole.ADMIN))
+
+
+def constant(value: str) -> ConstantParameter:
+	return ConstantParameter(value=value)
+
+
+def add(*values: str) -> ComputedParameter:
+	return ComputedParameter(type=ParameterComputeType.ADD, parameters=[constant(x) for x in values])
+
+
+def expression(left, operator: ParameterExpressionOperator, right=None) -> ParameterExpression:
+	return ParameterExpression(left=left, operator=operator, right=right)
+
+
+def create_variables(data: Dict[str, Any]) -> PipelineVariables:
+	return PipelineVariables(None, data, None)
+
+
+def run_both(joint: ParameterJoint, data_list: List[Dict[str, Any]]) -> List[Any]:
+	principal_service = create_fake_principal_service()
+	parsed = ParsedMemoryJoint(joint, principal_service)
+	compiled = compile_condition_in_memory(parsed)
+
+	def run(func) -> Any:
+		try:
+			return func()
+		except Exception as e:
+			return type(e)
+
+	results = []
+	for data in data_list:
+		results.append((
+			run(lambda: parsed.run(create_variables(data), principal_service)),
+			run(lambda: compiled(create_variables(data), principal_service))))
+	return results
+
+
+class CompileInMemoryTest(TestCase):
+	def test_same_as_parsed(self):
+		joint = ParameterJoint(jointType=ParameterJointType.AND, filters=[
+			expression(constant('{amount}'), ParameterExpressionOperator.MORE, add('1', '2')),
+			ParameterJoint(jointType=ParameterJointType.OR, filters=[
+				expression(constant('{name}'), ParameterExpressionOperator.EQUALS, constant('a')),
+				expression(constant('{name}'), ParameterExpressionOperator.IN, constant('b,c')),
+				expression(constant('{code}'), ParameterExpressionOperator.EMPTY)
+			]),
+			expression(add('{amount}', '10'), ParameterExpressionOperator.LESS_EQUALS, constant('100'))
+		])
+		data_list = [
+			{'amount': 5, 'name': 'a'}, {'amount': 5, 'name': 'c', 'code': 'x'}, {'amount': 5, 'name': 'd', 'code': 'x'},
+			{'amount': 2, 'name': 'a'}, {'amount': 95, 'name': 'b'}, {'amount': 'x', 'name': 'a'}, {}
+		]
+		results = run_both(joint, data_list)
+		for parsed_result, compiled_result in results:
+			self.assertEqual(parsed_result, compiled_result)
+		self.assertEqual([True, True, False, False, False], [x[1] for x in results[:5]])
+
+	def test_fold_static(self):
+		joint = ParameterJoint(jointType=ParameterJointType.OR, filters=[
+			expression(add('1', '2'), ParameterExpressionOperator.EQUALS, constant('4')),
+			expression(constant('{name}'), ParameterExpressionOperator.NOT_EMPTY),
+			expression(constant('3'), ParameterExpressionOperator.MORE, add('1', '1')),
+			expression(constant('{code}'), ParameterExpressionOperator.NOT_EMPTY)
+		])
+		for parsed_result, compiled_result in run_both(joint, [{'name': 'a'}, {'code': 'b'}, {}]):
+			self.assertEqual(parsed_result, compiled_result)
+		self.assertTrue(compile_parameter_in_memory(
+			parse_parameter_in_memory(add('1', '2'), create_fake_principal_service())).static)
+
+	def test_errors_raised_at_runtime(self):
+		joint = ParameterJoint(jointType=ParameterJointType.AND, filters=[
+			expression(constant('{amount}'), ParameterExpressionOperator.MORE, constant('0')),
+			expression(constant('a'), ParameterExpressionOperator.LESS, constant('b'))
+		])
+		for parsed_result, compiled_result in run_both(joint, [{'amount': 1}, {'amount': 0}]):
+			self.assertEqual(parsed_result, compiled_result)
@@ -0,0 +1,35 @@
+from unittest import TestCase
+
+from watchmen_data_kernel.storage_bridge import PipelineVariables
+from watchmen_data_kernel.topic_schema import TopicSchema
+from watchmen_model.admin import Factor, FactorType, Topic
+
+
+def create_topic() -> Topic:
+	return Topic(topicId='1', name='order', factors=[
+		Factor(factorId='1', name='items', type=FactorType.ARRAY),
+		Factor(factorId='2', name='items.code', type=FactorType.TEXT),
+		Factor(factorId='3', name='items.parts', type=FactorType.ARRAY),
+		Factor(factorId='4', name='items', type=FactorType.TEXT)
+	])
+
+
+class FactorIndexTest(TestCase):
+	def test_find(self):
+		index = TopicSchema(create_topic()).get_factor_index()
+		self.assertEqual('2', index.find_by_name('items.code').factorId)
+		self.assertEqual('3', index.find_by_path(['items', 'parts']).factorId)
+		self.assertEqual('items.code', index.find_by_id('2').name)
+		# first one wins
+		self.assertEqual('1', index.find_by_name('items').factorId)
+		self.assertIsNone(index.find_by_id('5'))
+
+	def test_is_list(self):
+		variables = PipelineVariables(None, {}, create_topic())
+		self.assertTrue(variables.is_list_on_trigger(['items']))
+		self.assertTrue(variables.is_list_on_trigger(['items', 'parts']))
+		self.assertFalse(variables.is_list_on_trigger(['items', 'code']))
+		variables.put_with_from('x', [], 'items')
+		self.assertTrue(variables.is_list_on_variables(['x', 'parts']))
+		self.assertFalse(variables.is_list_on_variables(['x', 'code']))
+		self.assertFalse(PipelineVariables(None, {}, None).is_list_on_trigger(['items']))
@@ -0,0 +1,105 @@
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+from unittest import TestCase
+
+from watchmen_auth import PrincipalService
+from watchmen_data_kernel.common import DataKernelException
+from watchmen_data_kernel.storage import RegularTopicDataEntityHelper, RegularTopicDataService
+from watchmen_data_kernel.storage_bridge import PipelineVariables
+from watchmen_data_kernel.storage_bridge.ask_from_storage import ParsedStorageMappingFactor
+from watchmen_data_kernel.topic_schema import TopicSchema
+from watchmen_model.admin import AccumulateMode, AggregateArithmetic, Factor, FactorType, MappingFactor, Topic, \
+	TopicKind, TopicType, User, UserRole
+from watchmen_model.common import ConstantParameter
+from watchmen_storage import EntityFinder, EntityIncrementer
+
+
+def create_fake_principal_service() -> PrincipalService:
+	return PrincipalService(User(userId='1', tenantId='1', name='imma-admin', role=UserRole.ADMIN))
+
+
+def create_schema() -> TopicSchema:
+	return TopicSchema(Topic(
+		topicId='1', name='order_summary', type=TopicType.AGGREGATE, kind=TopicKind.BUSINESS,
+		factors=[Factor(factorId='1', name='amount', type=FactorType.NUMBER)]))
+
+
+class FakeStorage:
+	def __init__(self, row: Dict[str, Any], pulled: Optional[Dict[str, Any]] = None):
+		self.row = row
+		# values pulled after increment, e.g. float of float columns or number of oracle
+		self.pulled = pulled or {}
+		self.incrementers: List[EntityIncrementer] = []
+		self.committed = False
+		self.rolledBack = False
+
+	def begin(self) -> None:
+		pass
+
+	def commit_and_close(self) -> None:
+		self.committed = True
+
+	def rollback_and_close(self) -> None:
+		self.rolledBack = True
+
+	def increment(self, incrementer: EntityIncrementer) -> int:
+		self.incrementers.append(incrementer)
+		for column_name, increment in incrementer.increments.items():
+			self.row[column_name] = (self.row.get(column_name) or 0) + increment
+		self.row.update(incrementer.update)
+		return 1
+
+	def find(self, finder: EntityFinder) -> List[Dict[str, Any]]:
+		return [finder.shaper.deserialize({**self.row, **self.pulled})]
+
+
+class IncrementTest(TestCase):
+	def test_same_as_run(self):
+		principal_service = create_fake_principal_service()
+		schema = create_schema()
+		original_data = {'amount': Decimal('100')}
+		for arithmetic in [AggregateArithmetic.SUM, AggregateArithmetic.COUNT]:
+			for accumulate_mode in [AccumulateMode.STANDARD, AccumulateMode.CUMULATE, AccumulateMode.REVERSE]:
+				for previous in [None, {'value': '3'}]:
+					parsed = ParsedStorageMappingFactor(
+						schema, MappingFactor(factorId='1', arithmetic=arithmetic, source=ConstantParameter(value='{value}')),
+						accumulate_mode, principal_service)
+					variables = PipelineVariables(previous, {'value': '7'}, None)
+					increment: Optional[Decimal] = parsed.compute_increment(variables, principal_service)
+					if increment is None:
+						continue
+					_, value = parsed.run({}, original_data, variables, principal_service)
+					self.assertEqual(value, original_data['amount'] + increment, f'{arithmetic}, {accumulate_mode}, {previous}')
+
+	def test_increment_and_pull(self):
+		schema = create_schema()
+		storage = FakeStorage({'id_': 1, 'version_': 2, 'amount': Decimal('10')})
+		# noinspection PyTypeChecker
+		service = RegularTopicDataService(
+			schema, RegularTopicDataEntityHelper(schema), storage, create_fake_principal_service())
+		count, data = service.increment_and_pull([], {'amount': Decimal('5')})
+		self.assertEqual(1, count)
+		self.assertTrue(storage.committed)
+		self.assertEqual({'amount': Decimal('5'), 'version_': Decimal('1')}, storage.incrementers[0].increments)
+		self.assertEqual((Decimal('15'), 3), (data['amount'], data['version_']))
+
+	def test_pulled_value_to_decimal(self):
+		schema = create_schema()
+		storage = FakeStorage({'id_': 1, 'version_': 2, 'amount': Decimal('10')}, {'amount': 15.1})
+		# noinspection PyTypeChecker
+		service = RegularTopicDataService(
+			schema, RegularTopicDataEntityHelper(schema), storage, create_fake_principal_service())
+		_, data = service.increment_and_pull([], {'amount': Decimal('5.1')})
+		self.assertEqual(Decimal('15.1'), data['amount'])
+		self.assertTrue(storage.committed)
+
+	def test_rollback_when_pulled_value_not_decimal(self):
+		schema = create_schema()
+		storage = FakeStorage({'id_': 1, 'version_': 2, 'amount': Decimal('10')}, {'amount': 'x'})
+		# noinspection PyTypeChecker
+		service = RegularTopicDataService(
+			schema, RegularTopicDataEntityHelper(schema), storage, create_fake_principal_service())
+		with self.assertRaises(DataKernelException):
+			service.increment_and_pull([], {'amount': Decimal('5')})
+		self.assertFalse(storage.committed)
+		self.assertTrue(storage.rolledBack)
@@ -0,0 +1,42 @@
+from copy import deepcopy
+from datetime import date, datetime
+from unittest import TestCase
+
+from watchmen_auth import PrincipalService
+from watchmen_data_kernel.topic_schema import TopicSchema
+from watchmen_model.admin import Factor, FactorEncryptMethod, FactorType, Topic, User, UserRole
+
+
+def create_fake_principal_service() -> PrincipalService:
+	return PrincipalService(User(userId='1', tenantId='1', name='imma-admin', role=UserRole.ADMIN))
+
+
+def create_topic_schema() -> TopicSchema:
+	return TopicSchema(Topic(topicId='1', name='order', factors=[
+		Factor(factorId='1', name='orderDate', type=FactorType.DATE),
+		Factor(factorId='2', name='createdAt', type=FactorType.DATETIME),
+		Factor(factorId='3', name='email', type=FactorType.EMAIL, encrypt=FactorEncryptMethod.MD5),
+		Factor(factorId='4', name='items', type=FactorType.ARRAY),
+		Factor(factorId='5', name='items.shipDate', type=FactorType.DATE),
+		Factor(factorId='6', name='items.shipTime', type=FactorType.TIME),
+		Factor(factorId='7', name='status', type=FactorType.TEXT, defaultValue='new')
+	]))
+
+
+class PrepareBatchTest(TestCase):
+	def test_same_as_prepare_data(self):
+		rows = [
+			{
+				'orderDate': '2024-03-21', 'createdAt': '2024/03/21 18:30:00', 'email': 'a@b.com',
+				'items': [{'shipDate': '21-03-2024', 'shipTime': '18:30'}, {'shipDate': None, 'shipTime': 'x'}]
+			},
+			{'orderDate': '2024-03-21', 'createdAt': datetime(2024, 3, 21), 'email': '', 'status': 'paid'},
+			{'orderDate': '03212024', 'createdAt': 'not a date', 'email': None, 'items': []},
+			{'orderDate': date(2024, 3, 22), 'createdAt': 20240321}
+		]
+		expected = [create_topic_schema().prepare_data(x, create_fake_principal_service()) for x in deepcopy(rows)]
+		prepared = create_topic_schema().prepare_batch(rows, create_fake_principal_service())
+		self.assertEqual(expected, prepared)
+		self.assertEqual(datetime(2024, 3, 21), prepared[0]['orderDate'])
+		self.assertEqual(datetime(2024, 3, 21), prepared[2]['orderDate'])
+		self.assertEqual('new', prepared[0]['status'])
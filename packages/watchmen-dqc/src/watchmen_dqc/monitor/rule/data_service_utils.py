@@ -13,7 +13,7 @@ from watchmen_model.dqc import MonitorRule
 from watchmen_model.pipeline_kernel import TopicDataColumnNames
 from watchmen_storage import ColumnNameLiteral, EntityCriteria, EntityCriteriaExpression, EntityCriteriaJoint, \
 	EntityCriteriaJointConjunction, EntityCriteriaOperator
-from watchmen_utilities import ArrayHelper, is_blank
+from watchmen_utilities import is_blank
 
 logger = getLogger(__name__)
 
@@ -43,8 +43,7 @@ def find_factor(
 	if is_blank(factor_id):
 		logger.error(f'Factor id not declared on rule[{rule.dict()}].')
 		return False, None
-	topic = data_service.get_topic()
-	factor = ArrayHelper(topic.factors).find(lambda x: x.factorId == factor_id)
+	factor = data_service.get_schema().get_factor_index().find_by_id(factor_id)
 	if factor is None:
 		logger.error(f'Factor[id={factor_id}] on rule[{rule.dict()}] not found.')
 		return False, None
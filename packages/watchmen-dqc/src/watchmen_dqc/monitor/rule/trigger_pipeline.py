@@ -4,7 +4,7 @@ from logging import getLogger
 from typing import Optional
 
 from watchmen_auth import PrincipalService
-from watchmen_data_kernel.meta import TopicService
+from watchmen_data_kernel.meta import ask_factor_index, TopicService
 from watchmen_data_kernel.topic_schema import TopicSchema
 from watchmen_dqc.common import ask_monitor_result_pipeline_async, DqcException
 from watchmen_meta.common import ask_snowflake_generator
@@ -12,7 +12,7 @@ from watchmen_model.admin import PipelineTriggerType
 from watchmen_model.dqc import MonitorRule, MonitorRuleDetected
 from watchmen_model.pipeline_kernel import PipelineMonitorLog, PipelineTriggerTraceId
 from watchmen_pipeline_kernel.pipeline import PipelineTrigger
-from watchmen_utilities import ArrayHelper, is_not_blank
+from watchmen_utilities import is_not_blank
 from .types import RuleResult
 
 logger = getLogger(__name__)
@@ -62,7 +62,7 @@ def trigger(
 	factor_id = rule.factorId
 	factor_name: Optional[str] = None
 	if is_not_blank(factor_id):
-		factor = ArrayHelper(topic.factors).find(lambda x: x.factorId == factor_id)
+		factor = ask_factor_index(topic).find_by_id(factor_id)
 		if factor is not None:
 			factor_name = factor.name
 	detected = MonitorRuleDetected(
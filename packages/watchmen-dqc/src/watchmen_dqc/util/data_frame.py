@@ -1,10 +1,10 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from pandas import DataFrame
 
+from watchmen_data_kernel.meta import ask_factor_index
 from watchmen_model.admin import Factor, FactorType, Topic
 from watchmen_model.pipeline_kernel import TopicDataColumnNames
-from watchmen_utilities import ArrayHelper
 
 
 def build_data_frame(rows: List[List[Any]], columns: List[str]) -> DataFrame:
@@ -44,10 +44,10 @@ def convert_data_frame_type_by_types(data_frame: DataFrame, types: Dict[str, Fac
 
 def convert_data_frame_type_by_topic(data_frame: DataFrame, topic: Topic) -> DataFrame:
 	type_dict = {}
-	factor_map: Dict[str, Factor] = ArrayHelper(topic.factors).to_map(lambda x: x.name, lambda x: x)
+	factor_index = ask_factor_index(topic)
 	for column in data_frame.columns:
-		if column in factor_map:
-			factor = factor_map.get(column)
+		factor: Optional[Factor] = factor_index.find_by_name(column)
+		if factor is not None:
 			type_dict[column] = convert_to_pandas_type(factor.type)
 		elif column == TopicDataColumnNames.ID.value:
 			type_dict[column] = convert_to_pandas_type(FactorType.SEQUENCE)
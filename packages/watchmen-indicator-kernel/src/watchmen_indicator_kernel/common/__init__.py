@@ -1,2 +1,2 @@
 from .exception import IndicatorKernelException
-from .settings import ask_plugin_host
+from .settings import ask_objective_factor_query_fusion, ask_objective_factor_query_parallelism, ask_plugin_host
@@ -8,6 +8,8 @@ logger = getLogger(__name__)
 
 class IndicatorKernelSettings(ExtendedBaseSettings):
 	PLUGIN_HOST: Optional[str] = None
+	OBJECTIVE_FACTOR_QUERY_FUSION: bool = True  # fuse factors on same topic into one query
+	OBJECTIVE_FACTOR_QUERY_PARALLELISM: int = 4  # max concurrent queries when asking objective factor values
 
 
 settings = IndicatorKernelSettings()
@@ -16,3 +18,11 @@ settings = IndicatorKernelSettings()
 
 def ask_plugin_host() -> str:
 	return settings.PLUGIN_HOST
+
+
+def ask_objective_factor_query_fusion() -> bool:
+	return settings.OBJECTIVE_FACTOR_QUERY_FUSION
+
+
+def ask_objective_factor_query_parallelism() -> int:
+	return settings.OBJECTIVE_FACTOR_QUERY_PARALLELISM
@@ -17,6 +17,7 @@ from watchmen_utilities import ArrayHelper, get_day_of_month, get_day_of_week, g
 	get_week_of_month, get_week_of_year, get_year, is_blank, is_date, is_decimal, is_not_blank, ExtendedBaseModel
 from ..objective_factor import get_objective_factor_data_service
 from ..utils import as_time_frame, compute_chain_frame, compute_previous_frame, compute_time_frame, TimeFrame
+from .factor_value_planner import ask_factor_values, AskedFactorValues, FactorValueAsk
 
 logger = getLogger(__name__)
 
@@ -84,6 +85,8 @@ class ObjectiveDataService:
 			.to_list()
 		for var in single_value_variables:
 			self.variablesOnValueMap[var.name.strip()] = var.value
+		# values of indicator factors asked in advance
+		self.askedFactorValues: AskedFactorValues = {}
 
 	def get_principal_service(self) -> PrincipalService:
 		return self.principalService
@@ -118,16 +121,91 @@ class ObjectiveDataService:
 			self, factor: ObjectiveFactorOnIndicator, values: TempObjectiveFactorValues,
 			get_time_frame: Callable[[], Optional[TimeFrame]],
 			set_to: Callable[[TempObjectiveFactorValues, Optional[Decimal]], None]):
+		time_frame = get_time_frame()
+		asked = self.askedFactorValues.get((factor.uuid, time_frame))
+		if asked is not None:
+			succeed, value = asked
+			if succeed:
+				set_to(values, value)
+			else:
+				values.failed = True
+			return
 		# noinspection PyBroadException
 		try:
 			objective_factor_data_service = get_objective_factor_data_service(
 				self.get_objective(), factor, self.get_principal_service())
-			value = objective_factor_data_service.ask_value(get_time_frame())
+			value = objective_factor_data_service.ask_value(time_frame)
 			set_to(values, value)
 		except Exception as e:
 			logger.error(e, exc_info=True, stack_info=True)
 			values.failed = True
 
+	def gather_factor_ids_of_target(
+			self, target: ObjectiveTarget, sorted_factor_map: Dict[ObjectiveFactorId, SortableObjectiveFactor]
+	) -> List[ObjectiveFactorId]:
+		"""
+		returns ids of factors which are referred by target, and all dependencies of them
+		"""
+		factor_ids: List[ObjectiveFactorId] = []
+
+		def gather(parameter: Optional[ObjectiveParameter]) -> None:
+			if isinstance(parameter, ReferObjectiveParameter):
+				factor_ids.append(parameter.uuid)
+			elif isinstance(parameter, ComputedObjectiveParameter):
+				ArrayHelper(parameter.parameters).each(gather)
+
+		if isinstance(target.asis, ComputedObjectiveParameter):
+			gather(target.asis)
+		elif is_not_blank(target.asis):
+			factor_ids.append(target.asis)
+
+		all_factor_ids: List[ObjectiveFactorId] = []
+		for factor_id in factor_ids:
+			all_factor_ids.append(factor_id)
+			sorted_factor = sorted_factor_map.get(factor_id)
+			if sorted_factor is not None:
+				all_factor_ids.extend(sorted_factor.allDepends)
+		return all_factor_ids
+
+	def ask_indicator_factor_values_in_advance(
+			self, sorted_factors: List[SortableObjectiveFactor], targets: Optional[List[ObjectiveTarget]]) -> None:
+		"""
+		ask values of indicator factors on all necessary time frames together,
+		so the queries can be fused and run concurrently, instead of one by one on computing.
+		values on previous/chain time frame are asked only when they are required by targets.
+		"""
+		sorted_factor_map: Dict[ObjectiveFactorId, SortableObjectiveFactor] = ArrayHelper(sorted_factors) \
+			.to_map(lambda x: x.factor.uuid, lambda x: x)
+		previous_factor_ids: List[ObjectiveFactorId] = []
+		chain_factor_ids: List[ObjectiveFactorId] = []
+		for target in ArrayHelper(targets).filter(lambda x: x.asis is not None).to_list():
+			if target.askPreviousCycle:
+				previous_factor_ids.extend(self.gather_factor_ids_of_target(target, sorted_factor_map))
+			if target.askChainCycle:
+				chain_factor_ids.extend(self.gather_factor_ids_of_target(target, sorted_factor_map))
+
+		asks: Dict[Tuple[ObjectiveFactorId, Optional[TimeFrame]], FactorValueAsk] = {}
+		for sorted_factor in sorted_factors:
+			factor = sorted_factor.factor
+			if not isinstance(factor, ObjectiveFactorOnIndicator):
+				continue
+			# noinspection PyBroadException
+			try:
+				objective_factor_data_service = get_objective_factor_data_service(
+					self.get_objective(), factor, self.get_principal_service())
+			except Exception:
+				# leave it to be asked on computing, failure is handled there
+				continue
+			time_frames = [self.get_current_time_frame()]
+			if factor.uuid in previous_factor_ids:
+				time_frames.append(self.get_previous_time_frame())
+			if factor.uuid in chain_factor_ids:
+				time_frames.append(self.get_chain_time_frame())
+			for time_frame in time_frames:
+				ask = FactorValueAsk(factor, objective_factor_data_service, time_frame)
+				asks[ask.get_key()] = ask
+		self.askedFactorValues.update(ask_factor_values(list(asks.values())))
+
 	def gather_direct_dependencies(
 			self,
 			sorted_factor: SortableObjectiveFactor, formula: Optional[ComputedObjectiveParameter]
@@ -639,12 +717,13 @@ class ObjectiveDataService:
 			.filter(lambda x: x.uuid not in valid_factor_ids) \
 			.each(fail_factor)
 
-		# compute factor values on current time frame
+		# ask indicator factor values, and compute factor values on current time frame
+		targets = self.get_objective().targets
+		self.ask_indicator_factor_values_in_advance(sorted_factors, targets)
 		ArrayHelper(sorted_factors) \
 			.each(lambda x: self.compute_factor_value_on_current_time_frame(x.factor, factor_values))
 
 		# compute target values
-		targets = self.get_objective().targets
 		target_values = ArrayHelper(targets).map(lambda x: self.compute_target_value(x, factor_values)).to_list()
 
 		def formalize_factor_values(values: TempObjectiveFactorValues) -> ObjectiveFactorValues:
@@ -675,7 +754,8 @@ class ObjectiveDataService:
 			.filter(lambda x: x.uuid not in valid_factor_ids) \
 			.each(fail_factor)
 
-		# compute factor values on current time frame
+		# ask indicator factor values, and compute factor values on current time frame
+		self.ask_indicator_factor_values_in_advance(sorted_factors, [target])
 		ArrayHelper(sorted_factors) \
 			.each(lambda x: self.compute_factor_value_on_current_time_frame(x.factor, factor_values))
 
@@ -0,0 +1,96 @@
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from logging import getLogger
+from typing import Callable, Dict, List, Optional, Tuple
+
+from watchmen_indicator_kernel.common import ask_objective_factor_query_fusion, ask_objective_factor_query_parallelism
+from watchmen_model.common import ObjectiveFactorId, TopicId
+from watchmen_model.indicator import ObjectiveFactorOnIndicator
+from watchmen_utilities import ArrayHelper
+from ..objective_factor import ask_fused_values, ObjectiveFactorDataService, TopicBaseObjectiveFactorDataService
+from ..utils import TimeFrame
+
+logger = getLogger(__name__)
+
+# identify value of factor on time frame, time frames are created once by objective data service
+FactorValueKey = Tuple[ObjectiveFactorId, Optional[TimeFrame]]
+# asked or not, and the value
+AskedFactorValue = Tuple[bool, Optional[Decimal]]
+AskedFactorValues = Dict[FactorValueKey, AskedFactorValue]
+
+
+class FactorValueAsk:
+	def __init__(
+			self, factor: ObjectiveFactorOnIndicator, data_service: ObjectiveFactorDataService,
+			time_frame: Optional[TimeFrame]):
+		self.factor = factor
+		self.dataService = data_service
+		self.timeFrame = time_frame
+
+	def get_key(self) -> FactorValueKey:
+		return self.factor.uuid, self.timeFrame
+
+
+def ask_one(ask: FactorValueAsk) -> AskedFactorValues:
+	# noinspection PyBroadException
+	try:
+		return {ask.get_key(): (True, ask.dataService.ask_value(ask.timeFrame))}
+	except Exception as e:
+		logger.error(e, exc_info=True, stack_info=True)
+		return {ask.get_key(): (False, None)}
+
+
+def ask_one_by_one(asks: List[FactorValueAsk]) -> AskedFactorValues:
+	values: AskedFactorValues = {}
+	ArrayHelper(asks).each(lambda x: values.update(ask_one(x)))
+	return values
+
+
+def ask_fused(asks: List[FactorValueAsk]) -> AskedFactorValues:
+	# noinspection PyBroadException
+	try:
+		# noinspection PyTypeChecker
+		values = ask_fused_values(ArrayHelper(asks).map(lambda x: (x.dataService, x.timeFrame)).to_list())
+		return ArrayHelper(asks).map_with_index(lambda x, index: (x.get_key(), (True, values[index]))).to_map(
+			lambda x: x[0], lambda x: x[1])
+	except Exception as e:
+		# fused query is an optimization only, ask factors one by one to get the same values as not fused
+		logger.warning(f'Failed to ask fused values of {len(asks)} objective factors, ask one by one.', exc_info=e)
+		return ask_one_by_one(asks)
+
+
+def plan_factor_value_asks(asks: List[FactorValueAsk]) -> List[Callable[[], AskedFactorValues]]:
+	"""
+	factors based on same topic are fused into one query when fusion is enabled,
+	returns independent tasks, each of them asks values of one or more factors.
+	"""
+	tasks: List[Callable[[], AskedFactorValues]] = []
+	fusible_groups: Dict[TopicId, List[FactorValueAsk]] = {}
+	fusion = ask_objective_factor_query_fusion()
+	for ask in asks:
+		data_service = ask.dataService
+		if fusion and isinstance(data_service, TopicBaseObjectiveFactorDataService) and data_service.can_fuse():
+			fusible_groups.setdefault(data_service.get_topic().topicId, []).append(ask)
+		else:
+			tasks.append(lambda a=ask: ask_one(a))
+	for group in fusible_groups.values():
+		if len(group) == 1:
+			tasks.append(lambda a=group[0]: ask_one(a))
+		else:
+			tasks.append(lambda g=group: ask_fused(g))
+	return tasks
+
+
+def ask_factor_values(asks: List[FactorValueAsk]) -> AskedFactorValues:
+	"""
+	independent tasks run concurrently on a bounded executor
+	"""
+	tasks = plan_factor_value_asks(asks)
+	parallelism = min(ask_objective_factor_query_parallelism(), len(tasks))
+	values: AskedFactorValues = {}
+	if parallelism <= 1:
+		ArrayHelper(tasks).each(lambda x: values.update(x()))
+	else:
+		with ThreadPoolExecutor(max_workers=parallelism) as executor:
+			ArrayHelper(list(executor.map(lambda x: x(), tasks))).each(lambda x: values.update(x))
+	return values
@@ -1,2 +1,3 @@
 from .data_helper import get_objective_factor_data_service
 from .data_service import ObjectiveFactorDataService, ObjectiveTargetBreakdownValueRow, ObjectiveTargetBreakdownValues
+from .topic_base_service import ask_fused_values, TopicBaseObjectiveFactorDataService
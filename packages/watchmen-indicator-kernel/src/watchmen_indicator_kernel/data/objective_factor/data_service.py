@@ -281,11 +281,11 @@ class ObjectiveFactorDataService(ObjectiveCriteriaService):
 		], dimensions=[])
 
 	# noinspection PyMethodMayBeStatic
-	def get_value_from_result(self, data_result: DataResult) -> Decimal:
+	def get_value_from_result(self, data_result: DataResult, index: int = 0) -> Decimal:
 		if len(data_result.data) == 0:
 			return Decimal('0')
 		else:
-			value = data_result.data[0][0]
+			value = data_result.data[0][index]
 			parsed, decimal_value = is_decimal(value)
 			return decimal_value if parsed else Decimal('0')
 
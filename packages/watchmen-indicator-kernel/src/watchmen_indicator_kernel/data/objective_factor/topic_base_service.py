@@ -5,8 +5,10 @@ from watchmen_auth import PrincipalService
 from watchmen_indicator_kernel.common import IndicatorKernelException
 from watchmen_model.admin import Topic, Factor, Enum
 from watchmen_model.common import DataResult, ParameterJoint, ParameterJointType, ParameterKind, \
-	SubjectDatasetColumnId, TopicFactorParameter, TopicId, DataResultSetRow, ComputedParameter, DataResultSet, FactorId
-from watchmen_model.console import Report, Subject, SubjectDataset, SubjectDatasetColumn, ReportDimension
+	SubjectDatasetColumnId, TopicFactorParameter, TopicId, DataResultSetRow, ComputedParameter, DataResultSet, FactorId, \
+	ParameterComputeType
+from watchmen_model.console import Report, Subject, SubjectDataset, SubjectDatasetColumn, ReportDimension, \
+	ReportIndicator, ReportIndicatorArithmetic
 from watchmen_model.indicator import Indicator, Objective, ObjectiveFactorOnIndicator, IndicatorAggregateArithmetic
 from watchmen_model.indicator.derived_objective import BreakdownTarget, BreakdownDimension, BreakdownDimensionType
 from watchmen_utilities import ArrayHelper, is_blank
@@ -79,6 +81,33 @@ class TopicBaseObjectiveFactorDataService(ObjectiveFactorDataService):
 		data_result = report_data_service.find()
 		return self.get_value_from_result(data_result)
 
+	def can_fuse(self) -> bool:
+		"""
+		count is computed on all rows, cannot be restricted by a conditional column, therefore cannot be fused.
+		"""
+		return self.fake_to_report(self.FAKED_ONLY_COLUMN_ID).indicators[0].arithmetic != ReportIndicatorArithmetic.COUNT
+
+	def fake_time_frame_column(
+			self, time_frame: Optional[TimeFrame], column_id: SubjectDatasetColumnId
+	) -> Tuple[SubjectDatasetColumn, ReportIndicator, Optional[ParameterJoint]]:
+		"""
+		fake a column which only takes value of rows matched filters on given time frame, other rows are null.
+		returns the column, report indicator to aggregate it, and the filters.
+		"""
+		only_column, _ = self.fake_indicator_factor_to_dataset_column()
+		a_filter = self.build_filters(time_frame)
+		if a_filter is None:
+			parameter = only_column.parameter
+		else:
+			only_column.parameter.conditional = True
+			only_column.parameter.on = a_filter
+			# no anyway route, value is null when not matched
+			parameter = ComputedParameter(
+				kind=ParameterKind.COMPUTED, type=ParameterComputeType.CASE_THEN, parameters=[only_column.parameter])
+		report_indicator = self.fake_to_report(column_id).indicators[0]
+		report_indicator.name = f'_{column_id}_'
+		return SubjectDatasetColumn(columnId=column_id, parameter=parameter, alias=column_id), report_indicator, a_filter
+
 	def find_factor(
 			self, factor_id: Optional[FactorId],
 			on_factor_id_missed: Callable[[], str]) -> Factor:
@@ -177,3 +206,31 @@ class TopicBaseObjectiveFactorDataService(ObjectiveFactorDataService):
 			columns=data_result.columns,
 			data=self.replace_result_data_for_enum(data_result, enum_dict)
 		)
+
+
+def ask_fused_values(
+		asks: List[Tuple[TopicBaseObjectiveFactorDataService, Optional[TimeFrame]]]) -> List[Optional[Decimal]]:
+	"""
+	ask values of factors on same topic by one query, each pair of factor and time frame is a conditional aggregation.
+	all data services must be fusible, and values are returned in same order as given.
+	"""
+	columns: List[SubjectDatasetColumn] = []
+	report_indicators: List[ReportIndicator] = []
+	filters: List[ParameterJoint] = []
+	whole_topic = False
+	for index, (data_service, time_frame) in enumerate(asks):
+		column, report_indicator, a_filter = data_service.fake_time_frame_column(time_frame, f'FUSED_COLUMN_{index}')
+		columns.append(column)
+		report_indicators.append(report_indicator)
+		if a_filter is None:
+			whole_topic = True
+		else:
+			filters.append(a_filter)
+	# rows which matched none of the filters are useless
+	dataset_filters = None if whole_topic else ParameterJoint(jointType=ParameterJointType.OR, filters=filters)
+	subject = Subject(dataset=SubjectDataset(columns=columns, filters=dataset_filters))
+	report = Report(indicators=report_indicators, dimensions=[])
+	first_data_service = asks[0][0]
+	data_result = first_data_service.get_report_data_service(subject, report).find()
+	return ArrayHelper(asks).map_with_index(
+		lambda x, index: first_data_service.get_value_from_result(data_result, index)).to_list()
@@ -0,0 +1,181 @@
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+from unittest import TestCase
+from unittest.mock import patch
+
+from watchmen_auth import PrincipalService
+from watchmen_indicator_kernel.data.objective.factor_value_planner import ask_factor_values, ask_one, \
+	FactorValueAsk
+from watchmen_indicator_kernel.data.objective_factor import ask_fused_values, TopicBaseObjectiveFactorDataService
+from watchmen_model.admin import Factor, FactorType, Topic, User, UserRole
+from watchmen_model.common import ComputedParameter, ConstantParameter, DataResult, Parameter, ParameterComputeType, \
+	ParameterExpression, ParameterExpressionOperator, ParameterJoint, ParameterJointType, ParameterKind, \
+	TopicFactorParameter
+from watchmen_model.console import Report, ReportIndicatorArithmetic, Subject
+from watchmen_model.indicator import Indicator, IndicatorAggregateArithmetic, IndicatorFilter, Objective, \
+	ObjectiveFactorOnIndicator
+
+ROWS: List[Dict[str, Any]] = [
+	{'region': 'east', 'product': 'a', 'amount': 10},
+	{'region': 'east', 'product': 'b', 'amount': 20},
+	{'region': 'west', 'product': 'a', 'amount': 30},
+	{'region': 'west', 'product': 'a', 'amount': 30},
+	{'region': 'north', 'product': 'c', 'amount': 40}
+]
+
+
+def create_fake_principal_service() -> PrincipalService:
+	return PrincipalService(User(userId='1', tenantId='1', name='imma-admin', role=UserRole.ADMIN))
+
+
+def create_topic() -> Topic:
+	return Topic(topicId='1', name='sales', factors=[
+		Factor(factorId='region', name='region', type=FactorType.TEXT),
+		Factor(factorId='product', name='product', type=FactorType.TEXT),
+		Factor(factorId='amount', name='amount', type=FactorType.NUMBER)
+	])
+
+
+def equals(factor_id: str, value: str) -> ParameterJoint:
+	return ParameterJoint(jointType=ParameterJointType.AND, filters=[ParameterExpression(
+		left=TopicFactorParameter(kind=ParameterKind.TOPIC, topicId='1', factorId=factor_id),
+		operator=ParameterExpressionOperator.EQUALS,
+		right=ConstantParameter(kind=ParameterKind.CONSTANT, value=value))])
+
+
+def create_data_service(
+		uuid: str, factor_id: str, arithmetic: IndicatorAggregateArithmetic,
+		joint: Optional[ParameterJoint]) -> TopicBaseObjectiveFactorDataService:
+	indicator = Indicator(
+		indicatorId=uuid, factorId=factor_id, aggregateArithmetic=arithmetic,
+		filter=IndicatorFilter(enabled=joint is not None, joint=joint))
+	return TopicBaseObjectiveFactorDataService(
+		Objective(objectiveId='1'), ObjectiveFactorOnIndicator(uuid=uuid, conditional=False), indicator,
+		create_topic(), create_fake_principal_service())
+
+
+def matches(row: Dict[str, Any], joint: Optional[ParameterJoint]) -> bool:
+	if joint is None:
+		return True
+	results = []
+	for a_filter in joint.filters:
+		if isinstance(a_filter, ParameterJoint):
+			results.append(matches(row, a_filter))
+		else:
+			results.append(row.get(a_filter.left.factorId) == a_filter.right.value)
+	return any(results) if joint.jointType == ParameterJointType.OR else all(results)
+
+
+def compute(row: Dict[str, Any], parameter: Parameter) -> Any:
+	if isinstance(parameter, ComputedParameter):
+		# case then without anyway route
+		route = parameter.parameters[0]
+		return compute(row, route) if matches(row, route.on) else None
+	return row.get(parameter.factorId)
+
+
+def aggregate(values: List[Any], arithmetic: ReportIndicatorArithmetic) -> Optional[Decimal]:
+	values = [x for x in values if x is not None]
+	if len(values) == 0:
+		# as sql does
+		return None if arithmetic != ReportIndicatorArithmetic.DISTINCT_COUNT else Decimal(0)
+	if arithmetic == ReportIndicatorArithmetic.SUMMARY:
+		return Decimal(sum(values))
+	elif arithmetic == ReportIndicatorArithmetic.AVERAGE:
+		return Decimal(sum(values)) / len(values)
+	elif arithmetic == ReportIndicatorArithmetic.DISTINCT_COUNT:
+		return Decimal(len(set(values)))
+	raise NotImplementedError(f'{arithmetic}')
+
+
+class FakeReportDataService:
+	"""
+	run subject and report on rows in memory
+	"""
+
+	def __init__(self, subject: Subject, report: Report, fail_on_fused: bool):
+		self.subject = subject
+		self.report = report
+		self.failOnFused = fail_on_fused
+
+	def find(self) -> DataResult:
+		if self.failOnFused and len(self.report.indicators) > 1:
+			raise RuntimeError('Fused query failed.')
+		rows = [x for x in ROWS if matches(x, self.subject.dataset.filters)]
+		columns = dict((x.columnId, x) for x in self.subject.dataset.columns)
+		return DataResult(columns=[], data=[[
+			aggregate([compute(row, columns[x.columnId].parameter) for row in rows], x.arithmetic)
+			for x in self.report.indicators
+		]])
+
+
+class FactorValuePlannerTest(TestCase):
+	def setUp(self):
+		self.reports: List[Report] = []
+		self.subjects: List[Subject] = []
+		self.failOnFused = False
+
+		# noinspection PyUnusedLocal
+		def get_report_data_service(data_service, subject: Subject, report: Report) -> FakeReportDataService:
+			self.subjects.append(subject)
+			self.reports.append(report)
+			return FakeReportDataService(subject, report, self.failOnFused)
+
+		patcher = patch.object(TopicBaseObjectiveFactorDataService, 'get_report_data_service', get_report_data_service)
+		patcher.start()
+		self.addCleanup(patcher.stop)
+
+	# noinspection PyMethodMayBeStatic
+	def create_asks(self) -> List[FactorValueAsk]:
+		data_services = [
+			create_data_service('1', 'amount', IndicatorAggregateArithmetic.SUM, equals('region', 'east')),
+			create_data_service('2', 'amount', IndicatorAggregateArithmetic.AVG, equals('region', 'west')),
+			create_data_service('3', 'product', IndicatorAggregateArithmetic.DISTINCT_COUNT, equals('product', 'a')),
+			# matches nothing
+			create_data_service('4', 'amount', IndicatorAggregateArithmetic.SUM, equals('region', 'none'))
+		]
+		return [FactorValueAsk(x.get_objective_factor(), x, None) for x in data_services]
+
+	def test_fused_subject_and_report(self):
+		asks = self.create_asks()
+		ask_fused_values([(x.dataService, x.timeFrame) for x in asks])
+		self.assertEqual(1, len(self.reports))
+		subject, report = self.subjects[0], self.reports[0]
+		# one conditional column per factor
+		self.assertEqual(len(asks), len(subject.dataset.columns))
+		for column in subject.dataset.columns:
+			self.assertIsInstance(column.parameter, ComputedParameter)
+			self.assertEqual(ParameterComputeType.CASE_THEN, column.parameter.type)
+			self.assertTrue(column.parameter.parameters[0].conditional)
+		self.assertEqual(
+			[x.columnId for x in subject.dataset.columns], [x.columnId for x in report.indicators])
+		self.assertEqual([
+			ReportIndicatorArithmetic.SUMMARY, ReportIndicatorArithmetic.AVERAGE,
+			ReportIndicatorArithmetic.DISTINCT_COUNT, ReportIndicatorArithmetic.SUMMARY
+		], [x.arithmetic for x in report.indicators])
+		# dataset is narrowed by filters of all factors
+		self.assertEqual(ParameterJointType.OR, subject.dataset.filters.jointType)
+		self.assertEqual(len(asks), len(subject.dataset.filters.filters))
+
+	def test_same_as_one_by_one(self):
+		one_by_one = {}
+		for ask in self.create_asks():
+			one_by_one.update(ask_one(ask))
+		self.assertEqual(
+			[(True, Decimal(30)), (True, Decimal(30)), (True, Decimal(1)), (True, Decimal(0))], list(one_by_one.values()))
+
+		self.reports.clear()
+		self.assertEqual(one_by_one, ask_factor_values(self.create_asks()))
+		# fused into one query
+		self.assertEqual(1, len(self.reports))
+
+	def test_fallback_when_fused_failed(self):
+		self.failOnFused = True
+		values = ask_factor_values(self.create_asks())
+		# one fused query failed, then asked one by one
+		self.assertEqual([4, 1, 1, 1, 1], [len(x.indicators) for x in self.reports])
+		self.failOnFused = False
+		one_by_one = {}
+		for ask in self.create_asks():
+			one_by_one.update(ask_one(ask))
+		self.assertEqual(one_by_one, values)
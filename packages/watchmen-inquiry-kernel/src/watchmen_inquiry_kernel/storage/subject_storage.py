@@ -179,7 +179,7 @@ class SubjectStorage:
 	# noinspection PyMethodMayBeStatic
 	def find_factor(self, factor_id: FactorId, schema: TopicSchema) -> Factor:
 		topic = schema.get_topic()
-		factor = ArrayHelper(topic.factors).find(lambda x: x.factorId == factor_id)
+		factor = schema.get_factor_index().find_by_id(factor_id)
 		if factor is None:
 			raise InquiryKernelException(
 				f'Factor[id={factor_id}] in topic[id={topic.topicId}, name={topic.name}] not found.')
@@ -9,7 +9,7 @@ from trino.dbapi import connect
 from watchmen_auth import PrincipalService
 from watchmen_data_kernel.cache import CacheService
 from watchmen_data_kernel.common import ask_storage_echo_enabled
-from watchmen_data_kernel.meta import DataSourceService
+from watchmen_data_kernel.meta import ask_factor_index, DataSourceService
 from watchmen_data_kernel.utils import parse_move_date_pattern
 from watchmen_model.admin import Factor, Topic
 from watchmen_model.common import DataPage, FactorId, TopicId
@@ -38,7 +38,7 @@ class TrinoSchema:
 		self.catalog = catalog
 		self.schema = schema
 		self.topic = topic
-		self.factor_map = ArrayHelper(topic.factors).to_map(lambda x: x.factorId, lambda x: x)
+		self.factor_index = ask_factor_index(topic)
 		self.entity_name = f'{catalog}.{schema}.{as_table_name(topic)}'
 		self.alias = self.entity_name
 
@@ -52,7 +52,7 @@ class TrinoSchema:
 		return self.alias
 
 	def find_factor(self, factor_id: FactorId) -> Factor:
-		factor = self.factor_map.get(factor_id)
+		factor = self.factor_index.find_by_id(factor_id)
 		if factor is None:
 			raise InquiryTrinoException(
 				f'Factor[id={factor_id}] not found in topic[id={self.topic.topicId}, name={self.topic.name}].')
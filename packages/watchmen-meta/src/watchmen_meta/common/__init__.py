@@ -4,7 +4,7 @@ from .settings import ask_datasource_aes_enabled, ask_datasource_aes_params, ask
 	ask_meta_storage, ask_snowflake_generator, ask_super_admin, MetaSettings, ask_meta_storage_type, \
 	ask_default_package_version, ask_snowflake_competitive_workers_v2, get_snowflake_worker
 from .storage_service import EntityService, IdentifiedStorableService, StorageService, TupleNotFoundException
-from .tuple_service import AuditableShaper, OptimisticLockShaper, TupleService, TupleShaper
+from .tuple_service import AuditableShaper, OptimisticLockShaper, TupleService, TupleShaper, TupleVersion
 from .user_based_tuple_service import UserBasedTupleService, UserBasedTupleShaper
 from .operation_service import RecordOperationService
 from .package_version_service import PackageVersionService
@@ -1,10 +1,12 @@
-from typing import Optional
+from datetime import datetime
+from typing import List, Optional
 from abc import abstractmethod
 from watchmen_auth import PrincipalService
 from watchmen_model.common import Auditable, OptimisticLock, TenantBasedTuple, Tuple
 from watchmen_model.system import Operation, OperationType
-from watchmen_storage import ColumnNameLiteral, EntityCriteriaExpression, EntityRow, OptimisticLockException, \
-	SnowflakeGenerator, TransactionalStorageSPI
+from watchmen_storage import ColumnNameLiteral, EntityCriteriaExpression, EntityCriteriaOperator, EntityRow, \
+	EntityStraightColumn, EntityStraightValuesFinder, OptimisticLockException, SnowflakeGenerator, \
+	TransactionalStorageSPI
 from .settings import ask_default_package_version
 from .storage_service import EntityService, TupleId, TupleNotFoundException
 from .operation_service import RecordOperationService
@@ -71,6 +73,17 @@ class TupleShaper:
 		return a_tuple
 
 
+class TupleVersion:
+	"""
+	id, version and last modified time of tuple, to detect change without loading whole tuple
+	"""
+
+	def __init__(self, tuple_id: TupleId, version: Optional[int], last_modified_at: Optional[datetime]):
+		self.tupleId = tuple_id
+		self.version = version
+		self.lastModifiedAt = last_modified_at
+
+
 # noinspection PyAbstractClass
 class TupleService(EntityService):
 	def __init__(
@@ -123,6 +136,21 @@ class TupleService(EntityService):
 		self.record_operation(OperationType.CREATE, a_tuple)
 		return a_tuple
 
+	def create_all(self, tuples: List[Tuple]) -> List[Tuple]:
+		"""
+		insert all tuples by one statement
+		"""
+		if len(tuples) == 0:
+			return tuples
+		for a_tuple in tuples:
+			self.try_to_prepare_auditable_on_create(a_tuple)
+			if isinstance(a_tuple, OptimisticLock):
+				a_tuple.version = 1
+		self.storage.insert_all(tuples, self.get_entity_helper())
+		for a_tuple in tuples:
+			self.record_operation(OperationType.CREATE, a_tuple)
+		return tuples
+
 	def update(self, a_tuple: Tuple) -> Tuple:
 		"""
 		with optimistic lock logic
@@ -169,6 +197,48 @@ class TupleService(EntityService):
 		self.record_operation(OperationType.DELETE, a_tuple)
 		return a_tuple
 
+	def delete_by_ids(self, tuple_ids: List[TupleId]) -> int:
+		"""
+		delete by one statement, deleted tuples are not pulled, therefore operations are not recorded
+		"""
+		if len(tuple_ids) == 0:
+			return 0
+		return self.storage.delete(self.get_entity_deleter(criteria=[self.build_ids_criteria(tuple_ids)]))
+
 	def find_by_id(self, tuple_id: TupleId) -> Optional[Tuple]:
 		return self.storage.find_by_id(tuple_id, self.get_entity_id_helper())
+
+	def build_ids_criteria(self, tuple_ids: List[TupleId]) -> EntityCriteriaExpression:
+		return EntityCriteriaExpression(
+			left=ColumnNameLiteral(columnName=self.get_storable_id_column_name()),
+			operator=EntityCriteriaOperator.IN, right=tuple_ids)
+
+	def find_by_ids(self, tuple_ids: List[TupleId]) -> List[Tuple]:
+		if len(tuple_ids) == 0:
+			return []
+		# noinspection PyTypeChecker
+		return self.storage.find(self.get_entity_finder(criteria=[self.build_ids_criteria(tuple_ids)]))
+
+	def find_versions_by_ids(self, tuple_ids: List[TupleId]) -> List[TupleVersion]:
+		"""
+		for optimistic lock tuple only, tuples which not found are not included
+		"""
+		if len(tuple_ids) == 0:
+			return []
+		id_column_name = self.get_storable_id_column_name()
+		version_column_name = self.get_optimistic_column_name()
+		rows = self.storage.find_straight_values(EntityStraightValuesFinder(
+			name=self.get_entity_name(),
+			shaper=self.get_entity_shaper(),
+			criteria=[self.build_ids_criteria(tuple_ids)],
+			straightColumns=[
+				EntityStraightColumn(columnName=id_column_name, alias=id_column_name),
+				EntityStraightColumn(columnName=version_column_name, alias=version_column_name),
+				EntityStraightColumn(columnName='last_modified_at', alias='last_modified_at')
+			]
+		))
+		return [
+			TupleVersion(row.get(id_column_name), row.get(version_column_name), row.get('last_modified_at'))
+			for row in rows
+		]
 	
\ No newline at end of file
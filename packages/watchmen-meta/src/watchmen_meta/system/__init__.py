@@ -1,8 +1,10 @@
 from .ai_model_service import AIModelService
+from .cache_invalidation_service import CacheInvalidationService
 from .data_source_service import DataSourceService
 from .external_writer_service import ExternalWriterService
 from .kafka_collector_config_service import KafkaCollectorConfigService
 from .key_store_service import KeyStoreService
 from .pat_service import PatService
+from .pipeline_monitor_log_rollup_service import PipelineMonitorLogRollupService
 from .plugin_service import PluginService
 from .tenant_service import TenantService
@@ -0,0 +1,79 @@
+from datetime import datetime
+from typing import List
+
+from watchmen_meta.common import StorageService
+from watchmen_model.system import CacheInvalidation
+from watchmen_storage import ColumnNameLiteral, EntityCriteriaExpression, EntityCriteriaOperator, EntityDeleter, \
+	EntityFinder, EntityHelper, EntityRow, EntityShaper, EntitySortColumn, EntitySortMethod
+
+
+class CacheInvalidationShaper(EntityShaper):
+	def serialize(self, invalidation: CacheInvalidation) -> EntityRow:
+		return {
+			'invalidation_id': invalidation.invalidationId,
+			'kind': invalidation.kind,
+			'resource_id': invalidation.resourceId,
+			'origin': invalidation.origin,
+			'tenant_id': invalidation.tenantId,
+			'created_at': invalidation.createdAt
+		}
+
+	def deserialize(self, row: EntityRow) -> CacheInvalidation:
+		return CacheInvalidation(
+			invalidationId=row.get('invalidation_id'),
+			kind=row.get('kind'),
+			resourceId=row.get('resource_id'),
+			origin=row.get('origin'),
+			tenantId=row.get('tenant_id'),
+			createdAt=row.get('created_at')
+		)
+
+
+CACHE_INVALIDATION_ENTITY_NAME = 'cache_invalidations'
+CACHE_INVALIDATION_ENTITY_SHAPER = CacheInvalidationShaper()
+
+
+class CacheInvalidationService(StorageService):
+	"""
+	cache invalidations are written by node which changes meta, and polled by all nodes.
+	rows are not tuples, no audit columns, no optimistic lock.
+	"""
+
+	# noinspection PyMethodMayBeStatic
+	def get_entity_name(self) -> str:
+		return CACHE_INVALIDATION_ENTITY_NAME
+
+	# noinspection PyMethodMayBeStatic
+	def get_entity_shaper(self) -> EntityShaper:
+		return CACHE_INVALIDATION_ENTITY_SHAPER
+
+	def publish(self, invalidation: CacheInvalidation) -> CacheInvalidation:
+		invalidation.invalidationId = str(self.snowflakeGenerator.next_id())
+		invalidation.createdAt = self.now()
+		self.storage.insert_one(invalidation, EntityHelper(
+			name=self.get_entity_name(), shaper=self.get_entity_shaper()))
+		return invalidation
+
+	def find_since(self, since: datetime) -> List[CacheInvalidation]:
+		# noinspection PyTypeChecker
+		return self.storage.find(EntityFinder(
+			name=self.get_entity_name(),
+			shaper=self.get_entity_shaper(),
+			criteria=[
+				EntityCriteriaExpression(
+					left=ColumnNameLiteral(columnName='created_at'),
+					operator=EntityCriteriaOperator.GREATER_THAN_OR_EQUALS, right=since)
+			],
+			sort=[EntitySortColumn(name='created_at', method=EntitySortMethod.ASC)]
+		))
+
+	def delete_before(self, before: datetime) -> int:
+		return self.storage.delete(EntityDeleter(
+			name=self.get_entity_name(),
+			shaper=self.get_entity_shaper(),
+			criteria=[
+				EntityCriteriaExpression(
+					left=ColumnNameLiteral(columnName='created_at'),
+					operator=EntityCriteriaOperator.LESS_THAN, right=before)
+			]
+		))
@@ -0,0 +1,200 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from watchmen_meta.common import StorageService
+from watchmen_model.common import PipelineId, TenantId, TopicId
+from watchmen_model.pipeline_kernel import PipelineMonitorLogRollup, PipelineMonitorLogRollupTier
+from watchmen_storage import ColumnNameLiteral, EntityCriteria, EntityCriteriaExpression, EntityCriteriaJoint, \
+	EntityCriteriaJointConjunction, EntityCriteriaOperator, EntityDeleter, EntityFinder, EntityHelper, \
+	EntityLimitedFinder, EntityRow, EntityShaper, EntitySortColumn, EntitySortMethod
+from watchmen_utilities import ArrayHelper, is_not_blank
+
+
+class PipelineMonitorLogRollupShaper(EntityShaper):
+	def serialize(self, rollup: PipelineMonitorLogRollup) -> EntityRow:
+		return {
+			'rollup_id': rollup.rollupId,
+			'tenant_id': rollup.tenantId,
+			'topic_id': rollup.topicId,
+			'pipeline_id': rollup.pipelineId,
+			'tier': rollup.tier,
+			'minute_at': rollup.minuteAt,
+			'backfilled': rollup.backfilled,
+			'total_count': rollup.totalCount,
+			'done_count': rollup.doneCount,
+			'error_count': rollup.errorCount,
+			'ignored_count': rollup.ignoredCount,
+			'duration_count': rollup.durationCount,
+			'duration_sum': rollup.durationSum,
+			'duration_min': rollup.durationMin,
+			'duration_max': rollup.durationMax,
+			'duration_sketch': rollup.durationSketch,
+			'insert_count': rollup.insertCount,
+			'update_count': rollup.updateCount,
+			'delete_count': rollup.deleteCount
+		}
+
+	def deserialize(self, row: EntityRow) -> PipelineMonitorLogRollup:
+		return PipelineMonitorLogRollup(
+			rollupId=row.get('rollup_id'),
+			tenantId=row.get('tenant_id'),
+			topicId=row.get('topic_id'),
+			pipelineId=row.get('pipeline_id'),
+			tier=row.get('tier'),
+			minuteAt=row.get('minute_at'),
+			backfilled=row.get('backfilled') or False,
+			totalCount=row.get('total_count') or 0,
+			doneCount=row.get('done_count') or 0,
+			errorCount=row.get('error_count') or 0,
+			ignoredCount=row.get('ignored_count') or 0,
+			durationCount=row.get('duration_count') or 0,
+			durationSum=row.get('duration_sum') or 0,
+			durationMin=row.get('duration_min'),
+			durationMax=row.get('duration_max'),
+			durationSketch=row.get('duration_sketch'),
+			insertCount=row.get('insert_count') or 0,
+			updateCount=row.get('update_count') or 0,
+			deleteCount=row.get('delete_count') or 0
+		)
+
+
+PIPELINE_MONITOR_LOG_ROLLUP_ENTITY_NAME = 'pipeline_monitor_log_rollups'
+PIPELINE_MONITOR_LOG_ROLLUP_ENTITY_SHAPER = PipelineMonitorLogRollupShaper()
+ROLLUP_IDS_CHUNK_SIZE = 500
+
+
+class PipelineMonitorLogRollupService(StorageService):
+	"""
+	minute rollups are appended by nodes which write monitor logs, compacted into coarser tiers, and merged on read.
+	rows are not tuples, no audit columns, no optimistic lock.
+	"""
+
+	# noinspection PyMethodMayBeStatic
+	def get_entity_name(self) -> str:
+		return PIPELINE_MONITOR_LOG_ROLLUP_ENTITY_NAME
+
+	# noinspection PyMethodMayBeStatic
+	def get_entity_shaper(self) -> EntityShaper:
+		return PIPELINE_MONITOR_LOG_ROLLUP_ENTITY_SHAPER
+
+	def create_all(self, rollups: List[PipelineMonitorLogRollup]) -> List[PipelineMonitorLogRollup]:
+		if len(rollups) == 0:
+			return rollups
+		ids = self.snowflakeGenerator.next_ids(len(rollups))
+		for index, rollup in enumerate(rollups):
+			rollup.rollupId = str(ids[index])
+		self.storage.insert_all(rollups, EntityHelper(name=self.get_entity_name(), shaper=self.get_entity_shaper()))
+		return rollups
+
+	# noinspection PyMethodMayBeStatic
+	def build_period_criteria(
+			self, tier: Optional[PipelineMonitorLogRollupTier],
+			start: Optional[datetime], end: Optional[datetime]) -> List[EntityCriteriaExpression]:
+		"""
+		start is included, end is excluded
+		"""
+		return ArrayHelper([
+			EntityCriteriaExpression(left=ColumnNameLiteral(columnName='tier'), right=tier)
+			if tier is not None else None,
+			EntityCriteriaExpression(
+				left=ColumnNameLiteral(columnName='minute_at'),
+				operator=EntityCriteriaOperator.GREATER_THAN_OR_EQUALS, right=start) if start is not None else None,
+			EntityCriteriaExpression(
+				left=ColumnNameLiteral(columnName='minute_at'),
+				operator=EntityCriteriaOperator.LESS_THAN, right=end) if end is not None else None
+		]).filter(lambda x: x is not None).to_list()
+
+	# noinspection PyMethodMayBeStatic
+	def build_criteria(
+			self, tenant_id: TenantId, topic_id: Optional[TopicId], pipeline_id: Optional[PipelineId],
+			periods: List[Tuple[PipelineMonitorLogRollupTier, Optional[datetime], Optional[datetime]]]
+	) -> EntityCriteria:
+		"""
+		rollups match any of given periods, start of period is included, end is excluded
+		"""
+		return ArrayHelper([
+			EntityCriteriaExpression(left=ColumnNameLiteral(columnName='tenant_id'), right=tenant_id),
+			EntityCriteriaExpression(left=ColumnNameLiteral(columnName='topic_id'), right=topic_id)
+			if is_not_blank(topic_id) else None,
+			EntityCriteriaExpression(left=ColumnNameLiteral(columnName='pipeline_id'), right=pipeline_id)
+			if is_not_blank(pipeline_id) else None,
+			EntityCriteriaJoint(
+				conjunction=EntityCriteriaJointConjunction.OR,
+				children=ArrayHelper(periods).map(lambda x: EntityCriteriaJoint(
+					conjunction=EntityCriteriaJointConjunction.AND,
+					children=self.build_period_criteria(x[0], x[1], x[2])
+				)).to_list()
+			)
+		]).filter(lambda x: x is not None).to_list()
+
+	def find(
+			self, tenant_id: TenantId, topic_id: Optional[TopicId], pipeline_id: Optional[PipelineId],
+			periods: List[Tuple[PipelineMonitorLogRollupTier, Optional[datetime], Optional[datetime]]]
+	) -> List[PipelineMonitorLogRollup]:
+		# noinspection PyTypeChecker
+		return self.storage.find(EntityFinder(
+			name=self.get_entity_name(),
+			shaper=self.get_entity_shaper(),
+			criteria=self.build_criteria(tenant_id, topic_id, pipeline_id, periods)
+		))
+
+	def find_earliest_on_the_fly(self, tenant_id: TenantId) -> Optional[PipelineMonitorLogRollup]:
+		"""
+		returns the earliest rollup which is written on the fly, not by backfill
+		"""
+		rollups = self.storage.find_limited(EntityLimitedFinder(
+			name=self.get_entity_name(),
+			shaper=self.get_entity_shaper(),
+			criteria=[
+				EntityCriteriaExpression(left=ColumnNameLiteral(columnName='tenant_id'), right=tenant_id),
+				EntityCriteriaExpression(left=ColumnNameLiteral(columnName='backfilled'), right=False)
+			],
+			sort=[EntitySortColumn(name='minute_at', method=EntitySortMethod.ASC)],
+			limit=1
+		))
+		# noinspection PyTypeChecker
+		return rollups[0] if len(rollups) != 0 else None
+
+	def find_by_tier(
+			self, tier: PipelineMonitorLogRollupTier, start: Optional[datetime], end: Optional[datetime],
+			limit: Optional[int] = None) -> List[PipelineMonitorLogRollup]:
+		"""
+		rollups of all tenants in given tier and period, in ascending order of period
+		"""
+		criteria = self.build_period_criteria(tier, start, end)
+		sort = [EntitySortColumn(name='minute_at', method=EntitySortMethod.ASC)]
+		if limit is None:
+			# noinspection PyTypeChecker
+			return self.storage.find(EntityFinder(
+				name=self.get_entity_name(), shaper=self.get_entity_shaper(), criteria=criteria, sort=sort))
+		# noinspection PyTypeChecker
+		return self.storage.find_limited(EntityLimitedFinder(
+			name=self.get_entity_name(), shaper=self.get_entity_shaper(), criteria=criteria, sort=sort, limit=limit))
+
+	def delete_by_ids(self, rollup_ids: List[str]) -> int:
+		"""
+		returns count of deleted rollups, ids are deleted in chunks since values of "in" are limited in some databases
+		"""
+		return ArrayHelper(rollup_ids).chunk(ROLLUP_IDS_CHUNK_SIZE).reduce(
+			lambda count, ids: count + self.storage.delete(EntityDeleter(
+				name=self.get_entity_name(),
+				shaper=self.get_entity_shaper(),
+				criteria=[
+					EntityCriteriaExpression(
+						left=ColumnNameLiteral(columnName='rollup_id'), operator=EntityCriteriaOperator.IN, right=ids)
+				]
+			)), 0)
+
+	def delete_backfilled(self, tenant_id: TenantId, start: Optional[datetime], end: Optional[datetime]) -> int:
+		"""
+		delete rollups built by backfill in given period of all tiers
+		"""
+		return self.storage.delete(EntityDeleter(
+			name=self.get_entity_name(),
+			shaper=self.get_entity_shaper(),
+			criteria=[
+				EntityCriteriaExpression(left=ColumnNameLiteral(columnName='tenant_id'), right=tenant_id),
+				EntityCriteriaExpression(left=ColumnNameLiteral(columnName='backfilled'), right=True),
+				*self.build_period_criteria(None, start, end)
+			]
+		))
@@ -7,13 +7,17 @@ SQLAlchemy engine (MySQLDataSourceHelper) instead of dbt.
 Any metric is recursively decomposed into leaf measure aggregation queries
 (one leaf = one measure aggregated by the request group-by, compiled to SQL);
 ratio / derived / cumulative semantics are combined in Python, aligning rows
-on group-by key tuples. Non-MySQL data sources are not handled here: the
+on group-by key tuples. Leaves of one request are planned before execution:
+identical leaves are fetched once, leaves reading the same rows are merged into
+one SQL with multiple aggregate columns, and the distinct queries run
+concurrently. Non-MySQL data sources are not handled here: the
 public entry returns None and the caller falls through to the dbt path.
 """
 
 import ast
 import calendar
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
@@ -39,6 +43,7 @@ from watchmen_metricflow.ontology.table_factory import OntologyTableFactory
 from watchmen_metricflow.service.meta_service import (
 	get_data_source_service, get_topic_service, load_metrics_by_tenant_id,
 	load_semantic_models_by_tenant_id)
+from watchmen_metricflow.settings import ask_mysql_metric_query_parallelism
 from watchmen_metricflow.util.trans import trans_readonly
 
 _GRANULARITIES = ('day', 'week', 'month', 'quarter', 'year')
@@ -497,13 +502,36 @@ def _build_filters(
 	return filters
 
 
-def _build_leaf_query(
+class _LeafQuery:
+	"""One leaf measure aggregation; identical leaves of a request share one instance."""
+
+	def __init__(
+			self, model: SemanticModel, table_ref: str, attributes: Dict[str, str], filters: Dict[str, Any],
+			derived: DerivedAttribute, target_field: Optional[str]) -> None:
+		self.model = model
+		self.table_ref = table_ref
+		# attribute name -> column expr, group-by columns and filtered columns
+		self.attributes = attributes
+		self.filters = filters
+		self.derived = derived
+		self.target_field = target_field
+
+	@property
+	def label(self) -> str:
+		return self.derived.name
+
+	def coalesce_key(self) -> tuple:
+		"""Leaves with the same key read the same rows and groups, so they can share one SQL."""
+		return (
+			self.model.name, self.table_ref, tuple(sorted(self.attributes.items())),
+			repr(sorted(self.filters.items())))
+
+
+def _build_leaf(
 		specs: List[_GroupSpec], req: MetricQueryRequest, model: SemanticModel,
 		measure: Measure, table_ref: str, filter_strings: List[str],
-		time_shift: List[Tuple[int, str]]
-) -> Tuple[VirtualOntology, OntologyQueryRequest, str]:
-	"""Build the synthetic ontology + query request for one leaf measure aggregation."""
-	leaf_label = measure.name
+		time_shift: List[Tuple[int, str]]) -> _LeafQuery:
+	"""Resolve columns, filters and aggregation of one leaf measure."""
 	attributes: Dict[str, str] = {}
 	for spec in specs:
 		attributes[spec.attr_name] = _resolve_time_expr(model, measure) \
@@ -517,31 +545,55 @@ def _build_leaf_query(
 	target_field = measure.expr
 	if aggregate == 'count' and (target_field is None or target_field.strip() in ('', '*', '1')):
 		target_field = None
+	derived = DerivedAttribute(name=measure.name, aggregate=aggregate, path=[], targetField=target_field)
+	return _LeafQuery(model, table_ref, attributes, filters, derived, target_field)
+
 
-	fields = set(attributes.values())
-	if target_field:
-		fields.add(target_field)
+def _build_query(
+		specs: List[_GroupSpec], leaves: List[_LeafQuery]) -> Tuple[VirtualOntology, OntologyQueryRequest]:
+	"""Build the synthetic ontology + query request for leaves sharing one coalesce key.
+
+	Each distinct leaf becomes one aggregate column of the same SELECT.
+	"""
+	first = leaves[0]
+	fields: set = set(first.attributes.values())
+	derived_attributes: List[DerivedAttribute] = []
+	for leaf in leaves:
+		if leaf.target_field:
+			fields.add(leaf.target_field)
+		if all(derived.name != leaf.label for derived in derived_attributes):
+			derived_attributes.append(leaf.derived)
 	mapping = PhysicalTableMapping(
-		topicName=table_ref, alias='base', kind='primary', fields=sorted(fields))
+		topicName=first.table_ref, alias='base', kind='primary', fields=sorted(fields))
 	virtual_object = VirtualObject(
 		id='metric_leaf', name='metric_leaf',
 		physicalTables=[mapping],
 		attributes=[
 			VirtualObjectAttribute(name=name, sourceTable='base', sourceField=expr)
-			for name, expr in attributes.items()],
-		derivedAttributes=[
-			DerivedAttribute(name=leaf_label, aggregate=aggregate, path=[], targetField=target_field)])
+			for name, expr in first.attributes.items()],
+		derivedAttributes=derived_attributes)
 	ontology = VirtualOntology(
 		ontologyId='metric_leaf_ontology', name='metric_leaf',
 		virtualObjects=[virtual_object], virtualLinks=[])
 	request = OntologyQueryRequest(
 		virtualObjectId='metric_leaf',
-		filters=filters,
+		filters=first.filters,
 		fields=[],
 		groupBy=[OntologyGroupBy(field=spec.attr_name, granularity=spec.granularity) for spec in specs],
-		includeDerived=[leaf_label],
+		includeDerived=[derived.name for derived in derived_attributes],
 		limit=10000)
-	return ontology, request, leaf_label
+	return ontology, request
+
+
+def _build_leaf_query(
+		specs: List[_GroupSpec], req: MetricQueryRequest, model: SemanticModel,
+		measure: Measure, table_ref: str, filter_strings: List[str],
+		time_shift: List[Tuple[int, str]]
+) -> Tuple[VirtualOntology, OntologyQueryRequest, str]:
+	"""Build the synthetic ontology + query request for one leaf measure aggregation."""
+	leaf = _build_leaf(specs, req, model, measure, table_ref, filter_strings, time_shift)
+	ontology, request = _build_query(specs, [leaf])
+	return ontology, request, leaf.label
 
 
 # =============================================================================
@@ -579,6 +631,9 @@ def _rows_to_series(rows: List[Dict[str, Any]], specs: List[_GroupSpec], leaf_la
 	values: Dict[tuple, Any] = {}
 	display: Dict[tuple, tuple] = {}
 	for row in rows:
+		if leaf_label not in row:
+			# row of another leaf sharing the query
+			continue
 		raw_key = tuple(row.get(spec.attr_name) for spec in specs)
 		key = tuple(_normalize_value(item) for item in raw_key)
 		values[key] = row.get(leaf_label)
@@ -587,25 +642,79 @@ def _rows_to_series(rows: List[Dict[str, Any]], specs: List[_GroupSpec], leaf_la
 	return _Series(values, display, time_index, time_granularity, fill)
 
 
+LeafRows = List[Dict[str, Any]]
+LeafExecutor = Callable[[VirtualOntology, OntologyQueryRequest], LeafRows]
+
+
+def _leaf_key(
+		model: SemanticModel, measure: Measure, filter_strings: List[str],
+		time_shift: List[Tuple[int, str]]) -> tuple:
+	return model.name, measure.name, tuple(filter_strings), tuple(time_shift)
+
+
 class _RunState:
-	"""Per-request state shared by all leaf queries (specs, filters, executor)."""
+	"""Per-request state shared by all leaf queries (specs, filters, executor).
+
+	With prefetch, the metric tree is walked twice: the planning walk only collects
+	leaves, which are then deduplicated, coalesced into multi-aggregate queries and
+	executed in one round; the second walk combines the fetched rows.
+	"""
 
 	def __init__(
 			self, context: MySQLQueryContext, specs: List[_GroupSpec], req: MetricQueryRequest,
-			execute: Callable[[VirtualOntology, OntologyQueryRequest], List[Dict[str, Any]]]) -> None:
+			execute: LeafExecutor,
+			execute_all: Optional[Callable[[List[Tuple[VirtualOntology, OntologyQueryRequest]]], List[LeafRows]]] = None
+	) -> None:
 		self.context = context
 		self.specs = specs
 		self.req = req
 		self.execute = execute
+		self.execute_all = execute_all
+		self.planning = False
+		# leaf key -> leaf, collected by the planning walk
+		self.leaves: Dict[tuple, _LeafQuery] = {}
+		# leaf key -> fetched rows
+		self.results: Dict[tuple, LeafRows] = {}
+
+	def build_leaf(
+			self, model: SemanticModel, measure: Measure, filter_strings: List[str],
+			time_shift: List[Tuple[int, str]]) -> _LeafQuery:
+		source = self.context.model_sources[model.name]
+		return _build_leaf(self.specs, self.req, model, measure, source.table_ref, filter_strings, time_shift)
 
 	def run_leaf(
 			self, model: SemanticModel, measure: Measure, filter_strings: List[str],
 			time_shift: List[Tuple[int, str]], fill: Any) -> _Series:
-		source = self.context.model_sources[model.name]
-		ontology, request, leaf_label = _build_leaf_query(
-			self.specs, self.req, model, measure, source.table_ref, filter_strings, time_shift)
-		rows = self.execute(ontology, request)
-		return _rows_to_series(rows, self.specs, leaf_label, fill)
+		key = _leaf_key(model, measure, filter_strings, time_shift)
+		if key not in self.results:
+			if self.planning:
+				if key not in self.leaves:
+					self.leaves[key] = self.build_leaf(model, measure, filter_strings, time_shift)
+				# shape only, values are not needed for planning
+				return _rows_to_series([], self.specs, measure.name, fill)
+			leaf = self.build_leaf(model, measure, filter_strings, time_shift)
+			self.results[key] = self.execute(*_build_query(self.specs, [leaf]))
+		return _rows_to_series(self.results[key], self.specs, measure.name, fill)
+
+	def prefetch(self, metric_name: str) -> None:
+		"""Collect all leaves of the metric, then fetch each distinct query once."""
+		self.planning = True
+		try:
+			_eval_metric(self, metric_name, [], [], set())
+		finally:
+			self.planning = False
+		groups: Dict[tuple, List[tuple]] = {}
+		for key, leaf in self.leaves.items():
+			groups.setdefault(leaf.coalesce_key(), []).append(key)
+		keys_list = list(groups.values())
+		queries = [_build_query(self.specs, [self.leaves[key] for key in keys]) for keys in keys_list]
+		if self.execute_all is not None:
+			rows_list = self.execute_all(queries)
+		else:
+			rows_list = [self.execute(ontology, request) for ontology, request in queries]
+		for keys, rows in zip(keys_list, rows_list):
+			for key in keys:
+				self.results[key] = rows
 
 
 def _merge_filter_strings(filter_strings: List[str], extra: Optional[str]) -> List[str]:
@@ -998,13 +1107,13 @@ class MySQLMetricQueryRunner:
 		self.engine = engine
 		# injectable leaf executor for tests; production executes via SQLAlchemy
 		self._execute_leaf = execute_leaf
-		self._compiler = OntologySqlCompiler()
 
 	def run(self, req: MetricQueryRequest):
 		metric = self.context.metric
 		force_time = _tree_needs_time(metric.name, self.context.metrics_by_name, set())
 		specs = _parse_group_specs(req, metric, force_time)
-		state = _RunState(self.context, specs, req, self.execute)
+		state = _RunState(self.context, specs, req, self.execute, self.execute_all)
+		state.prefetch(metric.name)
 		series = _eval_metric(state, metric.name, [], [], set())
 		return _to_response(metric.name, specs, series, req)
 
@@ -1012,10 +1121,23 @@ class MySQLMetricQueryRunner:
 		if self._execute_leaf is not None:
 			return self._execute_leaf(ontology, request)
 		engine = self._resolve_engine()
-		compiled = self._compiler.compile(ontology, request, dialect_name=engine.dialect.name)
+		# compiler keeps per-compile state, one compiler per query since queries run concurrently
+		compiled = OntologySqlCompiler().compile(ontology, request, dialect_name=engine.dialect.name)
 		with engine.connect() as conn:
 			return [dict(row._mapping) for row in conn.execute(compiled.statement).fetchall()]
 
+	def execute_all(
+			self, queries: List[Tuple[VirtualOntology, OntologyQueryRequest]]) -> List[List[Dict[str, Any]]]:
+		"""Execute distinct leaf queries concurrently, each on its own pooled connection."""
+		parallelism = min(len(queries), ask_mysql_metric_query_parallelism())
+		if parallelism <= 1:
+			return [self.execute(ontology, request) for ontology, request in queries]
+		if self._execute_leaf is None:
+			# engine lookup reads meta storage, resolve it once before going concurrent
+			self._resolve_engine()
+		with ThreadPoolExecutor(max_workers=parallelism) as executor:
+			return list(executor.map(lambda query: self.execute(*query), queries))
+
 	def _resolve_engine(self) -> Engine:
 		# one engine per request, shared by all leaf queries
 		if self.engine is None:
@@ -7,6 +7,7 @@ class MetricFlowSettings(RestSettings):
     TUPLE_DELETABLE: bool = True
     ANALYSIS_WEB_BASE_URL: str = 'http://localhost:8080'
     ONTOLOGY_QUERY_REQUIRE_FILTERS: bool = True  # ontology 查询 API 必须携带过滤条件，防止全表扫描
+    MYSQL_METRIC_QUERY_PARALLELISM: int = 4  # max concurrent leaf queries of one metric query on MySQL bypass
 
 
 mf_settings = MetricFlowSettings()
@@ -22,6 +23,9 @@ def ask_analysis_web_base_url() -> str:
 
 def ask_ontology_query_require_filters() -> bool:
     return mf_settings.ONTOLOGY_QUERY_REQUIRE_FILTERS
+
+def ask_mysql_metric_query_parallelism() -> int:
+    return mf_settings.MYSQL_METRIC_QUERY_PARALLELISM
 #
 #
 # def ask_azure_api_base() -> str:
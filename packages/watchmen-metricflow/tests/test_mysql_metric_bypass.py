@@ -93,17 +93,19 @@ def _db_direct_resolver(key='node:localhost:3306:analytics', table_ref='raw:orde
     return resolver
 
 
-def _fake_execute(rows_by_label):
+def _fake_execute(rows_by_label, requests=None):
     def execute(ontology, request):
-        label = request.includeDerived[0]
-        return [dict(row) for row in rows_by_label.get(label, [])]
+        if requests is not None:
+            requests.append(request)
+        # a coalesced query returns rows of all its leaves
+        return [dict(row) for label in request.includeDerived for row in rows_by_label.get(label, [])]
     return execute
 
 
-def _run_metric(metric, metrics, models, rows_by_label, req, resolver=None):
+def _run_metric(metric, metrics, models, rows_by_label, req, resolver=None, requests=None):
     context = svc.resolve_mysql_context(metric, metrics, models, resolver or _mysql_resolver())
     assert context is not None
-    runner = svc.MySQLMetricQueryRunner(context, execute_leaf=_fake_execute(rows_by_label))
+    runner = svc.MySQLMetricQueryRunner(context, execute_leaf=_fake_execute(rows_by_label, requests))
     return runner.run(req)
 
 
@@ -368,6 +370,62 @@ class TestLeafTranslation(unittest.TestCase):
             svc.parse_where_filters('region = 1')
 
 
+# --------------------------------------------------------------------------- #
+# Leaf planning
+# --------------------------------------------------------------------------- #
+
+class TestLeafPlanning(unittest.TestCase):
+    def test_ratio_leaves_coalesced_into_one_query(self):
+        metric = _ratio_metric()
+        rows = {
+            'order_total': [{'region': 'a', 'order_total': 100}],
+            'order_count': [{'region': 'a', 'order_count': 4}],
+        }
+        requests = []
+        response = _run_metric(
+            metric, [metric], [_make_semantic_model()], rows,
+            MetricQueryRequest(metric='avg_order', group_by=['region']), requests=requests)
+        self.assertEqual(sorted(response.data), [('a', 25)])
+        self.assertEqual(len(requests), 1)
+        self.assertEqual(requests[0].includeDerived, ['order_total', 'order_count'])
+
+    def test_coalesced_query_renders_multiple_aggregates(self):
+        model = _make_semantic_model()
+        req = MetricQueryRequest(metric='avg_order', group_by=['region'])
+        specs = svc._parse_group_specs(req, _ratio_metric(), False)
+        leaves = [
+            svc._build_leaf(specs, req, model, model.get_measure_by_name(name), 'orders', [], [])
+            for name in ('order_total', 'order_count')]
+        self.assertEqual(leaves[0].coalesce_key(), leaves[1].coalesce_key())
+        ontology, request = svc._build_query(specs, leaves)
+        compiled = OntologySqlCompiler().compile(ontology, request, dialect_name='mysql')
+        sql = str(compiled.statement.compile(
+            dialect=mysql.dialect(), compile_kwargs={'literal_binds': True})).upper()
+        self.assertIn('SUM(', sql)
+        self.assertIn('COUNT(', sql)
+        self.assertEqual(sql.count('FROM TOPIC_ORDERS'), 1)
+
+    def test_identical_leaves_deduped_and_distinct_filters_split(self):
+        total = _simple_metric(name='total', measure='order_total')
+        apac = Metric(
+            name='apac', type='simple', filter="{{ Dimension('region') }} = 'APAC'",
+            type_params=MetricTypeParams(measure=MeasureReference(name='order_total')))
+        metric = Metric(
+            name='share', type='derived',
+            type_params=MetricTypeParams(
+                expr='apac / total + total * 0',
+                metrics=[MetricRef(name='apac'), MetricRef(name='total'), MetricRef(name='total', alias='again')]))
+        rows = {'order_total': [{'region': 'APAC', 'order_total': 50}]}
+        requests = []
+        response = _run_metric(
+            metric, [metric, total, apac], [_make_semantic_model()], rows,
+            MetricQueryRequest(metric='share', group_by=['region']), requests=requests)
+        self.assertEqual(sorted(response.data), [('APAC', 1.0)])
+        # total is fetched once, filtered apac leaf has its own query
+        self.assertEqual(len(requests), 2)
+        self.assertEqual(sorted(str(request.filters) for request in requests), ["{'region': 'APAC'}", '{}'])
+
+
 # --------------------------------------------------------------------------- #
 # Metric-type combination
 # --------------------------------------------------------------------------- #
@@ -20,3 +20,5 @@ class DeleteRowAction(DeleteTopicAction):
 
 class DeleteRowsAction(DeleteTopicAction):
 	type: DeleteTopicActionType = DeleteTopicActionType.DELETE_ROWS
+	# delete found rows chunk by chunk in one transaction, instead of one by one
+	bulk: bool = False
@@ -2,7 +2,9 @@ from .pipeline_monitor_log import MonitorAlarmAction, MonitorCopyToMemoryAction,
 	MonitorLogAction, MonitorLogActionId, MonitorLogStage, MonitorLogStatus, MonitorLogUnit, MonitorReadAction, \
 	MonitorWriteAction, MonitorWriteToExternalAction, PipelineMonitorLog, PipelineMonitorLogCriteria, \
 	PipelineMonitorLogId
+from .pipeline_monitor_log_rollup import PipelineMonitorLogRollup, PipelineMonitorLogRollupTier
 from .pipeline_monitor_pipelines import ask_pipeline_monitor_pipelines
 from .pipeline_monitor_topics import ask_pipeline_monitor_topics
-from .pipeline_trigger_data import PipelineTriggerData, PipelineTriggerDataWithPAT, PipelineTriggerResult, \
+from .pipeline_trigger_data import PipelineBatchTriggerData, PipelineBatchTriggerResult, \
+	PipelineBatchTriggerRowResult, PipelineTriggerData, PipelineTriggerDataWithPAT, PipelineTriggerResult, \
 	PipelineTriggerTraceId, TopicDataColumnNames
@@ -0,0 +1,43 @@
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Optional
+
+from watchmen_model.common import PipelineId, Storable, TenantId, TopicId
+from watchmen_utilities import ExtendedBaseModel
+
+
+class PipelineMonitorLogRollupTier(str, Enum):
+	MINUTE = 'minute',
+	HOUR = 'hour',
+	DAY = 'day'
+
+
+class PipelineMonitorLogRollup(ExtendedBaseModel, Storable):
+	"""
+	aggregates of pipeline monitor logs in one minute, hour or day.
+	minute rollups are appended, and compacted into hour and then day rollups when they are old enough.
+	multiple rollups of same pipeline and period are merged on read.
+	"""
+	rollupId: Optional[str] = None
+	tenantId: Optional[TenantId] = None
+	topicId: Optional[TopicId] = None
+	pipelineId: Optional[PipelineId] = None
+	tier: PipelineMonitorLogRollupTier = PipelineMonitorLogRollupTier.MINUTE
+	# start time of period, start time of monitor logs truncated to minute, hour or day by tier
+	minuteAt: Optional[datetime] = None
+	# built by backfill from existing monitor logs, otherwise written on the fly
+	backfilled: bool = False
+	totalCount: int = 0
+	doneCount: int = 0
+	errorCount: int = 0
+	ignoredCount: int = 0
+	# durations in milliseconds, only positive durations are counted
+	durationCount: int = 0
+	durationSum: int = 0
+	durationMin: Optional[int] = None
+	durationMax: Optional[int] = None
+	# serialized mergeable quantile sketch of durations
+	durationSketch: Optional[Dict[str, Any]] = None
+	insertCount: int = 0
+	updateCount: int = 0
+	deleteCount: int = 0
@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Any, Dict, TypeVar, Optional
+from typing import Any, Dict, List, TypeVar, Optional
 
 from watchmen_model.admin import PipelineTriggerType
 from watchmen_model.common import TenantId
@@ -35,6 +35,34 @@ class PipelineTriggerResult(ExtendedBaseModel):
 	logId: Optional[str] = None
 
 
+class PipelineBatchTriggerData(ExtendedBaseModel):
+	# topic name
+	code: Optional[str] = None
+	# rows of current data, all rows are triggered by same trigger type
+	data: Optional[List[Dict[str, Any]]] = None
+	triggerType: PipelineTriggerType = PipelineTriggerType.INSERT
+	# pass tenant id when use super admin
+	tenantId: Optional[TenantId] = None
+	# user given trace id, shared by all rows. typically leave it as none
+	traceId: Optional[PipelineTriggerTraceId] = None
+
+
+class PipelineBatchTriggerRowResult(ExtendedBaseModel):
+	# index of row in given batch
+	index: int = 0
+	success: bool = True
+	internalDataId: Optional[str] = None
+	error: Optional[str] = None
+
+
+class PipelineBatchTriggerResult(ExtendedBaseModel):
+	received: bool = True
+	traceId: Optional[PipelineTriggerTraceId] = None
+	succeeded: int = 0
+	failed: int = 0
+	results: List[PipelineBatchTriggerRowResult] = []
+
+
 class TopicDataColumnNames(str, Enum):
 	ID = 'id_',
 	RAW_TOPIC_DATA = 'data_',
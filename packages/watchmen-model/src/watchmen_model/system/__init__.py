@@ -1,4 +1,5 @@
 from .ai_model import AIModel
+from .cache_invalidation import CacheInvalidation, CacheInvalidationKind
 from .data_source import DataSource, DataSourceParam, DataSourceType
 from .external_writer import ExternalWriter, ExternalWriterType
 from .kafka_collector_config import KafkaCollectorConfig
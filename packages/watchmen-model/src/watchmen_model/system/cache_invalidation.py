@@ -0,0 +1,27 @@
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+
+from watchmen_utilities import ExtendedBaseModel
+
+from watchmen_model.common import Storable, TenantId
+
+
+class CacheInvalidationKind(str, Enum):
+	TOPIC = 'topic',
+	PIPELINE = 'pipeline',
+	DATA_SOURCE = 'data-source',
+	EXTERNAL_WRITER = 'external-writer',
+	TENANT = 'tenant',
+	# clear all caches, resource id is ignored
+	ALL = 'all'
+
+
+class CacheInvalidation(ExtendedBaseModel, Storable):
+	invalidationId: Optional[str] = None
+	kind: Optional[CacheInvalidationKind] = None
+	resourceId: Optional[str] = None
+	# node which publishes this invalidation, node ignores invalidations published by itself
+	origin: Optional[str] = None
+	tenantId: Optional[TenantId] = None
+	createdAt: Optional[datetime] = None
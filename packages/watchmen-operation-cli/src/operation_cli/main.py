@@ -118,6 +118,13 @@ def handle_pipeline_stats(args: argparse.Namespace) -> None:
 	))
 
 
+def handle_pipeline_rollup_backfill(args: argparse.Namespace) -> None:
+	run_with_service(args, lambda svc: svc.pipeline_rollup_backfill(
+		start_date=args.start_date,
+		end_date=args.end_date,
+	))
+
+
 def handle_ingest_events(args: argparse.Namespace) -> None:
 	run_with_service(args, lambda svc: svc.ingest_events(
 		page_number=args.page_number,
@@ -255,6 +262,13 @@ def register_pipeline_commands(subparsers: argparse._SubParsersAction) -> None:
 	add_vault_arg(stats)
 	stats.set_defaults(handler=handle_pipeline_stats)
 
+	backfill = create_subparser(pipeline_sub, 'rollup-backfill', 'Build pipeline monitor log rollups from existing logs (POST /pipeline/log/rollup/backfill)')
+	backfill.add_argument('--start-date', required=False, help='ISO datetime')
+	backfill.add_argument('--end-date', required=False, help='ISO datetime')
+	add_tenant_arg(backfill)
+	add_vault_arg(backfill)
+	backfill.set_defaults(handler=handle_pipeline_rollup_backfill)
+
 
 def register_ingest_commands(subparsers: argparse._SubParsersAction) -> None:
 	ingest_parser = create_subparser(subparsers, 'ingest', 'Ingest / collector error commands')
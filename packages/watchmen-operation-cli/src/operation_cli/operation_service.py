@@ -77,6 +77,21 @@ class OperationService:
 			payload['sampleSize'] = sample_size
 		return self.client.post_json('/pipeline/log/stats', payload=payload)
 
+	def pipeline_rollup_backfill(
+		self,
+		start_date: Optional[str] = None,
+		end_date: Optional[str] = None,
+	) -> Dict[str, Any]:
+		"""Build pipeline monitor log rollups from existing logs (POST /pipeline/log/rollup/backfill)."""
+		payload: Dict[str, Any] = {}
+		if self.tenant_id:
+			payload['tenantId'] = self.tenant_id
+		if start_date:
+			payload['startDate'] = start_date
+		if end_date:
+			payload['endDate'] = end_date
+		return self.client.post_json('/pipeline/log/rollup/backfill', payload=payload)
+
 	# ------------------------------------------------------------------
 	# Ingest / collector errors
 	# ------------------------------------------------------------------
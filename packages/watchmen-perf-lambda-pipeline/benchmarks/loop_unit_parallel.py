@@ -0,0 +1,186 @@
+"""Compare parallel loop unit paths of pipeline kernel, process pool vs dask vs threads.
+
+Compiled unit is a CPU-bound stand-in, compiling it burns --compile-ms, running one element
+burns --work-ms, no meta or topic storage is touched. Real code paths compile differently:
+thread and dask paths compile the unit for each element, process pool workers compile it once
+and cache it. Use --cache-compiled to cache compiled units on thread and dask paths as well,
+then only the distribution itself is compared.
+
+Requires watchmen-pipeline-kernel and its dependencies on PYTHONPATH, dask and distributed for dask.
+
+	python benchmarks/loop_unit_parallel.py --elements 10000 --workers 8
+	python benchmarks/loop_unit_parallel.py --elements 10000 --workers 8 --cache-compiled
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from functools import partial
+from typing import Any, Callable, Dict, List, Tuple
+
+from watchmen_auth import PrincipalService
+from watchmen_data_kernel.storage import TopicTrigger
+from watchmen_data_kernel.storage_bridge import now, PipelineVariables
+from watchmen_model.admin import Pipeline, PipelineStage, PipelineUnit, Topic, TopicKind, User, UserRole
+from watchmen_model.pipeline_kernel import MonitorLogStage, MonitorLogStatus, MonitorLogUnit
+from watchmen_pipeline_kernel.common.settings import settings as kernel_settings
+from watchmen_pipeline_kernel.pipeline_schema import distributed_compiled_unit
+from watchmen_pipeline_kernel.pipeline_schema.distributed_compiled_unit import DistributedUnitLoop, \
+	DistributedUnitLoopResult
+from watchmen_pipeline_kernel.topic import RuntimeTopicStorages
+
+LOOP_VARIABLE_NAME = 'items'
+
+
+def burn(milliseconds: float) -> None:
+	"""busy loop, holds gil as pure python code does"""
+	end = time.perf_counter() + milliseconds / 1000
+	while time.perf_counter() < end:
+		pass
+
+
+class FakeSchema:
+	# noinspection PyMethodMayBeStatic
+	def get_topic(self) -> Topic:
+		return Topic(topicId='1', name='fake', kind=TopicKind.BUSINESS)
+
+
+class FakeCompiledUnit:
+	compileMs: float = 0
+	workMs: float = 0
+
+	# noinspection PyUnusedLocal
+	def __init__(
+			self, pipeline: Pipeline, stage: PipelineStage, unit: PipelineUnit,
+			principal_service: PrincipalService):
+		burn(FakeCompiledUnit.compileMs)
+		self.unit = unit
+
+	# noinspection PyUnusedLocal
+	def run(
+			self, variables: PipelineVariables, new_pipeline, stage_monitor_log: MonitorLogStage,
+			storages, principal_service: PrincipalService) -> bool:
+		burn(FakeCompiledUnit.workMs)
+		value = variables.find(LOOP_VARIABLE_NAME)
+		stage_monitor_log.units.append(MonitorLogUnit(
+			unitId=self.unit.unitId, name=self.unit.name, status=MonitorLogStatus.DONE, startTime=now(),
+			spentInMills=0, loopVariableName=LOOP_VARIABLE_NAME, loopVariableValue=value, actions=[]))
+		new_pipeline(FakeSchema(), TopicTrigger(current={'value': value}))
+		return True
+
+
+def distribute_single_unit_cached(
+		pipeline: Pipeline, stage: PipelineStage, unit: PipelineUnit,
+		user: User, pipeline_variables: PipelineVariables):
+	"""same as distribute_single_unit, but compiled unit is cached as process pool workers do"""
+	principal_service = PrincipalService(user)
+	compiled_unit = distributed_compiled_unit.ask_worker_compiled_unit(pipeline, stage, unit, principal_service)
+	return distributed_compiled_unit.run_single_unit(
+		compiled_unit, pipeline_variables, RuntimeTopicStorages(principal_service), principal_service)
+
+
+def install_fakes(compile_ms: float, work_ms: float, cache_compiled: bool) -> None:
+	"""
+	runs in benchmark process, and in each worker process of process pool and dask,
+	workers are spawned, patches of benchmark process are not inherited.
+	"""
+	FakeCompiledUnit.compileMs = compile_ms
+	FakeCompiledUnit.workMs = work_ms
+	distributed_compiled_unit.CompiledSingleUnit = FakeCompiledUnit
+	distributed_compiled_unit.find_topic_schema = lambda topic_id, principal_service: FakeSchema()
+	if cache_compiled:
+		distributed_compiled_unit.distribute_single_unit = distribute_single_unit_cached
+
+
+def create_loop(elements: int) -> DistributedUnitLoop:
+	values = list(range(elements))
+	variables = PipelineVariables(None, {}, None)
+	variables.put(LOOP_VARIABLE_NAME, values)
+	return DistributedUnitLoop() \
+		.with_unit(
+			Pipeline(pipelineId='1', version=1, lastModifiedAt=now()), PipelineStage(stageId='1'),
+			PipelineUnit(unitId='1', name='loop')) \
+		.with_principal_service(
+			PrincipalService(User(userId='1', tenantId='1', name='imma-admin', role=UserRole.ADMIN))) \
+		.with_pipeline_variables(variables) \
+		.with_loop_variable_values(LOOP_VARIABLE_NAME, values)
+
+
+def run_process_pool(
+		loop: DistributedUnitLoop, args: argparse.Namespace) -> Tuple[float, DistributedUnitLoopResult]:
+	# install fakes instead of initializing meta storage, pool is warmed on first use, exclude it from measuring
+	distributed_compiled_unit.initialize_loop_worker = partial(
+		install_fakes, args.compile_ms, args.work_ms, args.cache_compiled)
+	distributed_compiled_unit.process_pool_holder.ask_executor()
+	return measure_loop(lambda: distributed_compiled_unit.process_pool_unit_loop(loop))
+
+
+def run_thread(loop: DistributedUnitLoop, args: argparse.Namespace) -> Tuple[float, DistributedUnitLoopResult]:
+	return measure_loop(lambda: distributed_compiled_unit.thread_unit_loop(loop))
+
+
+def run_dask(loop: DistributedUnitLoop, args: argparse.Namespace) -> Tuple[float, DistributedUnitLoopResult]:
+	# cluster is started on first use, exclude it from measuring
+	client = distributed_compiled_unit.dask_client_holder.ask_client()
+	client.run(install_fakes, args.compile_ms, args.work_ms, args.cache_compiled)
+	return measure_loop(lambda: distributed_compiled_unit.distribute_unit_loop(loop))
+
+
+def run_inline(loop: DistributedUnitLoop, args: argparse.Namespace) -> Tuple[float, DistributedUnitLoopResult]:
+	"""elements one by one in benchmark process, compiled once, what one process pool worker does"""
+	return measure_loop(lambda: DistributedUnitLoopResult(items=distributed_compiled_unit.run_loop_chunk(
+		loop.pipeline, loop.stage, loop.unit, distributed_compiled_unit.to_user(loop.principalService),
+		distributed_compiled_unit.to_chunk_variables(loop), loop.loopVariableName, loop.loopVariableValues)))
+
+
+MODES: Dict[str, Callable[[DistributedUnitLoop, argparse.Namespace], Tuple[float, DistributedUnitLoopResult]]] = {
+	'inline': run_inline,
+	'process': run_process_pool,
+	'thread': run_thread,
+	'dask': run_dask
+}
+
+
+def measure_loop(run: Callable[[], DistributedUnitLoopResult]) -> Tuple[float, DistributedUnitLoopResult]:
+	start = time.perf_counter()
+	result = run()
+	return time.perf_counter() - start, result
+
+
+def check(result: DistributedUnitLoopResult, elements: int) -> bool:
+	values: List[Any] = [item.log.loopVariableValue for item in result.items]
+	return values == list(range(elements)) and all(item.success for item in result.items)
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('--elements', type=int, default=10000)
+	parser.add_argument('--workers', type=int, default=8)
+	parser.add_argument('--chunk-size', type=int, default=100, help='elements sent to process pool by one task')
+	parser.add_argument('--compile-ms', type=float, default=5, help='cpu spent on compiling unit')
+	parser.add_argument('--work-ms', type=float, default=1.5, help='cpu spent on running one element')
+	parser.add_argument('--cache-compiled', action='store_true', help='cache compiled units on thread and dask paths')
+	parser.add_argument('--dask-threads', action='store_true', help='dask workers are threads, not processes')
+	parser.add_argument('--modes', default='inline,process,thread,dask')
+	args = parser.parse_args()
+
+	kernel_settings.PIPELINE_PARALLEL_ACTIONS_COUNT = args.workers
+	kernel_settings.PIPELINE_PARALLEL_ACTIONS_PROCESS_POOL_CHUNK_SIZE = args.chunk_size
+	kernel_settings.PIPELINE_PARALLEL_ACTIONS_DASK_USE_PROCESS = not args.dask_threads
+	install_fakes(args.compile_ms, args.work_ms, args.cache_compiled)
+
+	results = []
+	for mode in [x.strip() for x in args.modes.split(',') if x.strip()]:
+		spent, result = MODES[mode](create_loop(args.elements), args)
+		results.append((mode, spent, check(result, args.elements)))
+
+	print(
+		f'elements: {args.elements}, workers: {args.workers}, compile: {args.compile_ms}ms, '
+		f'work: {args.work_ms}ms, compiled cached on all paths: {args.cache_compiled}')
+	print(f'{"mode":<10}{"seconds":>10}{"elements/s":>12}{"ok":>6}')
+	for mode, spent, ok in results:
+		print(f'{mode:<10}{spent:>10.2f}{args.elements / spent:>12.0f}{str(ok):>6}')
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,147 @@
+"""Compare primary key diff of table extractor, all keys in numpy vs keyset pages.
+
+Source table and existed change records are SQLite stand-ins. Keys of existed change
+records are stored as json, values are strings as they are loaded from json.
+
+Requires watchmen-collector-surface and its dependencies on PYTHONPATH.
+
+	python benchmarks/table_extractor_diff.py --keys 1000000 --existed 0.3
+	python benchmarks/table_extractor_diff.py --keys 10000000 --existed 0.3 --skip-numpy
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from unittest.mock import patch
+
+import numpy as np
+
+from watchmen_collector_kernel.model import CollectorTableConfig
+from watchmen_collector_kernel.service.extract_utils import cal_array2d_diff
+from watchmen_collector_surface.cdc import table_extractor
+from watchmen_collector_surface.cdc.table_extractor import TableExtractor
+from watchmen_storage import EntityCriteriaJoint, EntityCriteriaJointConjunction, EntityCriteriaOperator
+
+CONFIG = CollectorTableConfig(configId='1', name='source', tableName='source', primaryKey=['a', 'b'], tenantId='1')
+SQL_OPERATORS = {EntityCriteriaOperator.EQUALS: '=', EntityCriteriaOperator.GREATER_THAN: '>'}
+
+
+def create_database(path: str, keys: int, existed: float) -> None:
+	connection = sqlite3.connect(path)
+	connection.execute('CREATE TABLE source (a INTEGER, b TEXT, PRIMARY KEY (a, b))')
+	connection.execute('CREATE TABLE change_records (change_record_id INTEGER PRIMARY KEY, data_id TEXT)')
+	connection.executemany(
+		'INSERT INTO source (a, b) VALUES (?, ?)', ((index // 10, f'{index % 10:02d}') for index in range(keys)))
+	step = max(int(1 / existed), 1) if existed > 0 else 0
+	if step != 0:
+		connection.executemany(
+			'INSERT INTO change_records (data_id) VALUES (?)',
+			((json.dumps({'a': str(index // 10), 'b': f'{index % 10:02d}'}),) for index in range(0, keys, step)))
+	connection.commit()
+	connection.close()
+
+
+def to_sql(statement: Any, params: List[Any]) -> str:
+	if isinstance(statement, EntityCriteriaJoint):
+		conjunction = ' OR ' if statement.conjunction == EntityCriteriaJointConjunction.OR else ' AND '
+		return '(' + conjunction.join(to_sql(child, params) for child in statement.children) + ')'
+	params.append(statement.right)
+	return f'{statement.left.columnName} {SQL_OPERATORS[statement.operator]} ?'
+
+
+class SqliteSourceExtractor:
+	def __init__(self, connection: sqlite3.Connection):
+		self.connection = connection
+
+	def find_limited_primary_keys_by_criteria(self, criteria: List[Any], limit: int) -> List[Dict[str, Any]]:
+		params: List[Any] = []
+		where = ' AND '.join(to_sql(statement, params) for statement in criteria) or '1 = 1'
+		rows = self.connection.execute(
+			f'SELECT a, b FROM source WHERE {where} ORDER BY a, b LIMIT {limit}', params).fetchall()
+		return [{'a': a, 'b': b} for a, b in rows]
+
+
+class SqliteChangeDataRecordService:
+	def __init__(self, connection: sqlite3.Connection):
+		self.connection = connection
+
+	def find_existed_records(self, table_trigger_id: int) -> List[Dict]:
+		return [json.loads(row[0]) for row in self.connection.execute('SELECT data_id FROM change_records')]
+
+	def find_existed_records_after(
+			self, table_trigger_id: int, change_record_id: Optional[int], limit: int) -> List[SimpleNamespace]:
+		rows = self.connection.execute(
+			'SELECT change_record_id, data_id FROM change_records WHERE change_record_id > ? '
+			f'ORDER BY change_record_id LIMIT {limit}', (change_record_id or 0,)).fetchall()
+		return [SimpleNamespace(changeRecordId=row[0], dataId=json.loads(row[1])) for row in rows]
+
+
+def diff_by_numpy(connection: sqlite3.Connection) -> int:
+	"""all source keys and existed keys in memory, diff by numpy, as extractor did before keyset pages"""
+	source_records = [{'a': a, 'b': b} for a, b in connection.execute('SELECT a, b FROM source')]
+	existed_records = SqliteChangeDataRecordService(connection).find_existed_records(0)
+	source_array = np.asarray([list(record.values()) for record in source_records])
+	if len(existed_records) == 0:
+		return len(source_array)
+	existed_array = np.asarray([list(record.values()) for record in existed_records])
+	return len(cal_array2d_diff(source_array, existed_array).tolist())
+
+
+def diff_by_pages(connection: sqlite3.Connection, page_size: int) -> int:
+	extractor = TableExtractor.__new__(TableExtractor)
+	extractor.change_data_record_service = SqliteChangeDataRecordService(connection)
+	with patch.object(table_extractor, 'ask_source_extractor', lambda config: SqliteSourceExtractor(connection)), \
+			patch.object(table_extractor, 'ask_extract_table_limit_size', lambda: page_size):
+		existed_keys = extractor.find_existed_keys(0, CONFIG)
+		try:
+			diffs = 0
+			for source_records in extractor.find_primary_key_pages([], CONFIG):
+				diffs = diffs + len(extractor.get_diff(source_records, existed_keys, CONFIG))
+			return diffs
+		finally:
+			existed_keys.close()
+
+
+def measure(name: str, run: Callable[[], int]) -> Tuple[str, float, float, int]:
+	tracemalloc.start()
+	start = time.perf_counter()
+	diffs = run()
+	spent = time.perf_counter() - start
+	_, peak = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	return name, spent, peak / 1024 / 1024, diffs
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('--keys', type=int, default=1000000)
+	parser.add_argument('--existed', type=float, default=0.3, help='ratio of keys which have change records')
+	parser.add_argument('--page-size', type=int, default=10000)
+	parser.add_argument('--skip-numpy', action='store_true', help='numpy diff of 10M keys needs several GB')
+	args = parser.parse_args()
+
+	with tempfile.TemporaryDirectory() as directory:
+		path = os.path.join(directory, 'stand-in.sqlite')
+		create_database(path, args.keys, args.existed)
+		connection = sqlite3.connect(path)
+		results = []
+		if not args.skip_numpy:
+			results.append(measure('numpy', lambda: diff_by_numpy(connection)))
+		results.append(measure('keyset pages', lambda: diff_by_pages(connection, args.page_size)))
+		connection.close()
+
+	print(f'keys: {args.keys}, existed ratio: {args.existed}, page size: {args.page_size}')
+	print(f'{"diff":<14}{"seconds":>10}{"peak MB":>10}{"diffs":>12}')
+	for name, spent, peak, diffs in results:
+		print(f'{name:<14}{spent:>10.2f}{peak:>10.1f}{diffs:>12}')
+
+
+if __name__ == '__main__':
+	main()
@@ -4,4 +4,14 @@ from .settings import ask_async_handle_monitor_log, ask_decrypt_factor_value, as
 	ask_pipeline_update_retry, ask_pipeline_update_retry_force, ask_pipeline_update_retry_interval, \
 	ask_pipeline_update_retry_times, ask_parallel_actions_dask_threads_per_work, \
 	ask_parallel_actions_use_multithreading, ask_pipeline_recursion_limit, ask_pipeline_error_handle_monitor_log, \
-	ask_standard_external_writer_timeout
+	ask_standard_external_writer_timeout, ask_pipeline_unit_of_work, ask_pipeline_unit_of_work_transactional, \
+	ask_pipeline_write_behind, ask_pipeline_write_behind_batch_size, \
+	ask_pipeline_batch_trigger_save_size, ask_pipeline_monitor_log_sink, ask_pipeline_monitor_log_sink_batch_size, \
+	ask_pipeline_monitor_log_sink_flush_interval, ask_pipeline_monitor_log_sink_queue_size, \
+	ask_topic_snapshot_copy_size, ask_topic_snapshot_task_page_size, ask_pipeline_monitor_log_rollup, \
+	ask_pipeline_monitor_log_rollup_flush_interval, ask_pipeline_monitor_log_rollup_backfill_page_size, \
+	ask_pipeline_monitor_log_rollup_compact_interval, ask_pipeline_monitor_log_rollup_compact_size, \
+	ask_pipeline_monitor_log_rollup_minute_tier_hours, ask_pipeline_monitor_log_rollup_hour_tier_days, \
+	ask_pipeline_bulk_delete_chunk_size, ask_pipeline_write_factor_increment, ask_parallel_actions_use_process_pool, \
+	ask_parallel_actions_process_pool_chunk_size, ask_pipeline_concurrent_dispatch, \
+	ask_pipeline_concurrent_dispatch_workers
@@ -14,6 +14,8 @@ class PipelineKernelSettings(ExtendedBaseSettings):
 	PIPELINE_PARALLEL_ACTIONS_DASK_THREADS_PER_WORK: int = 1
 	PIPELINE_PARALLEL_ACTIONS_DASK_TEMP_DIR: Optional[str] = None
 	PIPELINE_PARALLEL_ACTIONS_DASK_USE_PROCESS: bool = True
+	PIPELINE_PARALLEL_ACTIONS_USE_PROCESS_POOL: bool = False  # run loop elements on built-in process pool, not dask
+	PIPELINE_PARALLEL_ACTIONS_PROCESS_POOL_CHUNK_SIZE: int = 100  # loop elements sent to process pool by one task
 	PIPELINE_STANDARD_EXTERNAL_WRITER: bool = True
 	PIPELINE_ELASTIC_SEARCH_EXTERNAL_WRITER: bool = False
 	PIPELINE_UPDATE_RETRY: bool = True  # enable pipeline update retry if it is failed on optimistic lock
@@ -25,6 +27,28 @@ class PipelineKernelSettings(ExtendedBaseSettings):
 	QUERY_MONITOR_LOG: bool = False
 	PIPELINE_RECURSION_LIMIT: int = 900
 	PIPELINE_STANDARD_EXTERNAL_WRITER_TIMEOUT: int = 60
+	PIPELINE_UNIT_OF_WORK: bool = False  # share one connection per data source in whole dispatched pipelines
+	PIPELINE_UNIT_OF_WORK_TRANSACTIONAL: bool = False  # run unit of work in one transaction per data source
+	PIPELINE_WRITE_BEHIND: bool = False  # buffer insertions of insert row action, flush at stage end
+	PIPELINE_WRITE_BEHIND_BATCH_SIZE: int = 500  # flush buffered insertions of topic when reaches batch size
+	PIPELINE_BATCH_TRIGGER_SAVE_SIZE: int = 500  # rows saved by one statement when trigger pipelines in batch
+	PIPELINE_MONITOR_LOG_SINK: bool = False  # buffer monitor logs and write them in batch by background thread
+	PIPELINE_MONITOR_LOG_SINK_BATCH_SIZE: int = 200  # write buffered monitor logs when reaches batch size
+	PIPELINE_MONITOR_LOG_SINK_FLUSH_INTERVAL: int = 1000  # write buffered monitor logs interval in milliseconds
+	PIPELINE_MONITOR_LOG_SINK_QUEUE_SIZE: int = 10000  # max buffered monitor logs, drop when full
+	TOPIC_SNAPSHOT_COPY_SIZE: int = 1000  # rows copied from source topic to task topic by one statement
+	TOPIC_SNAPSHOT_TASK_PAGE_SIZE: int = 1000  # tasks fetched by one query when run topic snapshot tasks
+	PIPELINE_MONITOR_LOG_ROLLUP: bool = False  # roll monitor logs up per pipeline and minute, stats are read from rollups
+	PIPELINE_MONITOR_LOG_ROLLUP_FLUSH_INTERVAL: int = 30  # write accumulated rollups interval in seconds
+	PIPELINE_MONITOR_LOG_ROLLUP_BACKFILL_PAGE_SIZE: int = 1000  # monitor logs read by one query on backfill
+	PIPELINE_MONITOR_LOG_ROLLUP_COMPACT_INTERVAL: int = 600  # compact rollups into coarser tiers interval in seconds
+	PIPELINE_MONITOR_LOG_ROLLUP_COMPACT_SIZE: int = 5000  # max rollups compacted in one transaction
+	PIPELINE_MONITOR_LOG_ROLLUP_MINUTE_TIER_HOURS: int = 24  # minute rollups older than it are compacted into hours
+	PIPELINE_MONITOR_LOG_ROLLUP_HOUR_TIER_DAYS: int = 7  # hour rollups older than it are compacted into days
+	PIPELINE_BULK_DELETE_CHUNK_SIZE: int = 1000  # rows deleted by one statement when delete rows action is bulk
+	PIPELINE_WRITE_FACTOR_INCREMENT: bool = False  # sum/count of write factor computed in storage side when applicable
+	PIPELINE_CONCURRENT_DISPATCH: bool = False  # run triggered pipelines which access disjoint topics concurrently
+	PIPELINE_CONCURRENT_DISPATCH_WORKERS: int = 8  # max pipelines run concurrently in one dispatch
 
 
 settings = PipelineKernelSettings()
@@ -63,6 +87,14 @@ def ask_parallel_actions_dask_threads_per_work() -> int:
 	return settings.PIPELINE_PARALLEL_ACTIONS_DASK_THREADS_PER_WORK
 
 
+def ask_parallel_actions_use_process_pool() -> bool:
+	return settings.PIPELINE_PARALLEL_ACTIONS_USE_PROCESS_POOL
+
+
+def ask_parallel_actions_process_pool_chunk_size() -> int:
+	return settings.PIPELINE_PARALLEL_ACTIONS_PROCESS_POOL_CHUNK_SIZE
+
+
 def ask_standard_external_writer_enabled() -> bool:
 	return settings.PIPELINE_STANDARD_EXTERNAL_WRITER
 
@@ -104,4 +136,92 @@ def ask_pipeline_error_handle_monitor_log() -> bool:
 
 
 def ask_standard_external_writer_timeout() -> int:
-	return settings.PIPELINE_STANDARD_EXTERNAL_WRITER_TIMEOUT
\ No newline at end of file
+	return settings.PIPELINE_STANDARD_EXTERNAL_WRITER_TIMEOUT
+
+
+def ask_pipeline_unit_of_work() -> bool:
+	return settings.PIPELINE_UNIT_OF_WORK
+
+
+def ask_pipeline_unit_of_work_transactional() -> bool:
+	return settings.PIPELINE_UNIT_OF_WORK_TRANSACTIONAL
+
+
+def ask_pipeline_write_behind() -> bool:
+	return settings.PIPELINE_WRITE_BEHIND
+
+
+def ask_pipeline_write_behind_batch_size() -> int:
+	return settings.PIPELINE_WRITE_BEHIND_BATCH_SIZE
+
+
+def ask_pipeline_batch_trigger_save_size() -> int:
+	return settings.PIPELINE_BATCH_TRIGGER_SAVE_SIZE
+
+
+def ask_pipeline_monitor_log_sink() -> bool:
+	return settings.PIPELINE_MONITOR_LOG_SINK
+
+
+def ask_pipeline_monitor_log_sink_batch_size() -> int:
+	return settings.PIPELINE_MONITOR_LOG_SINK_BATCH_SIZE
+
+
+def ask_pipeline_monitor_log_sink_flush_interval() -> int:
+	return settings.PIPELINE_MONITOR_LOG_SINK_FLUSH_INTERVAL
+
+
+def ask_pipeline_monitor_log_sink_queue_size() -> int:
+	return settings.PIPELINE_MONITOR_LOG_SINK_QUEUE_SIZE
+
+
+def ask_topic_snapshot_copy_size() -> int:
+	return settings.TOPIC_SNAPSHOT_COPY_SIZE
+
+
+def ask_topic_snapshot_task_page_size() -> int:
+	return settings.TOPIC_SNAPSHOT_TASK_PAGE_SIZE
+
+
+def ask_pipeline_monitor_log_rollup() -> bool:
+	return settings.PIPELINE_MONITOR_LOG_ROLLUP
+
+
+def ask_pipeline_monitor_log_rollup_flush_interval() -> int:
+	return settings.PIPELINE_MONITOR_LOG_ROLLUP_FLUSH_INTERVAL
+
+
+def ask_pipeline_monitor_log_rollup_backfill_page_size() -> int:
+	return settings.PIPELINE_MONITOR_LOG_ROLLUP_BACKFILL_PAGE_SIZE
+
+
+def ask_pipeline_monitor_log_rollup_compact_interval() -> int:
+	return settings.PIPELINE_MONITOR_LOG_ROLLUP_COMPACT_INTERVAL
+
+
+def ask_pipeline_monitor_log_rollup_compact_size() -> int:
+	return settings.PIPELINE_MONITOR_LOG_ROLLUP_COMPACT_SIZE
+
+
+def ask_pipeline_monitor_log_rollup_minute_tier_hours() -> int:
+	return settings.PIPELINE_MONITOR_LOG_ROLLUP_MINUTE_TIER_HOURS
+
+
+def ask_pipeline_monitor_log_rollup_hour_tier_days() -> int:
+	return settings.PIPELINE_MONITOR_LOG_ROLLUP_HOUR_TIER_DAYS
+
+
+def ask_pipeline_bulk_delete_chunk_size() -> int:
+	return settings.PIPELINE_BULK_DELETE_CHUNK_SIZE
+
+
+def ask_pipeline_write_factor_increment() -> bool:
+	return settings.PIPELINE_WRITE_FACTOR_INCREMENT
+
+
+def ask_pipeline_concurrent_dispatch() -> bool:
+	return settings.PIPELINE_CONCURRENT_DISPATCH
+
+
+def ask_pipeline_concurrent_dispatch_workers() -> int:
+	return settings.PIPELINE_CONCURRENT_DISPATCH_WORKERS
@@ -1 +1,5 @@
+from .duration_sketch import DurationSketch
 from .monitor_log_data_service import PipelineMonitorLogDataService
+from .monitor_log_rollup import ask_monitor_log_rollup_writer, flush_monitor_log_rollups, merge_rollups, \
+	MonitorLogRollupBucket, MonitorLogRollupWriter
+from .monitor_log_rollup_data_service import PipelineMonitorLogRollupDataService
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from math import ceil, log
+from typing import Any, Dict, Optional
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+
+
+class DurationSketch:
+	"""
+	mergeable quantile sketch, in the way of DDSketch.
+	positive values are counted in logarithmic buckets, bucket i covers (gamma^(i-1), gamma^i],
+	any quantile is answered within given relative accuracy, and sketches are merged by adding bucket counts.
+	"""
+
+	def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+		self.relativeAccuracy = relative_accuracy
+		self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+		self.logGamma = log(self.gamma)
+		self.bins: Dict[int, int] = {}
+		# values which are less than or equal to 0
+		self.zeroCount = 0
+		self.count = 0
+
+	def key_of(self, value: float) -> int:
+		return int(ceil(log(value) / self.logGamma))
+
+	def value_of(self, key: int) -> float:
+		# middle of bucket, relative error to any value in bucket is at most relative accuracy
+		return 2 * (self.gamma ** key) / (self.gamma + 1)
+
+	def add(self, value: float, count: int = 1) -> None:
+		if count <= 0:
+			return
+		if value <= 0:
+			self.zeroCount = self.zeroCount + count
+		else:
+			key = self.key_of(value)
+			self.bins[key] = self.bins.get(key, 0) + count
+		self.count = self.count + count
+
+	def merge(self, another: DurationSketch) -> None:
+		if another.relativeAccuracy != self.relativeAccuracy:
+			raise ValueError(
+				f'Cannot merge sketch with relative accuracy[{another.relativeAccuracy}] '
+				f'into sketch with relative accuracy[{self.relativeAccuracy}].')
+		for key, count in another.bins.items():
+			self.bins[key] = self.bins.get(key, 0) + count
+		self.zeroCount = self.zeroCount + another.zeroCount
+		self.count = self.count + another.count
+
+	def quantile(self, q: float) -> Optional[float]:
+		"""
+		nearest rank quantile, q is in [0, 1]. returns none when sketch is empty.
+		"""
+		if self.count == 0:
+			return None
+		rank = max(1, int(ceil(min(max(q, 0), 1) * self.count)))
+		if rank <= self.zeroCount:
+			return 0
+		accumulated = self.zeroCount
+		for key in sorted(self.bins.keys()):
+			accumulated = accumulated + self.bins[key]
+			if accumulated >= rank:
+				return self.value_of(key)
+		return self.value_of(max(self.bins.keys()))
+
+	def to_dict(self) -> Dict[str, Any]:
+		return {
+			'accuracy': self.relativeAccuracy,
+			'zeroCount': self.zeroCount,
+			'bins': {str(key): count for key, count in self.bins.items()}
+		}
+
+	@staticmethod
+	def from_dict(data: Optional[Dict[str, Any]]) -> DurationSketch:
+		if data is None:
+			return DurationSketch()
+		sketch = DurationSketch(data.get('accuracy') or DEFAULT_RELATIVE_ACCURACY)
+		sketch.add(0, data.get('zeroCount') or 0)
+		for key, count in (data.get('bins') or {}).items():
+			sketch.bins[int(key)] = sketch.bins.get(int(key), 0) + count
+			sketch.count = sketch.count + count
+		return sketch
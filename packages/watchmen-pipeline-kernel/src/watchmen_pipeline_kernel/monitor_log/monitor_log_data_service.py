@@ -1,4 +1,5 @@
-from typing import Optional
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
 
 from watchmen_auth import PrincipalService
 from watchmen_data_kernel.common import ask_datetime_formats
@@ -9,8 +10,8 @@ from watchmen_model.common import DataPage, Pageable, TenantId, TopicId
 from watchmen_model.pipeline_kernel import PipelineMonitorLog, PipelineMonitorLogCriteria, TopicDataColumnNames
 from watchmen_pipeline_kernel.common import PipelineKernelException
 from watchmen_pipeline_kernel.topic import RuntimeTopicStorages
-from watchmen_storage import ColumnNameLiteral, EntityCriteriaExpression, EntityCriteriaOperator, EntitySortColumn, \
-	EntitySortMethod
+from watchmen_storage import ColumnNameLiteral, EntityCriteriaExpression, EntityCriteriaJoint, \
+	EntityCriteriaJointConjunction, EntityCriteriaOperator, EntitySortColumn, EntitySortMethod
 from watchmen_utilities import ArrayHelper, is_date, is_not_blank
 
 
@@ -113,6 +114,57 @@ class PipelineMonitorLogDataService:
 			.to_list()
 		return page
 
+	def find_by_start_time(
+			self, tenant_id: TenantId, start: Optional[datetime], end: Optional[datetime],
+			after: Optional[Tuple[datetime, int]], limit: int
+	) -> List[Tuple[Tuple[datetime, int], PipelineMonitorLog]]:
+		"""
+		find monitor logs which start in given range, in ascending order of start time and id.
+		keyset paging, returns logs after given start time and id, with their start time and id as next "after".
+		"""
+		schema = self.get_topic_schema()
+		storage = self.ask_storages().ask_topic_storage(schema)
+		data_service = ask_topic_data_service(schema, storage, self.principalService)
+
+		entity_criteria = [
+			EntityCriteriaExpression(
+				left=ColumnNameLiteral(columnName=TopicDataColumnNames.TENANT_ID.value), right=tenant_id)
+		]
+		if start is not None:
+			# noinspection SpellCheckingInspection
+			entity_criteria.append(EntityCriteriaExpression(
+				left=ColumnNameLiteral(columnName='starttime'),
+				operator=EntityCriteriaOperator.GREATER_THAN_OR_EQUALS, right=start))
+		if end is not None:
+			# noinspection SpellCheckingInspection
+			entity_criteria.append(EntityCriteriaExpression(
+				left=ColumnNameLiteral(columnName='starttime'), operator=EntityCriteriaOperator.LESS_THAN, right=end))
+		if after is not None:
+			after_start_time, after_id = after
+			# noinspection SpellCheckingInspection
+			entity_criteria.append(EntityCriteriaJoint(conjunction=EntityCriteriaJointConjunction.OR, children=[
+				EntityCriteriaExpression(
+					left=ColumnNameLiteral(columnName='starttime'),
+					operator=EntityCriteriaOperator.GREATER_THAN, right=after_start_time),
+				EntityCriteriaJoint(conjunction=EntityCriteriaJointConjunction.AND, children=[
+					EntityCriteriaExpression(left=ColumnNameLiteral(columnName='starttime'), right=after_start_time),
+					EntityCriteriaExpression(
+						left=ColumnNameLiteral(columnName=TopicDataColumnNames.ID.value),
+						operator=EntityCriteriaOperator.GREATER_THAN, right=after_id)
+				])
+			]))
+		# noinspection SpellCheckingInspection
+		rows = data_service.find_limited_values(entity_criteria, limit, [
+			EntitySortColumn(name='starttime', method=EntitySortMethod.ASC),
+			EntitySortColumn(name=TopicDataColumnNames.ID.value, method=EntitySortMethod.ASC)
+		])
+
+		def to_log(row: Dict[str, Any]) -> Tuple[Tuple[datetime, int], PipelineMonitorLog]:
+			monitor_log = PipelineMonitorLog(**row.get(TopicDataColumnNames.RAW_TOPIC_DATA.value))
+			return (monitor_log.startTime, row.get(TopicDataColumnNames.ID.value)), monitor_log
+
+		return ArrayHelper(rows).map(to_log).to_list()
+
 	def find_error_log_with_uid(self, uid: str) -> PipelineMonitorLog:
 		schema = self.get_topic_schema()
 		storage = self.ask_storages().ask_topic_storage(schema)
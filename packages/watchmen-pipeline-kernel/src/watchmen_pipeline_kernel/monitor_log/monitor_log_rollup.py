@@ -0,0 +1,329 @@
+from datetime import datetime, timedelta
+from logging import getLogger
+from threading import Lock, Thread
+from time import monotonic, sleep
+from typing import Dict, List, Optional, Tuple
+
+from watchmen_meta.common import ask_meta_storage, ask_snowflake_generator
+from watchmen_meta.system import PipelineMonitorLogRollupService
+from watchmen_model.common import PipelineId, TenantId, TopicId
+from watchmen_model.pipeline_kernel import MonitorLogStatus, PipelineMonitorLog, PipelineMonitorLogRollup, \
+	PipelineMonitorLogRollupTier
+from watchmen_pipeline_kernel.common import ask_pipeline_monitor_log_rollup_compact_interval, \
+	ask_pipeline_monitor_log_rollup_compact_size, ask_pipeline_monitor_log_rollup_flush_interval, \
+	ask_pipeline_monitor_log_rollup_hour_tier_days, ask_pipeline_monitor_log_rollup_minute_tier_hours
+from watchmen_utilities import ArrayHelper, get_current_time_in_seconds
+from .duration_sketch import DurationSketch
+
+logger = getLogger(__name__)
+
+RollupKey = Tuple[TenantId, Optional[TopicId], Optional[PipelineId], datetime]
+# rollup key with backfilled flag, rollups built by backfill are not merged with rollups written on the fly
+CompactKey = Tuple[TenantId, Optional[TopicId], Optional[PipelineId], bool, datetime]
+
+
+def as_minute(moment: Optional[datetime]) -> datetime:
+	if moment is None:
+		moment = get_current_time_in_seconds()
+	return moment.replace(second=0, microsecond=0)
+
+
+def as_period(moment: datetime, tier: PipelineMonitorLogRollupTier) -> datetime:
+	"""
+	truncate to start of minute, hour or day
+	"""
+	if tier == PipelineMonitorLogRollupTier.DAY:
+		return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+	elif tier == PipelineMonitorLogRollupTier.HOUR:
+		return moment.replace(minute=0, second=0, microsecond=0)
+	else:
+		return as_minute(moment)
+
+
+class MonitorLogRollupBucket:
+	"""
+	aggregates of monitor logs, buckets are merged by adding aggregates and sketches.
+	"""
+
+	def __init__(self):
+		self.totalCount = 0
+		self.doneCount = 0
+		self.errorCount = 0
+		self.ignoredCount = 0
+		self.durationCount = 0
+		self.durationSum = 0
+		self.durationMin: Optional[int] = None
+		self.durationMax: Optional[int] = None
+		self.durationSketch = DurationSketch()
+		self.insertCount = 0
+		self.updateCount = 0
+		self.deleteCount = 0
+
+	def add_duration(self, duration: int) -> None:
+		self.durationCount = self.durationCount + 1
+		self.durationSum = self.durationSum + duration
+		self.durationMin = duration if self.durationMin is None else min(self.durationMin, duration)
+		self.durationMax = duration if self.durationMax is None else max(self.durationMax, duration)
+		self.durationSketch.add(duration)
+
+	def add(self, monitor_log: PipelineMonitorLog) -> None:
+		self.totalCount = self.totalCount + 1
+		if monitor_log.status == MonitorLogStatus.DONE:
+			self.doneCount = self.doneCount + 1
+		elif monitor_log.status == MonitorLogStatus.ERROR:
+			self.errorCount = self.errorCount + 1
+		elif monitor_log.status == MonitorLogStatus.IGNORED:
+			self.ignoredCount = self.ignoredCount + 1
+		if monitor_log.spentInMills is not None and monitor_log.spentInMills > 0:
+			self.add_duration(monitor_log.spentInMills)
+		for stage in monitor_log.stages or []:
+			for unit in stage.units or []:
+				for action in unit.actions or []:
+					self.insertCount = self.insertCount + (action.insertCount or 0)
+					self.updateCount = self.updateCount + (action.updateCount or 0)
+					self.deleteCount = self.deleteCount + (action.deleteCount or 0)
+
+	def merge(self, rollup: PipelineMonitorLogRollup) -> None:
+		self.totalCount = self.totalCount + rollup.totalCount
+		self.doneCount = self.doneCount + rollup.doneCount
+		self.errorCount = self.errorCount + rollup.errorCount
+		self.ignoredCount = self.ignoredCount + rollup.ignoredCount
+		self.durationCount = self.durationCount + rollup.durationCount
+		self.durationSum = self.durationSum + rollup.durationSum
+		if rollup.durationMin is not None:
+			self.durationMin = rollup.durationMin if self.durationMin is None \
+				else min(self.durationMin, rollup.durationMin)
+		if rollup.durationMax is not None:
+			self.durationMax = rollup.durationMax if self.durationMax is None \
+				else max(self.durationMax, rollup.durationMax)
+		self.durationSketch.merge(DurationSketch.from_dict(rollup.durationSketch))
+		self.insertCount = self.insertCount + rollup.insertCount
+		self.updateCount = self.updateCount + rollup.updateCount
+		self.deleteCount = self.deleteCount + rollup.deleteCount
+
+	def to_rollup(
+			self, key: RollupKey, tier: PipelineMonitorLogRollupTier = PipelineMonitorLogRollupTier.MINUTE,
+			backfilled: bool = False) -> PipelineMonitorLogRollup:
+		tenant_id, topic_id, pipeline_id, minute_at = key
+		return PipelineMonitorLogRollup(
+			tenantId=tenant_id, topicId=topic_id, pipelineId=pipeline_id,
+			tier=tier, minuteAt=minute_at, backfilled=backfilled,
+			totalCount=self.totalCount, doneCount=self.doneCount,
+			errorCount=self.errorCount, ignoredCount=self.ignoredCount,
+			durationCount=self.durationCount, durationSum=self.durationSum,
+			durationMin=self.durationMin, durationMax=self.durationMax,
+			durationSketch=self.durationSketch.to_dict(),
+			insertCount=self.insertCount, updateCount=self.updateCount, deleteCount=self.deleteCount
+		)
+
+
+def ask_rollup_key(monitor_log: PipelineMonitorLog, tenant_id: TenantId) -> RollupKey:
+	return tenant_id, monitor_log.topicId, monitor_log.pipelineId, as_minute(monitor_log.startTime)
+
+
+def roll_up(
+		buckets: Dict[RollupKey, MonitorLogRollupBucket], monitor_log: PipelineMonitorLog,
+		tenant_id: TenantId) -> None:
+	key = ask_rollup_key(monitor_log, tenant_id)
+	bucket = buckets.get(key)
+	if bucket is None:
+		bucket = MonitorLogRollupBucket()
+		buckets[key] = bucket
+	bucket.add(monitor_log)
+
+
+def merge_rollups(rollups: List[PipelineMonitorLogRollup]) -> MonitorLogRollupBucket:
+	bucket = MonitorLogRollupBucket()
+	ArrayHelper(rollups).each(lambda x: bucket.merge(x))
+	return bucket
+
+
+def ask_rollup_service() -> PipelineMonitorLogRollupService:
+	# noinspection PyTypeChecker
+	return PipelineMonitorLogRollupService(ask_meta_storage()).with_snowflake_generator(ask_snowflake_generator())
+
+
+def save_rollups(buckets: Dict[RollupKey, MonitorLogRollupBucket]) -> None:
+	if len(buckets) == 0:
+		return
+	service = ask_rollup_service()
+	service.begin_transaction()
+	try:
+		service.create_all(ArrayHelper(list(buckets.items())).map(lambda x: x[1].to_rollup(x[0])).to_list())
+		service.commit_transaction()
+	except Exception as e:
+		service.rollback_transaction()
+		raise e
+
+
+def ask_compact_key(rollup: PipelineMonitorLogRollup, tier: PipelineMonitorLogRollupTier) -> CompactKey:
+	return rollup.tenantId, rollup.topicId, rollup.pipelineId, rollup.backfilled, as_period(rollup.minuteAt, tier)
+
+
+def roll_into(
+		buckets: Dict[CompactKey, MonitorLogRollupBucket], rollup: PipelineMonitorLogRollup,
+		tier: PipelineMonitorLogRollupTier) -> None:
+	key = ask_compact_key(rollup, tier)
+	bucket = buckets.get(key)
+	if bucket is None:
+		bucket = MonitorLogRollupBucket()
+		buckets[key] = bucket
+	bucket.merge(rollup)
+
+
+def compact_tier(
+		service: PipelineMonitorLogRollupService,
+		source_tier: PipelineMonitorLogRollupTier, target_tier: PipelineMonitorLogRollupTier,
+		before: datetime, limit: int) -> int:
+	"""
+	compact at most given limit rollups of source tier which start before given time into target tier,
+	existing target rollups of same pipelines and periods are merged as well.
+	returns count of compacted source rollups.
+	rollups are deleted by ids, if any of them is gone, it is compacted by another node, nothing is changed.
+	"""
+	service.begin_transaction()
+	try:
+		sources = service.find_by_tier(source_tier, None, before, limit)
+		if len(sources) == 0:
+			service.commit_transaction()
+			return 0
+		buckets: Dict[CompactKey, MonitorLogRollupBucket] = {}
+		ArrayHelper(sources).each(lambda x: roll_into(buckets, x, target_tier))
+		targets = ArrayHelper(service.find_by_tier(
+			target_tier, as_period(sources[0].minuteAt, target_tier),
+			as_period(sources[-1].minuteAt, target_tier) + timedelta(seconds=1))) \
+			.filter(lambda x: ask_compact_key(x, target_tier) in buckets).to_list()
+		ArrayHelper(targets).each(lambda x: roll_into(buckets, x, target_tier))
+
+		rollup_ids = ArrayHelper([*sources, *targets]).map(lambda x: x.rollupId).to_list()
+		deleted_count = service.delete_by_ids(rollup_ids)
+		if deleted_count != len(rollup_ids):
+			service.rollback_transaction()
+			logger.info(
+				f'Monitor log rollups of tier[{source_tier}] are compacted by others, '
+				f'{deleted_count} of {len(rollup_ids)} deleted.')
+			return 0
+		service.create_all(ArrayHelper(list(buckets.items())).map(
+			lambda x: x[1].to_rollup((x[0][0], x[0][1], x[0][2], x[0][4]), target_tier, x[0][3])).to_list())
+		service.commit_transaction()
+		return len(sources)
+	except Exception as e:
+		service.rollback_transaction()
+		raise e
+
+
+def compact_rollups(now: Optional[datetime] = None) -> int:
+	"""
+	minute rollups older than minute tier hours are compacted into hours,
+	hour rollups older than hour tier days are compacted into days.
+	returns count of compacted rollups.
+	"""
+	if now is None:
+		now = get_current_time_in_seconds()
+	limit = max(ask_pipeline_monitor_log_rollup_compact_size(), 1)
+	service = ask_rollup_service()
+	count = 0
+	for source_tier, target_tier, before in [
+		(
+				PipelineMonitorLogRollupTier.MINUTE, PipelineMonitorLogRollupTier.HOUR,
+				as_period(
+					now - timedelta(hours=ask_pipeline_monitor_log_rollup_minute_tier_hours()),
+					PipelineMonitorLogRollupTier.HOUR)
+		),
+		(
+				PipelineMonitorLogRollupTier.HOUR, PipelineMonitorLogRollupTier.DAY,
+				as_period(
+					now - timedelta(days=ask_pipeline_monitor_log_rollup_hour_tier_days()),
+					PipelineMonitorLogRollupTier.DAY)
+		)
+	]:
+		while True:
+			compacted_count = compact_tier(service, source_tier, target_tier, before, limit)
+			count = count + compacted_count
+			if compacted_count < limit:
+				break
+	return count
+
+
+class MonitorLogRollupWriter:
+	"""
+	accumulate rollups in memory, a background thread appends them to meta storage every flush interval.
+	each flush writes at most one row per pipeline and minute, stats merge all rows on read.
+	the same thread compacts old rollups into coarser tiers every compact interval.
+	"""
+
+	def __init__(self, flush_interval: int, compact_interval: int):
+		# in seconds
+		self.flushInterval = max(flush_interval, 1)
+		self.compactInterval = max(compact_interval, 1)
+		self.lastCompactAt: Optional[float] = None
+		self.buckets: Dict[RollupKey, MonitorLogRollupBucket] = {}
+		self.lock = Lock()
+		self.flusher: Optional[Thread] = None
+
+	def start(self) -> None:
+		if self.flusher is not None:
+			return
+		with self.lock:
+			if self.flusher is None:
+				self.flusher = Thread(target=MonitorLogRollupWriter.run, args=(self,), daemon=True)
+				self.flusher.start()
+
+	def accept(self, monitor_log: PipelineMonitorLog, tenant_id: TenantId) -> None:
+		self.start()
+		with self.lock:
+			roll_up(self.buckets, monitor_log, tenant_id)
+
+	def run(self) -> None:
+		while True:
+			sleep(self.flushInterval)
+			self.flush()
+			self.try_to_compact()
+
+	def try_to_compact(self) -> None:
+		now = monotonic()
+		if self.lastCompactAt is not None and now - self.lastCompactAt < self.compactInterval:
+			return
+		self.lastCompactAt = now
+		try:
+			compact_rollups()
+		except Exception as e:
+			logger.error('Failed to compact monitor log rollups.', exc_info=e)
+
+	def flush(self) -> None:
+		with self.lock:
+			buckets = self.buckets
+			self.buckets = {}
+		try:
+			save_rollups(buckets)
+		except Exception as e:
+			logger.error(f'Failed to write {len(buckets)} monitor log rollup(s), put back to retry.', exc_info=e)
+			with self.lock:
+				for key, bucket in buckets.items():
+					existing = self.buckets.get(key)
+					if existing is None:
+						self.buckets[key] = bucket
+					else:
+						existing.merge(bucket.to_rollup(key))
+
+
+rollup_writer_lock = Lock()
+rollup_writer: Optional[MonitorLogRollupWriter] = None
+
+
+def ask_monitor_log_rollup_writer() -> MonitorLogRollupWriter:
+	global rollup_writer
+	if rollup_writer is None:
+		with rollup_writer_lock:
+			if rollup_writer is None:
+				rollup_writer = MonitorLogRollupWriter(
+					ask_pipeline_monitor_log_rollup_flush_interval(), ask_pipeline_monitor_log_rollup_compact_interval())
+	return rollup_writer
+
+
+def flush_monitor_log_rollups() -> None:
+	"""
+	write accumulated rollups when writer is created
+	"""
+	if rollup_writer is not None:
+		rollup_writer.flush()
@@ -0,0 +1,127 @@
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from watchmen_auth import PrincipalService
+from watchmen_meta.system import PipelineMonitorLogRollupService
+from watchmen_model.common import PipelineId, TenantId, TopicId
+from watchmen_model.pipeline_kernel import PipelineMonitorLogRollupTier
+from watchmen_pipeline_kernel.common import ask_pipeline_monitor_log_rollup, \
+	ask_pipeline_monitor_log_rollup_backfill_page_size, PipelineKernelException
+from watchmen_utilities import ArrayHelper, get_current_time_in_seconds
+from .monitor_log_data_service import PipelineMonitorLogDataService
+from .monitor_log_rollup import as_minute, as_period, ask_rollup_service, merge_rollups, MonitorLogRollupBucket, \
+	roll_up, RollupKey
+
+ROLLUP_SAVE_SIZE = 1000
+
+
+def as_next_day(moment: datetime) -> datetime:
+	day = as_period(moment, PipelineMonitorLogRollupTier.DAY)
+	return day if day == moment else day + timedelta(days=1)
+
+
+def as_next_minute(moment: datetime) -> datetime:
+	minute = as_minute(moment)
+	return minute if minute == moment else minute + timedelta(minutes=1)
+
+
+class PipelineMonitorLogRollupDataService:
+	def __init__(self, principal_service: PrincipalService):
+		self.principalService = principal_service
+
+	# noinspection PyMethodMayBeStatic
+	def ask_rollup_service(self) -> PipelineMonitorLogRollupService:
+		return ask_rollup_service()
+
+	# noinspection PyMethodMayBeStatic
+	def ask_log_service(self, principal_service: PrincipalService) -> PipelineMonitorLogDataService:
+		return PipelineMonitorLogDataService(principal_service)
+
+	def find_stats(
+			self, topic_id: Optional[TopicId], pipeline_id: Optional[PipelineId],
+			start: Optional[datetime], end: Optional[datetime]) -> MonitorLogRollupBucket:
+		"""
+		merge rollups of periods which given range touches, both start and end are included.
+		old minutes are compacted into hours and days, each period is read from the tier it is compacted into,
+		therefore start of range is extended to whole hour or day when it falls in a compacted period.
+		"""
+		end_at = None if end is None else as_minute(end) + timedelta(minutes=1)
+		periods = ArrayHelper([
+			PipelineMonitorLogRollupTier.MINUTE, PipelineMonitorLogRollupTier.HOUR, PipelineMonitorLogRollupTier.DAY
+		]).map(lambda x: (x, None if start is None else as_period(start, x), end_at)).to_list()
+		service = self.ask_rollup_service()
+		service.begin_transaction()
+		try:
+			rollups = service.find(self.principalService.get_tenant_id(), topic_id, pipeline_id, periods)
+		finally:
+			service.close_transaction()
+		return merge_rollups(rollups)
+
+	# noinspection PyMethodMayBeStatic
+	def ask_on_the_fly_start(self, service: PipelineMonitorLogRollupService, tenant_id: TenantId) -> datetime:
+		"""
+		returns the time since when rollups are written on the fly, in transaction of given service
+		"""
+		earliest = service.find_earliest_on_the_fly(tenant_id)
+		if earliest is not None:
+			return earliest.minuteAt
+		if ask_pipeline_monitor_log_rollup():
+			raise PipelineKernelException(
+				'Monitor log rollups are written on the fly, but none is flushed yet, backfill later.')
+		# not written on the fly, logs are rolled up till now
+		return as_minute(get_current_time_in_seconds())
+
+	def backfill(self, start: Optional[datetime], end: Optional[datetime]) -> int:
+		"""
+		build rollups from existing monitor logs which start in given range.
+		logs which are rolled up on the fly are never backfilled, otherwise they are counted twice,
+		range ends after the earliest rollup written on the fly is refused.
+		range is extended to whole days, but never over the earliest rollup written on the fly.
+		rollups built by previous backfill in range are replaced, rollups written on the fly are not touched.
+		returns count of monitor logs rolled up.
+		"""
+		tenant_id = self.principalService.get_tenant_id()
+		service = self.ask_rollup_service()
+		service.begin_transaction()
+		try:
+			on_the_fly_start = self.ask_on_the_fly_start(service, tenant_id)
+		finally:
+			service.close_transaction()
+		if end is not None and as_next_minute(end) > on_the_fly_start:
+			raise PipelineKernelException(
+				f'Backfill range must end before [{on_the_fly_start}], '
+				f'since when monitor log rollups are written on the fly.')
+		start = None if start is None else as_period(start, PipelineMonitorLogRollupTier.DAY)
+		end = on_the_fly_start if end is None else min(as_next_day(end), on_the_fly_start)
+
+		buckets: Dict[RollupKey, MonitorLogRollupBucket] = {}
+		log_service = self.ask_log_service(self.principalService)
+		page_size = max(ask_pipeline_monitor_log_rollup_backfill_page_size(), 1)
+		after = None
+		count = 0
+		while True:
+			# keyset paging, logs written during backfill do not shift pages
+			logs = log_service.find_by_start_time(tenant_id, start, end, after, page_size)
+			ArrayHelper(logs).each(lambda x: roll_up(buckets, x[1], tenant_id))
+			count = count + len(logs)
+			if len(logs) < page_size:
+				break
+			after = logs[-1][0]
+
+		service.begin_transaction()
+		try:
+			# check again, rollups of logs in range might be written on the fly during backfill
+			on_the_fly_start = self.ask_on_the_fly_start(service, tenant_id)
+			if on_the_fly_start < end:
+				raise PipelineKernelException(
+					f'Monitor log rollups are written on the fly since [{on_the_fly_start}] during backfill, '
+					f'backfill range must end before it.')
+			service.delete_backfilled(tenant_id, start, end)
+			rollups = ArrayHelper(list(buckets.items())) \
+				.map(lambda x: x[1].to_rollup(x[0], PipelineMonitorLogRollupTier.MINUTE, True)).to_list()
+			ArrayHelper(rollups).chunk(ROLLUP_SAVE_SIZE).each(lambda x: service.create_all(x))
+			service.commit_transaction()
+		except Exception as e:
+			service.rollback_transaction()
+			raise e
+		return count
@@ -7,8 +7,11 @@ from watchmen_data_kernel.meta import TopicService
 from watchmen_data_kernel.topic_schema import TopicSchema
 from watchmen_model.admin import PipelineTriggerType, TopicKind
 from watchmen_model.pipeline_kernel import PipelineMonitorLog, PipelineTriggerTraceId, MonitorLogStatus
-from watchmen_pipeline_kernel.common import PipelineKernelException, ask_pipeline_error_handle_monitor_log
+from watchmen_pipeline_kernel.common import PipelineKernelException, ask_pipeline_error_handle_monitor_log, \
+	ask_pipeline_monitor_log_rollup, ask_pipeline_monitor_log_sink
+from watchmen_pipeline_kernel.monitor_log import ask_monitor_log_rollup_writer
 from watchmen_utilities import run
+from .monitor_log_sink import ask_monitor_log_sink
 from .pipeline_trigger import PipelineTrigger
 
 logger = getLogger(__name__)
@@ -27,29 +30,36 @@ def find_topic_schema(name: str, principal_service: PrincipalService) -> TopicSc
 	return schema
 
 
-def create_monitor_log_pipeline_invoker(
-		trace_id: PipelineTriggerTraceId, principal_service: PrincipalService
-) -> Callable[[PipelineMonitorLog, bool], None]:
-
-	def is_logging_required(monitor_log: PipelineMonitorLog) -> bool:
-		if ask_pipeline_error_handle_monitor_log():
-			if monitor_log.status == MonitorLogStatus.ERROR:
-				return True
-			else:
-				return False
+def is_logging_required(monitor_log: PipelineMonitorLog, principal_service: PrincipalService) -> bool:
+	if ask_pipeline_error_handle_monitor_log():
+		if monitor_log.status == MonitorLogStatus.ERROR:
+			return True
+		else:
+			return False
 
-		topic_service = get_topic_service(principal_service)
-		topic = topic_service.find_by_id(monitor_log.topicId)
-		if topic is None:
+	topic_service = get_topic_service(principal_service)
+	topic = topic_service.find_by_id(monitor_log.topicId)
+	if topic is None:
+		return False
+	else:
+		if topic.kind == TopicKind.SYSTEM:
 			return False
 		else:
-			if topic.kind == TopicKind.SYSTEM:
-				return False
-			else:
-				return True
+			return True
+
+
+def create_monitor_log_pipeline_invoker(
+		trace_id: PipelineTriggerTraceId, principal_service: PrincipalService
+) -> Callable[[PipelineMonitorLog, bool], None]:
 
 	def handle_monitor_log(monitor_log: PipelineMonitorLog, asynchronized: bool) -> None:
-		if is_logging_required(monitor_log):
+		if is_logging_required(monitor_log, principal_service):
+			if ask_pipeline_monitor_log_rollup():
+				ask_monitor_log_rollup_writer().accept(monitor_log, principal_service.get_tenant_id())
+			if ask_pipeline_monitor_log_sink():
+				# buffered, written and triggered in batch by sink
+				ask_monitor_log_sink().accept(monitor_log, trace_id, principal_service)
+				return
 			schema = find_topic_schema('raw_pipeline_monitor_log', principal_service)
 			trigger = PipelineTrigger(
 				trigger_topic_schema=schema,
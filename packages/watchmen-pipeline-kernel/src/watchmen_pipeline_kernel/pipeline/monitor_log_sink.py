@@ -0,0 +1,189 @@
+import atexit
+from logging import getLogger
+from queue import Empty, Full, Queue
+from threading import Lock, Thread
+from time import monotonic
+from typing import Callable, Dict, List, Optional
+
+from watchmen_auth import PrincipalService
+from watchmen_data_kernel.meta import TopicService
+from watchmen_data_kernel.topic_schema import TopicSchema
+from watchmen_model.admin import PipelineTriggerType
+from watchmen_model.common import TenantId
+from watchmen_model.pipeline_kernel import PipelineMonitorLog, PipelineTriggerTraceId
+from watchmen_pipeline_kernel.common import ask_pipeline_monitor_log_rollup, \
+	ask_pipeline_monitor_log_sink_batch_size, ask_pipeline_monitor_log_sink_flush_interval, \
+	ask_pipeline_monitor_log_sink_queue_size, PipelineKernelException
+from watchmen_pipeline_kernel.monitor_log import ask_monitor_log_rollup_writer, flush_monitor_log_rollups
+from watchmen_utilities import ArrayHelper
+from .pipeline_batch_trigger import PipelineBatchTrigger
+
+logger = getLogger(__name__)
+
+MONITOR_LOG_TOPIC_NAME = 'raw_pipeline_monitor_log'
+
+
+class BufferedMonitorLog:
+	def __init__(
+			self, monitor_log: PipelineMonitorLog, trace_id: PipelineTriggerTraceId,
+			principal_service: PrincipalService):
+		self.monitorLog = monitor_log
+		self.traceId = trace_id
+		self.principalService = principal_service
+
+
+class MonitorLogSink:
+	"""
+	buffer monitor logs in a bounded queue, a background thread writes them in bulk every batch size rows
+	or flush interval milliseconds, whichever comes first.
+	pipelines on monitor log topic are triggered in batch as well.
+	"""
+
+	def __init__(self, batch_size: int, flush_interval: int, queue_size: int):
+		self.batchSize = max(batch_size, 1)
+		# in seconds
+		self.flushInterval = max(flush_interval, 1) / 1000
+		self.queue: Queue = Queue(maxsize=max(queue_size, 1))
+		self.lock = Lock()
+		self.flusher: Optional[Thread] = None
+
+	def start(self) -> None:
+		if self.flusher is not None:
+			return
+		with self.lock:
+			if self.flusher is None:
+				self.flusher = Thread(target=MonitorLogSink.run, args=(self,), daemon=True)
+				self.flusher.start()
+
+	def accept(
+			self, monitor_log: PipelineMonitorLog, trace_id: PipelineTriggerTraceId,
+			principal_service: PrincipalService) -> bool:
+		"""
+		returns false when queue is still full after waiting for one flush interval, monitor log is dropped.
+		"""
+		self.start()
+		try:
+			self.queue.put(BufferedMonitorLog(monitor_log, trace_id, principal_service), timeout=self.flushInterval)
+			return True
+		except Full:
+			logger.error(
+				f'Monitor log sink is full, monitor log[traceId={trace_id}, pipelineId={monitor_log.pipelineId}, '
+				f'dataId={monitor_log.dataId}] dropped.')
+			return False
+
+	def take(self) -> List[BufferedMonitorLog]:
+		"""
+		block until one monitor log arrives, then collect more until batch size or flush interval reached.
+		"""
+		items: List[BufferedMonitorLog] = [self.queue.get()]
+		deadline = monotonic() + self.flushInterval
+		while len(items) < self.batchSize:
+			remaining = deadline - monotonic()
+			if remaining <= 0:
+				break
+			try:
+				items.append(self.queue.get(timeout=remaining))
+			except Empty:
+				break
+		return items
+
+	def drain(self) -> List[BufferedMonitorLog]:
+		items: List[BufferedMonitorLog] = []
+		while True:
+			try:
+				items.append(self.queue.get_nowait())
+			except Empty:
+				return items
+
+	def run(self) -> None:
+		while True:
+			self.write_safely(self.take())
+
+	def flush(self) -> None:
+		"""
+		write all buffered monitor logs in current thread
+		"""
+		items = self.drain()
+		for batch in ArrayHelper(items).chunk(self.batchSize).to_list():
+			self.write_safely(batch)
+
+	def write_safely(self, items: List[BufferedMonitorLog]) -> None:
+		try:
+			self.write(items)
+		except Exception as e:
+			logger.error(f'Failed to write {len(items)} monitor log(s).', exc_info=e)
+
+	def write(self, items: List[BufferedMonitorLog]) -> None:
+		by_tenant: Dict[TenantId, List[BufferedMonitorLog]] = ArrayHelper(items) \
+			.group_by(lambda x: x.principalService.get_tenant_id())
+		for tenant_id, tenant_items in by_tenant.items():
+			try:
+				self.write_tenant(tenant_items)
+			except Exception as e:
+				logger.error(f'Failed to write {len(tenant_items)} monitor log(s) of tenant[{tenant_id}].', exc_info=e)
+
+	# noinspection PyMethodMayBeStatic
+	def find_schema(self, principal_service: PrincipalService) -> TopicSchema:
+		schema = TopicService(principal_service).find_schema_by_name(
+			MONITOR_LOG_TOPIC_NAME, principal_service.get_tenant_id())
+		if schema is None:
+			raise PipelineKernelException(
+				f'Topic schema[name={MONITOR_LOG_TOPIC_NAME}, tenant={principal_service.get_tenant_id()}] not found.')
+		return schema
+
+	def create_handle_monitor_log(
+			self, principal_service: PrincipalService) -> Callable[[PipelineMonitorLog, bool], None]:
+		# monitor logs of pipelines on monitor log topic go back to sink
+		# noinspection PyUnusedLocal
+		def handle_monitor_log(monitor_log: PipelineMonitorLog, asynchronized: bool) -> None:
+			# to avoid the loop dependency
+			from .monitor_log_invoker import is_logging_required
+			# logs of pipelines on system topic are not required, otherwise monitor log topic is triggered endlessly
+			if not is_logging_required(monitor_log, principal_service):
+				return
+			if ask_pipeline_monitor_log_rollup():
+				ask_monitor_log_rollup_writer().accept(monitor_log, principal_service.get_tenant_id())
+			self.accept(monitor_log, monitor_log.traceId, principal_service)
+
+		return handle_monitor_log
+
+	def write_tenant(self, items: List[BufferedMonitorLog]) -> None:
+		# all items are in same tenant, use principal of first one to save data and run pipelines
+		principal_service = items[0].principalService
+		PipelineBatchTrigger(
+			trigger_topic_schema=self.find_schema(principal_service),
+			trigger_type=PipelineTriggerType.INSERT,
+			trigger_data_list=ArrayHelper(items).map(lambda x: x.monitorLog.dict()).to_list(),
+			trace_id=items[0].traceId,
+			principal_service=principal_service,
+			handle_monitor_log=self.create_handle_monitor_log(principal_service),
+			trace_id_list=ArrayHelper(items).map(lambda x: x.traceId).to_list()
+		).invoke_batch()
+
+
+sink_lock = Lock()
+sink: Optional[MonitorLogSink] = None
+
+
+def ask_monitor_log_sink() -> MonitorLogSink:
+	global sink
+	if sink is None:
+		with sink_lock:
+			if sink is None:
+				sink = MonitorLogSink(
+					ask_pipeline_monitor_log_sink_batch_size(),
+					ask_pipeline_monitor_log_sink_flush_interval(),
+					ask_pipeline_monitor_log_sink_queue_size())
+	return sink
+
+
+def flush_monitor_logs() -> None:
+	"""
+	write buffered monitor logs and then rollups on exit, flushers are daemon threads and stop without writing.
+	"""
+	if sink is not None:
+		sink.flush()
+	flush_monitor_log_rollups()
+
+
+atexit.register(flush_monitor_logs)
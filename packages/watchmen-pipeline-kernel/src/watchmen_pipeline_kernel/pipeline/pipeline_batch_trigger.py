@@ -0,0 +1,137 @@
+from logging import getLogger
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from watchmen_auth import PrincipalService
+from watchmen_data_kernel.storage import TopicTrigger
+from watchmen_data_kernel.topic_schema import TopicSchema
+from watchmen_model.admin import Pipeline, PipelineTriggerType, TopicKind
+from watchmen_model.pipeline_kernel import PipelineBatchTriggerRowResult, PipelineMonitorLog, PipelineTriggerTraceId
+from watchmen_pipeline_kernel.common import ask_pipeline_batch_trigger_save_size
+from watchmen_utilities import ArrayHelper
+from .pipeline_trigger import PipelineTrigger
+
+logger = getLogger(__name__)
+
+
+class PipelineBatchTrigger(PipelineTrigger):
+	"""
+	trigger pipelines for a batch of rows of same topic and trigger type.
+	topic schema, pipelines, storages and compiled pipelines are resolved once and shared by all rows.
+	failure of one row does not impact others, status of each row is returned.
+	"""
+
+	def __init__(
+			self, trigger_topic_schema: TopicSchema, trigger_type: PipelineTriggerType,
+			trigger_data_list: List[Dict[str, Any]], trace_id: PipelineTriggerTraceId,
+			principal_service: PrincipalService,
+			handle_monitor_log: Callable[[PipelineMonitorLog, bool], None],
+			trace_id_list: Optional[List[PipelineTriggerTraceId]] = None):
+		"""
+		trace id is shared by all rows, unless trace id list is given, which has same length as trigger data list
+		"""
+		super().__init__(
+			trigger_topic_schema=trigger_topic_schema, trigger_type=trigger_type,
+			trigger_data={}, trace_id=trace_id, principal_service=principal_service,
+			asynchronized=False, handle_monitor_log=handle_monitor_log)
+		self.triggerDataList = trigger_data_list
+		self.traceIdList = trace_id_list
+
+	def prepare_one_by_one(
+			self, rows: List[Tuple[int, Dict[str, Any]]], results: List[PipelineBatchTriggerRowResult]
+	) -> List[Tuple[int, Dict[str, Any]]]:
+		prepared: List[Tuple[int, Dict[str, Any]]] = []
+		for index, data in rows:
+			try:
+				self.triggerTopicSchema.prepare_data(data, self.principalService)
+				prepared.append((index, data))
+			except Exception as e:
+				logger.error(e, exc_info=True, stack_info=True)
+				self.fail(results[index], e)
+		return prepared
+
+	def prepare_batch_data(self, results: List[PipelineBatchTriggerRowResult]) -> List[Tuple[int, Dict[str, Any]]]:
+		rows: List[Tuple[int, Dict[str, Any]]] = []
+		for index, data in enumerate(self.triggerDataList):
+			if data is None:
+				self.fail(results[index], ValueError('Trigger data is null.'))
+			else:
+				rows.append((index, data))
+		try:
+			self.triggerTopicSchema.prepare_batch(ArrayHelper(rows).map(lambda x: x[1]).to_list(), self.principalService)
+			return rows
+		except Exception as e:
+			# prepare again one by one to find out the failed rows
+			logger.warning(f'Failed to prepare trigger data in batch, fallback to prepare one by one.', exc_info=e)
+			return self.prepare_one_by_one(rows, results)
+
+	def can_save_in_bulk(self) -> bool:
+		return self.triggerType == PipelineTriggerType.INSERT \
+			and self.triggerTopicSchema.get_topic().kind != TopicKind.SYNONYM
+
+	def save_one_by_one(
+			self, rows: List[Tuple[int, Dict[str, Any]]], results: List[PipelineBatchTriggerRowResult]
+	) -> List[Tuple[int, TopicTrigger]]:
+		saved: List[Tuple[int, TopicTrigger]] = []
+		for index, data in rows:
+			try:
+				saved.append((index, self.save_data(data)))
+			except Exception as e:
+				logger.error(e, exc_info=True, stack_info=True)
+				self.fail(results[index], e)
+		return saved
+
+	def save_in_bulk(
+			self, rows: List[Tuple[int, Dict[str, Any]]], results: List[PipelineBatchTriggerRowResult]
+	) -> List[Tuple[int, TopicTrigger]]:
+		data_service = self.ask_topic_data_service(self.triggerTopicSchema)
+		saved: List[Tuple[int, TopicTrigger]] = []
+		for chunk in ArrayHelper(rows).chunk(ask_pipeline_batch_trigger_save_size()).to_list():
+			try:
+				triggers = data_service.trigger_by_insert_all(ArrayHelper(chunk).map(lambda x: x[1]).to_list())
+				saved.extend(ArrayHelper(chunk).map_with_index(lambda x, index: (x[0], triggers[index])).to_list())
+			except Exception as e:
+				# statement is rejected as a whole, save one by one to find out the failed rows
+				logger.warning(f'Failed to save trigger data in bulk, fallback to save one by one.', exc_info=e)
+				saved.extend(self.save_one_by_one(chunk, results))
+		return saved
+
+	# noinspection PyMethodMayBeStatic
+	def fail(self, result: PipelineBatchTriggerRowResult, e: Exception) -> None:
+		result.success = False
+		result.error = str(e)
+
+	def ask_pipelines_of_trigger(
+			self, trigger_type: PipelineTriggerType, resolved: Dict[PipelineTriggerType, List[Pipeline]]
+	) -> List[Pipeline]:
+		pipelines: Optional[List[Pipeline]] = resolved.get(trigger_type)
+		if pipelines is None:
+			pipelines = self.ask_pipelines(trigger_type)
+			resolved[trigger_type] = pipelines
+		return pipelines
+
+	def invoke_batch(self) -> List[PipelineBatchTriggerRowResult]:
+		"""
+		prepare and save all rows, then dispatch pipelines row by row.
+		"""
+		results = ArrayHelper(self.triggerDataList) \
+			.map_with_index(lambda x, index: PipelineBatchTriggerRowResult(index=index)).to_list()
+		prepared = self.prepare_batch_data(results)
+		if self.can_save_in_bulk():
+			saved = self.save_in_bulk(prepared, results)
+		else:
+			saved = self.save_one_by_one(prepared, results)
+
+		# pipelines are resolved once for each trigger type
+		resolved: Dict[PipelineTriggerType, List[Pipeline]] = {}
+		for index, trigger in saved:
+			result = results[index]
+			result.internalDataId = str(trigger.internalDataId)
+			try:
+				pipelines = self.ask_pipelines_of_trigger(trigger.triggerType, resolved)
+				if len(pipelines) != 0:
+					self.dispatch(
+						trigger, pipelines, None if self.traceIdList is None else self.traceIdList[index])
+			except Exception as e:
+				logger.error(e, exc_info=True, stack_info=True)
+				self.fail(result, e)
+		return results
@@ -1,14 +1,18 @@
-from typing import Optional
+import asyncio
+from typing import List, Optional
 
 from watchmen_auth import PrincipalService
 from watchmen_data_kernel.meta import TenantService, TopicService
 from watchmen_data_kernel.topic_schema import TopicSchema
 from watchmen_model.admin import User, UserRole
-from watchmen_model.pipeline_kernel import PipelineTriggerData, PipelineTriggerTraceId
+from watchmen_model.common import TenantId
+from watchmen_model.pipeline_kernel import PipelineBatchTriggerData, PipelineBatchTriggerRowResult, \
+	PipelineTriggerData, PipelineTriggerTraceId
 from watchmen_model.system import Tenant
 from watchmen_pipeline_kernel.common import PipelineKernelException
 from watchmen_utilities import is_blank, is_not_blank
 from .monitor_log_invoker import create_monitor_log_pipeline_invoker
+from .pipeline_batch_trigger import PipelineBatchTrigger
 from .pipeline_trigger import PipelineTrigger
 
 
@@ -28,29 +32,33 @@ def find_topic_schema(name: str, principal_service: PrincipalService) -> TopicSc
 	return schema
 
 
-async def invoke(
-		trigger_data: PipelineTriggerData,
-		trace_id: PipelineTriggerTraceId, principal_service: PrincipalService,
-		asynchronized: bool) -> int:
-	if trigger_data.data is None:
-		raise PipelineKernelException(f'Trigger data is null.')
-	
+def ask_trigger_principal(tenant_id: Optional[TenantId], principal_service: PrincipalService) -> PrincipalService:
 	if principal_service.is_super_admin():
-		if is_blank(trigger_data.tenantId):
+		if is_blank(tenant_id):
 			raise Exception('No tenant appointed.')
 		tenant_service = get_tenant_service(principal_service)
-		tenant: Optional[Tenant] = tenant_service.find_by_id(trigger_data.tenantId)
+		tenant: Optional[Tenant] = tenant_service.find_by_id(tenant_id)
 		if tenant is None:
-			raise Exception(f'Tenant[{trigger_data.tenantId}] not exists.')
+			raise Exception(f'Tenant[{tenant_id}] not exists.')
 		# run by super admin, fake a tenant admin.
 		# user id and name still use current principal's
-		principal_service = PrincipalService(User(
-			userId=principal_service.get_user_id(), tenantId=trigger_data.tenantId,
+		return PrincipalService(User(
+			userId=principal_service.get_user_id(), tenantId=tenant_id,
 			name=principal_service.get_user_name(), role=UserRole.ADMIN))
 	else:
-		if is_not_blank(trigger_data.tenantId) and trigger_data.tenantId != principal_service.get_tenant_id():
-			raise Exception(f'Tenant[{trigger_data.tenantId}] does not match principal.')
+		if is_not_blank(tenant_id) and tenant_id != principal_service.get_tenant_id():
+			raise Exception(f'Tenant[{tenant_id}] does not match principal.')
+		return principal_service
+
+
+async def invoke(
+		trigger_data: PipelineTriggerData,
+		trace_id: PipelineTriggerTraceId, principal_service: PrincipalService,
+		asynchronized: bool) -> int:
+	if trigger_data.data is None:
+		raise PipelineKernelException(f'Trigger data is null.')
 	
+	principal_service = ask_trigger_principal(trigger_data.tenantId, principal_service)
 	schema = find_topic_schema(trigger_data.code, principal_service)
 	return await PipelineTrigger(
 		trigger_topic_schema=schema,
@@ -63,6 +71,25 @@ async def invoke(
 	).invoke()
 
 
+def invoke_batch(
+		trigger_data: PipelineBatchTriggerData,
+		trace_id: PipelineTriggerTraceId, principal_service: PrincipalService
+) -> List[PipelineBatchTriggerRowResult]:
+	if trigger_data.data is None:
+		raise PipelineKernelException(f'Trigger data is null.')
+
+	principal_service = ask_trigger_principal(trigger_data.tenantId, principal_service)
+	schema = find_topic_schema(trigger_data.code, principal_service)
+	return PipelineBatchTrigger(
+		trigger_topic_schema=schema,
+		trigger_type=trigger_data.triggerType,
+		trigger_data_list=trigger_data.data,
+		trace_id=trace_id,
+		principal_service=principal_service,
+		handle_monitor_log=create_monitor_log_pipeline_invoker(trace_id, principal_service)
+	).invoke_batch()
+
+
 async def try_to_invoke_pipelines(
 		trigger_data: PipelineTriggerData, trace_id: PipelineTriggerTraceId,
 		principal_service: PrincipalService
@@ -76,3 +103,11 @@ async def try_to_invoke_pipelines_async(
 ) -> int:
 	return await invoke(trigger_data, trace_id, principal_service, True)
 
+
+async def try_to_invoke_pipelines_batch(
+		trigger_data: PipelineBatchTriggerData, trace_id: PipelineTriggerTraceId,
+		principal_service: PrincipalService
+) -> List[PipelineBatchTriggerRowResult]:
+	# batch is fully synchronous blocking code, run it in thread pool to keep event loop responsive
+	loop = asyncio.get_running_loop()
+	return await loop.run_in_executor(None, invoke_batch, trigger_data, trace_id, principal_service)
@@ -1,6 +1,6 @@
 import asyncio
 from logging import getLogger
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from watchmen_auth import PrincipalService
 from watchmen_data_kernel.meta import PipelineService
@@ -10,7 +10,9 @@ from watchmen_data_kernel.topic_schema import TopicSchema
 from watchmen_model.admin import Pipeline, PipelineTriggerType, TopicKind
 from watchmen_model.common import PipelineId
 from watchmen_model.pipeline_kernel import PipelineMonitorLog, PipelineTriggerTraceId
-from watchmen_pipeline_kernel.common import PipelineKernelException
+from watchmen_pipeline_kernel.common import ask_pipeline_concurrent_dispatch, \
+	ask_pipeline_concurrent_dispatch_workers, ask_pipeline_unit_of_work, ask_pipeline_unit_of_work_transactional, \
+	PipelineKernelException
 from watchmen_pipeline_kernel.pipeline_schema import RuntimePipelineContext
 from watchmen_pipeline_kernel.topic import RuntimeTopicStorages
 from watchmen_utilities import ArrayHelper, is_not_blank
@@ -52,6 +54,9 @@ class PipelineTrigger:
 		self.triggerTopicSchema.prepare_data(self.triggerData, self.principalService)
 
 	def save_trigger_data(self) -> TopicTrigger:
+		return self.save_data(self.triggerData)
+
+	def save_data(self, trigger_data: Dict[str, Any]) -> TopicTrigger:
 		if self.triggerTopicSchema.get_topic().kind == TopicKind.SYNONYM:
 			# only insertion is supported on synonym
 			# will do nothing on synonym topic itself, simply trigger the insert pipeline
@@ -60,7 +65,7 @@ class PipelineTrigger:
 			if self.triggerType == PipelineTriggerType.INSERT:
 				return TopicTrigger(
 					previous=None,
-					current=self.triggerData,
+					current=trigger_data,
 					triggerType=PipelineTriggerType.INSERT,
 					internalDataId=-1
 				)
@@ -69,13 +74,13 @@ class PipelineTrigger:
 		else:
 			data_service = self.ask_topic_data_service(self.triggerTopicSchema)
 			if self.triggerType == PipelineTriggerType.INSERT:
-				return data_service.trigger_by_insert(self.triggerData)
+				return data_service.trigger_by_insert(trigger_data)
 			elif self.triggerType == PipelineTriggerType.INSERT_OR_MERGE:
-				return data_service.trigger_by_insert_or_merge(self.triggerData)
+				return data_service.trigger_by_insert_or_merge(trigger_data)
 			elif self.triggerType == PipelineTriggerType.MERGE:
-				return data_service.trigger_by_merge(self.triggerData)
+				return data_service.trigger_by_merge(trigger_data)
 			elif self.triggerType == PipelineTriggerType.DELETE:
-				return data_service.trigger_by_delete(self.triggerData)
+				return data_service.trigger_by_delete(trigger_data)
 			else:
 				raise PipelineKernelException(f'Trigger type[{self.triggerType}] is not supported.')
 
@@ -99,6 +104,16 @@ class PipelineTrigger:
 		"""
 		data of trigger must be prepared already
 		"""
+		pipelines = self.ask_pipelines(trigger.triggerType, pipeline_id)
+		if len(pipelines) == 0:
+			return
+		self.dispatch(trigger, pipelines)
+
+	def ask_pipelines(
+			self, trigger_type: PipelineTriggerType, pipeline_id: Optional[PipelineId] = None) -> List[Pipeline]:
+		"""
+		returns pipelines which should be run on given trigger type, or empty list when there is none
+		"""
 		schema = self.triggerTopicSchema
 		topic = schema.get_topic()
 		if is_not_blank(pipeline_id):
@@ -114,17 +129,23 @@ class PipelineTrigger:
 				raise PipelineKernelException(f'Given pipeline[id={pipeline_id}] not found.')
 			else:
 				logger.warning(f'No pipeline needs to be triggered by topic[id={topic.topicId}, name={topic.name}].')
-			return
+			return []
 
 		pipelines = ArrayHelper(pipelines) \
-			.filter(lambda x: self.should_run(trigger.triggerType, x)).to_list()
+			.filter(lambda x: self.should_run(trigger_type, x)).to_list()
 		if len(pipelines) == 0:
 			if is_not_blank(pipeline_id):
 				raise PipelineKernelException(
-					f'Given pipeline[id={pipeline_id}] does not match trigger type[{trigger.triggerType}].')
+					f'Given pipeline[id={pipeline_id}] does not match trigger type[{trigger_type}].')
 			else:
 				logger.warning(f'No pipeline needs to be triggered by topic[id={topic.topicId}, name={topic.name}].')
-			return
+			return []
+		return pipelines
+
+	def dispatch(
+			self, trigger: TopicTrigger, pipelines: List[Pipeline],
+			trace_id: Optional[PipelineTriggerTraceId] = None) -> None:
+		trace_id = self.traceId if trace_id is None else trace_id
 
 		def construct_queued_pipeline(a_pipeline: Pipeline) -> RuntimePipelineContext:
 			return RuntimePipelineContext(
@@ -133,13 +154,17 @@ class PipelineTrigger:
 				previous_data=trigger.previous,
 				current_data=trigger.current,
 				principal_service=self.principalService,
-				trace_id=self.traceId,
+				trace_id=trace_id,
 				data_id=trigger.internalDataId
 			)
 
 		PipelinesDispatcher(
 			contexts=ArrayHelper(pipelines).map(lambda x: construct_queued_pipeline(x)).to_list(),
 			storages=self.storages,
+			unit_of_work=ask_pipeline_unit_of_work(),
+			transactional=ask_pipeline_unit_of_work_transactional(),
+			concurrent=ask_pipeline_concurrent_dispatch(),
+			workers=ask_pipeline_concurrent_dispatch_workers()
 		).start(self.handle_monitor_log)
 
 	async def invoke(self) -> int:
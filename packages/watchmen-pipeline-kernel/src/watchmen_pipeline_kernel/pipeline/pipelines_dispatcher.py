@@ -1,21 +1,64 @@
 import logging
-from typing import Callable, List, Optional
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple
 
 from watchmen_model.pipeline_kernel import PipelineMonitorLog
 from watchmen_pipeline_kernel.common import PipelineKernelException
 from watchmen_pipeline_kernel.pipeline_schema import RuntimePipelineContext
+from watchmen_pipeline_kernel.pipeline_schema_interface import PipelineContext, PipelineTopicAccess
 from watchmen_pipeline_kernel.topic import RuntimeTopicStorages
 
-
 logger = logging.getLogger(__name__)
 
+QueuedContext = Tuple[PipelineContext, Optional[PipelineTopicAccess]]
+HandledMonitorLog = Tuple[PipelineMonitorLog, bool]
+
+
+def is_in_conflict(access: Optional[PipelineTopicAccess], others: List[Optional[PipelineTopicAccess]]) -> bool:
+	if access is None:
+		return len(others) != 0
+	return any(access.conflicts_with(other) for other in others)
+
 
 class PipelinesDispatcher:
-	def __init__(self, contexts: List[RuntimePipelineContext], storages: RuntimeTopicStorages):
-		self.contexts = contexts
+	def __init__(
+			self, contexts: List[RuntimePipelineContext], storages: RuntimeTopicStorages,
+			unit_of_work: bool = False, transactional: bool = False,
+			concurrent: bool = False, workers: int = 8):
+		"""
+		when unit of work is enabled, all pipelines dispatched share one connection per data source,
+		and connections are released when all pipelines finished.
+		transactional is available only when unit of work is enabled.
+		when concurrent is enabled, pipelines which access disjoint topics run concurrently on a bounded pool,
+		pipelines in conflict run one by one in order of queue.
+		concurrent is ignored when unit of work is enabled, connection cannot be shared between threads.
+		"""
+		self.contexts: Deque[RuntimePipelineContext] = deque(contexts)
 		self.storages = storages
+		self.unitOfWork = unit_of_work
+		self.transactional = transactional
+		self.concurrent = concurrent and not unit_of_work
+		self.workers = max(workers, 1)
 
 	def start(self, handle_monitor_log: Callable[[PipelineMonitorLog, bool], None]) -> None:
+		if not self.unitOfWork:
+			self.dispatch(handle_monitor_log)
+			return
+
+		self.storages.begin_unit_of_work(self.transactional)
+		try:
+			self.dispatch(handle_monitor_log)
+		except Exception as e:
+			self.storages.end_unit_of_work(False)
+			raise e
+		self.storages.end_unit_of_work(True)
+
+	def dispatch(self, handle_monitor_log: Callable[[PipelineMonitorLog, bool], None]) -> None:
+		if self.concurrent:
+			self.dispatch_concurrently(handle_monitor_log)
+			return
+
 		while self.contexts:
 			context = self.next_context()
 			created_contexts = context.start(self.storages, handle_monitor_log)
@@ -27,9 +70,77 @@ class PipelinesDispatcher:
 		if len(self.contexts) == 0:
 			return None
 		# get next context
-		context = self.contexts[0]
+		context = self.contexts.popleft()
 		if context is None:
 			raise PipelineKernelException(f'Pipeline context is none, cannot be invoked.')
-		# next context is ready, pop it
-		self.contexts = self.contexts[1:]
 		return context
+
+	def dispatch_concurrently(self, handle_monitor_log: Callable[[PipelineMonitorLog, bool], None]) -> None:
+		"""
+		topics accessed by pipeline are resolved from compiled pipeline.
+		pipeline starts when it is not in conflict with any running pipeline or any queued before it,
+		therefore pipelines accessing same topic run in order of queue, as same as one by one.
+		pipelines created by a finished one are queued when it is finished.
+		"""
+		queued: Deque[QueuedContext] = deque()
+		while self.contexts:
+			self.enqueue(queued, [self.next_context()])
+
+		running: Dict[Future, Optional[PipelineTopicAccess]] = {}
+		error: Optional[Exception] = None
+		with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='pipeline-dispatch') as executor:
+			while True:
+				if error is None:
+					self.schedule(queued, running, executor)
+				if len(running) == 0:
+					break
+				done, _ = wait(list(running.keys()), return_when=FIRST_COMPLETED)
+				for future in done:
+					del running[future]
+					try:
+						created_contexts, monitor_logs = future.result()
+						for monitor_log, asynchronized in monitor_logs:
+							handle_monitor_log(monitor_log, asynchronized)
+						self.enqueue(queued, created_contexts)
+					except Exception as e:
+						# stop starting new pipelines, and wait for running ones
+						if error is None:
+							error = e
+						else:
+							logger.error(e, exc_info=True, stack_info=True)
+		if error is not None:
+			raise error
+
+	# noinspection PyMethodMayBeStatic
+	def enqueue(self, queued: Deque[QueuedContext], contexts: Iterable[PipelineContext]) -> None:
+		for context in contexts:
+			if context is None:
+				raise PipelineKernelException('Pipeline context is none, cannot be invoked.')
+			queued.append((context, context.ask_topic_access()))
+
+	def schedule(
+			self, queued: Deque[QueuedContext], running: Dict[Future, Optional[PipelineTopicAccess]],
+			executor: ThreadPoolExecutor) -> None:
+		# accesses of running pipelines and queued ones which are not started yet
+		accesses = list(running.values())
+		waiting: Deque[QueuedContext] = deque()
+		while queued and len(running) < self.workers:
+			context, access = queued.popleft()
+			if is_in_conflict(access, accesses):
+				waiting.append((context, access))
+			else:
+				running[executor.submit(self.start_context, context)] = access
+			accesses.append(access)
+		waiting.extend(queued)
+		queued.clear()
+		queued.extend(waiting)
+
+	def start_context(self, context: PipelineContext) -> Tuple[List[PipelineContext], List[HandledMonitorLog]]:
+		"""
+		runs on worker thread, with its own storages.
+		monitor logs are handed over to dispatching thread, might trigger pipelines asynchronized.
+		"""
+		monitor_logs: List[HandledMonitorLog] = []
+		created_contexts = context.start(
+			self.storages.derive(), lambda monitor_log, asynchronized: monitor_logs.append((monitor_log, asynchronized)))
+		return created_contexts, monitor_logs
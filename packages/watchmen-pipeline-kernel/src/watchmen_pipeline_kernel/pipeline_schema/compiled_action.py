@@ -1,5 +1,6 @@
 from abc import abstractmethod
 from copy import deepcopy
+from decimal import Decimal
 from logging import getLogger
 from random import randrange
 from traceback import format_exc
@@ -22,18 +23,21 @@ from watchmen_data_kernel.storage_bridge import now, parse_action_defined_as, pa
 from watchmen_data_kernel.topic_schema import TopicSchema
 from watchmen_meta.common import ask_snowflake_generator
 from watchmen_model.admin import AggregateArithmetic, AlarmAction, AlarmActionSeverity, CopyToMemoryAction, \
-	DeleteTopicAction, DeleteTopicActionType, Factor, FindBy, FromTopic, MappingFactor, MappingRow, \
-	Pipeline, PipelineAction, PipelineStage, PipelineTriggerType, PipelineUnit, ReadFactorAction, ReadFactorsAction, \
-	ReadTopicAction, ReadTopicActionType, SystemActionType, Topic, ToTopic, WriteFactorAction, WriteToExternalAction, \
-	WriteTopicAction, WriteTopicActionType
-from watchmen_model.common import ConstantParameter, ParameterKind, VariablePredefineFunctions
+	DeleteRowsAction, DeleteTopicAction, DeleteTopicActionType, Factor, FactorEncryptMethod, FindBy, FromTopic, \
+	is_raw_topic, MappingFactor, MappingRow, Pipeline, PipelineAction, PipelineStage, PipelineTriggerType, PipelineUnit, \
+	ReadFactorAction, ReadFactorsAction, ReadTopicAction, ReadTopicActionType, SystemActionType, Topic, TopicKind, \
+	ToTopic, WriteFactorAction, WriteToExternalAction, WriteTopicAction, WriteTopicActionType
+from watchmen_model.common import ConstantParameter, FactorId, Parameter, ParameterCondition, ParameterExpression, \
+	ParameterExpressionOperator, ParameterJoint, ParameterJointType, ParameterKind, TopicFactorParameter, TopicId, \
+	VariablePredefineFunctions
 from watchmen_model.pipeline_kernel import MonitorAlarmAction, MonitorCopyToMemoryAction, MonitorDeleteAction, \
 	MonitorLogAction, MonitorLogStatus, MonitorLogUnit, MonitorReadAction, MonitorWriteAction, \
 	MonitorWriteToExternalAction
-from watchmen_pipeline_kernel.common import ask_decrypt_factor_value, ask_pipeline_update_retry, \
-	ask_pipeline_update_retry_force, ask_pipeline_update_retry_interval, ask_pipeline_update_retry_times, \
-	PipelineKernelException
+from watchmen_pipeline_kernel.common import ask_decrypt_factor_value, ask_pipeline_bulk_delete_chunk_size, \
+	ask_pipeline_update_retry, ask_pipeline_update_retry_force, ask_pipeline_update_retry_interval, ask_pipeline_update_retry_times, \
+	ask_pipeline_write_factor_increment, PipelineKernelException
 from watchmen_pipeline_kernel.pipeline_schema_interface import CreateQueuePipeline, TopicStorages
+from watchmen_pipeline_kernel.topic import UnitOfWorkTopicStorage
 from watchmen_storage import EntityColumnAggregateArithmetic, EntityCriteria, EntityStraightAggregateColumn, \
 	EntityStraightColumn
 from watchmen_utilities import ArrayHelper, is_blank, is_not_blank
@@ -293,10 +297,13 @@ class CompiledStorageAction(CompiledAction):
 	# noinspection PyMethodMayBeStatic
 	def ask_topic_data_service(
 			self, schema: TopicSchema, storages: TopicStorages,
-			principal_service: PrincipalService) -> TopicDataService:
+			principal_service: PrincipalService, flush_buffered: bool = True) -> TopicDataService:
 		"""
-		ask topic data service
+		ask topic data service.
+		buffered insertions of given topic are flushed by default, to make sure they can be read.
 		"""
+		if flush_buffered:
+			storages.flush(schema)
 		storage = storages.ask_topic_storage(schema)
 		return ask_topic_data_service(schema, storage, principal_service)
 
@@ -382,7 +389,7 @@ class CompiledReadTopicFactorAction(CompiledReadTopicAction):
 		if is_blank(factor_id):
 			raise PipelineKernelException(f'Factor not declared in read factor(s) action.')
 		topic = self.schema.get_topic()
-		factor = ArrayHelper(topic.factors).find(lambda x: x.factorId == factor_id)
+		factor = self.schema.get_factor_index().find_by_id(factor_id)
 		if factor is None:
 			raise PipelineKernelException(
 				f'Factor[id={factor_id}] in topic[id={topic.topicId}, name={topic.name}] not found.')
@@ -528,23 +535,32 @@ class CompiledInsertion(CompiledWriteTopicAction):
 			self, variables: PipelineVariables, new_pipeline: CreateQueuePipeline,
 			action_monitor_log: MonitorWriteAction,
 			principal_service: PrincipalService, topic_data_service: TopicDataService,
-			allow_failure: bool) -> bool:
+			allow_failure: bool, storages: Optional[TopicStorages] = None) -> bool:
 		"""
 		returns true when insert successfully.
 		returns false when insert failed and given allow_failure is true.
+		when storages given, try to buffer insertion into storages, failure will be raised on flush.
 		"""
 		data = self.parsedMapping.run(None, variables, principal_service)
 		self.schema.initialize_default_values(data)
 		self.schema.cast_date_or_time(data)
 		self.schema.encrypt(data, principal_service)
-		try:
-			data = topic_data_service.insert(data)
-		except IntegrityError as e:
-			logger.error(e, exc_info=True, stack_info=True)
-			if allow_failure:
-				return False
-			else:
-				raise e
+		if storages is None or not storages.buffer_insert(topic_data_service, data):
+			storage = topic_data_service.get_storage()
+			# insertion failure is allowed, then retry in same transaction of unit of work
+			savepoint = allow_failure and isinstance(storage, UnitOfWorkTopicStorage) and storage.begin_savepoint()
+			try:
+				data = topic_data_service.insert(data)
+				if savepoint:
+					storage.release_savepoint()
+			except IntegrityError as e:
+				logger.error(e, exc_info=True, stack_info=True)
+				if savepoint:
+					storage.rollback_to_savepoint()
+				if allow_failure:
+					return False
+				else:
+					raise e
 		action_monitor_log.insertCount = 1
 		action_monitor_log.touched = {'data': data}
 		# new pipeline
@@ -623,18 +639,20 @@ class CompiledInsertRowAction(CompiledInsertion):
 			action_monitor_log: MonitorWriteAction, storages: TopicStorages,
 			principal_service: PrincipalService) -> bool:
 		def work() -> None:
-			topic_data_service = self.ask_topic_data_service(self.schema, storages, principal_service)
-			self.do_insert(variables, new_pipeline, action_monitor_log, principal_service, topic_data_service, False)
+			# pure insertion, can be buffered
+			topic_data_service = self.ask_topic_data_service(self.schema, storages, principal_service, False)
+			self.do_insert(
+				variables, new_pipeline, action_monitor_log, principal_service, topic_data_service, False, storages)
 
 		return self.safe_run(action_monitor_log, work)
 
 
 class CompiledInsertOrMergeRowAction(CompiledInsertion, CompiledUpdate):
-	def do_insert_or_merge(
+	def create_insert_or_merge_worker(
 			self, variables: PipelineVariables, new_pipeline: CreateQueuePipeline,
 			action_monitor_log: MonitorWriteAction, storages: TopicStorages,
 			principal_service: PrincipalService,
-			allow_insert: bool) -> bool:
+			allow_insert: bool) -> Callable[[], None]:
 		def last_try() -> None:
 			# force lock and update, the final try after all retries by optimistic lock are failed
 			# still use the regular process
@@ -733,11 +751,16 @@ class CompiledInsertOrMergeRowAction(CompiledInsertion, CompiledUpdate):
 						raise PipelineKernelException(
 							f'Data not found on do update, {self.on_topic_message()}, by [{[statement.to_dict()]}].')
 
-		def create_worker() -> Callable[[], None]:
-			# retry times starts from 0
-			return lambda: work(0, allow_insert)
+		# retry times starts from 0
+		return lambda: work(0, allow_insert)
 
-		return self.safe_run(action_monitor_log, create_worker())
+	def do_insert_or_merge(
+			self, variables: PipelineVariables, new_pipeline: CreateQueuePipeline,
+			action_monitor_log: MonitorWriteAction, storages: TopicStorages,
+			principal_service: PrincipalService,
+			allow_insert: bool) -> bool:
+		return self.safe_run(action_monitor_log, self.create_insert_or_merge_worker(
+			variables, new_pipeline, action_monitor_log, storages, principal_service, allow_insert))
 
 	def do_run(
 			self, variables: PipelineVariables, new_pipeline: CreateQueuePipeline,
@@ -754,12 +777,114 @@ class CompiledMergeRowAction(CompiledInsertOrMergeRowAction):
 		return self.do_insert_or_merge(variables, new_pipeline, action_monitor_log, storages, principal_service, False)
 
 
+def ask_equation_factor_ids(condition: Optional[ParameterCondition], topic_id: TopicId) -> List[FactorId]:
+	"""
+	factors of given topic which are pinned by equations, only conjunctions are traversed
+	"""
+	if isinstance(condition, ParameterJoint):
+		if condition.jointType == ParameterJointType.OR:
+			return []
+		return ArrayHelper(condition.filters).map(lambda x: ask_equation_factor_ids(x, topic_id)).flatten().to_list()
+	elif isinstance(condition, ParameterExpression):
+		if condition.operator != ParameterExpressionOperator.EQUALS:
+			return []
+
+		def is_factor_of_topic(parameter: Optional[Parameter]) -> bool:
+			return isinstance(parameter, TopicFactorParameter) and parameter.topicId == topic_id
+
+		left_is_factor, right_is_factor = is_factor_of_topic(condition.left), is_factor_of_topic(condition.right)
+		if left_is_factor and not right_is_factor:
+			return [condition.left.factorId]
+		elif right_is_factor and not left_is_factor:
+			return [condition.right.factorId]
+	return []
+
+
 class CompiledWriteFactorAction(CompiledInsertOrMergeRowAction):
+	incrementApplicable: bool = False
+
+	def parse_action(self, action: WriteFactorAction, principal_service: PrincipalService) -> None:
+		super().parse_action(action, principal_service)
+		self.incrementApplicable = isinstance(action, WriteFactorAction) and self.is_increment_applicable(action)
+
+	def is_increment_applicable(self, action: WriteFactorAction) -> bool:
+		"""
+		factor can be increased in storage side, when
+		1. arithmetic is sum or count, and factor is not encrypted,
+		2. topic is a regular topic,
+		3. find by pins all factors of one unique index by equations, then at most one row matched,
+		4. written factor is not in find by, then updated row can be found again.
+		"""
+		if action.arithmetic != AggregateArithmetic.SUM and action.arithmetic != AggregateArithmetic.COUNT:
+			return False
+		topic = self.get_topic()
+		if is_raw_topic(topic) or topic.kind == TopicKind.SYNONYM:
+			return False
+		factor: Optional[Factor] = ArrayHelper(topic.factors).find(lambda x: x.factorId == action.factorId)
+		if factor is None or (factor.encrypt is not None and factor.encrypt != FactorEncryptMethod.NONE):
+			return False
+		factor_ids = ask_equation_factor_ids(action.by, topic.topicId)
+		if action.factorId in factor_ids:
+			return False
+		unique_indexes: Dict[str, List[Factor]] = ArrayHelper(topic.factors) \
+			.filter(lambda x: is_not_blank(x.indexGroup) and x.indexGroup.startswith('u-')) \
+			.group_by(lambda x: x.indexGroup)
+		return ArrayHelper(list(unique_indexes.values())) \
+			.some(lambda x: ArrayHelper(x).every(lambda y: y.factorId in factor_ids))
+
+	# noinspection PyMethodMayBeStatic
+	def revert_increments(
+			self, topic_data_service: TopicDataService, updated_data: Dict[str, Any],
+			increments: Dict[str, Decimal]) -> Dict[str, Any]:
+		"""
+		original data is not read, build it from updated data, values of incremented factors are decimal.
+		update time of original data is unknown, keep it as same as updated.
+		"""
+		data_entity_helper = topic_data_service.get_data_entity_helper()
+		original_data = deepcopy(updated_data)
+		for factor_name, increment in increments.items():
+			original_data[factor_name] = updated_data.get(factor_name) - increment
+		if data_entity_helper.is_versioned():
+			data_entity_helper.assign_version(original_data, data_entity_helper.find_version(updated_data) - 1)
+		return original_data
+
+	def do_increment(
+			self, increments: Dict[str, Decimal], variables: PipelineVariables, new_pipeline: CreateQueuePipeline,
+			action_monitor_log: MonitorWriteAction,
+			principal_service: PrincipalService, topic_data_service: TopicDataService) -> None:
+		statement = self.parsedFindBy.run(variables, principal_service)
+		action_monitor_log.findBy = statement.to_dict()
+		criteria = [statement]
+		updated_count, updated_data = topic_data_service.increment_and_pull(criteria, increments)
+		if updated_count == 0:
+			raise PipelineKernelException(f'Data not found, {self.on_topic_message()}, by [{[statement.to_dict()]}].')
+		original_data = self.revert_increments(topic_data_service, updated_data, increments)
+		self.post_update(
+			topic_data_service, new_pipeline, original_data, updated_data, action_monitor_log, updated_count, criteria)
+
 	def do_run(
 			self, variables: PipelineVariables, new_pipeline: CreateQueuePipeline,
 			action_monitor_log: MonitorWriteAction, storages: TopicStorages,
 			principal_service: PrincipalService) -> bool:
-		return self.do_insert_or_merge(variables, new_pipeline, action_monitor_log, storages, principal_service, False)
+		regular_work = self.create_insert_or_merge_worker(
+			variables, new_pipeline, action_monitor_log, storages, principal_service, False)
+		if not self.incrementApplicable or not ask_pipeline_write_factor_increment():
+			return self.safe_run(action_monitor_log, regular_work)
+
+		def work() -> None:
+			topic_data_service = self.ask_topic_data_service(self.schema, storages, principal_service)
+			increments = None
+			if topic_data_service.get_storage().is_increment_supported():
+				increments = self.parsedMapping.compute_increments(variables, principal_service)
+			if increments is None:
+				# not applicable on this storage or this time, do read and write
+				regular_work()
+			else:
+				# no read before write, no optimistic lock retry
+				self.do_increment(
+					increments, variables, new_pipeline, action_monitor_log, principal_service, topic_data_service)
+
+		return self.safe_run(action_monitor_log, work)
 
 
 # noinspection PyAbstractClass
@@ -810,10 +935,36 @@ class CompiledDeleteRowAction(CompiledDeleteTopicAction):
 
 
 class CompiledDeleteRowsAction(CompiledDeleteTopicAction):
+	def parse_action(self, action: DeleteRowsAction, principal_service: PrincipalService) -> None:
+		super().parse_action(action, principal_service)
+		self.bulk = action.bulk if isinstance(action, DeleteRowsAction) else False
+
+	def create_delete_trigger(self, topic_data_service: TopicDataService, row: Dict[str, Any]) -> TopicTrigger:
+		has_id, id_ = topic_data_service.get_data_entity_helper().find_data_id(row)
+		return TopicTrigger(previous=row, current=None, triggerType=PipelineTriggerType.DELETE, internalDataId=id_)
+
 	def do_run(
 			self, variables: PipelineVariables, new_pipeline: CreateQueuePipeline,
 			action_monitor_log: MonitorDeleteAction, storages: TopicStorages,
 			principal_service: PrincipalService) -> bool:
+		def work_in_bulk() -> None:
+			topic_data_service = self.ask_topic_data_service(self.schema, storages, principal_service)
+			statement = self.parsedFindBy.run(variables, principal_service)
+			action_monitor_log.findBy = statement.to_dict()
+			data = topic_data_service.find(criteria=[statement])
+			# in one transaction, all or nothing
+			try:
+				topic_data_service.delete_all_by_id_and_version(data, ask_pipeline_bulk_delete_chunk_size())
+			except Exception as e:
+				action_monitor_log.deleteCount = 0
+				action_monitor_log.touched = {'data': []}
+				raise PipelineKernelException(
+					f'Bulk deletion failed, {self.on_topic_message()}, by [{[statement.to_dict()]}].') from e
+			action_monitor_log.deleteCount = len(data)
+			action_monitor_log.touched = {'data': data}
+			# new pipelines, after deletion committed
+			ArrayHelper(data).each(lambda x: new_pipeline(self.schema, self.create_delete_trigger(topic_data_service, x)))
+
 		def work() -> None:
 			topic_data_service = self.ask_topic_data_service(self.schema, storages, principal_service)
 			statement = self.parsedFindBy.run(variables, principal_service)
@@ -831,19 +982,13 @@ class CompiledDeleteRowsAction(CompiledDeleteTopicAction):
 					else:
 						touched.append(row)
 						# new pipeline
-						has_id, id_ = topic_data_service.get_data_entity_helper().find_data_id(row)
-						new_pipeline(self.schema, TopicTrigger(
-							previous=row,
-							current=None,
-							triggerType=PipelineTriggerType.DELETE,
-							internalDataId=id_
-						))
+						new_pipeline(self.schema, self.create_delete_trigger(topic_data_service, row))
 			finally:
 				# log done information
 				action_monitor_log.deleteCount = len(touched)
 				action_monitor_log.touched = {'data': touched}
 
-		return self.safe_run(action_monitor_log, work)
+		return self.safe_run(action_monitor_log, work_in_bulk if self.bulk else work)
 
 
 def compile_action(
@@ -6,17 +6,18 @@ from traceback import format_exc
 from typing import Any, Callable, Dict, List, Optional
 
 from watchmen_auth import PrincipalService
-from watchmen_data_kernel.meta import PipelineService, TopicService
+from watchmen_data_kernel.meta import ask_factor_index, PipelineService, TopicService
 from watchmen_data_kernel.storage import TopicTrigger
 from watchmen_data_kernel.storage_bridge import now, parse_prerequisite_defined_as, parse_prerequisite_in_memory, \
 	PipelineVariables, spent_ms
 from watchmen_data_kernel.topic_schema import TopicSchema
 from watchmen_meta.common import ask_snowflake_generator
-from watchmen_model.admin import Pipeline, PipelineTriggerType
+from watchmen_model.admin import FromTopic, Pipeline, PipelineAction, PipelineTriggerType, ToTopic
 from watchmen_model.pipeline_kernel import MonitorLogStatus, PipelineMonitorLog, PipelineTriggerTraceId
 from watchmen_pipeline_kernel.common import ask_async_handle_monitor_log, PipelineKernelException
-from watchmen_pipeline_kernel.pipeline_schema_interface import CompiledPipeline, PipelineContext, TopicStorages
-from watchmen_utilities import ArrayHelper
+from watchmen_pipeline_kernel.pipeline_schema_interface import CompiledPipeline, PipelineContext, \
+	PipelineTopicAccess, TopicStorages
+from watchmen_utilities import ArrayHelper, is_not_blank
 from .compiled_stage import compile_stages, CompiledStage
 
 logger = getLogger(__name__)
@@ -30,6 +31,20 @@ def get_pipeline_service(principal_service: PrincipalService) -> PipelineService
 	return PipelineService(principal_service)
 
 
+def build_topic_access(pipeline: Pipeline) -> PipelineTopicAccess:
+	actions: List[PipelineAction] = ArrayHelper(pipeline.stages) \
+		.map(lambda x: x.units).flatten().filter(lambda x: x is not None) \
+		.map(lambda x: x.do).flatten() \
+		.filter(lambda x: x is not None).to_list()
+	read_topic_ids = ArrayHelper(actions) \
+		.filter(lambda x: isinstance(x, FromTopic) and is_not_blank(x.topicId)) \
+		.map(lambda x: x.topicId).to_list()
+	write_topic_ids = ArrayHelper(actions) \
+		.filter(lambda x: isinstance(x, ToTopic) and is_not_blank(x.topicId)) \
+		.map(lambda x: x.topicId).to_list()
+	return PipelineTopicAccess([pipeline.topicId, *read_topic_ids], write_topic_ids)
+
+
 class RuntimeCompiledPipeline(CompiledPipeline):
 	def __init__(self, pipeline: Pipeline, principal_service: PrincipalService):
 		"""
@@ -41,10 +56,14 @@ class RuntimeCompiledPipeline(CompiledPipeline):
 		self.prerequisiteDefinedAs = parse_prerequisite_defined_as(pipeline, principal_service)
 		self.prerequisiteTest = parse_prerequisite_in_memory(pipeline, principal_service)
 		self.stages = compile_stages(pipeline, principal_service)
+		self.topicAccess = build_topic_access(pipeline)
 
 	def get_pipeline(self):
 		return self.pipeline
 
+	def get_topic_access(self) -> PipelineTopicAccess:
+		return self.topicAccess
+
 	def run(
 			self,
 			previous_data: Optional[Dict[str, Any]], current_data: Optional[Dict[str, Any]],
@@ -55,7 +74,9 @@ class RuntimeCompiledPipeline(CompiledPipeline):
 		# build pipeline variables
 		trigger_topic_id = self.pipeline.topicId
 		trigger_topic = get_topic_service(principal_service).find_by_id(trigger_topic_id)
-		variables = PipelineVariables(previous_data, current_data, trigger_topic)
+		variables = PipelineVariables(
+			previous_data, current_data, trigger_topic,
+			None if trigger_topic is None else ask_factor_index(trigger_topic))
 
 		# build monitor log
 		monitor_log = PipelineMonitorLog(
@@ -99,6 +120,14 @@ class RuntimeCompiledPipeline(CompiledPipeline):
 			monitor_log.status = MonitorLogStatus.ERROR
 			monitor_log.error = format_exc()
 
+		try:
+			# buffered insertions must be written before pipelines triggered by them
+			storages.flush()
+		except Exception as e:
+			logger.error(e, exc_info=True, stack_info=True)
+			monitor_log.status = MonitorLogStatus.ERROR
+			monitor_log.error = format_exc()
+
 		# log spent in milliseconds
 		monitor_log.spentInMills = spent_ms(monitor_log.startTime)
 
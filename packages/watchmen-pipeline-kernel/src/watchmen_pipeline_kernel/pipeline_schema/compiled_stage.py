@@ -61,6 +61,16 @@ class CompiledStage:
 			stage_monitor_log.error = format_exc()
 			all_run = False
 
+		try:
+			# write buffered insertions at stage end
+			storages.flush()
+		except Exception as e:
+			logger.error(e, exc_info=True, stack_info=True)
+			stage_monitor_log.status = MonitorLogStatus.ERROR
+			stage_monitor_log.error = format_exc()
+			monitor_log.status = MonitorLogStatus.ERROR
+			all_run = False
+
 		stage_monitor_log.spentInMills = spent_ms(stage_monitor_log.startTime)
 
 		return all_run
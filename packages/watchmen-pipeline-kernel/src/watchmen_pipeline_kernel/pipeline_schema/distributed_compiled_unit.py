@@ -1,25 +1,29 @@
 from __future__ import annotations
 
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from copy import deepcopy
 from logging import getLogger
-from typing import Any, List, Optional, Tuple, Union
-
-from dask import config
-from distributed import Client
+from multiprocessing import get_context
+from threading import Lock
+from traceback import format_exc
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from watchmen_auth import PrincipalService
 from watchmen_data_kernel.meta import TopicService
 from watchmen_data_kernel.storage import TopicTrigger
-from watchmen_data_kernel.storage_bridge import PipelineVariables
+from watchmen_data_kernel.storage_bridge import now, PipelineVariables
 from watchmen_data_kernel.topic_schema import TopicSchema
+from watchmen_meta.common import ask_meta_storage, ask_snowflake_generator
 from watchmen_model.admin import Pipeline, PipelineStage, PipelineUnit, Topic, User
 from watchmen_model.common import DataModel, TopicId
-from watchmen_model.pipeline_kernel import MonitorLogStage, MonitorLogUnit
+from watchmen_model.pipeline_kernel import MonitorLogStage, MonitorLogStatus, MonitorLogUnit
 from watchmen_model.pipeline_kernel.pipeline_monitor_log import construct_unit
 from watchmen_pipeline_kernel.common import ask_parallel_actions_count, ask_parallel_actions_dask_temp_dir, \
 	ask_parallel_actions_dask_use_process, PipelineKernelException, ask_parallel_actions_dask_threads_per_work, \
-	ask_parallel_actions_use_multithreading
-from watchmen_pipeline_kernel.pipeline_schema_interface import CreateQueuePipeline
+	ask_parallel_actions_process_pool_chunk_size, ask_parallel_actions_use_multithreading, \
+	ask_parallel_actions_use_process_pool
+from watchmen_pipeline_kernel.pipeline_schema_interface import CreateQueuePipeline, TopicStorages
 from watchmen_pipeline_kernel.topic import RuntimeTopicStorages
 from watchmen_utilities import ArrayHelper
 from .compiled_single_unit import CompiledSingleUnit
@@ -58,11 +62,12 @@ class DistributedUnitLoop:
 		return self
 
 	def distribute(self, stage_monitor_log: MonitorLogStage, new_pipeline: CreateQueuePipeline) -> bool:
-		if ask_parallel_actions_use_multithreading():
+		if ask_parallel_actions_use_process_pool():
+			result = process_pool_unit_loop(self)
+		elif ask_parallel_actions_use_multithreading():
 			result = thread_unit_loop(self)
 		else:
 			result = distribute_unit_loop(self)
-		
 
 		return ArrayHelper(result.items) \
 			.map(lambda x: handle_loop_item_result(x, stage_monitor_log, new_pipeline, self.principalService)) \
@@ -84,7 +89,7 @@ class DistributedUnitLoopItemResult(DataModel):
 	def __setattr__(self, name, value):
 		if name == 'log':
 			super().__setattr__(name, construct_unit(value))
-		if name == 'triggered':
+		elif name == 'triggered':
 			super().__setattr__(name, construct_triggers(value))
 		else:
 			super().__setattr__(name, value)
@@ -143,10 +148,14 @@ def handle_loop_item_result(
 
 class DaskClientHolder:
 	initialized: bool = False
-	client: Optional[Client] = None
+	# dask is required only when loop is distributed by it
+	client: Optional[Any] = None
 
-	def initialize(self) -> Client:
+	def initialize(self) -> Any:
 		if not self.initialized:
+			from dask import config
+			from distributed import Client
+
 			config.set(temporary_directory=ask_parallel_actions_dask_temp_dir())
 			self.client = Client(
 				processes=ask_parallel_actions_dask_use_process(),
@@ -156,29 +165,27 @@ class DaskClientHolder:
 			self.initialized = True
 		return self.client
 
-	def ask_client(self) -> Client:
+	def ask_client(self) -> Any:
 		return self.initialize()
 
 
 dask_client_holder = DaskClientHolder()
 
 
+def to_user(principal_service: PrincipalService) -> User:
+	return User(
+		userId=principal_service.get_user_id(),
+		name=principal_service.get_user_name(),
+		tenantId=principal_service.get_tenant_id(),
+		role=principal_service.get_user_role()
+	)
+
+
 def to_dask_args(loop: DistributedUnitLoop, variableValue: Any) -> List[Any]:
 	cloned = loop.pipelineVariables.clone()
 	cloned.put(loop.loopVariableName, deepcopy(variableValue))
 
-	return [
-		loop.pipeline,
-		loop.stage,
-		loop.unit,
-		User(
-			userId=loop.principalService.get_user_id(),
-			name=loop.principalService.get_user_name(),
-			tenantId=loop.principalService.get_tenant_id(),
-			role=loop.principalService.get_user_role()
-		),
-		cloned
-	]
+	return [loop.pipeline, loop.stage, loop.unit, to_user(loop.principalService), cloned]
 
 
 def distribute_single_unit(
@@ -188,6 +195,14 @@ def distribute_single_unit(
 	principal_service = PrincipalService(user)
 	compiled_unit = CompiledSingleUnit(
 		pipeline=pipeline, stage=stage, unit=unit, principal_service=principal_service)
+	return run_single_unit(
+		compiled_unit, pipeline_variables, RuntimeTopicStorages(principal_service), principal_service)
+
+
+def run_single_unit(
+		compiled_unit: CompiledSingleUnit, pipeline_variables: PipelineVariables,
+		storages: TopicStorages, principal_service: PrincipalService
+) -> DistributedUnitLoopItemResult:
 	stage_monitor_log = MonitorLogStage(units=[])
 	triggered: List[Tuple[TopicId, TopicTrigger]] = []
 
@@ -197,8 +212,16 @@ def distribute_single_unit(
 	success = compiled_unit.run(
 		variables=pipeline_variables,
 		new_pipeline=new_pipeline, stage_monitor_log=stage_monitor_log,
-		storages=RuntimeTopicStorages(principal_service), principal_service=principal_service
+		storages=storages, principal_service=principal_service
 	)
+	try:
+		# write buffered insertions of this element before returning
+		storages.flush()
+	except Exception as e:
+		logger.error(e, exc_info=True, stack_info=True)
+		stage_monitor_log.units[0].status = MonitorLogStatus.ERROR
+		stage_monitor_log.units[0].error = format_exc()
+		success = False
 	return DistributedUnitLoopItemResult(log=stage_monitor_log.units[0], triggered=triggered, success=success)
 
 
@@ -214,13 +237,13 @@ def distribute_unit_loop(loop: DistributedUnitLoop) -> DistributedUnitLoopResult
 
 def thread_unit_loop(loop: DistributedUnitLoop) -> DistributedUnitLoopResult:
 	results = []
-	import concurrent.futures
-	with concurrent.futures.ThreadPoolExecutor(max_workers=ask_parallel_actions_count()) as executor:
+	with ThreadPoolExecutor(max_workers=ask_parallel_actions_count()) as executor:
 		futures = ArrayHelper(loop.loopVariableValues) \
 			.map(lambda variableValue: to_dask_args(loop, variableValue)) \
 			.map(lambda x: executor.submit(distribute_single_unit, *x)) \
 			.to_list()
-		for future in concurrent.futures.as_completed(futures):
+		# merge in order of elements
+		for future in futures:
 			try:
 				data = future.result()
 			except Exception as exc:
@@ -228,3 +251,129 @@ def thread_unit_loop(loop: DistributedUnitLoop) -> DistributedUnitLoopResult:
 			else:
 				results.append(data)
 	return DistributedUnitLoopResult(items=results)
+
+
+# compiled units of process pool worker, key is tenant, pipeline, version, stage and unit
+worker_compiled_units: Dict[Tuple[Any, ...], CompiledSingleUnit] = {}
+WORKER_COMPILED_UNITS_SIZE = 128
+
+
+def initialize_loop_worker() -> None:
+	"""
+	initialize meta storage and snowflake generator when worker process started.
+	worker is spawned, nothing such as connection pools and snowflake worker id is shared with parent process.
+	"""
+	ask_meta_storage()
+	ask_snowflake_generator()
+
+
+def ask_worker_compiled_unit(
+		pipeline: Pipeline, stage: PipelineStage, unit: PipelineUnit,
+		principal_service: PrincipalService) -> CompiledSingleUnit:
+	key = (
+		principal_service.get_tenant_id(), pipeline.pipelineId, pipeline.version, pipeline.lastModifiedAt,
+		stage.stageId, unit.unitId)
+	compiled_unit = worker_compiled_units.get(key)
+	if compiled_unit is None:
+		if len(worker_compiled_units) >= WORKER_COMPILED_UNITS_SIZE:
+			worker_compiled_units.clear()
+		compiled_unit = CompiledSingleUnit(
+			pipeline=pipeline, stage=stage, unit=unit, principal_service=principal_service)
+		worker_compiled_units[key] = compiled_unit
+	return compiled_unit
+
+
+def run_loop_chunk(
+		pipeline: Pipeline, stage: PipelineStage, unit: PipelineUnit, user: User,
+		pipeline_variables: PipelineVariables, loop_variable_name: str, loop_variable_values: List[Any]
+) -> List[DistributedUnitLoopItemResult]:
+	"""
+	runs on process pool worker. elements of chunk run one by one, same as sequential loop,
+	each element runs on a shallow clone of given variables which are unpickled once for whole chunk.
+	"""
+	principal_service = PrincipalService(user)
+	compiled_unit = ask_worker_compiled_unit(pipeline, stage, unit, principal_service)
+	storages = RuntimeTopicStorages(principal_service)
+
+	def run(value: Any) -> DistributedUnitLoopItemResult:
+		cloned = pipeline_variables.shallow_clone()
+		cloned.put(loop_variable_name, value)
+		return run_single_unit(compiled_unit, cloned, storages, principal_service)
+
+	return ArrayHelper(loop_variable_values).map(run).to_list()
+
+
+class ProcessPoolHolder:
+	executor: Optional[ProcessPoolExecutor] = None
+	lock: Lock = Lock()
+
+	def initialize(self) -> ProcessPoolExecutor:
+		if self.executor is None:
+			with self.lock:
+				if self.executor is None:
+					workers = max(ask_parallel_actions_count(), 1)
+					executor = ProcessPoolExecutor(
+						max_workers=workers, mp_context=get_context('spawn'), initializer=initialize_loop_worker)
+					# start all workers now, rather than on first loops
+					ArrayHelper([executor.submit(int) for _ in range(workers)]).each(lambda x: x.result())
+					self.executor = executor
+		return self.executor
+
+	def ask_executor(self) -> ProcessPoolExecutor:
+		return self.initialize()
+
+	def abandon(self, executor: ProcessPoolExecutor) -> None:
+		with self.lock:
+			if self.executor is executor:
+				self.executor = None
+		executor.shutdown(wait=False)
+
+
+process_pool_holder = ProcessPoolHolder()
+
+
+def to_chunk_variables(loop: DistributedUnitLoop) -> PipelineVariables:
+	"""
+	variables sent with each chunk, loop variable itself is excluded since elements are sent one by one.
+	factor index is not sent, rebuilt on worker when required.
+	"""
+	variables = loop.pipelineVariables
+	cloned = PipelineVariables(variables.previousData, variables.currentData, variables.topic)
+	cloned.variables = {key: value for key, value in variables.variables.items() if key != loop.loopVariableName}
+	cloned.variables_from = {
+		key: value for key, value in variables.variables_from.items() if key != loop.loopVariableName}
+	return cloned
+
+
+def create_failed_item_result(loop: DistributedUnitLoop, value: Any, error: str) -> DistributedUnitLoopItemResult:
+	return DistributedUnitLoopItemResult(
+		log=MonitorLogUnit(
+			unitId=loop.unit.unitId, name=loop.unit.name,
+			status=MonitorLogStatus.ERROR, startTime=now(), spentInMills=0, error=error,
+			loopVariableName=loop.loopVariableName, loopVariableValue=value,
+			actions=[]),
+		triggered=[], success=False)
+
+
+def process_pool_unit_loop(loop: DistributedUnitLoop) -> DistributedUnitLoopResult:
+	executor = process_pool_holder.ask_executor()
+	user = to_user(loop.principalService)
+	variables = to_chunk_variables(loop)
+	chunks = ArrayHelper(loop.loopVariableValues) \
+		.chunk(max(ask_parallel_actions_process_pool_chunk_size(), 1)).to_list()
+	futures: List[Future] = ArrayHelper(chunks) \
+		.map(lambda x: executor.submit(
+			run_loop_chunk, loop.pipeline, loop.stage, loop.unit, user, variables, loop.loopVariableName, x)) \
+		.to_list()
+	results: List[DistributedUnitLoopItemResult] = []
+	# merge in order of elements
+	for chunk, future in zip(chunks, futures):
+		try:
+			results.extend(future.result())
+		except Exception as e:
+			logger.error(e, exc_info=True, stack_info=True)
+			if isinstance(e, BrokenProcessPool):
+				process_pool_holder.abandon(executor)
+			error = format_exc()
+			results.extend(ArrayHelper(chunk).map(lambda x: create_failed_item_result(loop, x, error)).to_list())
+	return DistributedUnitLoopResult(items=results)
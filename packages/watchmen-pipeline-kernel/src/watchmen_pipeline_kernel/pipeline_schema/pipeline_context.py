@@ -5,7 +5,8 @@ from watchmen_data_kernel.topic_schema import TopicSchema
 from watchmen_model.admin import Pipeline
 from watchmen_model.pipeline_kernel import PipelineMonitorLog, PipelineTriggerTraceId
 from watchmen_pipeline_kernel.cache import CacheService
-from watchmen_pipeline_kernel.pipeline_schema_interface import CompiledPipeline, PipelineContext, TopicStorages
+from watchmen_pipeline_kernel.pipeline_schema_interface import CompiledPipeline, PipelineContext, \
+	PipelineTopicAccess, TopicStorages
 from .compiled_pipeline import RuntimeCompiledPipeline
 
 
@@ -40,6 +41,9 @@ class RuntimePipelineContext(PipelineContext):
 			handle_monitor_log=handle_monitor_log
 		)
 
+	def ask_topic_access(self) -> Optional[PipelineTopicAccess]:
+		return self.build_compiled_pipeline().get_topic_access()
+
 	def build_compiled_pipeline(self) -> CompiledPipeline:
 		compiled = CacheService.compiled_pipeline().get(self.pipeline.pipelineId)
 		if compiled is None:
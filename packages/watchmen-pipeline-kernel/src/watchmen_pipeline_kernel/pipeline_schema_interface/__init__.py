@@ -2,3 +2,4 @@ from .compiled_pipeline import CompiledPipeline
 from .create_queue_pipeline import CreateQueuePipeline
 from .pipeline_context import PipelineContext
 from .topic_storages import TopicStorages
+from .topic_access import PipelineTopicAccess
@@ -5,6 +5,7 @@ from watchmen_auth import PrincipalService
 from watchmen_model.admin import Pipeline
 from watchmen_model.pipeline_kernel import PipelineMonitorLog, PipelineTriggerTraceId
 from .pipeline_context import PipelineContext
+from .topic_access import PipelineTopicAccess
 from .topic_storages import TopicStorages
 
 
@@ -23,3 +24,10 @@ class CompiledPipeline:
 			handle_monitor_log: Callable[[PipelineMonitorLog, bool], None]
 	) -> List[PipelineContext]:
 		pass
+
+	# noinspection PyMethodMayBeStatic
+	def get_topic_access(self) -> Optional[PipelineTopicAccess]:
+		"""
+		returns none when topics accessed are unknown
+		"""
+		return None
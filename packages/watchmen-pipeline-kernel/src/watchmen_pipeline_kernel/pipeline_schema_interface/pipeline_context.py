@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 from abc import abstractmethod
-from typing import Callable, List
+from typing import Callable, List, Optional
 
 from watchmen_model.pipeline_kernel import PipelineMonitorLog
+from .topic_access import PipelineTopicAccess
 from .topic_storages import TopicStorages
 
 
@@ -15,3 +16,10 @@ class PipelineContext:
 			handle_monitor_log: Callable[[PipelineMonitorLog, bool], None]
 	) -> List[PipelineContext]:
 		pass
+
+	# noinspection PyMethodMayBeStatic
+	def ask_topic_access(self) -> Optional[PipelineTopicAccess]:
+		"""
+		returns none when topics accessed are unknown
+		"""
+		return None
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from typing import Iterable, Optional, Set
+
+from watchmen_model.common import TopicId
+
+
+class PipelineTopicAccess:
+	"""
+	topics read and written by a pipeline, trigger topic is treated as read.
+	"""
+
+	def __init__(self, read_topic_ids: Iterable[TopicId], write_topic_ids: Iterable[TopicId]):
+		self.writeTopicIds: Set[TopicId] = set(write_topic_ids)
+		# written topic is read as well, on find by or merge
+		self.readTopicIds: Set[TopicId] = set(read_topic_ids) | self.writeTopicIds
+
+	def conflicts_with(self, other: Optional[PipelineTopicAccess]) -> bool:
+		"""
+		conflicts when any topic written by one side is read or written by another side.
+		access is unknown when it is none, always conflicts.
+		"""
+		if other is None:
+			return True
+		return not self.writeTopicIds.isdisjoint(other.readTopicIds) \
+			or not other.writeTopicIds.isdisjoint(self.readTopicIds)
@@ -1,5 +1,7 @@
 from abc import abstractmethod
+from typing import Any, Dict, Optional
 
+from watchmen_data_kernel.storage import TopicDataService
 from watchmen_data_kernel.topic_schema import TopicSchema
 from watchmen_storage import TopicDataStorageSPI
 
@@ -9,3 +11,18 @@ class TopicStorages:
 	@abstractmethod
 	def ask_topic_storage(self, schema: TopicSchema) -> TopicDataStorageSPI:
 		pass
+
+	@abstractmethod
+	def buffer_insert(self, topic_data_service: TopicDataService, data: Dict[str, Any]) -> bool:
+		"""
+		returns True when data is buffered, it will be written on flush.
+		returns False when write behind is not enabled, data should be inserted directly.
+		"""
+		pass
+
+	@abstractmethod
+	def flush(self, schema: Optional[TopicSchema] = None) -> None:
+		"""
+		flush buffered data of given topic, or all topics when schema is not given
+		"""
+		pass
@@ -1 +1,3 @@
 from .topic_helper import RuntimeTopicStorages
+from .unit_of_work import UnitOfWorkTopicStorage
+from .write_buffer import TopicWriteBuffer
@@ -1,14 +1,20 @@
-from typing import Dict
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
 
 from watchmen_auth import PrincipalService
 from watchmen_data_kernel.meta import DataSourceService
 from watchmen_data_kernel.service import ask_topic_storage
+from watchmen_data_kernel.storage import TopicDataService
 from watchmen_data_kernel.topic_schema import TopicSchema
 from watchmen_model.common import DataSourceId
-from watchmen_pipeline_kernel.common import PipelineKernelException
+from watchmen_pipeline_kernel.common import ask_pipeline_write_behind, ask_pipeline_write_behind_batch_size, \
+	PipelineKernelException
 from watchmen_pipeline_kernel.pipeline_schema_interface import TopicStorages
 from watchmen_storage import TopicDataStorageSPI
-from watchmen_utilities import is_blank
+from watchmen_utilities import ArrayHelper, is_blank
+from .unit_of_work import UnitOfWorkTopicStorage
+from .write_buffer import TopicWriteBuffer
 
 
 def get_data_source_service(principal_service: PrincipalService) -> DataSourceService:
@@ -17,10 +23,21 @@ def get_data_source_service(principal_service: PrincipalService) -> DataSourceSe
 
 class RuntimeTopicStorages(TopicStorages):
 	storages: Dict[DataSourceId, TopicDataStorageSPI]
+	unitOfWork: Optional[Dict[DataSourceId, UnitOfWorkTopicStorage]] = None
+	unitOfWorkTransactional: bool = False
+	writeBuffer: Optional[TopicWriteBuffer] = None
 
-	def __init__(self, principal_service: PrincipalService):
+	def __init__(self, principal_service: PrincipalService, write_behind: Optional[bool] = None):
 		self.storages = {}
 		self.principalService = principal_service
+		if ask_pipeline_write_behind() if write_behind is None else write_behind:
+			self.writeBuffer = TopicWriteBuffer(ask_pipeline_write_behind_batch_size())
+
+	def derive(self) -> RuntimeTopicStorages:
+		"""
+		create storages with same principal and write behind, nothing is shared with this one.
+		"""
+		return RuntimeTopicStorages(self.principalService, self.writeBuffer is not None)
 
 	def ask_topic_storage(self, schema: TopicSchema) -> TopicDataStorageSPI:
 		topic = schema.get_topic()
@@ -28,6 +45,12 @@ class RuntimeTopicStorages(TopicStorages):
 		if is_blank(data_source_id):
 			raise PipelineKernelException(
 				f'Data source is not defined for topic[id={topic.topicId}, name={topic.name}]')
+		if self.unitOfWork is not None:
+			return self.ask_unit_of_work_storage(data_source_id, schema)
+
+		return self.ask_data_source_storage(data_source_id, schema)
+
+	def ask_data_source_storage(self, data_source_id: DataSourceId, schema: TopicSchema) -> TopicDataStorageSPI:
 		storage = self.storages.get(data_source_id)
 		if storage is not None:
 			return storage
@@ -35,3 +58,63 @@ class RuntimeTopicStorages(TopicStorages):
 		storage = ask_topic_storage(schema, self.principalService)
 		self.storages[data_source_id] = storage
 		return storage
+
+	def ask_unit_of_work_storage(self, data_source_id: DataSourceId, schema: TopicSchema) -> TopicDataStorageSPI:
+		storage = self.unitOfWork.get(data_source_id)
+		if storage is None:
+			storage = UnitOfWorkTopicStorage(
+				self.ask_data_source_storage(data_source_id, schema), self.unitOfWorkTransactional)
+			self.unitOfWork[data_source_id] = storage
+		# noinspection PyTypeChecker
+		return storage
+
+	def buffer_insert(self, topic_data_service: TopicDataService, data: Dict[str, Any]) -> bool:
+		if self.writeBuffer is None:
+			return False
+		self.writeBuffer.append(topic_data_service, data)
+		return True
+
+	def flush(self, schema: Optional[TopicSchema] = None) -> None:
+		if self.writeBuffer is None:
+			return
+		if schema is None:
+			self.writeBuffer.flush_all()
+		else:
+			topic_id = schema.get_topic().topicId
+			if self.writeBuffer.has_buffered(topic_id):
+				self.writeBuffer.flush_topic(topic_id)
+
+	def is_in_unit_of_work(self) -> bool:
+		return self.unitOfWork is not None
+
+	def begin_unit_of_work(self, transactional: bool = False) -> None:
+		"""
+		all storages asked after begin share one connection per data source, until unit of work ended.
+		"""
+		if self.unitOfWork is not None:
+			raise PipelineKernelException('Unit of work is in progress, cannot begin another one.')
+		self.unitOfWork = {}
+		self.unitOfWorkTransactional = transactional
+
+	def end_unit_of_work(self, success: bool) -> None:
+		"""
+		release connections of all data sources.
+		for transactional unit of work, commit when success, otherwise rollback.
+		"""
+		if self.unitOfWork is None:
+			return
+		storages = list(self.unitOfWork.values())
+		self.unitOfWork = None
+		errors = ArrayHelper(storages).map(lambda x: self.release_unit_of_work_storage(x, success)) \
+			.filter(lambda x: x is not None).to_list()
+		if len(errors) != 0:
+			raise PipelineKernelException(f'Failed to end unit of work, {len(errors)} storage(s) failed.') from errors[0]
+
+	# noinspection PyMethodMayBeStatic
+	def release_unit_of_work_storage(self, storage: UnitOfWorkTopicStorage, success: bool) -> Optional[Exception]:
+		# release all storages even if some of them failed
+		try:
+			storage.release(success)
+			return None
+		except Exception as e:
+			return e
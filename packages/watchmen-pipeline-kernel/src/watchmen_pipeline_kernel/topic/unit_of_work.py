@@ -0,0 +1,112 @@
+from logging import getLogger
+from typing import Any
+
+from watchmen_storage import TopicDataStorageSPI
+
+logger = getLogger(__name__)
+
+
+class UnitOfWorkTopicStorage:
+	"""
+	wrap a topic data storage, keep one connection for the whole unit of work.
+	connect and close from topic data service are absorbed, connection is released by "release" only.
+	1. non-transactional (default): one autocommit connection is retained and reused.
+		explicit transaction (begin/commit_and_close/rollback_and_close) still works as before,
+		autocommit connection is released before begin, and will be re-created on next connect.
+	2. transactional: one transaction is opened on first connect, commit or rollback on release.
+		nested begin/commit_and_close are absorbed, rollback_and_close marks the unit as rollback only.
+	other methods are delegated to wrapped storage.
+	"""
+
+	def __init__(self, storage: TopicDataStorageSPI, transactional: bool = False):
+		self.storage = storage
+		self.transactional = transactional
+		self.connected = False
+		self.inTransaction = False
+		self.rollbackOnly = False
+
+	def get_storage(self) -> TopicDataStorageSPI:
+		return self.storage
+
+	def connect(self) -> None:
+		if self.connected:
+			return
+		if self.transactional:
+			self.storage.begin()
+		else:
+			self.storage.connect()
+		self.connected = True
+
+	def close(self) -> None:
+		if self.inTransaction:
+			# explicit transaction on non-transactional unit, close it as regular
+			self.inTransaction = False
+			self.storage.close()
+		# otherwise retain connection, released by unit of work
+
+	def begin(self) -> None:
+		if self.transactional:
+			self.connect()
+		elif not self.inTransaction:
+			# release retained autocommit connection, explicit transaction requires a new one
+			self.release_connection()
+			self.storage.begin()
+			self.inTransaction = True
+
+	def commit_and_close(self) -> None:
+		if self.transactional:
+			# commit on release
+			return
+		self.inTransaction = False
+		self.storage.commit_and_close()
+
+	def rollback_and_close(self) -> None:
+		if self.transactional:
+			logger.warning('Rollback required in unit of work, whole unit will be rolled back on release.')
+			self.rollbackOnly = True
+			return
+		self.inTransaction = False
+		self.storage.rollback_and_close()
+
+	def begin_savepoint(self) -> bool:
+		"""
+		returns true when savepoint begun, only for transactional and storage supports it.
+		failed statement aborts whole transaction on some databases (e.g. postgresql),
+		rollback to savepoint then transaction can be continued.
+		"""
+		if not self.transactional or not self.storage.is_savepoint_supported():
+			return False
+		self.connect()
+		self.storage.begin_savepoint()
+		return True
+
+	def release_savepoint(self) -> None:
+		self.storage.release_savepoint()
+
+	def rollback_to_savepoint(self) -> None:
+		self.storage.rollback_to_savepoint()
+
+	def release_connection(self) -> None:
+		if self.connected:
+			self.connected = False
+			self.storage.close()
+
+	def release(self, success: bool) -> None:
+		"""
+		release connection. for transactional, commit when success and not marked as rollback only.
+		"""
+		if self.inTransaction:
+			self.inTransaction = False
+			self.storage.close()
+		if not self.connected:
+			return
+		self.connected = False
+		if not self.transactional:
+			self.storage.close()
+		elif success and not self.rollbackOnly:
+			self.storage.commit_and_close()
+		else:
+			self.storage.rollback_and_close()
+
+	def __getattr__(self, name: str) -> Any:
+		return getattr(self.storage, name)
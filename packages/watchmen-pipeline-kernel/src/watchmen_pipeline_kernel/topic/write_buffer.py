@@ -0,0 +1,64 @@
+from copy import copy
+from logging import getLogger
+from typing import Any, Dict, List, Tuple
+
+from watchmen_data_kernel.storage import TopicDataService
+from watchmen_model.common import TopicId
+from watchmen_utilities import ArrayHelper
+
+logger = getLogger(__name__)
+
+
+class TopicWriteBuffer:
+	"""
+	write behind buffer of insertions, grouped by topic.
+	data is prepared (id, version, audit columns) when buffered, and written by insert_all on flush.
+	buffer of topic is flushed automatically when its size reaches batch size.
+	"""
+
+	def __init__(self, batch_size: int):
+		self.batchSize = max(batch_size, 1)
+		# keep insertion order of topics, flush in same order
+		self.buffers: Dict[TopicId, Tuple[TopicDataService, List[Dict[str, Any]]]] = {}
+
+	def append(self, topic_data_service: TopicDataService, data: Dict[str, Any]) -> Dict[str, Any]:
+		"""
+		returns given data, with id, version and audit columns assigned
+		"""
+		topic_id = topic_data_service.get_topic().topicId
+		topic_data_service.prepare_insert(data)
+		buffered = self.buffers.get(topic_id)
+		if buffered is None:
+			buffered = (topic_data_service, [])
+			self.buffers[topic_id] = buffered
+		# shallow copy, protect buffered row from being changed by following logic
+		buffered[1].append(copy(data))
+		if len(buffered[1]) >= self.batchSize:
+			self.flush_topic(topic_id)
+		return data
+
+	def has_buffered(self, topic_id: TopicId) -> bool:
+		buffered = self.buffers.get(topic_id)
+		return buffered is not None and len(buffered[1]) != 0
+
+	def flush_topic(self, topic_id: TopicId) -> None:
+		buffered = self.buffers.pop(topic_id, None)
+		if buffered is None:
+			return
+		topic_data_service, rows = buffered
+		ArrayHelper(rows).chunk(self.batchSize).each(lambda x: topic_data_service.insert_all(x))
+
+	def flush_all(self) -> None:
+		"""
+		flush all topics, try to flush every topic even if some of them failed, raise the first exception.
+		"""
+		error = None
+		for topic_id in list(self.buffers.keys()):
+			try:
+				self.flush_topic(topic_id)
+			except Exception as e:
+				logger.error(e, exc_info=True, stack_info=True)
+				if error is None:
+					error = e
+		if error is not None:
+			raise error
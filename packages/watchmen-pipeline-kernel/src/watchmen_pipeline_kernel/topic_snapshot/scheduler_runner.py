@@ -1,7 +1,7 @@
 from asyncio import run
 from datetime import date, datetime, timedelta
 from logging import getLogger
-from typing import List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from time import sleep
 
@@ -20,10 +20,10 @@ from watchmen_model.common import Pageable, TenantId, TopicId
 from watchmen_model.pipeline_kernel import TopicDataColumnNames
 from watchmen_pipeline_kernel.pipeline import create_monitor_log_pipeline_invoker, PipelineTrigger
 from watchmen_storage import ColumnNameLiteral, EntityCriteriaExpression, EntityCriteriaJoint, \
-	EntityCriteriaJointConjunction
+	EntityCriteriaJointConjunction, EntityCriteriaOperator
 from watchmen_utilities import ArrayHelper, last_day_of_month
 from .scheduler_registrar import topic_snapshot_jobs
-from ..common import PipelineKernelException
+from ..common import ask_topic_snapshot_copy_size, ask_topic_snapshot_task_page_size, PipelineKernelException
 
 logger = getLogger(__name__)
 
@@ -226,8 +226,8 @@ def create_tasks(
 
 	snapshot_tag = build_snapshot_tag(process_date, scheduler.frequency)
 
-	def copy_data_by_id(id_: int) -> None:
-		source_data = source_topic_service.find_data_by_id(id_)
+	def to_task_data(source_data: Dict[str, Any]) -> Dict[str, Any]:
+		id_ = source_data.get(TopicDataColumnNames.ID.value)
 		source_topic_service.delete_reversed_columns(source_data)
 		source_data = source_topic_service.try_to_unwrap_from_topic_data(source_data)
 		source_data['originaldataid'] = id_
@@ -236,44 +236,40 @@ def create_tasks(
 		source_data['targettopicname'] = scheduler.targetTopicName
 		source_data['jobid'] = lock.lockId
 		source_data['schedulerid'] = scheduler.schedulerId
-		task_topic_service.trigger_by_insert(source_data)
-
-	ArrayHelper(data_ids).each(copy_data_by_id)
-	update_job_row_count(lock, len(data_ids), principal_service)
+		return source_data
+
+	def copy_data_by_ids(ids: List[int]) -> int:
+		"""
+		returns count of copied rows, source rows might be deleted after ids found
+		"""
+		source_data_list = source_topic_service.find([EntityCriteriaExpression(
+			left=ColumnNameLiteral(columnName=TopicDataColumnNames.ID.value),
+			operator=EntityCriteriaOperator.IN, right=ids)])
+		if len(source_data_list) == 0:
+			# insert all with no values is not allowed
+			return 0
+		task_topic_service.trigger_by_insert_all(ArrayHelper(source_data_list).map(to_task_data).to_list())
+		return len(source_data_list)
+
+	# copy in chunks, and row count is updated after each chunk copied
+	copied_count = 0
+	for chunk_ids in ArrayHelper(data_ids).chunk(ask_topic_snapshot_copy_size()).to_list():
+		chunk_copied_count = copy_data_by_ids(chunk_ids)
+		if chunk_copied_count == 0:
+			continue
+		copied_count = copied_count + chunk_copied_count
+		update_job_row_count(lock, copied_count, principal_service)
 	return True
 
 
-def run_task(
-		lock: TopicSnapshotJobLock, scheduler: TopicSnapshotScheduler,
-		principal_service: PrincipalService,
-		after_sleeping: bool = False
-) -> None:
-	# scan task topic to fetch task and trigger pipeline to write to target topic
-	# until there is no data with status ready
-	# or no task at all and task lock status is success/failed
-	task_topic_schema, task_topic_service, pipline = get_task_topic_data_service(scheduler, principal_service)
-	page = task_topic_service.page_and_unwrap([
-		EntityCriteriaJoint(
-			conjunction=EntityCriteriaJointConjunction.AND,
-			children=[
-				EntityCriteriaExpression(left=ColumnNameLiteral(columnName='jobid'), right=lock.lockId),
-				EntityCriteriaExpression(left=ColumnNameLiteral(columnName='schedulerid'), right=scheduler.schedulerId),
-				EntityCriteriaExpression(left=ColumnNameLiteral(columnName='status'), right='ready'),
-			]
-		)
-	], Pageable(pageNumber=1, pageSize=1))
-	if len(page.data) == 0:
-		if not after_sleeping:
-			sleep(30)
-			run_task(lock, scheduler, principal_service, True)
-			return
-		else:
-			# accomplish job
-			try_to_accomplish_job(lock.lockId, principal_service)
-			return
-
+def run_one_task(
+		data: Dict[str, Any], task_topic_schema: TopicSchema, task_topic_service: TopicDataService,
+		pipeline: Pipeline, principal_service: PrincipalService
+) -> bool:
+	"""
+	returns false when task is processed by others
+	"""
 	# try to update status to process
-	data = page.data[0]
 	data['status'] = 'processed'
 	data_id = data.get(TopicDataColumnNames.ID.value)
 	tenant_id = data.get(TopicDataColumnNames.TENANT_ID.value)
@@ -288,9 +284,7 @@ def run_task(
 		left=ColumnNameLiteral(columnName='status'), right='ready'
 	)])
 	if updated_count == 0:
-		sleep(1)
-		run_task(lock, scheduler, principal_service)
-		return
+		return False
 
 	trace_id = str(ask_snowflake_generator().next_id())
 	unwrapped_data = data[TopicDataColumnNames.RAW_TOPIC_DATA.value]
@@ -307,8 +301,49 @@ def run_task(
 		current=unwrapped_data,
 		triggerType=PipelineTriggerType.INSERT,
 		internalDataId=data_id
-	), pipline.pipelineId))
-	run_task(lock, scheduler, principal_service)
+	), pipeline.pipelineId))
+	return True
+
+
+def run_task(
+		lock: TopicSnapshotJobLock, scheduler: TopicSnapshotScheduler,
+		principal_service: PrincipalService,
+		after_sleeping: bool = False
+) -> None:
+	# scan task topic to fetch tasks page by page and trigger pipeline to write to target topic
+	# until there is no data with status ready
+	# or no task at all and task lock status is success/failed
+	# status of task is updated to processed one by one, so job can be resumed from the ready ones
+	task_topic_schema, task_topic_service, pipeline = get_task_topic_data_service(scheduler, principal_service)
+	criteria = [
+		EntityCriteriaJoint(
+			conjunction=EntityCriteriaJointConjunction.AND,
+			children=[
+				EntityCriteriaExpression(left=ColumnNameLiteral(columnName='jobid'), right=lock.lockId),
+				EntityCriteriaExpression(left=ColumnNameLiteral(columnName='schedulerid'), right=scheduler.schedulerId),
+				EntityCriteriaExpression(left=ColumnNameLiteral(columnName='status'), right='ready'),
+			]
+		)
+	]
+	while True:
+		page = task_topic_service.page_and_unwrap(
+			criteria, Pageable(pageNumber=1, pageSize=ask_topic_snapshot_task_page_size()))
+		if len(page.data) == 0:
+			if not after_sleeping:
+				sleep(30)
+				after_sleeping = True
+				continue
+			else:
+				# accomplish job
+				try_to_accomplish_job(lock.lockId, principal_service)
+				return
+
+		after_sleeping = False
+		processed_count = ArrayHelper(page.data).filter(
+			lambda x: run_one_task(x, task_topic_schema, task_topic_service, pipeline, principal_service)).size()
+		if processed_count == 0:
+			# all tasks of page are processed by others
+			sleep(1)
 
 
 def run_job(scheduler_id: TopicSnapshotSchedulerId, process_date: date) -> None:
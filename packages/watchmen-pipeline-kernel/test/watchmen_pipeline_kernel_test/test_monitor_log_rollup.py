@@ -0,0 +1,55 @@
+from datetime import datetime
+from random import Random
+from typing import Dict
+from unittest import TestCase
+
+from watchmen_model.pipeline_kernel import MonitorLogStatus, PipelineMonitorLog
+from watchmen_pipeline_kernel.monitor_log import DurationSketch, merge_rollups
+from watchmen_pipeline_kernel.monitor_log.monitor_log_rollup import MonitorLogRollupBucket, roll_up, RollupKey
+
+
+def nearest_rank(sorted_values, q: float) -> int:
+	index = max(0, min(len(sorted_values) - 1, int(-(-q * len(sorted_values) // 1)) - 1))
+	return sorted_values[index]
+
+
+class MonitorLogRollupTest(TestCase):
+	def test_sketch_quantile_in_accuracy(self):
+		rand = Random(7)
+		values = [int(rand.lognormvariate(5, 1.5)) + 1 for _ in range(10000)]
+		first, second = DurationSketch(), DurationSketch()
+		for index, value in enumerate(values):
+			(first if index % 2 == 0 else second).add(value)
+		# merged through serialization, as rollups are read from storage
+		merged = DurationSketch.from_dict(first.to_dict())
+		merged.merge(DurationSketch.from_dict(second.to_dict()))
+		self.assertEqual(len(values), merged.count)
+		sorted_values = sorted(values)
+		for q in [0.5, 0.95, 0.99]:
+			expected = nearest_rank(sorted_values, q)
+			self.assertLessEqual(abs(merged.quantile(q) - expected), expected * 0.01 + 1e-9)
+
+	def test_roll_up_and_merge(self):
+		buckets: Dict[RollupKey, MonitorLogRollupBucket] = {}
+		logs = [
+			PipelineMonitorLog(
+				pipelineId='1', topicId='1', status=MonitorLogStatus.DONE, spentInMills=10,
+				startTime=datetime(2026, 1, 1, 8, 0, 5)),
+			PipelineMonitorLog(
+				pipelineId='1', topicId='1', status=MonitorLogStatus.ERROR, spentInMills=30,
+				startTime=datetime(2026, 1, 1, 8, 0, 50)),
+			PipelineMonitorLog(
+				pipelineId='1', topicId='1', status=MonitorLogStatus.IGNORED, spentInMills=0,
+				startTime=datetime(2026, 1, 1, 8, 1, 0))
+		]
+		for log in logs:
+			roll_up(buckets, log, 't1')
+		self.assertEqual(2, len(buckets))
+		first = buckets[('t1', '1', '1', datetime(2026, 1, 1, 8, 0))]
+		self.assertEqual((2, 1, 1, 2, 40), (
+			first.totalCount, first.doneCount, first.errorCount, first.durationCount, first.durationSum))
+
+		merged = merge_rollups([bucket.to_rollup(key) for key, bucket in buckets.items()])
+		self.assertEqual((3, 1, 1, 1), (merged.totalCount, merged.doneCount, merged.errorCount, merged.ignoredCount))
+		self.assertEqual((2, 10, 30), (merged.durationCount, merged.durationMin, merged.durationMax))
+		self.assertAlmostEqual(30, merged.durationSketch.quantile(0.95), delta=0.3)
@@ -0,0 +1,237 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+from unittest import TestCase
+from unittest.mock import patch
+
+from watchmen_auth import PrincipalService
+from watchmen_model.admin import User, UserRole
+from watchmen_model.pipeline_kernel import MonitorLogStatus, PipelineMonitorLog, PipelineMonitorLogRollup, \
+	PipelineMonitorLogRollupTier
+from watchmen_pipeline_kernel.common import PipelineKernelException
+from watchmen_pipeline_kernel.monitor_log import monitor_log_rollup, monitor_log_rollup_data_service, \
+	PipelineMonitorLogRollupDataService
+from watchmen_pipeline_kernel.monitor_log.monitor_log_rollup import compact_rollups
+
+MINUTE = PipelineMonitorLogRollupTier.MINUTE
+HOUR = PipelineMonitorLogRollupTier.HOUR
+DAY = PipelineMonitorLogRollupTier.DAY
+
+
+def create_fake_principal_service() -> PrincipalService:
+	return PrincipalService(User(userId='1', tenantId='t1', name='imma-admin', role=UserRole.ADMIN))
+
+
+def create_rollup(
+		minute_at: datetime, total_count: int, tier: PipelineMonitorLogRollupTier = MINUTE,
+		backfilled: bool = False, pipeline_id: str = 'p1') -> PipelineMonitorLogRollup:
+	return PipelineMonitorLogRollup(
+		tenantId='t1', topicId='1', pipelineId=pipeline_id, tier=tier, minuteAt=minute_at, backfilled=backfilled,
+		totalCount=total_count, doneCount=total_count)
+
+
+def in_period(rollup: PipelineMonitorLogRollup, start: Optional[datetime], end: Optional[datetime]) -> bool:
+	return (start is None or rollup.minuteAt >= start) and (end is None or rollup.minuteAt < end)
+
+
+class FakeRollupService:
+	"""
+	rollups in memory, changes are visible after commit
+	"""
+
+	def __init__(self, rollups: List[PipelineMonitorLogRollup]):
+		self.nextId = 0
+		self.rollups = []
+		self.create_all(rollups)
+		self.committed = list(self.rollups)
+		self.lostIds: List[str] = []
+
+	def begin_transaction(self) -> None:
+		self.rollups = list(self.committed)
+
+	def commit_transaction(self) -> None:
+		self.committed = list(self.rollups)
+
+	def rollback_transaction(self) -> None:
+		self.rollups = list(self.committed)
+
+	def close_transaction(self) -> None:
+		pass
+
+	def create_all(self, rollups: List[PipelineMonitorLogRollup]) -> List[PipelineMonitorLogRollup]:
+		for rollup in rollups:
+			self.nextId = self.nextId + 1
+			rollup.rollupId = str(self.nextId)
+			self.rollups.append(rollup)
+		return rollups
+
+	def find_by_tier(
+			self, tier: PipelineMonitorLogRollupTier, start: Optional[datetime], end: Optional[datetime],
+			limit: Optional[int] = None) -> List[PipelineMonitorLogRollup]:
+		found = sorted(
+			[x for x in self.rollups if x.tier == tier and in_period(x, start, end)], key=lambda x: x.minuteAt)
+		return found if limit is None else found[:limit]
+
+	def delete_by_ids(self, rollup_ids: List[str]) -> int:
+		# rollups which are deleted by others
+		rollup_ids = [x for x in rollup_ids if x not in self.lostIds]
+		count = len([x for x in self.rollups if x.rollupId in rollup_ids])
+		self.rollups = [x for x in self.rollups if x.rollupId not in rollup_ids]
+		return count
+
+	def find(
+			self, tenant_id: str, topic_id: Optional[str], pipeline_id: Optional[str],
+			periods: List[Tuple[PipelineMonitorLogRollupTier, Optional[datetime], Optional[datetime]]]
+	) -> List[PipelineMonitorLogRollup]:
+		return [
+			x for x in self.rollups
+			if x.tenantId == tenant_id and (topic_id is None or x.topicId == topic_id)
+			and (pipeline_id is None or x.pipelineId == pipeline_id)
+			and any(x.tier == tier and in_period(x, start, end) for tier, start, end in periods)
+		]
+
+	def find_earliest_on_the_fly(self, tenant_id: str) -> Optional[PipelineMonitorLogRollup]:
+		rollups = sorted(
+			[x for x in self.rollups if x.tenantId == tenant_id and not x.backfilled], key=lambda x: x.minuteAt)
+		return rollups[0] if len(rollups) != 0 else None
+
+	def delete_backfilled(self, tenant_id: str, start: Optional[datetime], end: Optional[datetime]) -> int:
+		deleted = [x for x in self.rollups if x.tenantId == tenant_id and x.backfilled and in_period(x, start, end)]
+		self.rollups = [x for x in self.rollups if x not in deleted]
+		return len(deleted)
+
+	def summary(self) -> List[Tuple[PipelineMonitorLogRollupTier, datetime, bool, str, int]]:
+		return sorted(
+			[(x.tier, x.minuteAt, x.backfilled, x.pipelineId, x.totalCount) for x in self.committed],
+			key=lambda x: (x[1], x[0], x[2], x[3]))
+
+
+class FakeLogService:
+	def __init__(self, logs: List[PipelineMonitorLog]):
+		self.logs = sorted(logs, key=lambda x: x.startTime)
+		self.afters = []
+
+	# noinspection PyUnusedLocal
+	def find_by_start_time(
+			self, tenant_id: str, start: Optional[datetime], end: Optional[datetime],
+			after: Optional[Tuple[datetime, int]], limit: int
+	) -> List[Tuple[Tuple[datetime, int], PipelineMonitorLog]]:
+		self.afters.append(after)
+		keyed = [((x.startTime, index), x) for index, x in enumerate(self.logs)]
+		return [
+			x for x in keyed
+			if in_period(create_rollup(x[1].startTime, 0), start, end) and (after is None or x[0] > after)
+		][:limit]
+
+
+class MonitorLogRollupTiersTest(TestCase):
+	def compact(self, service: FakeRollupService, now: datetime, compact_size: int = 2) -> int:
+		with patch.object(monitor_log_rollup, 'ask_rollup_service', lambda: service), \
+				patch.object(monitor_log_rollup, 'ask_pipeline_monitor_log_rollup_compact_size', lambda: compact_size), \
+				patch.object(monitor_log_rollup, 'ask_pipeline_monitor_log_rollup_minute_tier_hours', lambda: 24), \
+				patch.object(monitor_log_rollup, 'ask_pipeline_monitor_log_rollup_hour_tier_days', lambda: 7):
+			return compact_rollups(now)
+
+	def test_compact_into_hours_and_days(self):
+		service = FakeRollupService([
+			# appended by two flushes of same minute
+			create_rollup(datetime(2026, 1, 9, 10, 5), 1),
+			create_rollup(datetime(2026, 1, 9, 10, 5), 2),
+			create_rollup(datetime(2026, 1, 9, 10, 40), 3),
+			create_rollup(datetime(2026, 1, 9, 10, 40), 4, pipeline_id='p2'),
+			create_rollup(datetime(2026, 1, 9, 11, 0), 5),
+			create_rollup(datetime(2026, 1, 9, 10, 20), 6, backfilled=True),
+			# compacted by previous run, late minute rollup of same hour is merged into it
+			create_rollup(datetime(2026, 1, 9, 10, 0), 7, tier=HOUR),
+			# older than hour tier days, compacted into hour and then day
+			create_rollup(datetime(2026, 1, 1, 8, 10), 8),
+			create_rollup(datetime(2026, 1, 1, 23, 59), 9, tier=HOUR),
+			# recent, not compacted
+			create_rollup(datetime(2026, 1, 10, 12, 0), 10)
+		])
+		self.assertEqual(9, self.compact(service, datetime(2026, 1, 10, 12, 30)))
+		self.assertEqual([
+			(DAY, datetime(2026, 1, 1), False, 'p1', 17),
+			(HOUR, datetime(2026, 1, 9, 10), False, 'p1', 13),
+			(HOUR, datetime(2026, 1, 9, 10), False, 'p2', 4),
+			(HOUR, datetime(2026, 1, 9, 10), True, 'p1', 6),
+			(HOUR, datetime(2026, 1, 9, 11), False, 'p1', 5),
+			(MINUTE, datetime(2026, 1, 10, 12), False, 'p1', 10)
+		], service.summary())
+		# nothing left to compact
+		self.assertEqual(0, self.compact(service, datetime(2026, 1, 10, 12, 30)))
+
+	def test_compacted_by_others(self):
+		service = FakeRollupService([
+			create_rollup(datetime(2026, 1, 9, 10, 5), 1),
+			create_rollup(datetime(2026, 1, 9, 10, 6), 2)
+		])
+		before = service.summary()
+		service.lostIds = ['2']
+		self.assertEqual(0, self.compact(service, datetime(2026, 1, 10, 12, 30)))
+		self.assertEqual(before, service.summary())
+
+	def test_find_stats_by_tiers(self):
+		service = FakeRollupService([
+			create_rollup(datetime(2026, 1, 1), 1, tier=DAY),
+			create_rollup(datetime(2026, 1, 2), 2, tier=DAY),
+			create_rollup(datetime(2026, 1, 9, 10), 4, tier=HOUR),
+			create_rollup(datetime(2026, 1, 9, 11), 8, tier=HOUR),
+			create_rollup(datetime(2026, 1, 10, 12, 0), 16),
+			create_rollup(datetime(2026, 1, 10, 12, 1), 32),
+			create_rollup(datetime(2026, 1, 10, 12, 1), 64)
+		])
+		data_service = PipelineMonitorLogRollupDataService(create_fake_principal_service())
+		with patch.object(monitor_log_rollup_data_service, 'ask_rollup_service', lambda: service):
+			def total(start: Optional[datetime], end: Optional[datetime]) -> int:
+				return data_service.find_stats('1', 'p1', start, end).totalCount
+
+			self.assertEqual(127, total(None, None))
+			# start falls in compacted day and hour, extended to whole day and hour
+			self.assertEqual(127, total(datetime(2026, 1, 1, 8), None))
+			self.assertEqual(124, total(datetime(2026, 1, 9, 10, 30), None))
+			self.assertEqual(12, total(datetime(2026, 1, 9, 10, 30), datetime(2026, 1, 10, 11, 59)))
+			self.assertEqual(96, total(datetime(2026, 1, 10, 12, 1), datetime(2026, 1, 10, 12, 1, 30)))
+			self.assertEqual(3, total(None, datetime(2026, 1, 8)))
+
+	def backfill(
+			self, service: FakeRollupService, log_service: FakeLogService, rollup_on_the_fly: bool,
+			start: Optional[datetime], end: Optional[datetime]) -> int:
+		data_service = PipelineMonitorLogRollupDataService(create_fake_principal_service())
+		data_service.ask_log_service = lambda principal_service: log_service
+		with patch.object(monitor_log_rollup_data_service, 'ask_rollup_service', lambda: service), \
+				patch.object(
+					monitor_log_rollup_data_service, 'ask_pipeline_monitor_log_rollup', lambda: rollup_on_the_fly), \
+				patch.object(monitor_log_rollup_data_service, 'ask_pipeline_monitor_log_rollup_backfill_page_size',
+				             lambda: 2):
+			return data_service.backfill(start, end)
+
+	def test_backfill_before_on_the_fly(self):
+		service = FakeRollupService([
+			# written on the fly since 10:00
+			create_rollup(datetime(2026, 1, 9, 10, 0), 100),
+			# backfilled before, replaced
+			create_rollup(datetime(2026, 1, 9, 8, 0), 200, backfilled=True)
+		])
+		log_service = FakeLogService([
+			PipelineMonitorLog(
+				pipelineId='p1', topicId='1', status=MonitorLogStatus.DONE, spentInMills=10,
+				startTime=datetime(2026, 1, 9, hour, minute))
+			for hour, minute in [(7, 1), (8, 0), (8, 0), (9, 59), (10, 0), (10, 1)]
+		])
+		with self.assertRaises(PipelineKernelException):
+			self.backfill(service, log_service, True, datetime(2026, 1, 9, 7), datetime(2026, 1, 9, 10, 1))
+		self.assertEqual(4, self.backfill(service, log_service, True, datetime(2026, 1, 9, 8), datetime(2026, 1, 9, 9)))
+		# range extended to whole day, ended at the earliest rollup written on the fly
+		self.assertEqual([
+			(MINUTE, datetime(2026, 1, 9, 7, 1), True, 'p1', 1),
+			(MINUTE, datetime(2026, 1, 9, 8, 0), True, 'p1', 2),
+			(MINUTE, datetime(2026, 1, 9, 9, 59), True, 'p1', 1),
+			(MINUTE, datetime(2026, 1, 9, 10, 0), False, 'p1', 100)
+		], service.summary())
+		# keyset paging
+		self.assertEqual([None, (datetime(2026, 1, 9, 8, 0), 1)], log_service.afters[:2])
+
+	def test_backfill_refused_before_flushed(self):
+		service = FakeRollupService([])
+		with self.assertRaises(PipelineKernelException):
+			self.backfill(service, FakeLogService([]), True, None, datetime(2026, 1, 9, 9))
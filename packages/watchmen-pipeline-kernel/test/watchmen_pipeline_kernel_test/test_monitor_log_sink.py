@@ -0,0 +1,81 @@
+from typing import List
+from unittest import TestCase
+from unittest.mock import patch
+
+from watchmen_auth import PrincipalService
+from watchmen_model.admin import Topic, TopicKind, User, UserRole
+from watchmen_model.pipeline_kernel import PipelineMonitorLog
+from watchmen_pipeline_kernel.pipeline import MonitorLogSink
+from watchmen_pipeline_kernel.pipeline import monitor_log_invoker, monitor_log_sink
+from watchmen_pipeline_kernel.pipeline.monitor_log_sink import BufferedMonitorLog
+
+
+def create_fake_principal_service(tenant_id: str) -> PrincipalService:
+	return PrincipalService(User(userId='1', tenantId=tenant_id, name='imma-admin', role=UserRole.ADMIN))
+
+
+class FakeTopicService:
+	# noinspection PyMethodMayBeStatic
+	def find_by_id(self, topic_id: str) -> Topic:
+		return Topic(topicId=topic_id, kind=TopicKind.SYSTEM if topic_id == 'system' else TopicKind.BUSINESS)
+
+
+class FakeRollupWriter:
+	def __init__(self, rolled_up: List[PipelineMonitorLog]):
+		self.rolledUp = rolled_up
+
+	# noinspection PyUnusedLocal
+	def accept(self, monitor_log: PipelineMonitorLog, tenant_id: str) -> None:
+		self.rolledUp.append(monitor_log)
+
+
+class FakeMonitorLogSink(MonitorLogSink):
+	def __init__(self, batch_size: int, queue_size: int = 100):
+		super().__init__(batch_size, 10, queue_size)
+		self.written: List[List[BufferedMonitorLog]] = []
+
+	def start(self) -> None:
+		# no background thread in test
+		pass
+
+	def write_tenant(self, items: List[BufferedMonitorLog]) -> None:
+		self.written.append(items)
+
+
+class MonitorLogSinkTest(TestCase):
+	def test_flush_by_tenant_and_batch_size(self):
+		sink = FakeMonitorLogSink(2)
+		for index in range(3):
+			sink.accept(PipelineMonitorLog(dataId=index), f'{index}', create_fake_principal_service('1'))
+		sink.accept(PipelineMonitorLog(dataId=3), '3', create_fake_principal_service('2'))
+		sink.flush()
+		self.assertEqual([[0, 1], [2], [3]], [[x.monitorLog.dataId for x in items] for items in sink.written])
+		self.assertEqual('1', sink.written[0][1].traceId)
+
+	def test_take_batch(self):
+		sink = FakeMonitorLogSink(2)
+		for index in range(3):
+			sink.accept(PipelineMonitorLog(dataId=index), f'{index}', create_fake_principal_service('1'))
+		self.assertEqual(2, len(sink.take()))
+		self.assertEqual(1, len(sink.take()))
+
+	def test_drop_when_full(self):
+		sink = FakeMonitorLogSink(2, 1)
+		self.assertTrue(sink.accept(PipelineMonitorLog(dataId=0), '0', create_fake_principal_service('1')))
+		self.assertFalse(sink.accept(PipelineMonitorLog(dataId=1), '1', create_fake_principal_service('1')))
+
+
+	def test_skip_logs_of_system_topic(self):
+		sink = FakeMonitorLogSink(2)
+		handle_monitor_log = sink.create_handle_monitor_log(create_fake_principal_service('1'))
+		rolled_up: List[PipelineMonitorLog] = []
+		rollup_writer = FakeRollupWriter(rolled_up)
+		with patch.object(monitor_log_invoker, 'get_topic_service', lambda x: FakeTopicService()), \
+				patch.object(monitor_log_sink, 'ask_pipeline_monitor_log_rollup', lambda: True), \
+				patch.object(monitor_log_sink, 'ask_monitor_log_rollup_writer', lambda: rollup_writer):
+			# pipelines on monitor log topic, which is a system topic
+			handle_monitor_log(PipelineMonitorLog(topicId='system', dataId=0), False)
+			handle_monitor_log(PipelineMonitorLog(topicId='business', dataId=1), False)
+		sink.flush()
+		self.assertEqual([[1]], [[x.monitorLog.dataId for x in items] for items in sink.written])
+		self.assertEqual([1], [x.dataId for x in rolled_up])
@@ -0,0 +1,90 @@
+from typing import Any, Dict, List
+from unittest import TestCase
+
+from watchmen_auth import PrincipalService
+from watchmen_data_kernel.storage import TopicTrigger
+from watchmen_model.admin import Pipeline, PipelineTriggerType, Topic, TopicKind, User, UserRole
+from watchmen_pipeline_kernel.pipeline import PipelineBatchTrigger
+
+
+def create_fake_principal_service() -> PrincipalService:
+	return PrincipalService(User(userId='1', tenantId='1', name='imma-admin', role=UserRole.ADMIN))
+
+
+class FakeSchema:
+	def __init__(self):
+		self.topic = Topic(topicId='1', name='fake', kind=TopicKind.BUSINESS)
+
+	def get_topic(self) -> Topic:
+		return self.topic
+
+	# noinspection PyUnusedLocal
+	def prepare_data(self, data: Dict[str, Any], principal_service: PrincipalService) -> Dict[str, Any]:
+		if data.get('bad'):
+			raise ValueError('Bad data.')
+		return data
+
+	def prepare_batch(self, rows: List[Dict[str, Any]], principal_service: PrincipalService) -> List[Dict[str, Any]]:
+		return [self.prepare_data(x, principal_service) for x in rows]
+
+
+class FakeDataService:
+	def __init__(self):
+		self.bulkCalls = 0
+		self.nextId = 0
+
+	def next_trigger(self, data: Dict[str, Any]) -> TopicTrigger:
+		self.nextId = self.nextId + 1
+		return TopicTrigger(current=data, triggerType=PipelineTriggerType.INSERT, internalDataId=self.nextId)
+
+	def trigger_by_insert_all(self, data_list: List[Dict[str, Any]]) -> List[TopicTrigger]:
+		self.bulkCalls = self.bulkCalls + 1
+		if any(x.get('duplicated') for x in data_list):
+			raise ValueError('Duplicated.')
+		return [self.next_trigger(x) for x in data_list]
+
+	def trigger_by_insert(self, data: Dict[str, Any]) -> TopicTrigger:
+		if data.get('duplicated'):
+			raise ValueError('Duplicated.')
+		return self.next_trigger(data)
+
+
+class FakeBatchTrigger(PipelineBatchTrigger):
+	def __init__(self, rows: List[Dict[str, Any]]):
+		# noinspection PyTypeChecker
+		super().__init__(
+			FakeSchema(), PipelineTriggerType.INSERT, rows, '1', create_fake_principal_service(), lambda x, y: None)
+		self.dataService = FakeDataService()
+		self.dispatched: List[TopicTrigger] = []
+		self.pipelinesAsked = 0
+
+	# noinspection PyUnusedLocal
+	def ask_topic_data_service(self, schema):
+		return self.dataService
+
+	# noinspection PyUnusedLocal
+	def ask_pipelines(self, trigger_type, pipeline_id=None) -> List[Pipeline]:
+		self.pipelinesAsked = self.pipelinesAsked + 1
+		return [Pipeline(pipelineId='1', topicId='1', type=PipelineTriggerType.INSERT, enabled=True)]
+
+	def dispatch(self, trigger: TopicTrigger, pipelines: List[Pipeline], trace_id=None) -> None:
+		self.dispatched.append(trigger)
+
+
+class PipelineBatchTriggerTest(TestCase):
+	def test_all_succeeded(self):
+		trigger = FakeBatchTrigger([{'a': 1}, {'a': 2}, {'a': 3}])
+		results = trigger.invoke_batch()
+		self.assertTrue(all(x.success for x in results))
+		self.assertEqual(['1', '2', '3'], [x.internalDataId for x in results])
+		self.assertEqual(1, trigger.dataService.bulkCalls)
+		self.assertEqual(3, len(trigger.dispatched))
+		self.assertEqual(1, trigger.pipelinesAsked)
+
+	def test_failed_rows(self):
+		trigger = FakeBatchTrigger([{'a': 1}, {'bad': True}, {'duplicated': True}, {'a': 4}])
+		results = trigger.invoke_batch()
+		self.assertEqual([True, False, False, True], [x.success for x in results])
+		self.assertEqual([0, 1, 2, 3], [x.index for x in results])
+		self.assertIsNone(results[1].internalDataId)
+		self.assertEqual(2, len(trigger.dispatched))
@@ -0,0 +1,114 @@
+from threading import current_thread, Lock
+from time import sleep
+from typing import Callable, List, Optional, Tuple
+from unittest import TestCase
+
+from watchmen_model.admin import InsertRowAction, Pipeline, PipelineStage, PipelineUnit, ReadRowAction
+from watchmen_model.pipeline_kernel import PipelineMonitorLog
+from watchmen_pipeline_kernel.pipeline.pipelines_dispatcher import PipelinesDispatcher
+from watchmen_pipeline_kernel.pipeline_schema.compiled_pipeline import build_topic_access
+from watchmen_pipeline_kernel.pipeline_schema_interface import PipelineContext, PipelineTopicAccess
+
+
+class FakeStorages:
+	def derive(self):
+		return self
+
+
+class Recorder:
+	def __init__(self):
+		self.lock = Lock()
+		self.events: List[Tuple[str, str]] = []
+		self.running = 0
+		self.maxRunning = 0
+
+	def enter(self, name: str) -> None:
+		with self.lock:
+			self.events.append(('start', name))
+			self.running = self.running + 1
+			self.maxRunning = max(self.maxRunning, self.running)
+
+	def leave(self, name: str) -> None:
+		with self.lock:
+			self.events.append(('end', name))
+			self.running = self.running - 1
+
+	def started(self) -> List[str]:
+		return [name for event, name in self.events if event == 'start']
+
+
+class FakeContext(PipelineContext):
+	def __init__(
+			self, recorder: Recorder, name: str, access: Optional[PipelineTopicAccess],
+			children: Optional[List[PipelineContext]] = None, spent: float = 0.05):
+		self.recorder = recorder
+		self.name = name
+		self.access = access
+		self.children = [] if children is None else children
+		self.spent = spent
+
+	def start(self, storages, handle_monitor_log: Callable[[PipelineMonitorLog, bool], None]) -> List[PipelineContext]:
+		self.recorder.enter(self.name)
+		sleep(self.spent)
+		self.recorder.leave(self.name)
+		handle_monitor_log(PipelineMonitorLog(pipelineId=self.name), False)
+		return self.children
+
+	def ask_topic_access(self) -> Optional[PipelineTopicAccess]:
+		return self.access
+
+
+def write(*topic_ids: str) -> PipelineTopicAccess:
+	return PipelineTopicAccess(['raw'], topic_ids)
+
+
+class PipelinesDispatcherTest(TestCase):
+	def dispatch(self, contexts: List[PipelineContext], workers: int = 8) -> List[Tuple[str, str]]:
+		handled: List[Tuple[str, str]] = []
+		# noinspection PyTypeChecker
+		PipelinesDispatcher(contexts, FakeStorages(), concurrent=True, workers=workers).start(
+			lambda monitor_log, _: handled.append((monitor_log.pipelineId, current_thread().name)))
+		return handled
+
+	def test_build_topic_access(self):
+		pipeline = Pipeline(topicId='raw', stages=[PipelineStage(units=[PipelineUnit(do=[
+			ReadRowAction(topicId='dim'), InsertRowAction(topicId='fact')
+		])])])
+		access = build_topic_access(pipeline)
+		self.assertEqual({'raw', 'dim', 'fact'}, access.readTopicIds)
+		self.assertEqual({'fact'}, access.writeTopicIds)
+		self.assertFalse(access.conflicts_with(write('other')))
+		self.assertTrue(access.conflicts_with(write('dim')))
+		self.assertTrue(access.conflicts_with(None))
+
+	def test_disjoint_run_concurrently(self):
+		recorder = Recorder()
+		contexts = [FakeContext(recorder, str(index), write(f't{index}')) for index in range(6)]
+		handled = self.dispatch(contexts, workers=3)
+		self.assertEqual(3, recorder.maxRunning)
+		self.assertEqual(6, len(handled))
+		# monitor logs are handled by dispatching thread
+		self.assertTrue(all(thread == current_thread().name for _, thread in handled))
+
+	def test_conflicts_run_in_order(self):
+		recorder = Recorder()
+		child = FakeContext(recorder, 'child', write('b'))
+		contexts = [
+			FakeContext(recorder, 'a1', write('a'), spent=0.1),
+			FakeContext(recorder, 'b1', write('b'), [child]),
+			FakeContext(recorder, 'a2', write('a')),
+			FakeContext(recorder, 'unknown', None),
+			FakeContext(recorder, 'c1', write('c'))
+		]
+		self.dispatch(contexts)
+		events = recorder.events
+		started = recorder.started()
+		self.assertEqual(({'a1', 'b1'}, 'a2', 'unknown', {'c1', 'child'}), (
+			set(started[:2]), started[2], started[3], set(started[4:])))
+		# a2 starts after a1 ended, unknown access waits for all before it
+		self.assertLess(events.index(('end', 'a1')), events.index(('start', 'a2')))
+		self.assertLess(events.index(('end', 'a2')), events.index(('start', 'unknown')))
+		self.assertLess(events.index(('end', 'b1')), events.index(('start', 'child')))
+		# pipelines queued after unknown access wait for it, even created by a finished one
+		self.assertLess(events.index(('end', 'unknown')), events.index(('start', 'c1')))
+		self.assertLess(events.index(('end', 'unknown')), events.index(('start', 'child')))
@@ -0,0 +1,90 @@
+from concurrent.futures import Future
+from typing import Any, Callable, List
+from unittest import TestCase
+from unittest.mock import patch
+
+from watchmen_auth import PrincipalService
+from watchmen_data_kernel.storage import TopicTrigger
+from watchmen_data_kernel.storage_bridge import now, PipelineVariables
+from watchmen_model.admin import Pipeline, PipelineStage, PipelineUnit, Topic, TopicKind, User, UserRole
+from watchmen_model.pipeline_kernel import MonitorLogStage, MonitorLogStatus, MonitorLogUnit
+from watchmen_pipeline_kernel.pipeline_schema import distributed_compiled_unit
+from watchmen_pipeline_kernel.pipeline_schema.distributed_compiled_unit import DistributedUnitLoop
+
+
+def create_fake_principal_service() -> PrincipalService:
+	return PrincipalService(User(userId='1', tenantId='1', name='imma-admin', role=UserRole.ADMIN))
+
+
+class FakeSchema:
+	# noinspection PyMethodMayBeStatic
+	def get_topic(self) -> Topic:
+		return Topic(topicId='1', name='fake', kind=TopicKind.BUSINESS)
+
+
+class FakeCompiledUnit:
+	def __init__(self, unit: PipelineUnit):
+		self.unit = unit
+
+	# noinspection PyUnusedLocal
+	def run(
+			self, variables: PipelineVariables, new_pipeline, stage_monitor_log: MonitorLogStage,
+			storages, principal_service: PrincipalService) -> bool:
+		value = variables.find('items')
+		if value == 'crash':
+			raise RuntimeError('Worker crashed.')
+		stage_monitor_log.units.append(MonitorLogUnit(
+			unitId=self.unit.unitId, name=self.unit.name, status=MonitorLogStatus.DONE, startTime=now(),
+			spentInMills=0, loopVariableName='items', loopVariableValue=value, actions=[]))
+		new_pipeline(FakeSchema(), TopicTrigger(current={'value': value, 'total': variables.find('total')}))
+		return True
+
+
+class InProcessExecutor:
+	def __init__(self):
+		self.submitted: List[tuple] = []
+
+	def submit(self, func: Callable[..., Any], *args) -> Future:
+		self.submitted.append(args)
+		future = Future()
+		try:
+			future.set_result(func(*args))
+		except Exception as e:
+			future.set_exception(e)
+		return future
+
+
+class ProcessPoolUnitLoopTest(TestCase):
+	def test_merge_in_order(self):
+		unit = PipelineUnit(unitId='1', name='loop')
+		items = [1, 2, 3, 'crash', 5, 6, 7]
+		variables = PipelineVariables(None, {}, None)
+		variables.put('items', items)
+		variables.put('total', 100)
+		loop = DistributedUnitLoop() \
+			.with_unit(Pipeline(pipelineId='1'), PipelineStage(stageId='1'), unit) \
+			.with_principal_service(create_fake_principal_service()) \
+			.with_pipeline_variables(variables) \
+			.with_loop_variable_values('items', items)
+
+		executor = InProcessExecutor()
+		stage_monitor_log = MonitorLogStage(units=[])
+		triggered: List[TopicTrigger] = []
+		with patch.object(distributed_compiled_unit.process_pool_holder, 'executor', executor), \
+				patch.object(distributed_compiled_unit, 'ask_parallel_actions_use_process_pool', lambda: True), \
+				patch.object(distributed_compiled_unit, 'ask_parallel_actions_process_pool_chunk_size', lambda: 2), \
+				patch.object(distributed_compiled_unit, 'ask_worker_compiled_unit', lambda *x: FakeCompiledUnit(unit)), \
+				patch.object(distributed_compiled_unit, 'find_topic_schema', lambda *x: FakeSchema()):
+			success = loop.distribute(stage_monitor_log, lambda schema, trigger: triggered.append(trigger))
+
+		# one task per chunk, loop variable itself is not sent
+		self.assertEqual(4, len(executor.submitted))
+		self.assertFalse(executor.submitted[0][4].has('items'))
+		self.assertEqual(100, executor.submitted[0][4].find('total'))
+		# failed chunk fails its elements only, logs and triggers are merged in order of elements
+		self.assertFalse(success)
+		self.assertEqual(items, [x.loopVariableValue for x in stage_monitor_log.units])
+		self.assertEqual(
+			[MonitorLogStatus.DONE] * 2 + [MonitorLogStatus.ERROR] * 2 + [MonitorLogStatus.DONE] * 3,
+			[x.status for x in stage_monitor_log.units])
+		self.assertEqual([1, 2, 5, 6, 7], [x.current['value'] for x in triggered])
@@ -0,0 +1,79 @@
+from datetime import date
+from typing import Any, Dict, List
+from unittest import TestCase
+from unittest.mock import patch
+
+from watchmen_auth import PrincipalService
+from watchmen_model.admin import TopicSnapshotFrequency, TopicSnapshotJobLock, TopicSnapshotScheduler, User, \
+	UserRole
+from watchmen_model.pipeline_kernel import TopicDataColumnNames
+from watchmen_pipeline_kernel.topic_snapshot import scheduler_runner
+from watchmen_storage import EntityCriteriaExpression
+
+
+def create_fake_principal_service() -> PrincipalService:
+	return PrincipalService(User(userId='1', tenantId='1', name='imma-admin', role=UserRole.ADMIN))
+
+
+class FakeSourceTopicDataService:
+	def __init__(self, ids: List[int]):
+		self.rows = {x: {TopicDataColumnNames.ID.value: x, 'value': x * 10} for x in ids}
+
+	def find(self, criteria: List[EntityCriteriaExpression]) -> List[Dict[str, Any]]:
+		return [dict(self.rows[x]) for x in criteria[0].right if x in self.rows]
+
+	# noinspection PyMethodMayBeStatic
+	def delete_reversed_columns(self, data: Dict[str, Any]) -> None:
+		data.pop(TopicDataColumnNames.ID.value, None)
+
+	# noinspection PyMethodMayBeStatic
+	def try_to_unwrap_from_topic_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+		return data
+
+
+class FakeTaskTopicDataService:
+	def __init__(self):
+		self.inserted: List[List[Dict[str, Any]]] = []
+
+	def trigger_by_insert_all(self, data_list: List[Dict[str, Any]]) -> None:
+		if len(data_list) == 0:
+			raise ValueError('Insert all with no values.')
+		self.inserted.append(data_list)
+
+
+class TopicSnapshotCreateTasksTest(TestCase):
+	def create_tasks(
+			self, data_ids: List[int], existing_ids: List[int]
+	) -> (FakeTaskTopicDataService, List[int], bool):
+		source_service = FakeSourceTopicDataService(existing_ids)
+		task_service = FakeTaskTopicDataService()
+		row_counts: List[int] = []
+		lock = TopicSnapshotJobLock(lockId='100', processDate=date(2026, 10, 18))
+		scheduler = TopicSnapshotScheduler(
+			schedulerId='200', frequency=TopicSnapshotFrequency.DAILY, targetTopicName='target')
+		with patch.object(scheduler_runner, 'get_source_topic_data_service', lambda *args: (None, source_service)), \
+				patch.object(scheduler_runner, 'get_task_topic_data_service', lambda *args: (None, task_service, None)), \
+				patch.object(scheduler_runner, 'find_task_rows', lambda *args: data_ids), \
+				patch.object(scheduler_runner, 'ask_topic_snapshot_copy_size', lambda: 2), \
+				patch.object(
+					scheduler_runner, 'update_job_row_count',
+					lambda _lock, row_count, _principal_service: row_counts.append(row_count)):
+			created = scheduler_runner.create_tasks(lock, scheduler, create_fake_principal_service())
+		return task_service, row_counts, created
+
+	def test_copy_in_chunks(self):
+		task_service, row_counts, created = self.create_tasks([1, 2, 3, 4, 5], [1, 2, 3, 4, 5])
+		self.assertTrue(created)
+		self.assertEqual([2, 2, 1], [len(x) for x in task_service.inserted])
+		self.assertEqual([2, 4, 5], row_counts)
+		task = task_service.inserted[0][0]
+		self.assertEqual(1, task['originaldataid'])
+		self.assertEqual('ready', task['status'])
+		self.assertEqual('100', task['jobid'])
+
+	def test_skip_chunk_of_deleted_rows(self):
+		# rows 3, 4 and 5 are deleted after their ids found, so chunk [3, 4] copies nothing
+		task_service, row_counts, created = self.create_tasks([1, 2, 3, 4, 5, 6], [1, 2, 6])
+		self.assertTrue(created)
+		self.assertEqual([2, 1], [len(x) for x in task_service.inserted])
+		self.assertEqual([2, 3], row_counts)
@@ -0,0 +1,100 @@
+from typing import List
+from unittest import TestCase
+
+from watchmen_pipeline_kernel.topic import UnitOfWorkTopicStorage
+
+
+class FakeStorage:
+	def __init__(self):
+		self.calls: List[str] = []
+
+	def connect(self) -> None:
+		self.calls.append('connect')
+
+	def close(self) -> None:
+		self.calls.append('close')
+
+	def begin(self) -> None:
+		self.calls.append('begin')
+
+	def commit_and_close(self) -> None:
+		self.calls.append('commit')
+
+	def rollback_and_close(self) -> None:
+		self.calls.append('rollback')
+
+	def insert_one(self, one, helper) -> None:
+		self.calls.append('insert')
+
+	# noinspection PyMethodMayBeStatic
+	def is_savepoint_supported(self) -> bool:
+		return True
+
+	def begin_savepoint(self) -> None:
+		self.calls.append('savepoint')
+
+	def rollback_to_savepoint(self) -> None:
+		self.calls.append('rollback to savepoint')
+
+
+class UnitOfWorkTest(TestCase):
+	def test_retain_autocommit_connection(self):
+		fake = FakeStorage()
+		storage = UnitOfWorkTopicStorage(fake)
+		for _ in range(3):
+			storage.connect()
+			storage.insert_one({}, None)
+			storage.close()
+		storage.release(True)
+		self.assertEqual(['connect', 'insert', 'insert', 'insert', 'close'], fake.calls)
+
+	def test_explicit_transaction_on_autocommit(self):
+		fake = FakeStorage()
+		storage = UnitOfWorkTopicStorage(fake)
+		storage.connect()
+		storage.begin()
+		storage.insert_one({}, None)
+		storage.commit_and_close()
+		storage.close()
+		storage.connect()
+		storage.close()
+		storage.release(True)
+		self.assertEqual(['connect', 'close', 'begin', 'insert', 'commit', 'connect', 'close'], fake.calls)
+
+	def test_transactional_commit(self):
+		fake = FakeStorage()
+		storage = UnitOfWorkTopicStorage(fake, True)
+		storage.connect()
+		storage.insert_one({}, None)
+		storage.close()
+		storage.begin()
+		storage.commit_and_close()
+		storage.close()
+		storage.release(True)
+		self.assertEqual(['begin', 'insert', 'commit'], fake.calls)
+
+	def test_transactional_rollback_only(self):
+		fake = FakeStorage()
+		storage = UnitOfWorkTopicStorage(fake, True)
+		storage.begin()
+		storage.rollback_and_close()
+		storage.release(True)
+		self.assertEqual(['begin', 'rollback'], fake.calls)
+
+	def test_release_without_connect(self):
+		fake = FakeStorage()
+		storage = UnitOfWorkTopicStorage(fake, True)
+		storage.release(False)
+		self.assertEqual([], fake.calls)
+
+	def test_savepoint(self):
+		fake = FakeStorage()
+		self.assertFalse(UnitOfWorkTopicStorage(fake).begin_savepoint())
+		storage = UnitOfWorkTopicStorage(fake, True)
+		self.assertTrue(storage.begin_savepoint())
+		storage.insert_one({}, None)
+		# failed insertion rolled back alone, transaction continues
+		storage.rollback_to_savepoint()
+		storage.insert_one({}, None)
+		storage.release(True)
+		self.assertEqual(['begin', 'savepoint', 'insert', 'rollback to savepoint', 'insert', 'commit'], fake.calls)
@@ -0,0 +1,56 @@
+from typing import Any, Dict, List
+from unittest import TestCase
+
+from watchmen_model.admin import Topic
+from watchmen_pipeline_kernel.topic import TopicWriteBuffer
+
+
+class FakeTopicDataService:
+	def __init__(self, topic_id: str):
+		self.topic = Topic(topicId=topic_id, name=f'topic_{topic_id}')
+		self.nextId = 0
+		self.written: List[List[Dict[str, Any]]] = []
+
+	def get_topic(self) -> Topic:
+		return self.topic
+
+	def prepare_insert(self, data: Dict[str, Any]) -> Dict[str, Any]:
+		self.nextId = self.nextId + 1
+		data['id_'] = self.nextId
+		return data
+
+	def insert_all(self, data_list: List[Dict[str, Any]]) -> None:
+		self.written.append(data_list)
+
+
+class TopicWriteBufferTest(TestCase):
+	def test_flush_on_batch_size(self):
+		buffer = TopicWriteBuffer(2)
+		service = FakeTopicDataService('1')
+		for index in range(5):
+			data = buffer.append(service, {'value': index})
+			self.assertEqual(index + 1, data['id_'])
+		self.assertEqual([2, 2], [len(x) for x in service.written])
+		self.assertTrue(buffer.has_buffered('1'))
+		buffer.flush_all()
+		self.assertEqual([2, 2, 1], [len(x) for x in service.written])
+		self.assertFalse(buffer.has_buffered('1'))
+
+	def test_flush_topic_only(self):
+		buffer = TopicWriteBuffer(10)
+		service1 = FakeTopicDataService('1')
+		service2 = FakeTopicDataService('2')
+		buffer.append(service1, {'value': 1})
+		buffer.append(service2, {'value': 2})
+		buffer.flush_topic('1')
+		self.assertEqual(1, len(service1.written))
+		self.assertEqual(0, len(service2.written))
+		self.assertTrue(buffer.has_buffered('2'))
+
+	def test_buffered_row_isolated(self):
+		buffer = TopicWriteBuffer(10)
+		service = FakeTopicDataService('1')
+		data = buffer.append(service, {'value': 1})
+		data['value'] = 2
+		buffer.flush_all()
+		self.assertEqual(1, service.written[0][0]['value'])
@@ -0,0 +1,149 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional
+from unittest import TestCase
+from unittest.mock import patch
+
+from watchmen_auth import PrincipalService
+from watchmen_data_kernel.storage import RegularTopicDataEntityHelper, RegularTopicDataService, TopicTrigger
+from watchmen_data_kernel.topic_schema import TopicSchema
+from watchmen_model.admin import Factor, FactorType, PipelineTriggerType, Topic, TopicKind, TopicType, User, \
+	UserRole, WriteTopicActionType
+from watchmen_model.pipeline_kernel import MonitorLogStatus, MonitorWriteAction
+from watchmen_pipeline_kernel.pipeline_schema import compiled_action
+from watchmen_pipeline_kernel.pipeline_schema.compiled_action import CompiledWriteFactorAction
+from watchmen_storage import EntityFinder, EntityIncrementer
+
+
+def create_fake_principal_service() -> PrincipalService:
+	return PrincipalService(User(userId='1', tenantId='1', name='imma-admin', role=UserRole.ADMIN))
+
+
+def create_schema() -> TopicSchema:
+	return TopicSchema(Topic(
+		topicId='1', name='order_summary', type=TopicType.AGGREGATE, kind=TopicKind.BUSINESS,
+		factors=[Factor(factorId='1', name='amount', type=FactorType.NUMBER)]))
+
+
+class FakeStorage:
+	def __init__(self, row: Dict[str, Any], pulled: Dict[str, Any]):
+		self.row = row
+		# values pulled after increment, e.g. float of float columns or number of oracle
+		self.pulled = pulled
+		self.committed = False
+		self.rolledBack = False
+
+	# noinspection PyMethodMayBeStatic
+	def is_increment_supported(self) -> bool:
+		return True
+
+	def begin(self) -> None:
+		pass
+
+	def commit_and_close(self) -> None:
+		self.committed = True
+
+	def rollback_and_close(self) -> None:
+		self.rolledBack = True
+
+	def increment(self, incrementer: EntityIncrementer) -> int:
+		for column_name, increment in incrementer.increments.items():
+			self.row[column_name] = (self.row.get(column_name) or 0) + increment
+		return 1
+
+	def find(self, finder: EntityFinder) -> List[Dict[str, Any]]:
+		return [finder.shaper.deserialize({**self.row, **self.pulled})]
+
+
+class FakeStatement:
+	# noinspection PyMethodMayBeStatic
+	def to_dict(self) -> Dict[str, Any]:
+		return {}
+
+
+class FakeFindBy:
+	# noinspection PyUnusedLocal,PyMethodMayBeStatic
+	def run(self, variables: Any, principal_service: PrincipalService) -> FakeStatement:
+		return FakeStatement()
+
+
+class FakeMapping:
+	# noinspection PyUnusedLocal,PyMethodMayBeStatic
+	def compute_increments(self, variables: Any, principal_service: PrincipalService) -> Optional[Dict[str, Decimal]]:
+		return {'amount': Decimal('5')}
+
+
+def create_action(storage: FakeStorage) -> CompiledWriteFactorAction:
+	# compiling is not required, increment path only
+	action = CompiledWriteFactorAction.__new__(CompiledWriteFactorAction)
+	action.schema = create_schema()
+	action.incrementApplicable = True
+	action.parsedFindBy = FakeFindBy()
+	action.parsedMapping = FakeMapping()
+
+	# noinspection PyUnusedLocal
+	def create_insert_or_merge_worker(*args, **kwargs) -> Callable[[], None]:
+		def work() -> None:
+			raise AssertionError('Read and write is not expected.')
+
+		return work
+
+	# noinspection PyUnusedLocal
+	def ask_topic_data_service(schema: TopicSchema, *args, **kwargs) -> RegularTopicDataService:
+		# noinspection PyTypeChecker
+		return RegularTopicDataService(
+			schema, RegularTopicDataEntityHelper(schema), storage, create_fake_principal_service())
+
+	action.create_insert_or_merge_worker = create_insert_or_merge_worker
+	action.ask_topic_data_service = ask_topic_data_service
+	return action
+
+
+def create_action_monitor_log() -> MonitorWriteAction:
+	return MonitorWriteAction(
+		uid='1', actionId='1', type=WriteTopicActionType.WRITE_FACTOR, startTime=datetime.now(), by=None, value=None)
+
+
+class WriteFactorIncrementTest(TestCase):
+	def run_action(self, storage: FakeStorage) -> Any:
+		action = create_action(storage)
+		action_monitor_log = create_action_monitor_log()
+		triggers: List[TopicTrigger] = []
+		with patch.object(compiled_action, 'ask_pipeline_write_factor_increment', lambda: True):
+			# noinspection PyTypeChecker
+			result = action.do_run(
+				variables=None, new_pipeline=lambda schema, trigger: triggers.append(trigger),
+				action_monitor_log=action_monitor_log, storages=None,
+				principal_service=create_fake_principal_service())
+		return result, action_monitor_log, triggers
+
+	def test_revert_increments(self):
+		action = create_action(FakeStorage({}, {}))
+		# noinspection PyTypeChecker
+		topic_data_service = action.ask_topic_data_service(action.schema)
+		original_data = action.revert_increments(
+			topic_data_service, {'id_': 1, 'version_': 3, 'amount': Decimal('12.5')}, {'amount': Decimal('2.5')})
+		self.assertEqual((Decimal('10.0'), 2), (original_data['amount'], original_data['version_']))
+
+	def test_do_run_increment(self):
+		# float pulled from float columns, or number of oracle
+		storage = FakeStorage({'id_': 1, 'version_': 2, 'amount': Decimal('10')}, {'amount': 15.0})
+		result, action_monitor_log, triggers = self.run_action(storage)
+		self.assertTrue(result)
+		self.assertEqual(MonitorLogStatus.DONE, action_monitor_log.status)
+		self.assertTrue(storage.committed)
+		self.assertEqual(1, len(triggers))
+		trigger = triggers[0]
+		self.assertEqual(PipelineTriggerType.MERGE, trigger.triggerType)
+		self.assertEqual(1, trigger.internalDataId)
+		self.assertEqual((Decimal('10.0'), 2), (trigger.previous['amount'], trigger.previous['version_']))
+		self.assertEqual((Decimal('15.0'), 3), (trigger.current['amount'], trigger.current['version_']))
+
+	def test_do_run_increment_unparsable(self):
+		storage = FakeStorage({'id_': 1, 'version_': 2, 'amount': Decimal('10')}, {'amount': 'x'})
+		result, action_monitor_log, triggers = self.run_action(storage)
+		self.assertFalse(result)
+		self.assertEqual(MonitorLogStatus.ERROR, action_monitor_log.status)
+		self.assertTrue(storage.rolledBack)
+		self.assertFalse(storage.committed)
+		self.assertEqual(0, len(triggers))
@@ -1,2 +1,3 @@
-from .kafka import init_kafka, KafkaSettings
+from .kafka import init_kafka
+from .kafka_consumer import KafkaConsumerMetrics, KafkaSettings, PartitionedKafkaConsumer
 from .rabbitmq import init_rabbitmq, RabbitmqSettings
@@ -1,3 +1,9 @@
+from asyncio import all_tasks, current_task, gather, run
+from threading import Lock
+from time import monotonic
+from typing import Dict, Tuple
+
+from watchmen_auth import PrincipalService
 from watchmen_meta.common import ask_snowflake_generator
 from watchmen_model.admin import UserRole
 from watchmen_model.pipeline_kernel import PipelineTriggerDataWithPAT, PipelineTriggerTraceId
@@ -6,13 +12,73 @@ from watchmen_rest import get_principal_by_pat, retrieve_authentication_manager
 from watchmen_utilities import is_blank
 
 
-async def handle_trigger_data(trigger_data: PipelineTriggerDataWithPAT) -> None:
-	# TODO should log trigger data
-	pat = trigger_data.pat
+def ask_principal_by_pat(pat: str) -> PrincipalService:
 	if is_blank(pat):
 		raise Exception('PAT not found.')
-	principal_service = get_principal_by_pat(
-		retrieve_authentication_manager(), pat, [UserRole.ADMIN, UserRole.SUPER_ADMIN])
+	return get_principal_by_pat(retrieve_authentication_manager(), pat, [UserRole.ADMIN, UserRole.SUPER_ADMIN])
+
+
+async def handle_trigger_data(trigger_data: PipelineTriggerDataWithPAT) -> None:
+	# TODO should log trigger data
+	principal_service = ask_principal_by_pat(trigger_data.pat)
 
 	trace_id: PipelineTriggerTraceId = str(ask_snowflake_generator().next_id())
 	await try_to_invoke_pipelines(trigger_data, trace_id, principal_service)
+
+
+class PrincipalByPATCache:
+	"""
+	resolved principals by PAT, kept for given seconds.
+	a revoked or disabled PAT is still accepted until its cached principal expires.
+	"""
+
+	def __init__(self, ttl: int, max_size: int = 1000):
+		# in seconds
+		self.ttl = ttl
+		self.maxSize = max_size
+		self.principals: Dict[str, Tuple[PrincipalService, float]] = {}
+		self.lock = Lock()
+
+	def evict_expired(self, now: float) -> None:
+		expired = [pat for pat, (_, expire_at) in self.principals.items() if expire_at <= now]
+		for pat in expired:
+			del self.principals[pat]
+		if len(self.principals) >= self.maxSize:
+			self.principals.clear()
+
+	def ask(self, pat: str) -> PrincipalService:
+		if self.ttl <= 0:
+			return ask_principal_by_pat(pat)
+		now = monotonic()
+		with self.lock:
+			cached = self.principals.get(pat)
+		if cached is not None and cached[1] > now:
+			return cached[0]
+		principal_service = ask_principal_by_pat(pat)
+		with self.lock:
+			if len(self.principals) >= self.maxSize:
+				self.evict_expired(now)
+			self.principals[pat] = (principal_service, now + self.ttl)
+		return principal_service
+
+
+async def invoke_and_wait(
+		trigger_data: PipelineTriggerDataWithPAT, trace_id: PipelineTriggerTraceId,
+		principal_service: PrincipalService) -> None:
+	await try_to_invoke_pipelines(trigger_data, trace_id, principal_service)
+	# monitor logs and pipelines triggered by them are scheduled as tasks on current loop, wait for them
+	while True:
+		pending = [task for task in all_tasks() if task is not current_task()]
+		if len(pending) == 0:
+			break
+		await gather(*pending, return_exceptions=True)
+
+
+def handle_trigger_data_in_thread(
+		trigger_data: PipelineTriggerDataWithPAT, principal_cache: PrincipalByPATCache) -> None:
+	"""
+	handle trigger data on a worker thread, returns when everything triggered by given data is done.
+	"""
+	principal_service = principal_cache.ask(trigger_data.pat)
+	trace_id: PipelineTriggerTraceId = str(ask_snowflake_generator().next_id())
+	run(invoke_and_wait(trigger_data, trace_id, principal_service))
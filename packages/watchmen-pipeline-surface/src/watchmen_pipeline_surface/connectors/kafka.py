@@ -1,20 +1,14 @@
 from asyncio import create_task, get_event_loop
 from json import loads
 from logging import getLogger
-from typing import List
 
-from watchmen_model.common import SettingsModel
 from watchmen_model.pipeline_kernel import PipelineTriggerDataWithPAT
 from .handler import handle_trigger_data
+from .kafka_consumer import consume_concurrently, KafkaSettings
 
 logger = getLogger(__name__)
 
 
-class KafkaSettings(SettingsModel):
-	bootstrapServers: str = None
-	topics: List[str] = []
-
-
 async def consume(loop, settings: KafkaSettings):
 	# noinspection PyPackageRequirements
 	from aiokafka import AIOKafkaConsumer
@@ -38,4 +32,7 @@ async def consume(loop, settings: KafkaSettings):
 
 
 def init_kafka(settings: KafkaSettings) -> None:
-	create_task(consume(get_event_loop(), settings))
+	if settings.concurrent:
+		create_task(consume_concurrently(settings))
+	else:
+		create_task(consume(get_event_loop(), settings))
@@ -0,0 +1,314 @@
+from asyncio import create_task, FIRST_COMPLETED, gather, get_running_loop, sleep as async_sleep, Task, wait
+from concurrent.futures import Executor, ThreadPoolExecutor
+from json import dumps, loads
+from logging import getLogger
+from time import monotonic, sleep
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from watchmen_model.common import SettingsModel
+from watchmen_model.pipeline_kernel import PipelineTriggerDataWithPAT
+from watchmen_utilities import ArrayHelper, is_blank
+from .handler import handle_trigger_data_in_thread, PrincipalByPATCache
+
+logger = getLogger(__name__)
+
+
+class KafkaSettings(SettingsModel):
+	bootstrapServers: str = None
+	topics: List[str] = []
+	# concurrent consumer, following are used only when it is enabled
+	concurrent: bool = False
+	groupId: str = 'watchmen-pipeline-surface'
+	workers: int = 8
+	# keep order of records with same key instead of whole partition
+	orderByKey: bool = False
+	fetchMaxRecords: int = 500
+	# in milliseconds
+	fetchTimeout: int = 1000
+	# stop fetching when count of records in processing reaches
+	maxInFlight: int = 2000
+	# in milliseconds
+	commitInterval: int = 1000
+	maxRetries: int = 2
+	# in milliseconds
+	retryBackoff: int = 500
+	deadLetterTopic: Optional[str] = None
+	# in seconds
+	patCacheTtl: int = 300
+	# in seconds
+	metricsInterval: int = 60
+
+
+class KafkaConsumerMetrics:
+	def __init__(self):
+		self.consumed = 0
+		self.processed = 0
+		self.failed = 0
+		self.deadLettered = 0
+		self.committed = 0
+		self.inFlight = 0
+		self.lag: Dict[str, int] = {}
+		self.lastReportAt = monotonic()
+		self.lastProcessed = 0
+
+	def snapshot(self) -> Dict[str, Any]:
+		now = monotonic()
+		elapsed = max(now - self.lastReportAt, 1e-6)
+		throughput = (self.processed - self.lastProcessed) / elapsed
+		self.lastReportAt = now
+		self.lastProcessed = self.processed
+		return {
+			'consumed': self.consumed,
+			'processed': self.processed,
+			'failed': self.failed,
+			'deadLettered': self.deadLettered,
+			'committed': self.committed,
+			'inFlight': self.inFlight,
+			'throughput': round(throughput, 2),
+			'lag': dict(self.lag),
+			'totalLag': sum(self.lag.values())
+		}
+
+
+class PoisonRecord:
+	def __init__(self, record: Any, error: Exception):
+		self.record = record
+		self.error = error
+
+
+def ask_partition_name(tp: Any) -> str:
+	return f'{tp.topic}-{tp.partition}'
+
+
+def parse_trigger_data(record: Any) -> PipelineTriggerDataWithPAT:
+	value = record.value
+	if isinstance(value, (bytes, bytearray)):
+		value = loads(value.decode('utf-8'))
+	elif isinstance(value, str):
+		value = loads(value)
+	return PipelineTriggerDataWithPAT.parse_obj(value)
+
+
+class PartitionedKafkaConsumer:
+	"""
+	fetch records in batches, records of one partition are processed in order,
+	or records with same key when ordering by key. partition is paused until its fetched records are done,
+	different partitions (and keys) are processed concurrently on a bounded executor.
+	offsets are committed in batches after records are done, which is at least once delivery.
+	records still failed after retries are sent to dead letter topic, or dropped when it is not given.
+	consumer and producer are in the way of aiokafka, any broker client with same methods is accepted.
+	"""
+
+	def __init__(
+			self, consumer: Any, settings: KafkaSettings,
+			handle: Optional[Callable[[PipelineTriggerDataWithPAT], None]] = None,
+			producer: Optional[Any] = None, executor: Optional[Executor] = None):
+		self.consumer = consumer
+		self.settings = settings
+		if handle is None:
+			principal_cache = PrincipalByPATCache(settings.patCacheTtl)
+			self.handle = lambda trigger_data: handle_trigger_data_in_thread(trigger_data, principal_cache)
+		else:
+			self.handle = handle
+		self.producer = producer
+		self.executor = executor if executor is not None else ThreadPoolExecutor(
+			max_workers=max(settings.workers, 1), thread_name_prefix='kafka-pipeline')
+		self.tasks: Set[Task] = set()
+		# next offsets to commit, by topic partition
+		self.committable: Dict[Any, int] = {}
+		self.lastCommitAt = monotonic()
+		self.metrics = KafkaConsumerMetrics()
+		self.stopped = False
+
+	def stop(self) -> None:
+		self.stopped = True
+
+	async def run(self) -> None:
+		try:
+			while not self.stopped:
+				await self.poll()
+		finally:
+			await self.drain()
+
+	async def wait_for_capacity(self) -> None:
+		"""
+		backpressure, stop fetching until some partitions are done.
+		"""
+		while self.metrics.inFlight >= max(self.settings.maxInFlight, 1) and len(self.tasks) != 0:
+			await wait(set(self.tasks), return_when=FIRST_COMPLETED)
+
+	async def poll(self) -> int:
+		"""
+		fetch once and dispatch fetched records, returns count of fetched records
+		"""
+		await self.wait_for_capacity()
+		batches = await self.consumer.getmany(
+			timeout_ms=self.settings.fetchTimeout, max_records=self.settings.fetchMaxRecords)
+		count = 0
+		for tp, records in batches.items():
+			if len(records) == 0:
+				continue
+			count = count + len(records)
+			self.consumer.pause(tp)
+			self.metrics.consumed = self.metrics.consumed + len(records)
+			self.metrics.inFlight = self.metrics.inFlight + len(records)
+			task = create_task(self.process_partition(tp, records))
+			self.tasks.add(task)
+			task.add_done_callback(self.tasks.discard)
+		await self.commit()
+		self.report_metrics()
+		return count
+
+	def split_lanes(self, records: List[Any]) -> List[List[Any]]:
+		if not self.settings.orderByKey:
+			return [records]
+		lanes: Dict[Any, List[Any]] = {}
+		ArrayHelper(records).each(lambda x: lanes.setdefault(x.key, []).append(x))
+		return list(lanes.values())
+
+	async def process_partition(self, tp: Any, records: List[Any]) -> None:
+		loop = get_running_loop()
+		try:
+			lanes = self.split_lanes(records)
+			results = await gather(*[loop.run_in_executor(self.executor, self.process_lane, lane) for lane in lanes])
+			for processed, poison_records in results:
+				self.metrics.processed = self.metrics.processed + processed
+				self.metrics.failed = self.metrics.failed + len(poison_records)
+				for poison in poison_records:
+					await self.dead_letter(poison)
+			self.committable[tp] = records[-1].offset + 1
+			self.update_lag(tp)
+		except Exception as e:
+			# records are not committed, rewind to redeliver them
+			logger.error(f'Failed to process records of partition[{ask_partition_name(tp)}], seek back.', exc_info=e)
+			self.seek(tp, records[0].offset)
+		finally:
+			self.metrics.inFlight = self.metrics.inFlight - len(records)
+			self.resume(tp)
+
+	def process_lane(self, records: List[Any]) -> Tuple[int, List[PoisonRecord]]:
+		"""
+		runs on worker thread, records are processed one by one.
+		returns count of processed records, and records which are failed after retries.
+		"""
+		poison_records: List[PoisonRecord] = []
+		for record in records:
+			poison = self.process_record(record)
+			if poison is not None:
+				poison_records.append(poison)
+		return len(records) - len(poison_records), poison_records
+
+	def process_record(self, record: Any) -> Optional[PoisonRecord]:
+		try:
+			trigger_data = parse_trigger_data(record)
+		except Exception as e:
+			# never be parsed, no retry
+			return PoisonRecord(record, e)
+
+		retries = 0
+		while True:
+			try:
+				self.handle(trigger_data)
+				return None
+			except Exception as e:
+				if retries >= self.settings.maxRetries:
+					return PoisonRecord(record, e)
+				retries = retries + 1
+				logger.warning(
+					f'Failed to process record[{ask_partition_name(record)}@{record.offset}], '
+					f'retry #{retries}.', exc_info=e)
+				sleep(self.settings.retryBackoff / 1000 * retries)
+
+	async def dead_letter(self, poison: PoisonRecord) -> None:
+		record = poison.record
+		name = f'{ask_partition_name(record)}@{record.offset}'
+		if self.producer is None or is_blank(self.settings.deadLetterTopic):
+			logger.error(f'Record[{name}] dropped.', exc_info=poison.error)
+			return
+		value = record.value
+		if isinstance(value, str):
+			value = value.encode('utf-8')
+		elif not isinstance(value, (bytes, bytearray)):
+			value = dumps(value).encode('utf-8')
+		await self.producer.send_and_wait(
+			self.settings.deadLetterTopic, value=value, key=record.key,
+			headers=[
+				('source', name.encode('utf-8')),
+				('error', str(poison.error).encode('utf-8'))
+			])
+		self.metrics.deadLettered = self.metrics.deadLettered + 1
+		logger.error(f'Record[{name}] sent to dead letter topic[{self.settings.deadLetterTopic}].', exc_info=poison.error)
+
+	def is_assigned(self, tp: Any) -> bool:
+		return tp in self.consumer.assignment()
+
+	def resume(self, tp: Any) -> None:
+		# partition might be revoked by rebalance during processing
+		if self.is_assigned(tp):
+			self.consumer.resume(tp)
+
+	def seek(self, tp: Any, offset: int) -> None:
+		if self.is_assigned(tp):
+			self.consumer.seek(tp, offset)
+
+	def update_lag(self, tp: Any) -> None:
+		highwater = self.consumer.highwater(tp)
+		if highwater is not None:
+			self.metrics.lag[ask_partition_name(tp)] = max(highwater - self.committable[tp], 0)
+
+	async def commit(self, force: bool = False) -> None:
+		if len(self.committable) == 0:
+			return
+		if not force and (monotonic() - self.lastCommitAt) * 1000 < self.settings.commitInterval:
+			return
+		# partition might be revoked by rebalance after its records are done,
+		# offsets of it are committed by whom it is assigned to now, never commit them here
+		assigned = self.consumer.assignment()
+		offsets = {tp: offset for tp, offset in self.committable.items() if tp in assigned}
+		self.committable = {}
+		self.lastCommitAt = monotonic()
+		if len(offsets) == 0:
+			return
+		try:
+			await self.consumer.commit(offsets)
+			self.metrics.committed = self.metrics.committed + len(offsets)
+		except Exception as e:
+			# records will be redelivered to whom the partitions are assigned
+			logger.error(f'Failed to commit offsets of {len(offsets)} partition(s).', exc_info=e)
+
+	def report_metrics(self, force: bool = False) -> None:
+		if not force and monotonic() - self.metrics.lastReportAt < self.settings.metricsInterval:
+			return
+		logger.info(f'Kafka consumer metrics[{self.metrics.snapshot()}].')
+
+	async def drain(self) -> None:
+		if len(self.tasks) != 0:
+			await wait(set(self.tasks))
+		await self.commit(True)
+		self.report_metrics(True)
+
+
+async def consume_concurrently(settings: KafkaSettings) -> None:
+	# noinspection PyPackageRequirements
+	from aiokafka import AIOKafkaConsumer, AIOKafkaProducer
+
+	while True:
+		consumer = AIOKafkaConsumer(
+			*settings.topics, bootstrap_servers=settings.bootstrapServers,
+			group_id=settings.groupId, enable_auto_commit=False)
+		producer = None
+		if not is_blank(settings.deadLetterTopic):
+			producer = AIOKafkaProducer(bootstrap_servers=settings.bootstrapServers)
+		try:
+			await consumer.start()
+			if producer is not None:
+				await producer.start()
+			await PartitionedKafkaConsumer(consumer, settings, producer=producer).run()
+		except Exception as e:
+			logger.error(e, exc_info=True, stack_info=True)
+		finally:
+			# leave consumer group
+			await consumer.stop()
+			if producer is not None:
+				await producer.stop()
+		await async_sleep(5)
@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends
@@ -5,11 +6,13 @@ from fastapi import APIRouter, Depends
 from watchmen_auth import PrincipalService
 from watchmen_model.admin import User, UserRole
 from watchmen_model.common import DataPage, PipelineId, TenantId, TopicId
+from watchmen_data_kernel.common import ask_datetime_formats
 from watchmen_model.pipeline_kernel import MonitorLogStatus, PipelineMonitorLog, PipelineMonitorLogCriteria
-from watchmen_pipeline_kernel.monitor_log import PipelineMonitorLogDataService
+from watchmen_pipeline_kernel.common import ask_pipeline_monitor_log_rollup
+from watchmen_pipeline_kernel.monitor_log import PipelineMonitorLogDataService, PipelineMonitorLogRollupDataService
 from watchmen_rest import get_any_admin_principal
 from watchmen_rest.util import raise_400
-from watchmen_utilities import ArrayHelper, ExtendedBaseModel, is_blank
+from watchmen_utilities import ArrayHelper, ExtendedBaseModel, is_blank, is_date
 
 router = APIRouter()
 
@@ -56,15 +59,29 @@ class PipelineMonitorLogStatsCriteria(ExtendedBaseModel):
 	sampleSize: Optional[int] = 200
 
 
-def ask_log_service(principal_service: PrincipalService, tenant_id: Optional[TenantId]) -> PipelineMonitorLogDataService:
+def ask_tenant_principal(principal_service: PrincipalService, tenant_id: Optional[TenantId]) -> PrincipalService:
 	if principal_service.is_super_admin():
 		if is_blank(tenant_id):
 			raise_400('Tenant id is required.')
 		# fake principal as tenant admin
-		principal_service = PrincipalService(User(
+		return PrincipalService(User(
 			userId=principal_service.get_user_id(), tenantId=tenant_id,
 			name=principal_service.get_user_name(), role=UserRole.ADMIN))
-	return PipelineMonitorLogDataService(principal_service)
+	return principal_service
+
+
+def ask_log_service(principal_service: PrincipalService, tenant_id: Optional[TenantId]) -> PipelineMonitorLogDataService:
+	return PipelineMonitorLogDataService(ask_tenant_principal(principal_service, tenant_id))
+
+
+def ask_rollup_service(
+		principal_service: PrincipalService, tenant_id: Optional[TenantId]) -> PipelineMonitorLogRollupDataService:
+	return PipelineMonitorLogRollupDataService(ask_tenant_principal(principal_service, tenant_id))
+
+
+def parse_date(date: Optional[str]) -> Optional[datetime]:
+	parsed, value = is_date(date, ask_datetime_formats())
+	return value if parsed else None
 
 
 def build_log_criteria(
@@ -82,6 +99,32 @@ def build_log_criteria(
 	)
 
 
+def fetch_pipeline_log_stats_by_rollups(
+		stats_criteria: PipelineMonitorLogStatsCriteria, principal_service: PrincipalService) -> dict:
+	"""
+	merge minute, hour and day rollups, all logs are counted, percentile is computed by merged sketch.
+	"""
+	bucket = ask_rollup_service(principal_service, stats_criteria.tenantId).find_stats(
+		stats_criteria.topicId, stats_criteria.pipelineId,
+		parse_date(stats_criteria.startDate), parse_date(stats_criteria.endDate))
+	average_duration = round(bucket.durationSum / bucket.durationCount) if bucket.durationCount > 0 else 0
+	p95_duration = bucket.durationSketch.quantile(0.95)
+	return {
+		'total': bucket.totalCount,
+		'byStatus': {
+			MonitorLogStatus.DONE.value: bucket.doneCount,
+			MonitorLogStatus.ERROR.value: bucket.errorCount,
+			MonitorLogStatus.IGNORED.value: bucket.ignoredCount
+		},
+		'avgDurationMs': average_duration,
+		'p95DurationMs': 0 if p95_duration is None else round(p95_duration),
+		'insertCount': bucket.insertCount,
+		'updateCount': bucket.updateCount,
+		'deleteCount': bucket.deleteCount,
+		'sampleSize': bucket.totalCount
+	}
+
+
 def percentile(sorted_values: List[int], pct: float) -> int:
 	if len(sorted_values) == 0:
 		return 0
@@ -93,6 +136,9 @@ def percentile(sorted_values: List[int], pct: float) -> int:
 async def fetch_pipeline_log_stats(
 		stats_criteria: PipelineMonitorLogStatsCriteria,
 		principal_service: PrincipalService = Depends(get_any_admin_principal)) -> dict:
+	if ask_pipeline_monitor_log_rollup():
+		return fetch_pipeline_log_stats_by_rollups(stats_criteria, principal_service)
+
 	tenant_id = stats_criteria.tenantId if principal_service.is_super_admin() \
 		else principal_service.get_tenant_id()
 	service = ask_log_service(principal_service, stats_criteria.tenantId)
@@ -134,3 +180,22 @@ async def fetch_pipeline_log_stats(
 		'deleteCount': delete_count,
 		'sampleSize': len(logs)
 	}
+
+
+class PipelineMonitorLogRollupBackfillCriteria(ExtendedBaseModel):
+	startDate: Optional[str] = None
+	endDate: Optional[str] = None
+	tenantId: Optional[TenantId] = None
+
+
+@router.post('/pipeline/log/rollup/backfill', tags=[UserRole.ADMIN, UserRole.SUPER_ADMIN], response_model=None)
+def backfill_pipeline_log_rollups(
+		criteria: PipelineMonitorLogRollupBackfillCriteria,
+		principal_service: PrincipalService = Depends(get_any_admin_principal)) -> dict:
+	"""
+	build rollups from existing monitor logs which start in given range, backfilled rollups in range are replaced.
+	range must end before the earliest rollup written on the fly.
+	"""
+	count = ask_rollup_service(principal_service, criteria.tenantId).backfill(
+		parse_date(criteria.startDate), parse_date(criteria.endDate))
+	return {'logCount': count}
@@ -3,10 +3,12 @@ from fastapi import APIRouter, Depends
 from watchmen_auth import PrincipalService
 from watchmen_meta.common import ask_snowflake_generator
 from watchmen_model.admin import UserRole
-from watchmen_model.pipeline_kernel import PipelineTriggerData, PipelineTriggerResult
-from watchmen_pipeline_kernel.pipeline import try_to_invoke_pipelines, try_to_invoke_pipelines_async
+from watchmen_model.pipeline_kernel import PipelineBatchTriggerData, PipelineBatchTriggerResult, PipelineTriggerData, \
+	PipelineTriggerResult
+from watchmen_pipeline_kernel.pipeline import try_to_invoke_pipelines, try_to_invoke_pipelines_async, \
+	try_to_invoke_pipelines_batch
 from watchmen_rest import get_any_admin_principal
-from watchmen_utilities import is_not_blank
+from watchmen_utilities import ArrayHelper, is_not_blank
 
 router = APIRouter()
 
@@ -28,3 +30,15 @@ async def trigger_pipeline_async(
 	trace_id = trigger_data.traceId if is_not_blank(trigger_data.traceId) else str(ask_snowflake_generator().next_id())
 	internal_data_id = await try_to_invoke_pipelines_async(trigger_data, trace_id, principal_service)
 	return PipelineTriggerResult(received=True, traceId=trace_id, internalDataId=str(internal_data_id))
+
+
+@router.post(
+	'/pipeline/data/batch', tags=[UserRole.ADMIN, UserRole.SUPER_ADMIN], response_model=PipelineBatchTriggerResult)
+async def trigger_pipeline_batch(
+		trigger_data: PipelineBatchTriggerData, principal_service: PrincipalService = Depends(get_any_admin_principal)
+) -> PipelineBatchTriggerResult:
+	trace_id = trigger_data.traceId if is_not_blank(trigger_data.traceId) else str(ask_snowflake_generator().next_id())
+	results = await try_to_invoke_pipelines_batch(trigger_data, trace_id, principal_service)
+	succeeded = ArrayHelper(results).filter(lambda x: x.success).size()
+	return PipelineBatchTriggerResult(
+		received=True, traceId=trace_id, succeeded=succeeded, failed=len(results) - succeeded, results=results)
@@ -22,6 +22,19 @@ class PipelineSurfaceSettings(ExtendedBaseSettings):
 	KAFKA_CONNECTOR: bool = False
 	KAFKA_BOOTSTRAP_SERVER: str = 'localhost:9092'
 	KAFKA_TOPICS: str = ''
+	KAFKA_CONCURRENT_CONSUMER: bool = False
+	KAFKA_GROUP_ID: str = 'watchmen-pipeline-surface'
+	KAFKA_WORKERS: int = 8
+	KAFKA_ORDER_BY_KEY: bool = False
+	KAFKA_FETCH_MAX_RECORDS: int = 500
+	KAFKA_FETCH_TIMEOUT: int = 1000  # in milliseconds
+	KAFKA_MAX_IN_FLIGHT: int = 2000
+	KAFKA_COMMIT_INTERVAL: int = 1000  # in milliseconds
+	KAFKA_MAX_RETRIES: int = 2
+	KAFKA_RETRY_BACKOFF: int = 500  # in milliseconds
+	KAFKA_DEAD_LETTER_TOPIC: str = ''
+	KAFKA_PAT_CACHE_TTL: int = 300  # in seconds
+	KAFKA_METRICS_INTERVAL: int = 60  # in seconds
 
 
 settings = PipelineSurfaceSettings()
@@ -40,7 +53,20 @@ def ask_kafka_connector_settings() -> KafkaSettings:
 		topics = topics.split(',')
 	return KafkaSettings(
 		bootstrapServers=settings.KAFKA_BOOTSTRAP_SERVER,
-		topics=topics
+		topics=topics,
+		concurrent=settings.KAFKA_CONCURRENT_CONSUMER,
+		groupId=settings.KAFKA_GROUP_ID,
+		workers=settings.KAFKA_WORKERS,
+		orderByKey=settings.KAFKA_ORDER_BY_KEY,
+		fetchMaxRecords=settings.KAFKA_FETCH_MAX_RECORDS,
+		fetchTimeout=settings.KAFKA_FETCH_TIMEOUT,
+		maxInFlight=settings.KAFKA_MAX_IN_FLIGHT,
+		commitInterval=settings.KAFKA_COMMIT_INTERVAL,
+		maxRetries=settings.KAFKA_MAX_RETRIES,
+		retryBackoff=settings.KAFKA_RETRY_BACKOFF,
+		deadLetterTopic=None if is_blank(settings.KAFKA_DEAD_LETTER_TOPIC) else settings.KAFKA_DEAD_LETTER_TOPIC,
+		patCacheTtl=settings.KAFKA_PAT_CACHE_TTL,
+		metricsInterval=settings.KAFKA_METRICS_INTERVAL
 	)
 
 
@@ -0,0 +1,92 @@
+from asyncio import sleep as async_sleep
+from json import dumps
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+
+class FakeTopicPartition(NamedTuple):
+	topic: str
+	partition: int
+
+
+class FakeRecord(NamedTuple):
+	topic: str
+	partition: int
+	offset: int
+	key: Optional[bytes]
+	value: Any
+
+
+class FakeConsumer:
+	"""
+	in-memory broker client in the way of aiokafka consumer, records are fetched from position of each partition.
+	"""
+
+	def __init__(self):
+		self.records: Dict[FakeTopicPartition, List[FakeRecord]] = {}
+		self.positions: Dict[FakeTopicPartition, int] = {}
+		self.paused: Set[FakeTopicPartition] = set()
+		self.commits: List[Dict[FakeTopicPartition, int]] = []
+		# partitions revoked by rebalance
+		self.revoked: Set[FakeTopicPartition] = set()
+		# called on each fetch, to observe state of consumer
+		self.onFetch: Optional[Callable[[], None]] = None
+
+	def append(self, tp: FakeTopicPartition, value: Any, key: Optional[bytes] = None) -> FakeRecord:
+		records = self.records.setdefault(tp, [])
+		self.positions.setdefault(tp, 0)
+		if isinstance(value, dict):
+			value = dumps(value).encode('utf-8')
+		record = FakeRecord(tp.topic, tp.partition, len(records), key, value)
+		records.append(record)
+		return record
+
+	def remaining(self) -> int:
+		return sum(len(records) - self.positions[tp] for tp, records in self.records.items())
+
+	async def getmany(self, timeout_ms: int, max_records: int) -> Dict[FakeTopicPartition, List[FakeRecord]]:
+		# give way to processing tasks, as polling a broker does
+		await async_sleep(0)
+		if self.onFetch is not None:
+			self.onFetch()
+		batches: Dict[FakeTopicPartition, List[FakeRecord]] = {}
+		count = 0
+		for tp, records in self.records.items():
+			if tp in self.paused or count >= max_records:
+				continue
+			position = self.positions[tp]
+			fetched = records[position:position + max_records - count]
+			if len(fetched) != 0:
+				batches[tp] = fetched
+				self.positions[tp] = position + len(fetched)
+				count = count + len(fetched)
+		if count == 0:
+			await async_sleep(timeout_ms / 1000)
+		return batches
+
+	def pause(self, *tps: FakeTopicPartition) -> None:
+		self.paused.update(tps)
+
+	def resume(self, *tps: FakeTopicPartition) -> None:
+		self.paused.difference_update(tps)
+
+	def seek(self, tp: FakeTopicPartition, offset: int) -> None:
+		self.positions[tp] = offset
+
+	def assignment(self) -> Set[FakeTopicPartition]:
+		return set(self.records.keys()) - self.revoked
+
+	def highwater(self, tp: FakeTopicPartition) -> Optional[int]:
+		return len(self.records.get(tp, []))
+
+	async def commit(self, offsets: Dict[FakeTopicPartition, int]) -> None:
+		self.commits.append(dict(offsets))
+
+
+class FakeProducer:
+	def __init__(self):
+		self.sent: List[Tuple[str, bytes, Optional[bytes], Dict[str, bytes]]] = []
+
+	async def send_and_wait(
+			self, topic: str, value: bytes, key: Optional[bytes] = None,
+			headers: Optional[List[Tuple[str, bytes]]] = None) -> None:
+		self.sent.append((topic, value, key, dict(headers or [])))
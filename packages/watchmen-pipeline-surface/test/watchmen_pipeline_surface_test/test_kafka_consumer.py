@@ -0,0 +1,177 @@
+from asyncio import run
+from threading import Lock
+from time import sleep
+from typing import Any, Dict, List, Optional, Tuple
+from unittest import TestCase
+
+from watchmen_model.pipeline_kernel import PipelineTriggerDataWithPAT
+from watchmen_pipeline_surface.connectors import KafkaSettings, PartitionedKafkaConsumer
+from .fake_broker import FakeConsumer, FakeProducer, FakeTopicPartition
+
+TP0 = FakeTopicPartition('raw', 0)
+TP1 = FakeTopicPartition('raw', 1)
+TP2 = FakeTopicPartition('raw', 2)
+
+
+def trigger_data(tp: FakeTopicPartition, seq: int, key: Optional[str] = None) -> Dict[str, Any]:
+	return {'code': 'raw', 'pat': 'pat', 'data': {'partition': tp.partition, 'seq': seq, 'key': key}}
+
+
+class Handled:
+	def __init__(self, spent: float = 0):
+		self.lock = Lock()
+		self.spent = spent
+		self.data: List[Tuple[int, Optional[str], int]] = []
+
+	def handle(self, data: PipelineTriggerDataWithPAT) -> None:
+		sleep(self.spent)
+		with self.lock:
+			self.data.append((data.data['partition'], data.data['key'], data.data['seq']))
+
+	def of(self, partition: int, key: Optional[str] = None) -> List[int]:
+		return [seq for p, k, seq in self.data if p == partition and k == key]
+
+
+async def consume(consumer: FakeConsumer, kafka_consumer: PartitionedKafkaConsumer) -> None:
+	while consumer.remaining() != 0 or len(kafka_consumer.tasks) != 0:
+		await kafka_consumer.poll()
+	await kafka_consumer.drain()
+
+
+def create_settings(**kwargs) -> KafkaSettings:
+	settings = dict(
+		workers=4, fetchMaxRecords=5, fetchTimeout=1, commitInterval=60000, retryBackoff=0, metricsInterval=60000)
+	settings.update(kwargs)
+	return KafkaSettings(**settings)
+
+
+class PartitionedKafkaConsumerTest(TestCase):
+	def test_partition_in_order(self):
+		consumer = FakeConsumer()
+		for seq in range(12):
+			for tp in [TP0, TP1, TP2]:
+				consumer.append(tp, trigger_data(tp, seq))
+		handled = Handled(0.001)
+		kafka_consumer = PartitionedKafkaConsumer(consumer, create_settings(), handled.handle)
+		run(consume(consumer, kafka_consumer))
+		for tp in [TP0, TP1, TP2]:
+			self.assertEqual(list(range(12)), handled.of(tp.partition))
+		self.assertEqual(36, kafka_consumer.metrics.processed)
+		self.assertEqual(0, kafka_consumer.metrics.inFlight)
+
+	def test_key_in_order(self):
+		consumer = FakeConsumer()
+		for seq in range(10):
+			for key in ['a', 'b']:
+				consumer.append(TP0, trigger_data(TP0, seq, key), key.encode('utf-8'))
+		handled = Handled(0.001)
+		kafka_consumer = PartitionedKafkaConsumer(consumer, create_settings(orderByKey=True), handled.handle)
+		run(consume(consumer, kafka_consumer))
+		self.assertEqual(list(range(10)), handled.of(0, 'a'))
+		self.assertEqual(list(range(10)), handled.of(0, 'b'))
+
+	def test_commit_in_batch(self):
+		consumer = FakeConsumer()
+		for seq in range(7):
+			consumer.append(TP0, trigger_data(TP0, seq))
+		for seq in range(3):
+			consumer.append(TP1, trigger_data(TP1, seq))
+		handled = Handled()
+		kafka_consumer = PartitionedKafkaConsumer(consumer, create_settings(), handled.handle)
+		run(consume(consumer, kafka_consumer))
+		# not reach commit interval, committed once on drain, next offset of last processed record
+		self.assertEqual([{TP0: 7, TP1: 3}], consumer.commits)
+		self.assertEqual(2, kafka_consumer.metrics.committed)
+		self.assertEqual({'raw-0': 0, 'raw-1': 0}, kafka_consumer.metrics.lag)
+
+	def test_commit_on_interval(self):
+		consumer = FakeConsumer()
+		for seq in range(12):
+			consumer.append(TP0, trigger_data(TP0, seq))
+		handled = Handled()
+		kafka_consumer = PartitionedKafkaConsumer(consumer, create_settings(commitInterval=0), handled.handle)
+		run(consume(consumer, kafka_consumer))
+		offsets = [commit[TP0] for commit in consumer.commits]
+		# offset committed is always next of a batch, and never goes back
+		self.assertEqual(12, offsets[-1])
+		self.assertEqual(sorted(offsets), offsets)
+		self.assertTrue(all(offset in [5, 10, 12] for offset in offsets))
+
+	def test_backpressure(self):
+		consumer = FakeConsumer()
+		for tp in [TP0, TP1, TP2]:
+			for seq in range(6):
+				consumer.append(tp, trigger_data(tp, seq))
+		handled = Handled(0.01)
+		kafka_consumer = PartitionedKafkaConsumer(
+			consumer, create_settings(fetchMaxRecords=3, maxInFlight=5), handled.handle)
+		in_flights: List[int] = []
+		consumer.onFetch = lambda: in_flights.append(kafka_consumer.metrics.inFlight)
+		max_in_flight = 0
+
+		async def consume_and_observe() -> None:
+			nonlocal max_in_flight
+			while consumer.remaining() != 0 or len(kafka_consumer.tasks) != 0:
+				await kafka_consumer.poll()
+				max_in_flight = max(max_in_flight, kafka_consumer.metrics.inFlight)
+			await kafka_consumer.drain()
+
+		run(consume_and_observe())
+		# fetched records exceed limit, and no more fetching until some are done
+		self.assertEqual(6, max_in_flight)
+		self.assertTrue(all(in_flight < 5 for in_flight in in_flights))
+		self.assertEqual(18, len(handled.data))
+
+	def test_dead_letter(self):
+		consumer = FakeConsumer()
+		consumer.append(TP0, trigger_data(TP0, 0))
+		consumer.append(TP0, trigger_data(TP0, 1), b'poison')
+		consumer.append(TP0, b'not a json', b'unparsable')
+		consumer.append(TP0, trigger_data(TP0, 3))
+		handled = Handled()
+		attempts: List[int] = []
+
+		def handle(data: PipelineTriggerDataWithPAT) -> None:
+			if data.data['seq'] == 1:
+				attempts.append(1)
+				raise ValueError('Poison record.')
+			handled.handle(data)
+
+		producer = FakeProducer()
+		kafka_consumer = PartitionedKafkaConsumer(
+			consumer, create_settings(maxRetries=2, deadLetterTopic='raw-dlq'), handle, producer)
+		run(consume(consumer, kafka_consumer))
+		# first try and 2 retries
+		self.assertEqual(3, len(attempts))
+		self.assertEqual([0, 3], handled.of(0))
+		self.assertEqual(
+			[('raw-dlq', b'poison', b'raw-0@1'), ('raw-dlq', b'unparsable', b'raw-0@2')],
+			[(topic, key, headers['source']) for topic, _, key, headers in producer.sent])
+		self.assertEqual(b'Poison record.', producer.sent[0][3]['error'])
+		# value is sent as is
+		self.assertEqual(b'not a json', producer.sent[1][1])
+		self.assertEqual(2, kafka_consumer.metrics.deadLettered)
+		self.assertEqual(2, kafka_consumer.metrics.failed)
+		# dead lettered records are committed as well
+		self.assertEqual([{TP0: 4}], consumer.commits)
+
+	def test_not_commit_revoked(self):
+		consumer = FakeConsumer()
+		for seq in range(3):
+			consumer.append(TP0, trigger_data(TP0, seq))
+			consumer.append(TP1, trigger_data(TP1, seq))
+		handled = Handled()
+
+		def handle(data: PipelineTriggerDataWithPAT) -> None:
+			# revoked by rebalance while its records are in processing
+			if data.data['partition'] == 1:
+				consumer.revoked.add(TP1)
+			handled.handle(data)
+
+		kafka_consumer = PartitionedKafkaConsumer(consumer, create_settings(fetchMaxRecords=10), handle)
+		run(consume(consumer, kafka_consumer))
+		self.assertEqual([0, 1, 2], handled.of(1))
+		self.assertEqual([{TP0: 3}], consumer.commits)
+		self.assertEqual(1, kafka_consumer.metrics.committed)
+		# not resumed after revoked
+		self.assertEqual({TP1}, consumer.paused)
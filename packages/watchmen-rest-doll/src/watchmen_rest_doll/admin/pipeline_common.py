@@ -6,13 +6,14 @@ from fastapi import APIRouter
 from starlette.responses import Response
 
 from watchmen_auth import PrincipalService
-from watchmen_data_kernel.cache import CacheService
+from watchmen_data_kernel.cache import CacheService, publish_cache_invalidation
 from watchmen_data_kernel.common import ask_all_date_formats, ask_replace_topic_to_storage, ask_sync_topic_to_storage
 from watchmen_meta.admin import PipelineService, TopicService
 from watchmen_meta.analysis import PipelineIndexService
 from watchmen_meta.common import ask_meta_storage, ask_snowflake_generator, TupleService
 from watchmen_model.admin import Pipeline, PipelineAction, PipelineStage, PipelineUnit, Topic, TopicKind, UserRole
 from watchmen_model.common import PipelineId, TenantId, TopicId
+from watchmen_model.system import CacheInvalidationKind
 from watchmen_rest import get_admin_principal, get_console_principal, get_super_admin_principal
 from watchmen_rest.util import raise_400, raise_403, raise_404, validate_tenant_id
 from watchmen_rest_doll.doll import ask_tuple_delete_enabled
@@ -78,13 +79,14 @@ def build_pipeline_index(pipeline: Pipeline, pipeline_service: PipelineService)
 	get_pipeline_index_service(pipeline_service).build_index(pipeline)
 
 
-def build_pipeline_cache(pipeline: Pipeline) -> None:
+def build_pipeline_cache(pipeline: Pipeline, pipeline_service: PipelineService) -> None:
 	CacheService.pipeline().put(pipeline)
+	publish_cache_invalidation(CacheInvalidationKind.PIPELINE, pipeline.pipelineId, pipeline_service)
 
 
 def post_save_pipeline(pipeline: Pipeline, pipeline_service: PipelineService) -> None:
 	build_pipeline_index(pipeline, pipeline_service)
-	build_pipeline_cache(pipeline)
+	build_pipeline_cache(pipeline, pipeline_service)
 
 
 # noinspection PyUnusedLocal
@@ -116,12 +118,12 @@ def ask_save_pipeline_action(
 
 def post_update_pipeline_name(pipeline: Pipeline, pipeline_service: PipelineService) -> None:
 	get_pipeline_index_service(pipeline_service).update_index_on_name_changed(pipeline)
-	CacheService.pipeline().put(pipeline)
+	build_pipeline_cache(pipeline, pipeline_service)
 
 
 def post_update_pipeline_enablement(pipeline: Pipeline, pipeline_service: PipelineService) -> None:
 	get_pipeline_index_service(pipeline_service).update_index_on_enablement_changed(pipeline)
-	CacheService.pipeline().put(pipeline)
+	build_pipeline_cache(pipeline, pipeline_service)
 
 
 class LastModified(ExtendedBaseModel):
@@ -135,3 +137,4 @@ def remove_pipeline_index(pipeline_id: PipelineId, pipeline_service: PipelineSer
 def post_delete_pipeline(pipeline_id: PipelineId, pipeline_service: PipelineService) -> None:
 	remove_pipeline_index(pipeline_id, pipeline_service)
 	CacheService.pipeline().remove(pipeline_id)
+	publish_cache_invalidation(CacheInvalidationKind.PIPELINE, pipeline_id, pipeline_service)
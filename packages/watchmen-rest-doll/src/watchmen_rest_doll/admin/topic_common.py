@@ -1,7 +1,7 @@
 from typing import Callable, List, Optional, Tuple
 
 from watchmen_auth import PrincipalService
-from watchmen_data_kernel.cache import CacheService
+from watchmen_data_kernel.cache import CacheService, publish_cache_invalidation
 from watchmen_data_kernel.common import ask_replace_topic_to_storage, ask_sync_topic_to_storage
 from watchmen_data_kernel.service import sync_topic_structure_storage
 from watchmen_meta.admin import FactorService, PipelineService, TopicService, TopicSnapshotSchedulerService
@@ -10,6 +10,7 @@ from watchmen_meta.common import ask_meta_storage, ask_snowflake_generator
 from watchmen_meta.system import DataSourceService
 from watchmen_model.admin import Factor, Pipeline, Topic, TopicKind, TopicType, UserRole, TopicSnapshotScheduler
 from watchmen_model.common import DataPage, TenantId, TopicId
+from watchmen_model.system import CacheInvalidationKind
 from watchmen_pipeline_kernel.topic_snapshot import as_snapshot_task_topic_name, create_snapshot_pipeline, \
 	create_snapshot_target_topic, create_snapshot_task_topic, rebuild_snapshot_pipeline, \
 	rebuild_snapshot_target_topic, rebuild_snapshot_task_topic
@@ -65,6 +66,7 @@ def build_topic_index(topic: Topic, topic_service: TopicService) -> None:
 def post_save_topic(topic: Topic, topic_service: TopicService) -> None:
 	build_topic_index(topic, topic_service)
 	CacheService.topic().put(topic)
+	publish_cache_invalidation(CacheInvalidationKind.TOPIC, topic.topicId, topic_service)
 
 
 def sync_topic_structure(
@@ -225,3 +227,4 @@ def remove_topic_index(topic_id: TopicId, topic_service: TopicService) -> None:
 def post_delete_topic(topic_id: TopicId, topic_service: TopicService) -> None:
 	remove_topic_index(topic_id, topic_service)
 	CacheService.topic().remove(topic_id)
+	publish_cache_invalidation(CacheInvalidationKind.TOPIC, topic_id, topic_service)
@@ -8,13 +8,13 @@ from fastapi import APIRouter, Body, Depends
 from sqlalchemy import text
 
 from watchmen_auth import PrincipalService
-from watchmen_data_kernel.cache import CacheService
+from watchmen_data_kernel.cache import CacheService, publish_cache_invalidation
 from watchmen_data_kernel.storage.topic_storage import build_topic_data_storage
 from watchmen_meta.common import ask_meta_storage, ask_snowflake_generator
 from watchmen_meta.system import DataSourceService
 from watchmen_model.admin import UserRole
 from watchmen_model.common import DataPage, DataSourceId, Pageable
-from watchmen_model.system import DataSource, DataSourceType
+from watchmen_model.system import CacheInvalidationKind, DataSource, DataSourceType
 from watchmen_rest import get_any_admin_principal, get_super_admin_principal
 from watchmen_rest.util import raise_400, raise_403, raise_404
 from watchmen_rest_doll.doll import ask_hide_datasource_pwd_enabled, ask_tuple_delete_enabled
@@ -94,6 +94,8 @@ async def save_data_source(
 			# noinspection PyTypeChecker
 			a_data_source: DataSource = data_source_service.update(a_data_source)
 		CacheService.data_source().put(a_data_source)
+		publish_cache_invalidation(
+			CacheInvalidationKind.DATA_SOURCE, a_data_source.dataSourceId, data_source_service)
 		return a_data_source
 
 	return trans(data_source_service, lambda: action(data_source))
@@ -250,6 +252,7 @@ async def delete_data_source_by_id_by_super_admin(
 		if data_source is None:
 			raise_404()
 		CacheService.data_source().remove(data_source_id)
+		publish_cache_invalidation(CacheInvalidationKind.DATA_SOURCE, data_source_id, data_source_service)
 		return data_source
 
 	return trans(data_source_service, action)
@@ -3,7 +3,7 @@ from typing import Callable, List, Optional
 from fastapi import APIRouter, Body, Depends
 
 from watchmen_auth import PrincipalService
-from watchmen_data_kernel.cache import CacheService
+from watchmen_data_kernel.cache import CacheService, publish_cache_invalidation
 from watchmen_meta.admin import PipelineService, TopicService
 from watchmen_meta.common import ask_meta_storage, ask_snowflake_generator
 from watchmen_meta.system import TenantService
@@ -11,7 +11,7 @@ from watchmen_model.admin import Pipeline, Topic, UserRole
 from watchmen_model.common import DataPage, Pageable, TenantId
 from watchmen_model.dqc import ask_dqc_pipelines, ask_dqc_topics
 from watchmen_model.pipeline_kernel import ask_pipeline_monitor_pipelines, ask_pipeline_monitor_topics
-from watchmen_model.system import Tenant
+from watchmen_model.system import CacheInvalidationKind, Tenant
 from watchmen_model.system.query_topic_generator import ask_query_performance_pipelines,ask_query_performance_topics
 from watchmen_rest import get_any_principal, get_super_admin_principal
 from watchmen_rest.util import raise_400, raise_403, raise_404
@@ -111,6 +111,7 @@ async def save_tenant(
 			# noinspection PyTypeChecker
 			a_tenant: Tenant = tenant_service.update(a_tenant)
 		CacheService.tenant().put(a_tenant)
+		publish_cache_invalidation(CacheInvalidationKind.TENANT, a_tenant.tenantId, tenant_service)
 		return a_tenant
 
 	return trans(tenant_service, lambda: action(tenant))
@@ -157,6 +158,7 @@ async def delete_tenant_by_id_by_super_admin(
 		if tenant is None:
 			raise_404()
 		CacheService.tenant().remove(tenant_id)
+		publish_cache_invalidation(CacheInvalidationKind.TENANT, tenant_id, tenant_service)
 		return tenant
 
 	return trans(tenant_service, action)
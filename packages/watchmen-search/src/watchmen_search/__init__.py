@@ -19,6 +19,7 @@ Typical usage::
     results = await service.search("hello", score_threshold=0.75)
 """
 from .azure_embedding import AzureOpenAIProvider
+from .embedding_cache import CachedEmbeddingProvider, EmbeddingCache, SqliteEmbeddingCache
 from .embedding_provider import EmbeddingProvider
 from .lance_store import LanceVectorStore
 from .model import SearchDocument, SearchResult
@@ -30,6 +31,9 @@ __all__ = [
 	"SearchDocument",
 	"SearchResult",
 	"EmbeddingProvider",
+	"CachedEmbeddingProvider",
+	"EmbeddingCache",
+	"SqliteEmbeddingCache",
 	"AzureOpenAIProvider",
 	"VectorStore",
 	"LanceVectorStore",
@@ -0,0 +1,199 @@
+"""Batched, cached embedding generation.
+
+:class:`CachedEmbeddingProvider` wraps any
+:class:`~watchmen_search.embedding_provider.EmbeddingProvider` so that:
+
+* texts are sent to the model in batches of ``batch_size``, at most
+  ``max_concurrency`` batches in flight, each batch retried on failure,
+* every vector is cached under ``sha256(model_id + normalized_text)`` in a
+  persistent :class:`EmbeddingCache` (SQLite by default), so re-indexing only
+  embeds the chunks which actually changed,
+* recently used vectors (typically repeated queries) are served from an
+  in-process LRU without touching the persistent cache.
+"""
+import hashlib
+import sqlite3
+import unicodedata
+from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from logging import getLogger
+from pathlib import Path
+from threading import Lock
+from time import sleep
+from typing import Dict, List, Optional
+
+from .embedding_provider import EmbeddingProvider
+
+logger = getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+	"""Normalize unicode and collapse whitespace, so cosmetic edits of a chunk
+	do not invalidate its cached vector."""
+	return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+def embedding_cache_key(model_id: str, text: str) -> str:
+	return hashlib.sha256(f"{model_id}\x00{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache(ABC):
+	"""Persistent key -> vector store used by :class:`CachedEmbeddingProvider`."""
+
+	@abstractmethod
+	def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+		"""Return cached vectors of given keys, missing keys are absent."""
+
+	@abstractmethod
+	def put_many(self, vectors: Dict[str, List[float]]) -> None:
+		"""Cache vectors by key, existing keys are overwritten."""
+
+
+class SqliteEmbeddingCache(EmbeddingCache):
+	"""SQLite-backed cache, vectors are stored as float32 blobs.
+
+	One connection is shared by all threads and guarded by a lock; SQLite
+	serializes writes anyway.
+	"""
+
+	# keep well below SQLite's default max number of host parameters
+	_LOOKUP_CHUNK = 500
+
+	def __init__(self, path: str) -> None:
+		Path(path).parent.mkdir(parents=True, exist_ok=True)
+		self._lock = Lock()
+		self._connection = sqlite3.connect(path, check_same_thread=False)
+		with self._lock:
+			self._connection.execute(
+				"CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+			self._connection.commit()
+
+	def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+		found: Dict[str, List[float]] = {}
+		with self._lock:
+			for start in range(0, len(keys), self._LOOKUP_CHUNK):
+				chunk = keys[start:start + self._LOOKUP_CHUNK]
+				placeholders = ",".join("?" * len(chunk))
+				rows = self._connection.execute(
+					f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk).fetchall()
+				for key, blob in rows:
+					found[key] = array("f", blob).tolist()
+		return found
+
+	def put_many(self, vectors: Dict[str, List[float]]) -> None:
+		if not vectors:
+			return
+		with self._lock:
+			self._connection.executemany(
+				"INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+				[(key, array("f", vector).tobytes()) for key, vector in vectors.items()])
+			self._connection.commit()
+
+	def close(self) -> None:
+		with self._lock:
+			self._connection.close()
+
+
+class CachedEmbeddingProvider(EmbeddingProvider):
+	"""Batching and caching decorator over another provider.
+
+	``model_id`` is part of every cache key, change it whenever the wrapped
+	model changes. ``cache`` is optional, without it only the in-process LRU is
+	used.
+	"""
+
+	def __init__(
+			self,
+			provider: EmbeddingProvider,
+			model_id: str,
+			cache: Optional[EmbeddingCache] = None,
+			batch_size: int = 64,
+			max_concurrency: int = 4,
+			max_retries: int = 3,
+			retry_backoff: float = 0.5,
+			lru_size: int = 256,
+	) -> None:
+		self._provider = provider
+		self._model_id = model_id
+		self._cache = cache
+		self._batch_size = max(batch_size, 1)
+		self._max_concurrency = max(max_concurrency, 1)
+		self._max_retries = max(max_retries, 0)
+		self._retry_backoff = retry_backoff
+		self._lru_size = lru_size
+		self._lru: "OrderedDict[str, List[float]]" = OrderedDict()
+		self._lru_lock = Lock()
+
+	@property
+	def dimension(self) -> int:
+		return self._provider.dimension
+
+	def _lru_get(self, key: str) -> Optional[List[float]]:
+		with self._lru_lock:
+			vector = self._lru.get(key)
+			if vector is not None:
+				self._lru.move_to_end(key)
+			return vector
+
+	def _lru_put(self, key: str, vector: List[float]) -> None:
+		if self._lru_size <= 0:
+			return
+		with self._lru_lock:
+			self._lru[key] = vector
+			self._lru.move_to_end(key)
+			while len(self._lru) > self._lru_size:
+				self._lru.popitem(last=False)
+
+	def _embed_with_retry(self, texts: List[str]) -> List[List[float]]:
+		attempt = 0
+		while True:
+			try:
+				vectors = self._provider.embed_batch(texts)
+				if len(vectors) != len(texts):
+					raise RuntimeError(
+						f"Embedding provider returned {len(vectors)} vectors for {len(texts)} inputs.")
+				return vectors
+			except Exception:
+				if attempt >= self._max_retries:
+					raise
+				delay = self._retry_backoff * (2 ** attempt)
+				attempt = attempt + 1
+				logger.warning(
+					"Embedding batch of %d texts failed, retry %d in %.1fs.", len(texts), attempt, delay, exc_info=True)
+				sleep(delay)
+
+	def _embed_missing(self, texts: List[str]) -> List[List[float]]:
+		batches = [texts[start:start + self._batch_size] for start in range(0, len(texts), self._batch_size)]
+		if len(batches) == 1 or self._max_concurrency == 1:
+			results = [self._embed_with_retry(batch) for batch in batches]
+		else:
+			with ThreadPoolExecutor(max_workers=min(self._max_concurrency, len(batches))) as executor:
+				results = list(executor.map(self._embed_with_retry, batches))
+		return [vector for batch_vectors in results for vector in batch_vectors]
+
+	def embed_batch(self, texts: List[str]) -> List[List[float]]:
+		if not texts:
+			return []
+		keys = [embedding_cache_key(self._model_id, text) for text in texts]
+		vectors: Dict[str, List[float]] = {}
+		for key in keys:
+			vector = self._lru_get(key)
+			if vector is not None:
+				vectors[key] = vector
+		missing_keys = [key for key in dict.fromkeys(keys) if key not in vectors]
+		if missing_keys and self._cache is not None:
+			vectors.update(self._cache.get_many(missing_keys))
+			missing_keys = [key for key in missing_keys if key not in vectors]
+		if missing_keys:
+			# same normalized text is embedded once per call
+			text_of_key = dict(zip(keys, texts))
+			embedded = dict(zip(missing_keys, self._embed_missing([text_of_key[key] for key in missing_keys])))
+			if self._cache is not None:
+				self._cache.put_many(embedded)
+			vectors.update(embedded)
+		logger.debug("Embedded %d texts, %d by model.", len(texts), len(missing_keys))
+		for key in dict.fromkeys(keys):
+			self._lru_put(key, vectors[key])
+		return [vectors[key] for key in keys]
@@ -10,12 +10,16 @@ generic 5-column shape:
 Metadata filtering works by translating ``filters={"k": "v"}`` into LanceDB's
 SQL ``where`` clause against the flattened metadata. For richer filtering,
 callers may also pass a raw ``where`` string via :meth:`search_where`.
+
+Small tables are searched by brute-force scan. Once a table reaches
+``index_threshold`` rows a vector index is built, and rows added afterwards are
+merged into it by ``optimize`` when they exceed ``reindex_ratio`` of the table.
 """
 import json
 from datetime import datetime
 from logging import getLogger
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import pyarrow as pa
 
@@ -61,12 +65,31 @@ class LanceVectorStore(VectorStore):
 	``db_path`` points to a local directory (LanceDB is file-based). One table
 	per ``table_name``. The table is created lazily on first ``add`` if it does
 	not exist; ``search`` against a missing table returns an empty list.
+
+	``index_threshold`` is the row count from which the vector index is built,
+	``None`` disables indexing. ``index_type`` is any LanceDB vector index type,
+	e.g. ``IVF_PQ`` or ``IVF_HNSW_SQ``. ``refine_factor`` re-ranks that many
+	times ``top_k`` candidates of the index by exact distance, which keeps
+	recall close to the brute-force scan.
 	"""
 
-	def __init__(self, db_path: str, table_name: str = "documents", dimension: int = 1536) -> None:
+	def __init__(
+			self,
+			db_path: str,
+			table_name: str = "documents",
+			dimension: int = 1536,
+			index_threshold: Optional[int] = 100_000,
+			index_type: str = "IVF_HNSW_SQ",
+			reindex_ratio: float = 0.1,
+			refine_factor: Optional[int] = 10,
+	) -> None:
 		self.db_path = db_path
 		self.table_name = table_name
 		self.dimension = dimension
+		self.index_threshold = index_threshold
+		self.index_type = index_type
+		self.reindex_ratio = reindex_ratio
+		self.refine_factor = refine_factor
 		# Imported lazily so importing watchmen_search does not require lancedb
 		# at module load (tests can swap in an in-memory fake store).
 		try:
@@ -144,6 +167,38 @@ class LanceVectorStore(VectorStore):
 		})
 		self._table.add(table_data)
 		logger.debug("Added %d documents to LanceDB table '%s'.", len(documents), self.table_name)
+		self._ensure_index()
+
+	def _vector_index_name(self) -> Optional[str]:
+		for index in self._table.list_indices():
+			if "vector" in index.columns:
+				return index.name
+		return None
+
+	def _ensure_index(self) -> None:
+		"""Build the vector index once the table is large enough, or merge
+		unindexed rows into it once they exceed ``reindex_ratio`` of the table.
+		Failures are logged only, search falls back to a brute-force scan."""
+		if self.index_threshold is None:
+			return
+		try:
+			total = self._table.count_rows()
+			if total < self.index_threshold:
+				return
+			index_name = self._vector_index_name()
+			if index_name is None:
+				self._table.create_index(vector_column_name="vector", index_type=self.index_type)
+				logger.info(
+					"Created %s index on LanceDB table '%s' with %d rows.", self.index_type, self.table_name, total)
+				return
+			stats = self._table.index_stats(index_name)
+			if stats is not None and stats.num_unindexed_rows > total * self.reindex_ratio:
+				self._table.optimize()
+				logger.info(
+					"Merged %d unindexed rows into index of LanceDB table '%s'.",
+					stats.num_unindexed_rows, self.table_name)
+		except Exception:
+			logger.warning("Failed to index LanceDB table '%s'.", self.table_name, exc_info=True)
 
 	def search(
 			self,
@@ -161,35 +216,50 @@ class LanceVectorStore(VectorStore):
 			where: Optional[str] = None,
 	) -> List[SearchDocument]:
 		"""Lower-level entry point that accepts a raw LanceDB ``where`` clause."""
+		return [self._row_to_document(row) for row in self._search_rows(query_embedding, top_k, where)]
+
+	def search_with_distances(
+			self,
+			query_embedding: List[float],
+			top_k: int = 10,
+			filters: Optional[Dict[str, Any]] = None,
+	) -> List[Tuple[SearchDocument, float]]:
+		"""Run the query once and return each document with its raw ``_distance``."""
+		rows = self._search_rows(query_embedding, top_k, _metadata_to_where(filters))
+		return [(self._row_to_document(row), float(row.get("_distance", 2.0))) for row in rows]
+
+	def _search_rows(self, query_embedding: List[float], top_k: int, where: Optional[str]) -> List[Dict[str, Any]]:
 		self._ensure_dimension(query_embedding)
 		query = self._table.search(query_embedding).limit(top_k)
+		if self.refine_factor:
+			query = query.refine_factor(self.refine_factor)
 		if where:
 			query = query.where(where)
 		try:
-			df = query.to_list()
+			return query.to_list()
 		except Exception:
 			# An empty table or no-match query can raise inside LanceDB; treat
 			# both as "no results".
 			logger.debug("LanceDB search returned no rows for table '%s'.", self.table_name, exc_info=True)
 			return []
-		results: List[SearchDocument] = []
-		for row in df:
-			metadata_raw = row.get("metadata")
-			try:
-				metadata = json.loads(metadata_raw) if isinstance(metadata_raw, str) and metadata_raw else {}
-			except json.JSONDecodeError:
-				metadata = {}
-			created_at = row.get("created_at")
-			if isinstance(created_at, (int, float)):
-				created_at = datetime.fromtimestamp(created_at)
-			results.append(SearchDocument(
-				id=row.get("id"),
-				text=row.get("text"),
-				metadata=metadata,
-				embedding=None,
-				created_at=created_at,
-			))
-		return results
+
+	# noinspection PyMethodMayBeStatic
+	def _row_to_document(self, row: Dict[str, Any]) -> SearchDocument:
+		metadata_raw = row.get("metadata")
+		try:
+			metadata = json.loads(metadata_raw) if isinstance(metadata_raw, str) and metadata_raw else {}
+		except json.JSONDecodeError:
+			metadata = {}
+		created_at = row.get("created_at")
+		if isinstance(created_at, (int, float)):
+			created_at = datetime.fromtimestamp(created_at)
+		return SearchDocument(
+			id=row.get("id"),
+			text=row.get("text"),
+			metadata=metadata,
+			embedding=None,
+			created_at=created_at,
+		)
 
 	def delete_by_filter(self, filters: Dict[str, Any]) -> int:
 		where = _metadata_to_where(filters)
@@ -204,11 +274,7 @@ class LanceVectorStore(VectorStore):
 
 	def _count_where(self, where: Optional[str]) -> int:
 		try:
-			query = self._table.search()
-			if where:
-				query = query.where(where)
-			df = query.to_list()
-			return len(df)
+			return self._table.count_rows(where)
 		except Exception:
 			logger.debug("LanceDB count failed for table '%s'.", self.table_name, exc_info=True)
 			return 0
@@ -224,15 +290,8 @@ class LanceVectorStore(VectorStore):
 		:class:`~watchmen_search.semantic_search.SemanticSearchService` can
 		normalize it into a similarity score without re-running the query.
 		"""
-		self._ensure_dimension(query_embedding)
-		query = self._table.search(query_embedding).limit(top_k)
-		if where:
-			query = query.where(where)
-		try:
-			df = query.to_list()
-		except Exception:
-			return []
-		return [float(row.get("_distance", 2.0)) for row in df]
+		rows = self._search_rows(query_embedding, top_k, where)
+		return [float(row.get("_distance", 2.0)) for row in rows]
 
 	def drop(self) -> None:
 		try:
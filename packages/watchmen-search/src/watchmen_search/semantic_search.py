@@ -15,7 +15,7 @@ methods, minus all hypothesis-specific document-shaping logic.
 """
 import asyncio
 from logging import getLogger
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from .embedding_provider import EmbeddingProvider
 from .model import SearchDocument, SearchResult
@@ -86,25 +86,17 @@ class SemanticSearchService:
 			return []
 		query_vector = query_embedding[0]
 
-		# Prefer the distance-aware path when the store supports it, so we can
-		# normalize consistently. Fall back to a plain document search.
-		distances: Optional[List[float]] = None
-		get_distance = getattr(self._store, "distance", None)
-		if callable(get_distance):
-			distances = get_distance(query_vector, top_k=top_k, where=None)
-
-		docs = self._store.search(query_vector, top_k=top_k, filters=filters)
-
-		# If distances are available, prefer them (same ordering as the search).
-		if distances is not None and len(distances) == len(docs):
+		# Prefer the single-pass path which returns documents with distances,
+		# then the distance-aware path, so we can normalize consistently. Fall
+		# back to a plain document search.
+		search_with_distances = getattr(self._store, "search_with_distances", None)
+		if callable(search_with_distances):
 			scored = [
 				(doc, _normalize_score(dist))
-				for doc, dist in zip(docs, distances)
+				for doc, dist in search_with_distances(query_vector, top_k=top_k, filters=filters)
 			]
 		else:
-			# No distance info; we cannot compute a score. Assign 0.0 so the
-			# threshold filter still works deterministically.
-			scored = [(doc, 0.0) for doc in docs]
+			scored = self._search_and_score(query_vector, top_k, filters)
 
 		results = [
 			SearchResult(document=doc, score=score)
@@ -115,6 +107,29 @@ class SemanticSearchService:
 		logger.debug("Semantic search for %r returned %d results.", query[:50], len(results))
 		return results
 
+	def _search_and_score(
+			self,
+			query_vector: List[float],
+			top_k: int,
+			filters: Optional[Dict[str, Any]],
+	) -> List[Tuple[SearchDocument, float]]:
+		distances: Optional[List[float]] = None
+		get_distance = getattr(self._store, "distance", None)
+		if callable(get_distance):
+			distances = get_distance(query_vector, top_k=top_k, where=None)
+
+		docs = self._store.search(query_vector, top_k=top_k, filters=filters)
+
+		# If distances are available, prefer them (same ordering as the search).
+		if distances is not None and len(distances) == len(docs):
+			return [
+				(doc, _normalize_score(dist))
+				for doc, dist in zip(docs, distances)
+			]
+		# No distance info; we cannot compute a score. Assign 0.0 so the
+		# threshold filter still works deterministically.
+		return [(doc, 0.0) for doc in docs]
+
 	async def delete_by_filter(self, filters: Dict[str, Any]) -> int:
 		deleted = self._store.delete_by_filter(filters)
 		logger.info("Deleted %d documents matching %r.", deleted, filters)
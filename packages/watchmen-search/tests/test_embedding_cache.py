@@ -0,0 +1,79 @@
+"""Tests for watchmen_search.embedding_cache, driven by the deterministic fake provider."""
+import shutil
+import tempfile
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from tests.fakes import FakeEmbeddingProvider
+from watchmen_search.embedding_cache import CachedEmbeddingProvider, SqliteEmbeddingCache
+
+
+class CountingProvider(FakeEmbeddingProvider):
+	"""Fake provider which records every batch and can fail the first calls."""
+
+	def __init__(self, fail_times: int = 0) -> None:
+		super().__init__(dimension=16)
+		self.batches: List[List[str]] = []
+		self.fail_times = fail_times
+
+	def embed_batch(self, texts: List[str]) -> List[List[float]]:
+		if self.fail_times > 0:
+			self.fail_times -= 1
+			raise RuntimeError("model unavailable")
+		self.batches.append(list(texts))
+		return super().embed_batch(texts)
+
+
+@pytest.fixture
+def cache_path():
+	tmp = Path(tempfile.mkdtemp(prefix="watchmen_search_cache_test_"))
+	yield str(tmp / "embeddings.sqlite")
+	shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_texts_are_embedded_in_batches(cache_path):
+	model = CountingProvider()
+	provider = CachedEmbeddingProvider(
+		model, "fake", cache=SqliteEmbeddingCache(cache_path), batch_size=2, max_concurrency=2)
+	texts = [f"text {i}" for i in range(5)]
+	vectors = provider.embed_batch(texts)
+	assert vectors == FakeEmbeddingProvider(16).embed_batch(texts)
+	assert sorted(len(batch) for batch in model.batches) == [1, 2, 2]
+
+
+def test_unchanged_texts_are_served_from_persistent_cache(cache_path):
+	first = CountingProvider()
+	CachedEmbeddingProvider(first, "fake", cache=SqliteEmbeddingCache(cache_path)).embed_batch(["a b", "c d"])
+	# a new process: empty LRU, same cache file
+	second = CountingProvider()
+	provider = CachedEmbeddingProvider(second, "fake", cache=SqliteEmbeddingCache(cache_path), lru_size=0)
+	vectors = provider.embed_batch(["a  b", "c d", "e f"])
+	# whitespace only edit does not invalidate the cached vector
+	assert second.batches == [["e f"]]
+	assert vectors[0] == pytest.approx(FakeEmbeddingProvider(16).embed_batch(["a b"])[0])
+
+
+def test_model_id_is_part_of_cache_key(cache_path):
+	CachedEmbeddingProvider(CountingProvider(), "model-1", cache=SqliteEmbeddingCache(cache_path)).embed_batch(["a"])
+	model = CountingProvider()
+	CachedEmbeddingProvider(model, "model-2", cache=SqliteEmbeddingCache(cache_path)).embed_batch(["a"])
+	assert model.batches == [["a"]]
+
+
+def test_repeated_queries_are_served_from_lru():
+	model = CountingProvider()
+	provider = CachedEmbeddingProvider(model, "fake")
+	provider.embed_batch(["premium"])
+	provider.embed_batch(["premium"])
+	provider.embed_batch(["premium", "premium"])
+	assert model.batches == [["premium"]]
+
+
+def test_failed_batch_is_retried():
+	model = CountingProvider(fail_times=2)
+	provider = CachedEmbeddingProvider(model, "fake", max_retries=2, retry_backoff=0)
+	assert len(provider.embed_batch(["a"])) == 1
+	with pytest.raises(RuntimeError):
+		CachedEmbeddingProvider(CountingProvider(fail_times=2), "fake", max_retries=1, retry_backoff=0).embed_batch(["a"])
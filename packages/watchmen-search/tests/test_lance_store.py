@@ -79,3 +79,32 @@ def test_add_rejects_wrong_dimension(store):
 	doc = SearchDocument(id="x", text="wrong dim", embedding=[0.0] * 8)
 	with pytest.raises(ValueError):
 		store.add([doc])
+
+
+def test_search_with_distances_runs_once(store):
+	store.add([
+		SearchDocument(id="a", text="alpha", embedding=_fake_vector(0), metadata={"topicId": "t1"}),
+		SearchDocument(id="b", text="beta", embedding=_fake_vector(1), metadata={"topicId": "t2"}),
+	])
+	results = store.search_with_distances(_fake_vector(1), top_k=2, filters={"topicId": "t2"})
+	assert [doc.id for doc, _ in results] == ["b"]
+	assert results[0][1] == pytest.approx(0.0)
+
+
+def test_index_built_when_threshold_reached():
+	tmp = Path(tempfile.mkdtemp(prefix="watchmen_search_test_"))
+	s = LanceVectorStore(db_path=str(tmp / "db"), table_name="docs", dimension=16, index_threshold=300)
+	try:
+		docs = [
+			SearchDocument(id=str(i), text=f"doc {i}", embedding=[((i * 7 + j) % 13) / 13.0 for j in range(16)])
+			for i in range(300)
+		]
+		s.add(docs[:299])
+		assert s._vector_index_name() is None
+		s.add(docs[299:])
+		assert s._vector_index_name() is not None
+		assert s.count() == 300
+		assert len(s.search(docs[0].embedding, top_k=5)) == 5
+	finally:
+		s.drop()
+		shutil.rmtree(tmp, ignore_errors=True)
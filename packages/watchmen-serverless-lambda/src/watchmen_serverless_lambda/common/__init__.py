@@ -6,6 +6,7 @@ from .settings import ask_serverless_queue_url, ask_serverless_record_batch_size
     ask_serverless_number_of_extract_table_coordinator, ask_serverless_number_of_record_coordinator, \
     ask_serverless_number_of_json_coordinator, ask_serverless_number_of_task_coordinator, \
     ask_serverless_extract_table_queue_url, ask_serverless_extract_table_limit_size, ask_serverless_post_object_id_batch_size, \
-    ask_serverless_post_object_id_limit_size
+    ask_serverless_post_object_id_limit_size, ask_serverless_collector_cache_heart_beat_interval, \
+    ask_serverless_sqs_concurrency, ask_serverless_sqs_safety_margin
 from .error import log_error
 from .logger import set_mdc_tenant
\ No newline at end of file
@@ -31,6 +31,14 @@ class ServerlessSettings(ExtendedBaseSettings):
 	
 	SERVERLESS_EXTRACT_TABLE_QUEUE_URL: str = ""
 	
+	# collector configs cached in warm container are checked on invocation, in seconds
+	SERVERLESS_COLLECTOR_CACHE_HEART_BEAT_INTERVAL: int = 60
+	
+	# records of one sqs event are processed concurrently, records of same message group are kept in order
+	SERVERLESS_SQS_CONCURRENCY: int = 4
+	# records not started yet are returned as failures when remaining time is less than margin, in seconds
+	SERVERLESS_SQS_SAFETY_MARGIN: int = 30
+	
 
 serverless_settings = ServerlessSettings()
 logger.info(f'Serverless Settings[{serverless_settings.model_dump()}].')
@@ -109,4 +117,16 @@ def ask_serverless_number_of_json_coordinator() -> int:
 
 
 def ask_serverless_number_of_task_coordinator() -> int:
-	return serverless_settings.SERVERLESS_NUMBER_OF_TASK_COORDINATOR
\ No newline at end of file
+	return serverless_settings.SERVERLESS_NUMBER_OF_TASK_COORDINATOR
+
+
+def ask_serverless_collector_cache_heart_beat_interval() -> int:
+	return serverless_settings.SERVERLESS_COLLECTOR_CACHE_HEART_BEAT_INTERVAL
+
+
+def ask_serverless_sqs_concurrency() -> int:
+	return serverless_settings.SERVERLESS_SQS_CONCURRENCY
+
+
+def ask_serverless_sqs_safety_margin() -> int:
+	return serverless_settings.SERVERLESS_SQS_SAFETY_MARGIN
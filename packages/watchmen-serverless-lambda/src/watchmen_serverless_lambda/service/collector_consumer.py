@@ -1,6 +1,7 @@
 import json
 import logging
 
+from watchmen_collector_kernel.cache import heart_beat_on_collector_configs_if_due
 from watchmen_meta.common import ask_snowflake_generator
 from watchmen_serverless_lambda.model import ActionType, AssignTaskMessage, ScheduledTaskMessage, PostGroupedJSONMessage
 from .collector_coordinator import get_collector_coordinator
@@ -8,7 +9,7 @@ from .collector_worker import get_collector_worker
 from watchmen_serverless_lambda.model.message import ExtractTableMessage, SaveRecordMessage, BuildJSONMessage, \
     AssignRecordMessage, AssignJsonMessage, PostJSONMessage, PostObjectIdMessage
 from watchmen_serverless_lambda.storage import ask_file_log_service
-from watchmen_serverless_lambda.common import log_error
+from watchmen_serverless_lambda.common import log_error, ask_serverless_collector_cache_heart_beat_interval
 
 logger = logging.getLogger(__name__)
 
@@ -21,8 +22,12 @@ class CollectorConsumer:
         self.collector_coordinator = get_collector_coordinator(self.tenant_id, context)
         self.collector_worker = get_collector_worker(self.tenant_id, context)
         self.log_service = ask_file_log_service()
+        heart_beat_on_collector_configs_if_due(ask_serverless_collector_cache_heart_beat_interval())
         
-    def process_message(self, message):
+    def process_message(self, message) -> bool:
+        """
+        returns false when message is failed, error is logged already.
+        """
         try:
             body = json.loads(message['body'])
             if body['action'] == ActionType.ASSIGN_RECORD:
@@ -57,9 +62,11 @@ class CollectorConsumer:
                 self.collector_worker.receive_message(message)
             else:
                 logger.error(f"invalidate message {message}")
+            return True
         except Exception as err:
             error_key = f"error/{self.tenant_id}/consumer/{self.snowflake_generator.next_id()}"
             log_error(self.tenant_id, self.log_service, error_key, err)
+            return False
 
 
 def get_collector_consumer(tenant_id: str, context) -> CollectorConsumer:
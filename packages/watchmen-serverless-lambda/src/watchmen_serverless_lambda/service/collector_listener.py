@@ -2,12 +2,13 @@ import logging
 from collections.abc import Callable
 from typing import Dict, Tuple, Optional
 
+from watchmen_collector_kernel.cache import heart_beat_on_collector_configs_if_due
 from watchmen_collector_kernel.model import TriggerEvent
 from watchmen_collector_kernel.service import ask_collector_storage
 from watchmen_collector_kernel.storage import get_trigger_event_service
 from watchmen_meta.common import ask_meta_storage, ask_super_admin, ask_snowflake_generator
 from watchmen_serverless_lambda.common import ask_serverless_queue_url, log_error, \
-    ask_serverless_extract_table_queue_url
+    ask_serverless_extract_table_queue_url, ask_serverless_collector_cache_heart_beat_interval
 from watchmen_serverless_lambda.model import ActionType, ListenerType
 from watchmen_serverless_lambda.queue import SQSSender
 from watchmen_serverless_lambda.service.event import get_event_listener
@@ -47,6 +48,7 @@ class CollectorListener:
         self.json_listener = get_json_listener(tenant_id)
         self.task_listener = get_task_listener(tenant_id)
         self.clean_listener = get_clean_listener(tenant_id)
+        heart_beat_on_collector_configs_if_due(ask_serverless_collector_cache_heart_beat_interval())
 
     def listen(self):
         try:
@@ -1,24 +1,84 @@
-
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Callable, Dict, List, Optional
 
-from watchmen_serverless_lambda.common import set_mdc_tenant
+from watchmen_serverless_lambda.common import set_mdc_tenant, ask_serverless_sqs_concurrency, \
+    ask_serverless_sqs_safety_margin
 from watchmen_serverless_lambda.service import get_collector_consumer
+from watchmen_serverless_lambda.service.time_manager import LambdaTimeManager
+from watchmen_utilities import ArrayHelper
 
 logger = logging.getLogger("trigger-sqs")
 
 
 def sqs_message_handler(event, context):
-    for message in event['Records']:
-        process_message(message, context)
+    """
+    failed records are reported by batch item failures, requires "ReportBatchItemFailures" on event source mapping,
+    otherwise the response is ignored and whole batch is deleted as before.
+    """
+    time_manager = LambdaTimeManager(context, ask_serverless_sqs_safety_margin())
+    failures = process_records(event['Records'],
+                               lambda message: process_message(message, context),
+                               lambda: time_manager.is_safe,
+                               ask_serverless_sqs_concurrency())
+    return {'batchItemFailures': ArrayHelper(failures).map(lambda x: {'itemIdentifier': x}).to_list()}
+
+
+def ask_message_group_id(message) -> Optional[str]:
+    return (message.get('attributes') or {}).get('MessageGroupId')
+
+
+def group_records(records: List[Dict]) -> List[List[Dict]]:
+    """
+    records of same message group (fifo queue) are in one lane, in original order.
+    each record of standard queue is a lane itself.
+    """
+    lanes: Dict[str, List[Dict]] = {}
+    for message in records:
+        group_id = ask_message_group_id(message)
+        lanes.setdefault(group_id if group_id else message['messageId'], []).append(message)
+    return list(lanes.values())
+
+
+def process_lane(lane: List[Dict], process: Callable[[Dict], bool], is_safe: Callable[[], bool]) -> List[str]:
+    """
+    returns message ids of failed records.
+    each record runs in its own copy of context, mdc (e.g. tenant) set by record is not leaked to others.
+    """
+    for index, message in enumerate(lane):
+        if not is_safe():
+            logger.warning(f"not enough time to process message {message['messageId']}, return to queue")
+            return ArrayHelper(lane[index:]).map(lambda x: x['messageId']).to_list()
+        if not copy_context().run(process, message):
+            # following records of message group cannot be processed before the failed one
+            return ArrayHelper(lane[index:]).map(lambda x: x['messageId']).to_list()
+    return []
+
+
+def process_records(records: List[Dict],
+                    process: Callable[[Dict], bool],
+                    is_safe: Callable[[], bool],
+                    concurrency: int) -> List[str]:
+    lanes = group_records(records)
+    workers = min(max(concurrency, 1), len(lanes))
+    if workers <= 1:
+        results = ArrayHelper(lanes).map(lambda x: process_lane(x, process, is_safe)).to_list()
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(lambda x: process_lane(x, process, is_safe), lanes))
+    failures = set(ArrayHelper(results).flatten().to_list())
+    # keep order of records in event
+    return ArrayHelper(records).map(lambda x: x['messageId']).filter(lambda x: x in failures).to_list()
 
 
-def process_message(message, context):
+def process_message(message, context) -> bool:
     try:
         body = json.loads(message['body'])
         set_mdc_tenant(body['tenantId'])
         consumer = get_collector_consumer(body['tenantId'], context)
-        consumer.process_message(message)
+        return consumer.process_message(message)
     except Exception as err:
         logger.error(err, exc_info=True, stack_info=True)
-        
+        return False
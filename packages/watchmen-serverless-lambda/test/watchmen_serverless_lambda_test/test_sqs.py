@@ -0,0 +1,115 @@
+from threading import Lock
+from typing import Dict, List, Optional
+from unittest import TestCase
+from unittest.mock import patch
+
+from watchmen_serverless_lambda.trigger import sqs
+from watchmen_serverless_lambda.trigger.sqs import group_records, process_lane, process_records
+from watchmen_utilities import mdc_get, mdc_put
+
+
+def create_message(message_id: str, group_id: Optional[str] = None) -> Dict:
+    message = {'messageId': message_id, 'body': '{}'}
+    if group_id is not None:
+        message['attributes'] = {'MessageGroupId': group_id}
+    return message
+
+
+def ask_ids(messages: List[Dict]) -> List[str]:
+    return [message['messageId'] for message in messages]
+
+
+class Processed:
+    def __init__(self, failed: Optional[List[str]] = None):
+        self.lock = Lock()
+        self.failed = failed if failed is not None else []
+        self.ids: List[str] = []
+
+    def process(self, message: Dict) -> bool:
+        with self.lock:
+            self.ids.append(message['messageId'])
+        return message['messageId'] not in self.failed
+
+
+class FakeTimeManager:
+    def __init__(self, context, safety_margin):
+        self.is_safe = context['safe']
+
+
+class SqsTest(TestCase):
+    def test_group_records(self):
+        records = [
+            create_message('1', 'a'), create_message('2', 'b'), create_message('3'),
+            create_message('4', 'a'), create_message('5'), create_message('6', 'b')
+        ]
+        self.assertEqual(
+            [['1', '4'], ['2', '6'], ['3'], ['5']], [ask_ids(lane) for lane in group_records(records)])
+
+    def test_fail_rest_of_group(self):
+        lane = [create_message('1', 'a'), create_message('2', 'a'), create_message('3', 'a')]
+        processed = Processed(['2'])
+        self.assertEqual(['2', '3'], process_lane(lane, processed.process, lambda: True))
+        # not processed after failure
+        self.assertEqual(['1', '2'], processed.ids)
+
+    def test_unsafe_cut_off(self):
+        lane = [create_message('1', 'a'), create_message('2', 'a'), create_message('3', 'a')]
+        processed = Processed()
+        checks = iter([True, False])
+        self.assertEqual(['2', '3'], process_lane(lane, processed.process, lambda: next(checks)))
+        self.assertEqual(['1'], processed.ids)
+
+    def test_process_records(self):
+        records = [
+            create_message('1', 'a'), create_message('2', 'b'), create_message('3'),
+            create_message('4', 'a'), create_message('5', 'b'), create_message('6'),
+            create_message('7', 'a')
+        ]
+        for concurrency in [1, 4]:
+            processed = Processed(['1', '5', '6'])
+            failures = process_records(records, processed.process, lambda: True, concurrency)
+            # in order of event
+            self.assertEqual(['1', '4', '5', '6', '7'], failures)
+            # records of group are processed in order, and stop on first failure
+            self.assertEqual(['1'], [x for x in processed.ids if x in ['1', '4', '7']])
+            self.assertEqual(['2', '5'], [x for x in processed.ids if x in ['2', '5']])
+            self.assertEqual({'1', '2', '3', '5', '6'}, set(processed.ids))
+
+    def test_process_records_when_unsafe(self):
+        records = [create_message('1', 'a'), create_message('2'), create_message('3', 'a')]
+        processed = Processed()
+        self.assertEqual(['1', '2', '3'], process_records(records, processed.process, lambda: False, 2))
+        self.assertEqual([], processed.ids)
+
+    def test_mdc_of_record(self):
+        records = [
+            create_message('1', 'a'), create_message('2', 'b'), create_message('3', 'a'), create_message('4', 'b')
+        ]
+        seen: Dict[str, Optional[str]] = {}
+
+        def process(message: Dict) -> bool:
+            # nothing left by previous record of lane, or by records on other threads
+            seen[message['messageId']] = mdc_get('tenant')
+            mdc_put('tenant', f"tenant-{message['messageId']}")
+            return mdc_get('tenant') == f"tenant-{message['messageId']}"
+
+        for concurrency in [1, 2]:
+            seen.clear()
+            self.assertEqual([], process_records(records, process, lambda: True, concurrency))
+            self.assertEqual({'1': None, '2': None, '3': None, '4': None}, seen)
+            self.assertIsNone(mdc_get('tenant'))
+
+    def test_batch_item_failures(self):
+        records = [create_message('1', 'a'), create_message('2'), create_message('3', 'a'), create_message('4')]
+        processed = Processed(['1', '4'])
+        with patch.object(sqs, 'LambdaTimeManager', FakeTimeManager), \
+                patch.object(sqs, 'process_message', lambda message, context: processed.process(message)):
+            response = sqs.sqs_message_handler({'Records': records}, {'safe': True})
+            self.assertEqual(
+                {'batchItemFailures': [{'itemIdentifier': '1'}, {'itemIdentifier': '3'}, {'itemIdentifier': '4'}]},
+                response)
+            response = sqs.sqs_message_handler({'Records': records}, {'safe': False})
+            self.assertEqual(
+                {'batchItemFailures': [{'itemIdentifier': x} for x in ['1', '2', '3', '4']]}, response)
+            response = sqs.sqs_message_handler({'Records': records[1:2]}, {'safe': True})
+            self.assertEqual({'batchItemFailures': []}, response)
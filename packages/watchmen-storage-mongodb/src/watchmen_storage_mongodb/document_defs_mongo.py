@@ -261,6 +261,27 @@ table_package_versions = MongoDocument(
 		create_tenant_id(), *create_tuple_audit_columns()
 	]
 )
+table_cache_invalidations = MongoDocument(
+	name='cache_invalidations',
+	columns=[
+		create_pk('invalidation_id'), create_str('kind', False),
+		create_str('resource_id'), create_str('origin', False),
+		create_tenant_id(), create_datetime('created_at', False)
+	]
+)
+table_pipeline_monitor_log_rollups = MongoDocument(
+	name='pipeline_monitor_log_rollups',
+	columns=[
+		create_pk('rollup_id'), create_tenant_id(),
+		create_str('topic_id'), create_str('pipeline_id'),
+		create_str('tier', False), create_datetime('minute_at', False), create_bool('backfilled', False),
+		create_int('total_count', False), create_int('done_count', False),
+		create_int('error_count', False), create_int('ignored_count', False),
+		create_int('duration_count', False), create_int('duration_sum', False),
+		create_int('duration_min'), create_int('duration_max'), create_json('duration_sketch'),
+		create_int('insert_count', False), create_int('update_count', False), create_int('delete_count', False)
+	]
+)
 
 # gui
 table_favorites = MongoDocument(
@@ -489,6 +510,8 @@ tables: Dict[str, MongoDocument] = {
 	'collector_competitive_lock': table_collector_competitive_lock,
 	'operations': table_operations,
 	'package_versions': table_package_versions,
+	'cache_invalidations': table_cache_invalidations,
+	'pipeline_monitor_log_rollups': table_pipeline_monitor_log_rollups,
 	# webhook
 	'subscription_event_locks': table_subscription_event_locks,
 	'subscription_events': table_subscription_event,
@@ -0,0 +1,25 @@
+CREATE TABLE pipeline_monitor_log_rollups
+(
+    rollup_id           NVARCHAR(50)    NOT NULL,
+    tenant_id           NVARCHAR(50)    NOT NULL,
+    topic_id            NVARCHAR(50),
+    pipeline_id         NVARCHAR(50),
+    tier                NVARCHAR(10)    NOT NULL,
+    minute_at           DATETIME        NOT NULL,
+    backfilled          TINYINT         NOT NULL,
+    total_count         BIGINT          NOT NULL,
+    done_count          BIGINT          NOT NULL,
+    error_count         BIGINT          NOT NULL,
+    ignored_count       BIGINT          NOT NULL,
+    duration_count      BIGINT          NOT NULL,
+    duration_sum        BIGINT          NOT NULL,
+    duration_min        BIGINT,
+    duration_max        BIGINT,
+    duration_sketch     NVARCHAR(MAX),
+    insert_count        BIGINT          NOT NULL,
+    update_count        BIGINT          NOT NULL,
+    delete_count        BIGINT          NOT NULL,
+    CONSTRAINT pk_pipeline_monitor_log_rollups PRIMARY KEY (rollup_id)
+);
+CREATE INDEX i_pipeline_monitor_log_rollups_1 ON pipeline_monitor_log_rollups (tenant_id, minute_at);
+CREATE INDEX i_pipeline_monitor_log_rollups_2 ON pipeline_monitor_log_rollups (tier, minute_at);
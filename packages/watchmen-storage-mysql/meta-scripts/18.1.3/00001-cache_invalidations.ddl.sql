@@ -0,0 +1,11 @@
+CREATE TABLE cache_invalidations
+(
+    invalidation_id     VARCHAR(50)     NOT NULL,
+    kind                VARCHAR(50)     NOT NULL,
+    resource_id         VARCHAR(50),
+    origin              VARCHAR(50)     NOT NULL,
+    tenant_id           VARCHAR(50)     NOT NULL,
+    created_at          DATETIME        NOT NULL,
+    PRIMARY KEY (invalidation_id),
+    INDEX (created_at)
+);
@@ -0,0 +1,25 @@
+CREATE TABLE pipeline_monitor_log_rollups
+(
+    rollup_id           VARCHAR(50)     NOT NULL,
+    tenant_id           VARCHAR(50)     NOT NULL,
+    topic_id            VARCHAR(50),
+    pipeline_id         VARCHAR(50),
+    tier                VARCHAR(10)     NOT NULL,
+    minute_at           DATETIME        NOT NULL,
+    backfilled          TINYINT         NOT NULL,
+    total_count         BIGINT          NOT NULL,
+    done_count          BIGINT          NOT NULL,
+    error_count         BIGINT          NOT NULL,
+    ignored_count       BIGINT          NOT NULL,
+    duration_count      BIGINT          NOT NULL,
+    duration_sum        BIGINT          NOT NULL,
+    duration_min        BIGINT,
+    duration_max        BIGINT,
+    duration_sketch     JSON,
+    insert_count        BIGINT          NOT NULL,
+    update_count        BIGINT          NOT NULL,
+    delete_count        BIGINT          NOT NULL,
+    PRIMARY KEY (rollup_id),
+    INDEX (tenant_id, minute_at),
+    INDEX (tier, minute_at)
+);
@@ -0,0 +1,25 @@
+CREATE TABLE pipeline_monitor_log_rollups
+(
+    rollup_id           VARCHAR2(50)    NOT NULL,
+    tenant_id           VARCHAR2(50)    NOT NULL,
+    topic_id            VARCHAR2(50),
+    pipeline_id         VARCHAR2(50),
+    tier                VARCHAR2(10)    NOT NULL,
+    minute_at           DATE            NOT NULL,
+    backfilled          NUMBER(1)       NOT NULL,
+    total_count         NUMBER(20)      NOT NULL,
+    done_count          NUMBER(20)      NOT NULL,
+    error_count         NUMBER(20)      NOT NULL,
+    ignored_count       NUMBER(20)      NOT NULL,
+    duration_count      NUMBER(20)      NOT NULL,
+    duration_sum        NUMBER(20)      NOT NULL,
+    duration_min        NUMBER(20),
+    duration_max        NUMBER(20),
+    duration_sketch     CLOB,
+    insert_count        NUMBER(20)      NOT NULL,
+    update_count        NUMBER(20)      NOT NULL,
+    delete_count        NUMBER(20)      NOT NULL,
+    CONSTRAINT pk_pipeline_monitor_log_rollups PRIMARY KEY (rollup_id)
+);
+CREATE INDEX i_pipeline_monitor_log_rollups_1 ON pipeline_monitor_log_rollups (tenant_id, minute_at);
+CREATE INDEX i_pipeline_monitor_log_rollups_2 ON pipeline_monitor_log_rollups (tier, minute_at);
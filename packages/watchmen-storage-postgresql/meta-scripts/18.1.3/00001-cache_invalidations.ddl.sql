@@ -0,0 +1,11 @@
+CREATE TABLE cache_invalidations
+(
+    invalidation_id     VARCHAR(50)     NOT NULL,
+    kind                VARCHAR(50)     NOT NULL,
+    resource_id         VARCHAR(50),
+    origin              VARCHAR(50)     NOT NULL,
+    tenant_id           VARCHAR(50)     NOT NULL,
+    created_at          TIMESTAMP       NOT NULL,
+    CONSTRAINT pk_cache_invalidations PRIMARY KEY (invalidation_id)
+);
+CREATE INDEX i_cache_invalidations_1 ON cache_invalidations (created_at);
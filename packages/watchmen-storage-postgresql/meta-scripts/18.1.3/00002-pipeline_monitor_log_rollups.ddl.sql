@@ -0,0 +1,25 @@
+CREATE TABLE pipeline_monitor_log_rollups
+(
+    rollup_id           VARCHAR(50)     NOT NULL,
+    tenant_id           VARCHAR(50)     NOT NULL,
+    topic_id            VARCHAR(50),
+    pipeline_id         VARCHAR(50),
+    tier                VARCHAR(10)     NOT NULL,
+    minute_at           TIMESTAMP       NOT NULL,
+    backfilled          SMALLINT        NOT NULL,
+    total_count         BIGINT          NOT NULL,
+    done_count          BIGINT          NOT NULL,
+    error_count         BIGINT          NOT NULL,
+    ignored_count       BIGINT          NOT NULL,
+    duration_count      BIGINT          NOT NULL,
+    duration_sum        BIGINT          NOT NULL,
+    duration_min        BIGINT,
+    duration_max        BIGINT,
+    duration_sketch     JSONB,
+    insert_count        BIGINT          NOT NULL,
+    update_count        BIGINT          NOT NULL,
+    delete_count        BIGINT          NOT NULL,
+    CONSTRAINT pk_pipeline_monitor_log_rollups PRIMARY KEY (rollup_id)
+);
+CREATE INDEX i_pipeline_monitor_log_rollups_1 ON pipeline_monitor_log_rollups (tenant_id, minute_at);
+CREATE INDEX i_pipeline_monitor_log_rollups_2 ON pipeline_monitor_log_rollups (tier, minute_at);
@@ -7,7 +7,7 @@ from threading import Thread
 from typing import Any, Dict, List, Optional, Tuple
 
 from sqlalchemy import delete, distinct, func, insert, select, Table, text, update, RowMapping
-from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.engine import Connection, Engine, NestedTransaction
 from sqlalchemy.sql.elements import literal_column
 from time import sleep, time
 
@@ -47,6 +47,7 @@ class StorageRDS(TransactionalStorageSPI):
 	name in update, criteria, sort must be serialized to column name, otherwise behavior cannot be predicated
 	"""
 	connection: Connection = None
+	savepoint: Optional[NestedTransaction] = None
 
 	def __init__(self, engine: Engine):
 		self.engine = engine
@@ -69,6 +70,24 @@ class StorageRDS(TransactionalStorageSPI):
 		if ask_detect_connection_leak_enabled():
 			alive_conn_dict[str(id(self.connection))] = traceback.format_stack(), time()
 
+	def is_savepoint_supported(self) -> bool:
+		return True
+
+	def begin_savepoint(self) -> None:
+		if self.connection is None or not self.connection.in_transaction():
+			raise UnexpectedStorageException('Transaction not begun, failed to begin savepoint.')
+		self.savepoint = self.connection.begin_nested()
+
+	def release_savepoint(self) -> None:
+		savepoint, self.savepoint = self.savepoint, None
+		if savepoint is not None:
+			savepoint.commit()
+
+	def rollback_to_savepoint(self) -> None:
+		savepoint, self.savepoint = self.savepoint, None
+		if savepoint is not None:
+			savepoint.rollback()
+
 	def build_dialect_json_serializer(self) -> None:
 		try:
 			_json_serializer = self.connection.dialect._json_serializer
@@ -93,6 +112,7 @@ class StorageRDS(TransactionalStorageSPI):
 			self.close()
 
 	def close(self) -> None:
+		self.savepoint = None
 		try:
 			if self.connection is not None:
 				if ask_detect_connection_leak_enabled():
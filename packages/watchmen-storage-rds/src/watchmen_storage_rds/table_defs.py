@@ -554,6 +554,23 @@ table_package_versions = Table(
     create_str('current_version', 20),
     create_tenant_id(), *create_tuple_audit_columns()
 )
+table_cache_invalidations = Table(
+    'cache_invalidations', meta_data,
+    create_pk('invalidation_id'), create_str('kind', 50, False),
+    create_str('resource_id', 50), create_str('origin', 50, False),
+    create_tenant_id(), create_datetime('created_at', False)
+)
+table_pipeline_monitor_log_rollups = Table(
+    'pipeline_monitor_log_rollups', meta_data,
+    create_pk('rollup_id'), create_tenant_id(),
+    create_str('topic_id', 50), create_str('pipeline_id', 50),
+    create_str('tier', 10, False), create_datetime('minute_at', False), create_bool('backfilled', False),
+    create_int('total_count', False), create_int('done_count', False),
+    create_int('error_count', False), create_int('ignored_count', False),
+    create_int('duration_count', False), create_int('duration_sum', False),
+    create_int('duration_min'), create_int('duration_max'), create_json('duration_sketch'),
+    create_int('insert_count', False), create_int('update_count', False), create_int('delete_count', False)
+)
 
 table_subscription_event = Table(
     'subscription_events', meta_data,
@@ -904,6 +921,8 @@ tables: Dict[str, Table] = {
     'scheduled_task_history': table_scheduled_task_history,
     'operations': table_operations,
     'package_versions': table_package_versions,
+    'cache_invalidations': table_cache_invalidations,
+    'pipeline_monitor_log_rollups': table_pipeline_monitor_log_rollups,
     # webhook
     'subscription_event_locks': table_subscription_event_locks,
     'subscription_events': table_subscription_event,
@@ -5,16 +5,16 @@ from logging import getLogger
 from timeit import default_timer as timer
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from sqlalchemy import and_, func, select, Table, text
+from sqlalchemy import and_, func, select, Table, text, update
 from sqlalchemy.sql import Join, label
 from sqlalchemy.sql.elements import Label, literal_column
 
 from watchmen_model.system import DataSource
 from watchmen_model.admin import Factor, FactorType, Topic
 from watchmen_model.common import DataPage, TopicId
-from watchmen_storage import as_table_name, EntityHelper, FreeAggregateArithmetic, FreeAggregateColumn, \
-	FreeAggregatePager, FreeAggregator, FreeColumn, FreeFinder, FreeJoin, FreeJoinType, FreePager, Literal, \
-	NoFreeJoinException, TopicDataStorageSPI, UnexpectedStorageException
+from watchmen_storage import as_table_name, EntityHelper, EntityIncrementer, FreeAggregateArithmetic, \
+	FreeAggregateColumn, FreeAggregatePager, FreeAggregator, FreeColumn, FreeFinder, FreeJoin, FreeJoinType, FreePager, \
+	Literal, NoFreeJoinException, TopicDataStorageSPI, UnexpectedStorageException
 from watchmen_storage.settings import ask_sql_analyzer_on
 from watchmen_storage.sql_analysis.ast_visitor import QueryPerformance
 from watchmen_storage.sql_analysis.parse_sql import SqlParser
@@ -48,6 +48,23 @@ class TopicDataStorageRDS(StorageRDS, TopicDataStorageSPI):
 		# noinspection SqlResolve
 		self.connection.execute(text(f'TRUNCATE TABLE {table.name}'))
 
+	def is_increment_supported(self) -> bool:
+		return True
+
+	def increment(self, incrementer: EntityIncrementer) -> int:
+		"""
+		column = coalesce(column, 0) + increment, row is locked by update statement until transaction ends
+		"""
+		table = self.find_table(incrementer.name)
+		values = {
+			column_name: func.coalesce(table.c[column_name], 0) + increment
+			for column_name, increment in incrementer.increments.items()
+		}
+		statement = update(table).values({**values, **incrementer.update})
+		statement = self.build_criteria_for_statement([table], statement, incrementer.criteria, True)
+		result = self.connection.execute(statement)
+		return result.rowcount
+
 	@abstractmethod
 	def ask_synonym_columns_sql(self, table_name: str) -> str:
 		raise UnexpectedStorageException('Method[ask_synonym_columns_sql] does not support by rds storage.')
@@ -1,4 +1,5 @@
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from logging import getLogger
 from typing import Dict, Optional, List, Union
@@ -6,10 +7,11 @@ from typing import Dict, Optional, List, Union
 from boto3 import client, resource
 from boto3.exceptions import Boto3Error
 from botocore.config import Config
+from botocore.exceptions import ClientError
 
 from watchmen_model.common import DataModel
 from watchmen_model.system import DataSourceParam
-from watchmen_storage import EntityCriteria, ask_s3_bucket_auth_iam_enable
+from watchmen_storage import EntityCriteria, ask_object_storage_fetch_parallelism, ask_s3_bucket_auth_iam_enable
 from watchmen_utilities import serialize_to_json, ArrayHelper
 from .object_defs_s3 import as_file_name
 from .where_build import build_criteria
@@ -57,20 +59,23 @@ class SimpleStorageService:
 			              aws_secret_access_key=access_key_secret,
 			              config=Config(signature_version="s3v4",
 										request_checksum_calculation="when_required",
-										response_checksum_validation="when_required")
+										response_checksum_validation="when_required",
+										max_pool_connections=max(ask_object_storage_fetch_parallelism(), 1))
 			              )
 		else:
 			if ask_s3_bucket_auth_iam_enable():
 				return client(
 					service_name='s3',
-					region_name=endpoint
+					region_name=endpoint,
+					config=Config(max_pool_connections=max(ask_object_storage_fetch_parallelism(), 1))
 				)
 			else:
 				return client(
 					service_name='s3',
 					region_name=endpoint,
 					aws_access_key_id=access_key_id,
-					aws_secret_access_key=access_key_secret
+					aws_secret_access_key=access_key_secret,
+					config=Config(max_pool_connections=max(ask_object_storage_fetch_parallelism(), 1))
 				)
 
 	def get_resource(self, access_key_id: str, access_key_secret: str, endpoint: str, bucket_name: str,
@@ -122,10 +127,27 @@ class SimpleStorageService:
 		try:
 			result = self.client.get_object(Bucket=self.bucket_name, Key=key)
 			return json.load(result['Body'])
+		except ClientError as e:
+			if e.response.get('Error', {}).get('Code') == 'NoSuchKey':
+				# deleted after listed
+				return None
+			logger.error(f'Get object failed, detail: {e.__dict__}', stack_info=True, exc_info=True)
+			return None
 		except Boto3Error as e:
 			logger.error(f'Get object failed, detail: {e.__dict__}', stack_info=True, exc_info=True)
 			return None
 
+	def get_objects(self, keys: List[str]) -> List[Optional[Dict]]:
+		"""
+		get objects concurrently, bounded by object storage fetch parallelism.
+		results are in same order as given keys.
+		"""
+		parallelism = min(ask_object_storage_fetch_parallelism(), len(keys))
+		if parallelism <= 1:
+			return ArrayHelper(keys).map(lambda key: self.get_object(key)).to_list()
+		with ThreadPoolExecutor(max_workers=parallelism) as executor:
+			return list(executor.map(self.get_object, keys))
+
 	def delete_object(self, key: str) -> int:
 		try:
 			self.client.delete_object(Bucket=self.bucket_name, Key=key)
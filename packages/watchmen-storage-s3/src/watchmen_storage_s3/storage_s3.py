@@ -184,7 +184,7 @@ class StorageS3(TransactionalStorageSPI):
 		objects = self.s3_client.get_objects_by_criteria(find_directory(finder.name),
 		                                                 finder.criteria)
 
-		return ArrayHelper(objects).map(lambda obj: self.s3_client.get_object(obj.key)).to_list()
+		return self.s3_client.get_objects(ArrayHelper(objects).map(lambda obj: obj.key).to_list())
 
 	def find_distinct_values(self, finder: EntityDistinctValuesFinder) -> EntityList:
 		"""
@@ -211,10 +211,7 @@ class StorageS3(TransactionalStorageSPI):
 	def find_limited(self, finder: EntityLimitedFinder) -> EntityList:
 		prefix = self.s3_client.ask_table_path(find_directory(finder.name))
 		objects = self.s3_client.list_objects(max_keys=finder.limit, prefix=prefix)
-		results = []
-		for object_ in objects:
-			results.append(self.s3_client.get_object(object_.key))
-		return results
+		return self.s3_client.get_objects(ArrayHelper(objects).map(lambda obj: obj.key).to_list())
 
 	def find_for_update_skip_locked(self, finder: EntityLimitedFinder) -> EntityList:
 		"""
@@ -0,0 +1,102 @@
+import os
+from io import BytesIO
+from tempfile import TemporaryDirectory
+from threading import current_thread, Lock
+from time import sleep
+from typing import Any, Dict, List
+from unittest import TestCase
+from unittest.mock import patch
+
+from botocore.exceptions import ClientError
+
+from watchmen_storage_s3 import simple_storage_service
+from watchmen_storage_s3.simple_storage_service import SimpleStorageService
+
+
+class FileSystemS3Client:
+	"""
+	stand-in of s3 client, objects are files under root directory
+	"""
+
+	def __init__(self, root: str):
+		self.root = root
+		self.lock = Lock()
+		self.inFlight = 0
+		self.maxInFlight = 0
+		self.threadNames = set()
+
+	def put_object(self, Body: str, Bucket: str, Key: str) -> None:
+		path = os.path.join(self.root, Bucket, Key)
+		os.makedirs(os.path.dirname(path), exist_ok=True)
+		with open(path, 'w') as file:
+			file.write(Body)
+
+	def get_object(self, Bucket: str, Key: str) -> Dict[str, Any]:
+		with self.lock:
+			self.inFlight = self.inFlight + 1
+			self.maxInFlight = max(self.maxInFlight, self.inFlight)
+			self.threadNames.add(current_thread().name)
+		try:
+			# network latency
+			sleep(0.01)
+			path = os.path.join(self.root, Bucket, Key)
+			if not os.path.exists(path):
+				raise ClientError({'Error': {'Code': 'NoSuchKey', 'Message': 'Not found.'}}, 'GetObject')
+			with open(path, 'rb') as file:
+				return {'Body': BytesIO(file.read())}
+		finally:
+			with self.lock:
+				self.inFlight = self.inFlight - 1
+
+
+class GetObjectsTest(TestCase):
+	def setUp(self):
+		self.directory = TemporaryDirectory()
+		self.client = FileSystemS3Client(self.directory.name)
+		self.service = SimpleStorageService.__new__(SimpleStorageService)
+		self.service.client = self.client
+		self.service.bucket_name = 'bucket'
+
+	def tearDown(self):
+		self.directory.cleanup()
+
+	def put_rows(self, count: int) -> List[str]:
+		keys = [f'prefix/topic/{index}' for index in range(count)]
+		for index, key in enumerate(keys):
+			self.service.put_object(key, {'id_': index, 'value': f'v{index}'})
+		return keys
+
+	def get_objects(self, keys: List[str], parallelism: int) -> List[Any]:
+		with patch.object(simple_storage_service, 'ask_object_storage_fetch_parallelism', lambda: parallelism):
+			return self.service.get_objects(keys)
+
+	def test_keep_key_order_and_none_for_missing(self):
+		keys = self.put_rows(20)
+		# reversed, and missing keys in between
+		keys = list(reversed(keys))
+		keys.insert(3, 'prefix/topic/missing-1')
+		keys.append('prefix/topic/missing-2')
+		objects = self.get_objects(keys, 4)
+		self.assertEqual(22, len(objects))
+		self.assertIsNone(objects[3])
+		self.assertIsNone(objects[21])
+		found = [x for x in objects if x is not None]
+		self.assertEqual(list(range(19, -1, -1)), [x['id_'] for x in found])
+		self.assertEqual('v19', found[0]['value'])
+
+	def test_bounded_by_parallelism(self):
+		keys = self.put_rows(30)
+		objects = self.get_objects(keys, 3)
+		self.assertEqual(list(range(30)), [x['id_'] for x in objects])
+		self.assertLessEqual(self.client.maxInFlight, 3)
+		self.assertGreater(self.client.maxInFlight, 1)
+
+	def test_sequential_when_parallelism_is_one(self):
+		keys = self.put_rows(5)
+		objects = self.get_objects(keys, 1)
+		self.assertEqual(list(range(5)), [x['id_'] for x in objects])
+		self.assertEqual(1, self.client.maxInFlight)
+		self.assertEqual({current_thread().name}, self.client.threadNames)
+
+	def test_empty_keys(self):
+		self.assertEqual([], self.get_objects([], 4))
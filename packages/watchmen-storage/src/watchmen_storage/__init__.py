@@ -5,7 +5,7 @@ from .data_source_helper import ask_datasource_name, DataSourceHelper
 from .free_storage_types import FreeAggregateArithmetic, FreeAggregateColumn, FreeAggregatePager, FreeAggregator, \
 	FreeColumn, FreeFinder, FreeJoin, FreeJoinType, FreePager
 from .settings import ask_decimal_fraction_digits, ask_decimal_integral_digits, ask_disable_compiled_cache, \
-	ask_object_storage_need_date_directory, ask_s3_bucket_auth_iam_enable
+	ask_object_storage_fetch_parallelism, ask_object_storage_need_date_directory, ask_s3_bucket_auth_iam_enable
 from .snowflake import InvalidSystemClockException, SnowflakeGenerator
 from .snowflake_remote import RemoteSnowflakeGenerator
 from .snowflake_worker_id_generator import immutable_worker_id, WorkerIdGenerator
@@ -22,8 +22,8 @@ from .storage_types import ColumnNameLiteral, ComputedLiteral, ComputedLiteralOp
 	EntityColumnAggregateArithmetic, EntityColumnName, EntityColumnType, EntityColumnValue, EntityCriteria, \
 	EntityCriteriaExpression, EntityCriteriaJoint, EntityCriteriaJointConjunction, EntityCriteriaOperator, \
 	EntityCriteriaStatement, EntityDeleter, EntityDistinctValuesFinder, EntityFinder, EntityHelper, EntityId, \
-	EntityIdHelper, EntityList, EntityName, EntityPager, EntityRow, EntityShaper, EntitySort, EntitySortColumn, \
-	EntitySortMethod, EntityStraightAggregateColumn, EntityStraightColumn, EntityStraightValuesFinder, EntityUpdate, \
-	EntityUpdater, Literal, EntityLimitedFinder, EntityLimitedStraightValuesFinder
+	EntityIdHelper, EntityIncrementer, EntityList, EntityName, EntityPager, EntityRow, EntityShaper, EntitySort, \
+	EntitySortColumn, EntitySortMethod, EntityStraightAggregateColumn, EntityStraightColumn, EntityStraightValuesFinder, \
+	EntityUpdate, EntityUpdater, Literal, EntityLimitedFinder, EntityLimitedStraightValuesFinder
 from .topic_utils import as_table_name
 from .snowflake_workers import SnowflakeWorker, DBConfig
\ No newline at end of file
@@ -9,6 +9,7 @@ class StorageSettings(ExtendedBaseSettings):
 	DECIMAL_FRACTION_DIGITS: int = 8
 	DISABLE_COMPILED_CACHE: bool = False
 	OBJECT_STORAGE_NEED_DATE_DIRECTORY: bool = False
+	OBJECT_STORAGE_FETCH_PARALLELISM: int = 16  # max objects fetched concurrently
 	S3_BUCKET_AUTH_IAM_ENABLE: bool = False
 	SQL_ANALYZER_ON: bool = True
 
@@ -39,3 +40,7 @@ def ask_object_storage_need_date_directory() -> bool:
 
 def ask_s3_bucket_auth_iam_enable() -> bool:
 	return storage_settings.S3_BUCKET_AUTH_IAM_ENABLE
+
+
+def ask_object_storage_fetch_parallelism() -> int:
+	return storage_settings.OBJECT_STORAGE_FETCH_PARALLELISM
@@ -1,4 +1,7 @@
+from atexit import register as register_exit
+from threading import Lock
 from time import time
+from typing import List
 
 from .snowflake_worker_id_generator import WorkerIdGenerator
 
@@ -16,6 +19,15 @@ MAX_SEQUENCE = -1 ^ (-1 << SEQUENCE_BITS)
 WORKER_ID_SHIFT = SEQUENCE_BITS
 DATACENTER_ID_SHIFT = SEQUENCE_BITS + WORKER_ID_BITS
 TIMESTAMP_LEFT_SHIFT = SEQUENCE_BITS + WORKER_ID_BITS + DATACENTER_ID_BITS
+# sequences of next milliseconds can be borrowed when current millisecond is used up,
+# at most 100 milliseconds ahead of clock, then wait for clock.
+# borrowed milliseconds are in memory only, ids of them will be issued again by a generator with same worker id,
+# if it starts before clock catches up. generator waits it out on normal exit (see close),
+# but not when process is killed, therefore
+# 1. do not restart a crashed process within 100 milliseconds with same fixed worker id,
+# 2. worker id of competitive workers must not be handed over within 100 milliseconds,
+#    storage based worker ids are taken over after no heart beat for interval + 60 seconds, far longer than that.
+MAX_BORROWED_MILLISECONDS = 100
 
 
 class InvalidSystemClockException(Exception):
@@ -63,31 +75,74 @@ class SnowflakeGenerator:
 		self.workerId = worker_id
 		self.sequence = 0
 		self.lastTimestamp = -1
+		# shared by threads
+		self.lock = Lock()
+		register_exit(self.close)
 
-
-	def next_id(self) -> int:
-		timestamp = generate_timestamp()
-
-		if timestamp < self.lastTimestamp:
-			# incorrect timestamp
-			# raise InvalidSystemClockException
-			# use current time stamp
-			timestamp = self.lastTimestamp
-
-		if timestamp == self.lastTimestamp:
-			# exactly in same timestamp, increase sequence
-			# and increase timestamp when sequence reaches the max value
-			self.sequence = (self.sequence + 1) & MAX_SEQUENCE
-			if self.sequence == 0:
-				timestamp = acquire_next_millisecond(self.lastTimestamp)
-				self.lastTimestamp = timestamp
-		else:
-			# already beyonds in-memory timestamp, reset in-memory
-			self.sequence = 0
-			self.lastTimestamp = timestamp
-			
+	def compose_id(self, timestamp: int, sequence: int) -> int:
 		return \
 			((timestamp - TWEPOCH) << TIMESTAMP_LEFT_SHIFT) | \
 			(self.dataCenterId << DATACENTER_ID_SHIFT) | \
 			(self.workerId << WORKER_ID_SHIFT) | \
-			self.sequence
+			sequence
+
+	def next_millisecond(self) -> int:
+		"""
+		sequences of in-memory timestamp are used up, must be called in lock
+		"""
+		timestamp = generate_timestamp()
+		if timestamp > self.lastTimestamp:
+			return timestamp
+		if self.lastTimestamp - timestamp >= MAX_BORROWED_MILLISECONDS:
+			acquire_next_millisecond(self.lastTimestamp - MAX_BORROWED_MILLISECONDS)
+		return self.lastTimestamp + 1
+
+	def next_id(self) -> int:
+		with self.lock:
+			timestamp = generate_timestamp()
+			if timestamp > self.lastTimestamp:
+				# already beyonds in-memory timestamp, reset in-memory
+				self.sequence = 0
+				self.lastTimestamp = timestamp
+			elif self.sequence < MAX_SEQUENCE:
+				# in same timestamp, or clock moved backwards, increase sequence on in-memory timestamp
+				self.sequence = self.sequence + 1
+			else:
+				# sequence reaches the max value, increase timestamp
+				self.sequence = 0
+				self.lastTimestamp = self.next_millisecond()
+			return self.compose_id(self.lastTimestamp, self.sequence)
+
+	def next_ids(self, count: int) -> List[int]:
+		"""
+		reserve given count of ids in one critical section, ids are ascending.
+		sequences of one millisecond are contiguous, therefore ids are built by ranges.
+		"""
+		if count <= 0:
+			return []
+		ids: List[int] = []
+		with self.lock:
+			timestamp = generate_timestamp()
+			if timestamp > self.lastTimestamp:
+				self.sequence = -1
+				self.lastTimestamp = timestamp
+			remaining = count
+			while remaining > 0:
+				if self.sequence >= MAX_SEQUENCE:
+					self.sequence = -1
+					self.lastTimestamp = self.next_millisecond()
+				first = self.sequence + 1
+				last = min(MAX_SEQUENCE, first + remaining - 1)
+				base = self.compose_id(self.lastTimestamp, 0)
+				ids.extend(range(base + first, base + last + 1))
+				remaining = remaining - (last - first + 1)
+				self.sequence = last
+		return ids
+
+	def close(self) -> None:
+		"""
+		wait until clock catches up borrowed milliseconds, at most 100 milliseconds.
+		then ids issued by this generator will not be issued again by next generator with same worker id.
+		"""
+		with self.lock:
+			acquire_next_millisecond(self.lastTimestamp)
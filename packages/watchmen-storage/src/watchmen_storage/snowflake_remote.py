@@ -76,5 +76,8 @@ class RemoteSnowflakeGenerator:
                 remaining -= take
         return result
 
+    def next_ids(self, count: int) -> List[int]:
+        return self.batch_next_id(count)
+
     def close(self):
         self._session.close()
\ No newline at end of file
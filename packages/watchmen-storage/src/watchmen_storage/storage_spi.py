@@ -5,9 +5,10 @@ from watchmen_model.system import DataSource
 from watchmen_model.admin import Factor, Topic
 from watchmen_model.common import DataPage
 from .free_storage_types import FreeAggregatePager, FreeAggregator, FreeFinder, FreePager
+from .storage_exception import UnexpectedStorageException
 from .storage_types import Entity, EntityDeleter, EntityDistinctValuesFinder, EntityFinder, EntityHelper, EntityId, \
-	EntityIdHelper, EntityList, EntityPager, EntityStraightValuesFinder, EntityUpdater, EntityLimitedFinder, \
-	EntityLimitedStraightValuesFinder
+	EntityIdHelper, EntityIncrementer, EntityList, EntityPager, EntityStraightValuesFinder, EntityUpdater, \
+	EntityLimitedFinder, EntityLimitedStraightValuesFinder
 
 
 class StorageSPI(ABC):
@@ -217,6 +218,22 @@ class TransactionalStorageSPI(StorageSPI):
 		"""
 		pass
 
+	# noinspection PyMethodMayBeStatic
+	def is_savepoint_supported(self) -> bool:
+		"""
+		whether savepoint can be created in transaction, statement failed after it can be rolled back alone
+		"""
+		return False
+
+	def begin_savepoint(self) -> None:
+		raise UnexpectedStorageException('Method[begin_savepoint] is not supported by current storage.')
+
+	def release_savepoint(self) -> None:
+		raise UnexpectedStorageException('Method[release_savepoint] is not supported by current storage.')
+
+	def rollback_to_savepoint(self) -> None:
+		raise UnexpectedStorageException('Method[rollback_to_savepoint] is not supported by current storage.')
+
 
 class TopicDataStorageSPI(TransactionalStorageSPI):
 	@abstractmethod
@@ -251,6 +268,19 @@ class TopicDataStorageSPI(TransactionalStorageSPI):
 	def is_free_find_supported(self) -> bool:
 		return True
 
+	# noinspection PyMethodMayBeStatic
+	def is_increment_supported(self) -> bool:
+		"""
+		whether columns can be increased in storage side, without reading them first
+		"""
+		return False
+
+	def increment(self, incrementer: EntityIncrementer) -> int:
+		"""
+		returns updated count
+		"""
+		raise UnexpectedStorageException('Method[increment] is not supported by current storage.')
+
 	def append_topic_to_trino(self, topic: Topic) -> None:
 		pass
 
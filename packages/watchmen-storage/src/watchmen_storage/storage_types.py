@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from abc import abstractmethod
+from decimal import Decimal
 from enum import Enum
 from typing import Any, Dict, List, Optional, Tuple, TypeVar, Union
 
@@ -204,5 +205,15 @@ class EntityUpdater(EntityHelper):
 	update: EntityUpdate
 
 
+class EntityIncrementer(EntityHelper):
+	"""
+	add increments to current values of columns in storage, null value is treated as 0.
+	columns in update are set as given values.
+	"""
+	criteria: Optional[EntityCriteria] = None
+	increments: Dict[EntityColumnName, Union[int, float, Decimal]]
+	update: EntityUpdate = {}
+
+
 class EntityLimitedStraightValuesFinder(EntityLimitedFinder):
 	straightColumns: List[EntityStraightColumn] = None
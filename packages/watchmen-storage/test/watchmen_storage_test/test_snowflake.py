@@ -0,0 +1,133 @@
+from os import environ
+from threading import Thread
+from time import perf_counter
+from typing import List
+from unittest import skipUnless, TestCase
+from unittest.mock import patch
+
+from watchmen_storage import immutable_worker_id, snowflake, SnowflakeGenerator
+from watchmen_storage.snowflake import MAX_BORROWED_MILLISECONDS, MAX_SEQUENCE, TIMESTAMP_LEFT_SHIFT, TWEPOCH
+
+
+def ask_timestamp(an_id: int) -> int:
+	return (an_id >> TIMESTAMP_LEFT_SHIFT) + TWEPOCH
+
+
+def ask_sequence(an_id: int) -> int:
+	return an_id & MAX_SEQUENCE
+
+
+# stress test and microbenchmark take a while, run them by SNOWFLAKE_STRESS_TEST=true
+STRESS_TEST_ENABLED = environ.get('SNOWFLAKE_STRESS_TEST') == 'true'
+
+
+class SnowflakeTest(TestCase):
+	def test_unique_in_threads(self):
+		generator = SnowflakeGenerator(1, immutable_worker_id(3))
+		results: List[List[int]] = [[] for _ in range(16)]
+
+		def generate(ids: List[int]) -> None:
+			for _ in range(1000):
+				ids.append(generator.next_id())
+				ids.extend(generator.next_ids(37))
+
+		threads = [Thread(target=generate, args=(ids,)) for ids in results]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
+		all_ids = [an_id for ids in results for an_id in ids]
+		self.assertEqual(16 * 1000 * 38, len(all_ids))
+		self.assertEqual(len(all_ids), len(set(all_ids)))
+		# ascending in each thread
+		for ids in results:
+			self.assertEqual(sorted(ids), ids)
+
+	def test_borrow_ahead_of_clock(self):
+		now = 1700000000000
+		# clock is frozen, until ticked
+		clock = {'now': now, 'calls': 0, 'tickAfter': None}
+
+		def generate_timestamp() -> int:
+			clock['calls'] = clock['calls'] + 1
+			if clock['tickAfter'] is not None and clock['calls'] > clock['tickAfter']:
+				clock['now'] = now + 1
+			return clock['now']
+
+		generator = SnowflakeGenerator(0, immutable_worker_id(0))
+		with patch.object(snowflake, 'generate_timestamp', generate_timestamp):
+			ids = generator.next_ids(MAX_SEQUENCE + 1)
+			# sequences of current millisecond are used up
+			self.assertEqual({now}, set(ask_timestamp(x) for x in ids))
+			self.assertEqual(list(range(MAX_SEQUENCE + 1)), [ask_sequence(x) for x in ids])
+			an_id = generator.next_id()
+			self.assertEqual((now + 1, 0), (ask_timestamp(an_id), ask_sequence(an_id)))
+			ids = ids + [an_id] + generator.next_ids((MAX_SEQUENCE + 1) * 2)
+			# across milliseconds ahead of clock, still contiguous
+			self.assertEqual((now + 3, 0), (ask_timestamp(ids[-1]), ask_sequence(ids[-1])))
+			self.assertEqual(sorted(ids), ids)
+			self.assertEqual(len(ids), len(set(ids)))
+			# borrows at most given milliseconds ahead of clock
+			ids = generator.next_ids((MAX_SEQUENCE + 1) * (MAX_BORROWED_MILLISECONDS - 3) + MAX_SEQUENCE)
+			self.assertEqual(
+				(now + MAX_BORROWED_MILLISECONDS, MAX_SEQUENCE), (ask_timestamp(ids[-1]), ask_sequence(ids[-1])))
+			# then waits for clock
+			clock['tickAfter'] = clock['calls'] + 10
+			an_id = generator.next_id()
+			self.assertEqual((now + MAX_BORROWED_MILLISECONDS + 1, 0), (ask_timestamp(an_id), ask_sequence(an_id)))
+			self.assertGreater(clock['calls'], clock['tickAfter'])
+
+	def test_close_waits_out_borrowed(self):
+		now = 1700000000000
+		clock = {'now': now, 'calls': 0}
+
+		def generate_timestamp() -> int:
+			# clock moves 1 millisecond per 10 calls
+			clock['calls'] = clock['calls'] + 1
+			return now + clock['calls'] // 10
+
+		generator = SnowflakeGenerator(0, immutable_worker_id(0))
+		with patch.object(snowflake, 'generate_timestamp', generate_timestamp):
+			ids = generator.next_ids((MAX_SEQUENCE + 1) * 50)
+			borrowed = ask_timestamp(ids[-1])
+			self.assertGreater(borrowed, generate_timestamp())
+			generator.close()
+			# next generator with same worker id starts after borrowed milliseconds
+			self.assertGreater(generate_timestamp(), borrowed)
+
+	@skipUnless(STRESS_TEST_ENABLED, 'Stress test is not enabled.')
+	def test_stress_unique_in_threads(self):
+		generator = SnowflakeGenerator(1, immutable_worker_id(3))
+		count_per_thread = 1000000
+		results: List[List[int]] = [[] for _ in range(16)]
+
+		def generate(ids: List[int]) -> None:
+			while len(ids) < count_per_thread:
+				ids.append(generator.next_id())
+				ids.extend(generator.next_ids(999))
+
+		threads = [Thread(target=generate, args=(ids,)) for ids in results]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
+		all_ids = set()
+		for ids in results:
+			self.assertEqual(sorted(ids), ids)
+			all_ids.update(ids)
+		self.assertEqual(sum(len(ids) for ids in results), len(all_ids))
+
+	@skipUnless(STRESS_TEST_ENABLED, 'Stress test is not enabled.')
+	def test_benchmark(self):
+		generator = SnowflakeGenerator(1, immutable_worker_id(3))
+		count = 1000000
+		start = perf_counter()
+		for _ in range(count):
+			generator.next_id()
+		spent = perf_counter() - start
+		print(f'next_id: {count / spent:,.0f} ids/s.')
+		start = perf_counter()
+		for _ in range(count // 1000):
+			generator.next_ids(1000)
+		spent = perf_counter() - start
+		print(f'next_ids(1000): {count / spent:,.0f} ids/s.')
@@ -204,6 +204,14 @@ class ArrayHelper:
 				a_dict[key] = [an_element]
 		return a_dict
 
+	def chunk(self, size: int) -> ArrayHelper:
+		"""
+		split into lists with given size, the last one might be smaller
+		"""
+		if size <= 0:
+			return ArrayHelper([self.aList])
+		return ArrayHelper([self.aList[index:index + size] for index in range(0, len(self.aList), size)])
+
 	def join(self, separator: str) -> str:
 		new_list: list = []
 		for an_element in self.aList:
@@ -8,7 +8,8 @@ _mdc_context: contextvars.ContextVar[Dict[str, str]] = contextvars.ContextVar(
 
 
 def mdc_put(key: str, value: str) -> None:
-    current = _mdc_context.get()
+    # copy, never mutate the dict of context var, which might be the default or shared with other contexts
+    current = dict(_mdc_context.get())
     current[key] = value
     _mdc_context.set(current)
 
@@ -18,7 +19,7 @@ def mdc_get(key: str) -> Optional[str]:
 
 
 def mdc_remove(key: str) -> None:
-    current = _mdc_context.get()
+    current = dict(_mdc_context.get())
     current.pop(key, None)
     _mdc_context.set(current)
 